@@ -1,13 +1,21 @@
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Callable, Awaitable
+from typing import Any, Dict, List, Callable, Awaitable, Optional
 from dataclasses import dataclass, field
 from datetime import datetime
 import asyncio
+import time
 from bot.logging import LOGGER
+from bot.utils.metrics import metrics
 
 logger = LOGGER(__name__)
 
+event_published = metrics.counter('events_published_total', 'Events published', ('event_type',))
+event_dropped = metrics.counter('events_dropped_total', 'Events dropped on a full subscriber queue', ('event_type', 'subscriber'))
+event_coalesced = metrics.counter('events_coalesced_total', 'Queued events replaced by a newer one', ('event_type', 'subscriber'))
+event_handled = metrics.counter('events_handled_total', 'Events handled by outcome', ('event_type', 'subscriber', 'status'))
+event_handler_latency = metrics.histogram('event_handler_duration_seconds', 'Event handler latency', ('event_type',))
+
 @dataclass
 class Event:
     """Base event class"""
@@ -30,49 +38,234 @@ class EventHandler(ABC):
         """Event types this handler can process"""
         pass
 
+DROP = "drop"
+BLOCK = "block"
+COALESCE = "coalesce"
+OVERFLOW_POLICIES = (DROP, BLOCK, COALESCE)
+
+DEFAULT_QUEUE_SIZE = 1000
+
+
+def default_coalesce_key(event: Event) -> Any:
+    """Events of the same type about the same clone replace each other while queued"""
+    return (event.event_type, event.data.get("clone_id"))
+
+
+class Subscription:
+    """One subscriber: a bounded queue drained by its own worker tasks
+
+    Overflow policies when the queue is full:
+    - ``drop``: the new event is discarded and counted
+    - ``block``: ``publish`` waits for room (backpressure on the publisher)
+    - ``coalesce``: a queued event with the same key is replaced by the newer one;
+      if nothing matches, the new event is dropped
+    """
+
+    def __init__(self, name: str, handler: Callable[[Event], Awaitable[None]], event_types: List[str],
+                 maxsize: int = DEFAULT_QUEUE_SIZE, overflow: str = DROP, workers: int = 1,
+                 coalesce_key: Callable[[Event], Any] = default_coalesce_key):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow!r}; use one of {OVERFLOW_POLICIES}")
+        self.name = name
+        self.handler = handler
+        self.event_types = set(event_types)
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.worker_count = max(1, workers)
+        self.coalesce_key = coalesce_key
+        self.queue: Optional[asyncio.Queue] = None
+        self.workers: List[asyncio.Task] = []
+        # Coalescing keeps the newest event per key; the queue only carries keys
+        self._latest: Dict[Any, Event] = {}
+
+    def _ensure_started(self):
+        if self.queue is None:
+            self.queue = asyncio.Queue(maxsize=self.maxsize)
+        self.workers = [task for task in self.workers if not task.done()]
+        while len(self.workers) < self.worker_count:
+            self.workers.append(asyncio.create_task(self._work(), name=f"event-worker:{self.name}"))
+
+    def offer(self, event: Event) -> str:
+        """Enqueue without waiting: returns ``queued``, ``coalesced``, ``dropped`` or ``full``"""
+        self._ensure_started()
+        if self.overflow == COALESCE:
+            key = self.coalesce_key(event)
+            if key in self._latest:
+                self._latest[key] = event
+                return "coalesced"
+            if self.queue.full():
+                return "dropped"
+            self._latest[key] = event
+            self.queue.put_nowait(key)
+            return "queued"
+        if self.queue.full():
+            return "full" if self.overflow == BLOCK else "dropped"
+        self.queue.put_nowait(event)
+        return "queued"
+
+    async def put(self, event: Event):
+        self._ensure_started()
+        await self.queue.put(event)
+
+    async def _work(self):
+        while True:
+            item = await self.queue.get()
+            event = self._latest.pop(item, None) if self.overflow == COALESCE else item
+            try:
+                if event is not None:
+                    await _run_handler(self.name, self.handler, event)
+            finally:
+                self.queue.task_done()
+
+    def depth(self) -> int:
+        return self.queue.qsize() if self.queue else 0
+
+    async def stop(self):
+        for task in self.workers:
+            task.cancel()
+        for task in self.workers:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self.workers = []
+
+
+async def _run_handler(name: str, handler: Callable[[Event], Awaitable[None]], event: Event):
+    started = time.perf_counter()
+    try:
+        await handler(event)
+        event_handled.inc(event_type=event.event_type, subscriber=name, status="ok")
+    except Exception as e:
+        event_handled.inc(event_type=event.event_type, subscriber=name, status="error")
+        logger.error(f"Error in event handler {name} for {event.event_type}: {e}")
+    finally:
+        event_handler_latency.observe(time.perf_counter() - started, event_type=event.event_type)
+
+
 class EventBus:
-    """Simple event bus for pub/sub messaging"""
-    
-    def __init__(self):
-        self._handlers: Dict[str, List[EventHandler]] = {}
-        self._async_handlers: Dict[str, List[Callable[[Event], Awaitable[None]]]] = {}
-    
-    def subscribe(self, handler: EventHandler):
+    """Pub/sub event bus with a bounded queue and worker tasks per subscriber
+
+    Publishing only enqueues, so a slow subscriber never delays the publisher or the
+    other subscribers. Each subscriber processes its events in order unless it asks
+    for more than one worker.
+    """
+
+    def __init__(self, default_maxsize: int = DEFAULT_QUEUE_SIZE, default_overflow: str = DROP):
+        self.default_maxsize = default_maxsize
+        self.default_overflow = default_overflow
+        self._subscriptions: List[Subscription] = []
+        self._by_type: Dict[str, List[Subscription]] = {}
+        self._blocked_puts: set = set()
+        self._closed = False
+
+    def _add(self, subscription: Subscription) -> Subscription:
+        self._subscriptions.append(subscription)
+        for event_type in subscription.event_types:
+            self._by_type.setdefault(event_type, []).append(subscription)
+        return subscription
+
+    def subscribe(self, handler: EventHandler, maxsize: Optional[int] = None,
+                  overflow: Optional[str] = None, workers: int = 1) -> Subscription:
         """Subscribe an event handler"""
-        for event_type in handler.event_types:
-            if event_type not in self._handlers:
-                self._handlers[event_type] = []
-            self._handlers[event_type].append(handler)
-    
-    def subscribe_async(self, event_type: str, handler: Callable[[Event], Awaitable[None]]):
+        return self._add(Subscription(
+            handler.__class__.__name__, handler.handle, handler.event_types,
+            maxsize or self.default_maxsize, overflow or self.default_overflow, workers
+        ))
+
+    def subscribe_async(self, event_type: str, handler: Callable[[Event], Awaitable[None]],
+                        maxsize: Optional[int] = None, overflow: Optional[str] = None,
+                        workers: int = 1, name: Optional[str] = None) -> Subscription:
         """Subscribe an async function handler"""
-        if event_type not in self._async_handlers:
-            self._async_handlers[event_type] = []
-        self._async_handlers[event_type].append(handler)
-    
+        return self._add(Subscription(
+            name or getattr(handler, "__qualname__", repr(handler)), handler, [event_type],
+            maxsize or self.default_maxsize, overflow or self.default_overflow, workers
+        ))
+
+    def unsubscribe(self, subscription: Subscription):
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+            for subscribers in self._by_type.values():
+                if subscription in subscribers:
+                    subscribers.remove(subscription)
+            for task in subscription.workers:
+                task.cancel()
+
+    def _record(self, event: Event, subscription: Subscription, outcome: str):
+        if outcome == "dropped":
+            event_dropped.inc(event_type=event.event_type, subscriber=subscription.name)
+            logger.warning(f"Event queue full for {subscription.name}, dropped {event.event_type}")
+        elif outcome == "coalesced":
+            event_coalesced.inc(event_type=event.event_type, subscriber=subscription.name)
+
     async def publish(self, event: Event):
-        """Publish an event to all subscribers"""
+        """Publish an event to all subscribers; waits only for room in ``block`` queues"""
+        if self._closed:
+            logger.warning(f"Event bus is closed, ignoring {event.event_type}")
+            return
         logger.debug(f"Publishing event: {event.event_type}")
-        
-        # Handle class-based handlers
-        handlers = self._handlers.get(event.event_type, [])
-        for handler in handlers:
-            try:
-                await handler.handle(event)
-            except Exception as e:
-                logger.error(f"Error in event handler {handler.__class__.__name__}: {e}")
-        
-        # Handle function-based handlers
-        async_handlers = self._async_handlers.get(event.event_type, [])
-        for handler in async_handlers:
-            try:
-                await handler(event)
-            except Exception as e:
-                logger.error(f"Error in async event handler: {e}")
-    
+        event_published.inc(event_type=event.event_type)
+        for subscription in list(self._by_type.get(event.event_type, ())):
+            outcome = subscription.offer(event)
+            if outcome == "full":
+                await subscription.put(event)
+            else:
+                self._record(event, subscription, outcome)
+
     def publish_sync(self, event: Event):
         """Publish event without waiting (fire and forget)"""
-        asyncio.create_task(self.publish(event))
+        if self._closed:
+            logger.warning(f"Event bus is closed, ignoring {event.event_type}")
+            return
+        event_published.inc(event_type=event.event_type)
+        for subscription in list(self._by_type.get(event.event_type, ())):
+            outcome = subscription.offer(event)
+            if outcome == "full":
+                # Tracked so drain() waits for it
+                task = asyncio.create_task(subscription.put(event))
+                self._blocked_puts.add(task)
+                task.add_done_callback(self._blocked_puts.discard)
+            else:
+                self._record(event, subscription, outcome)
+
+    async def join(self):
+        """Wait until every event published so far has been handled"""
+        while self._blocked_puts:
+            await asyncio.gather(*list(self._blocked_puts), return_exceptions=True)
+        for subscription in list(self._subscriptions):
+            if subscription.queue is not None:
+                await subscription.queue.join()
+
+    async def drain(self, timeout: float = 10.0) -> bool:
+        """Stop accepting events, finish the queued ones (up to ``timeout``) and stop workers"""
+        self._closed = True
+        drained = True
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            drained = False
+            logger.warning(f"Event bus drain timed out with {sum(s.depth() for s in self._subscriptions)} events queued")
+        for task in list(self._blocked_puts):
+            task.cancel()
+        for subscription in self._subscriptions:
+            await subscription.stop()
+        return drained
+
+    def reopen(self):
+        self._closed = False
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Queue depth and policy per subscriber"""
+        return {
+            subscription.name: {
+                "event_types": sorted(subscription.event_types),
+                "depth": subscription.depth(),
+                "maxsize": subscription.maxsize,
+                "overflow": subscription.overflow,
+                "workers": len([task for task in subscription.workers if not task.done()]),
+            }
+            for subscription in self._subscriptions
+        }
 
 # Global event bus instance
 event_bus = EventBus()
@@ -72,3 +72,17 @@ class SubscriptionExpiredEvent(Event):
             },
             source="subscription_manager"
         )
+
+class CloneConfigChangedEvent(Event):
+    """Event fired when clone settings change; clone_id is None for global settings"""
+
+    def __init__(self, clone_id: str = None, fields: list = None, **kwargs):
+        super().__init__(
+            event_type="clone.config_changed",
+            data={
+                "clone_id": clone_id,
+                "fields": fields or [],
+                **kwargs
+            },
+            source="clone_db"
+        )
@@ -1,3 +1,7 @@
+# Command monitoring must be registered before any Mongo client is created
+from bot.utils.metrics import register_mongo_listener
+register_mongo_listener()
+
 from .users import (
     add_user,
     del_user,
@@ -50,5 +54,8 @@ from .balance_db import (
     log_transaction,
     get_user_transactions,
     get_all_user_balances,
+    get_user_balances_page,
+    get_balance_totals,
+    get_user_transactions_page,
     check_sufficient_balance
 )
\ No newline at end of file
@@ -1,14 +1,14 @@
 import asyncio
 from datetime import datetime
-from motor.motor_asyncio import AsyncIOMotorClient
+from bot.database.connection import db
+from bot.database.pagination import Page, aggregate_totals, fetch_page
 from info import Config
 from bot.logging import LOGGER
 
 logger = LOGGER(__name__)
 
 # Balance database
-balance_client = AsyncIOMotorClient(Config.DATABASE_URI)
-balance_db = balance_client[Config.DATABASE_NAME]
+balance_db = db
 user_balances = balance_db.user_balances
 balance_transactions = balance_db.balance_transactions
 referral_codes = balance_db.referral_codes
@@ -155,6 +155,39 @@ async def get_all_user_balances():
         logger.error(f"❌ Error getting all balances: {e}")
         return []
 
+BALANCE_SORT = (("balance", -1), ("_id", 1))
+TRANSACTION_SORT = (("timestamp", -1), ("_id", -1))
+
+async def get_user_balances_page(cursor: str = None, limit: int = 20) -> Page:
+    """One page of user balances, highest first (admin function)"""
+    try:
+        return await fetch_page(
+            user_balances, sort=BALANCE_SORT, cursor=cursor, limit=limit,
+            projection={"username": 1, "first_name": 1, "balance": 1, "total_spent": 1}
+        )
+    except Exception as e:
+        logger.error(f"❌ Error getting balances page: {e}")
+        return Page([])
+
+async def get_balance_totals():
+    """Number of profiles and the sum of their balances, computed by MongoDB"""
+    try:
+        return await aggregate_totals(user_balances, sums={"balance": "balance"})
+    except Exception as e:
+        logger.error(f"❌ Error getting balance totals: {e}")
+        return {"count": 0, "balance": 0}
+
+async def get_user_transactions_page(user_id: int, cursor: str = None, limit: int = 10) -> Page:
+    """One page of a user's transactions, newest first"""
+    try:
+        return await fetch_page(
+            balance_transactions, {"user_id": user_id}, sort=TRANSACTION_SORT, cursor=cursor, limit=limit,
+            projection={"amount": 1, "type": 1, "description": 1, "balance_after": 1}
+        )
+    except Exception as e:
+        logger.error(f"❌ Error getting transactions page for {user_id}: {e}")
+        return Page([])
+
 async def check_sufficient_balance(user_id: int, required_amount: float):
     """Check if user has sufficient balance"""
     current_balance = await get_user_balance(user_id)
@@ -1,19 +1,29 @@
 import asyncio
 from datetime import datetime
-from motor.motor_asyncio import AsyncIOMotorClient
+from bot.database.connection import db
+from bot.database.pagination import Page, fetch_page
 from info import Config
 from bot.logging import LOGGER
 
 logger = LOGGER(__name__)
 
 # Clone database
-clone_client = AsyncIOMotorClient(Config.DATABASE_URI)
-clone_db = clone_client[Config.DATABASE_NAME] # Corrected to use Config.DATABASE_DB_NAME
+clone_db = db
 clones_collection = clone_db.clones # Renamed to avoid conflict with the import
 clone_configs_collection = clone_db.clone_configs # Renamed for clarity
 global_settings_collection = clone_db.global_settings # Renamed for clarity
 
 
+def _config_changed(clone_id, fields):
+    """Tell config caches a clone's settings changed; ``clone_id`` None means every clone"""
+    try:
+        from bot.core.events.base import event_bus
+        from bot.core.events.clone_events import CloneConfigChangedEvent
+        event_bus.publish_sync(CloneConfigChangedEvent(clone_id, fields=sorted(fields)))
+    except Exception as e:
+        logger.warning(f"⚠️ Could not publish config change for {clone_id}: {e}")
+
+
 async def create_clone(clone_data: dict):
     """Create a new clone entry"""
     try:
@@ -165,6 +175,7 @@ async def create_clone_config(clone_id: str):
         {"$set": default_config},
         upsert=True
     )
+    _config_changed(clone_id, default_config)
 
 async def get_clone(bot_id: str):
     """Get clone data by bot ID"""
@@ -248,12 +259,14 @@ async def get_clone_by_bot_token(bot_token):
         return None
 
 async def update_clone_config(clone_id: str, config_updates: dict):
-    """Update clone configuration"""
+    """Update clone configuration; False if the clone has no configuration"""
     config_updates["updated_at"] = datetime.now()
-    await clone_configs_collection.update_one(
+    result = await clone_configs_collection.update_one(
         {"_id": clone_id},
         {"$set": config_updates}
     )
+    _config_changed(clone_id, config_updates)
+    return result.matched_count > 0
 
 # Clone admin settings functions
 async def toggle_clone_feature(clone_id: str, feature: str, enabled: bool):
@@ -262,6 +275,7 @@ async def toggle_clone_feature(clone_id: str, feature: str, enabled: bool):
         {"_id": clone_id},
         {"$set": {f"features.{feature}": enabled, "updated_at": datetime.now()}}
     )
+    _config_changed(clone_id, [f"features.{feature}"])
 
 async def update_clone_shortener(clone_id: str, api_url: str, api_key: str):
     """Update clone shortener settings"""
@@ -273,6 +287,7 @@ async def update_clone_shortener(clone_id: str, api_url: str, api_key: str):
             "updated_at": datetime.now()
         }}
     )
+    _config_changed(clone_id, ["shortener_settings"])
 
 async def update_clone_shortener_settings(clone_id: str, api_url: str = None, api_key: str = None, enabled: bool = None):
     """Update clone shortener settings with optional parameters"""
@@ -289,6 +304,7 @@ async def update_clone_shortener_settings(clone_id: str, api_url: str = None, ap
         {"_id": clone_id},
         {"$set": update_data}
     )
+    _config_changed(clone_id, update_data)
 
 async def get_clone_config(clone_id: str):
     """Get clone configuration by clone ID"""
@@ -339,6 +355,7 @@ async def update_clone_token_verification(clone_id: str, verification_mode: str
         {"_id": clone_id},
         {"$set": update_data}
     )
+    _config_changed(clone_id, update_data)
 
 async def update_clone_time_settings(clone_id: str, setting: str, value: int):
     """Update clone time-based settings"""
@@ -349,6 +366,7 @@ async def update_clone_time_settings(clone_id: str, setting: str, value: int):
             "updated_at": datetime.now()
         }}
     )
+    _config_changed(clone_id, [f"time_settings.{setting}"])
 
 async def get_clone_admin_id(clone_id: str):
     """Get the admin ID for a specific clone"""
@@ -364,6 +382,18 @@ async def get_all_clones():
         logger.error(f"ERROR: Error getting all clones: {e}")
         return []
 
+CLONE_LIST_PROJECTION = {"username": 1, "bot_id": 1, "status": 1, "admin_id": 1}
+
+async def get_clones_page(cursor: str = None, limit: int = 10, status: str = None) -> Page:
+    """One page of clones in id order, with only the fields listings show"""
+    try:
+        query = {"status": status} if status else {}
+        return await fetch_page(clones_collection, query, sort=(("_id", 1),), cursor=cursor,
+                                limit=limit, projection=CLONE_LIST_PROJECTION)
+    except Exception as e:
+        logger.error(f"ERROR: Error getting clones page: {e}")
+        return Page([])
+
 async def deactivate_clone(clone_id: str):
     """Deactivate a clone"""
     await clones_collection.update_one(
@@ -400,6 +430,7 @@ async def get_global_force_channels():
 async def set_global_force_channels(channels: list):
     """Set global force channels"""
     await set_global_setting("global_force_channels", channels)
+    _config_changed(None, ["global_force_channels"])
 
 async def get_global_about():
     """Get global about message"""
@@ -475,23 +506,6 @@ async def get_clone_file_count(bot_id: str):
         logger.error(f"Error getting file count for clone {bot_id}: {e}")
         return 0
 
-async def update_clone_config(bot_token: str, config_updates: dict):
-    """Update clone configuration"""
-    try:
-        if not bot_token:
-            return False
-            
-        result = await clone_collection.update_one(
-            {"bot_token": bot_token},
-            {"$set": config_updates}
-        )
-        
-        return result.modified_count > 0
-        
-    except Exception as e:
-        logger.error(f"Error updating clone config: {e}")
-        return False
-
 async def get_clone_by_bot_token(bot_token: str):
     """Get clone by bot token"""
     try:
@@ -581,19 +595,23 @@ async def start_clone_in_db(clone_id: str):
     except Exception as e:
         logger.error(f"❌ Error starting clone {clone_id} in DB: {e}")
 
+async def aggregate_clone_status_counts() -> dict:
+    """Number of clones per status in one $group (raises on database errors)"""
+    counts = {}
+    async for row in clones_collection.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+        counts[row["_id"] or "unknown"] = counts.get(row["_id"] or "unknown", 0) + row["count"]
+    return counts
+
 async def get_clone_statistics():
     """Get comprehensive clone statistics"""
     try:
-        total_clones = await clones_collection.count_documents({})
-        active_clones = await clones_collection.count_documents({"status": "active"})
-        pending_clones = await clones_collection.count_documents({"status": "pending_payment"})
-        deactivated_clones = await clones_collection.count_documents({"status": "deactivated"})
+        counts = await aggregate_clone_status_counts()
 
         return {
-            "total": total_clones,
-            "active": active_clones,
-            "pending": pending_clones,
-            "deactivated": deactivated_clones
+            "total": sum(counts.values()),
+            "active": counts.get("active", 0),
+            "pending": counts.get("pending_payment", 0),
+            "deactivated": counts.get("deactivated", 0)
         }
     except Exception as e:
         logger.error(f"❌ Error getting clone statistics: {e}")
@@ -613,6 +631,9 @@ async def delete_clone(bot_id: str):
     """Delete a clone completely"""
     try:
         result = await clones_collection.delete_one({"_id": bot_id})
+        # The clone's stored Telegram session is useless without it
+        from bot.database.session_db import delete_session
+        await delete_session(f"clone_{bot_id}")
         return result.deleted_count > 0
     except Exception as e:
         logger.error(f"ERROR: Error deleting clone {bot_id}: {e}")
@@ -634,6 +655,7 @@ async def delete_clone_config(bot_id: str):
     """Delete clone configuration"""
     try:
         result = await clone_configs_collection.delete_one({"_id": bot_id})
+        _config_changed(bot_id, [])
         return result.deleted_count > 0
     except Exception as e:
         logger.error(f"ERROR: Error deleting clone config {bot_id}: {e}")
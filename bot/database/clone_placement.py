@@ -0,0 +1,625 @@
+"""
+Clone data placement: which database holds a clone's files and stats rollup
+
+A clone's index lives either in the shared database (``files`` / ``clone_stats``
+filtered by ``clone_id``) or in its dedicated database (``mongodb_url`` /
+``db_name`` from the clone record). Documents have the same shape in both, so
+only the collections change, except for ``_id``: in the shared collection every
+clone document's ``_id`` starts with ``<clone_id>_`` (see ``shared_id``), because
+the indexers key files by ``<chat>_<message>`` and two clones indexing one
+channel would otherwise overwrite each other there.
+
+The clone record's ``files_placement`` field is the routing switch. Clones
+without it keep the old split: browsing reads the shared database and the
+indexers write to the dedicated one. ``placement.collections(clone_id)`` is
+what readers use and ``placement.writing(clone_id, query)`` wraps every write.
+
+``placement.migrate(clone_id, target)`` moves a clone online:
+
+1. **claim**: mark the clone record (one migration at a time) and pin its
+   placement to the current side, so every writer follows the router;
+2. **copy**: stream the clone's files to the target in ``_id`` batches while
+   the queries of writes made meanwhile are logged; ids are namespaced on the
+   way into the shared collection, and the move stops if one belongs to
+   another clone;
+3. **catch-up**: re-sync the documents those queries touch, until few remain;
+4. **verify**: compare both sides batch by batch and repair differences;
+5. **cutover**: hold new writes, wait for running ones, re-sync the last
+   queries, check counts, rebuild the target's stats rollup and flip
+   ``files_placement`` in one conditional update; reads never stop;
+6. **cleanup** (optional): delete the clone's data from the old side.
+
+A clone still on the old split has files on both sides and can move either way.
+There is nothing to mirror, so it is merged instead. The claim routes it to the
+target straight away, and the migration waits for indexer writes already under
+way. It then merges the other side's files into the target, skipping any the
+target already holds. A second pass merges what the first missed. The stats are
+rebuilt and the record is flipped. If the merge fails, the clone goes back to
+the split, and running it again is safe. While the merge runs, browsing sees
+only what has reached the target so far.
+
+Usage::
+
+    python -m bot.database.clone_placement <clone_id> shared|dedicated [--cleanup]
+
+only while the bot is stopped: a running bot keeps its routes in memory.
+"""
+import asyncio
+import inspect
+import sys
+import uuid
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from pymongo import DeleteOne, ReplaceOne
+
+from info import Config
+from bot.logging import LOGGER
+from bot.database import file_dedup
+
+logger = LOGGER(__name__)
+
+SHARED = 'shared'
+DEDICATED = 'dedicated'
+PLACEMENTS = (SHARED, DEDICATED)
+PLACEMENT_FIELD = 'files_placement'
+MIGRATION_FIELD = 'placement_migration'  # id of the migration that owns the clone
+
+# Indexes the browse queries need on a clone's files collection
+FILE_INDEXES = (
+    [('clone_id', 1), ('file_id', 1)],
+    [('clone_id', 1), ('indexed_at', -1)],
+    [('clone_id', 1), ('access_count', -1)],
+)
+
+
+def shared_id(clone_id: str, doc_id):
+    """``_id`` a clone document has in the shared collection (idempotent)"""
+    prefix = f"{clone_id}_"
+    text = str(doc_id)
+    return text if text.startswith(prefix) else prefix + text
+
+
+def _id_query(query, id_forms: Callable):
+    """``query`` with every ``_id`` condition widened to the forms ``id_forms`` gives"""
+    if not isinstance(query, dict):
+        return query
+    widened = {}
+    for key, value in query.items():
+        if key == '_id' and not (isinstance(value, dict) and set(value) != {'$in'}):
+            values = value['$in'] if isinstance(value, dict) else [value]
+            widened[key] = {'$in': list({form: None for v in values for form in id_forms(v)})}
+        elif key in ('$or', '$and', '$nor'):
+            widened[key] = [_id_query(part, id_forms) for part in value]
+        else:
+            widened[key] = value
+    return widened
+
+
+class Route(NamedTuple):
+    placement: str
+    url: Optional[str] = None
+    db_name: Optional[str] = None
+
+
+def route_for(clone: Dict, placement: str) -> Route:
+    """Where ``placement`` puts ``clone``'s data; ValueError if it has no database of its own"""
+    if placement == SHARED:
+        return Route(SHARED)
+    if placement != DEDICATED:
+        raise ValueError(f"Unknown placement: {placement}")
+    url = clone.get('mongodb_url') or clone.get('db_url')
+    if not url:
+        raise ValueError(f"Clone {clone.get('_id')} has no database URL")
+    return Route(DEDICATED, url, clone.get('db_name') or f"clone_{clone['_id']}")
+
+
+class Migration:
+    """Progress of moving one clone's data"""
+
+    def __init__(self, clone_id: str, target: str):
+        self.id = uuid.uuid4().hex[:8]
+        self.clone_id = clone_id
+        self.source: Optional[str] = None
+        self.target = target
+        self.status = 'queued'  # queued -> running -> completed | failed
+        self.phase = 'queued'
+        self.message = ''
+        self.total = 0
+        self.copied = 0
+        self.caught_up = 0
+        self.verified = 0
+        self.repaired = 0
+        self.cleaned = 0
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def finish(self, status: str, message: str = ''):
+        self.status = status
+        self.message = message
+        self.phase = status
+        self.finished_at = datetime.now()
+
+    def summary(self) -> str:
+        text = (f"{self.source or '?'} → {self.target} {self.status}: {self.copied}/{self.total} copied, "
+                f"{self.caught_up} caught up, {self.verified} verified, {self.repaired} repaired")
+        if self.cleaned:
+            text += f", {self.cleaned} removed from {self.source}"
+        return f"{text} ({self.message})" if self.message else text
+
+    def as_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'clone_id': self.clone_id,
+            'source': self.source,
+            'target': self.target,
+            'status': self.status,
+            'phase': self.phase,
+            'message': self.message,
+            'total': self.total,
+            'copied': self.copied,
+            'caught_up': self.caught_up,
+            'verified': self.verified,
+            'repaired': self.repaired,
+            'cleaned': self.cleaned,
+            'created_at': self.created_at.isoformat(),
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class _Tenant:
+    """Write log and cutover gate of a clone being migrated"""
+
+    def __init__(self):
+        self.dirty: List[Dict] = []  # queries of writes made since the copy started
+        self.open = asyncio.Event()
+        self.open.set()
+
+
+async def _notify(on_progress: Optional[Callable], migration: Migration):
+    if on_progress is None:
+        return
+    try:
+        result = on_progress(migration)
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        logger.warning(f"⚠️ Progress callback failed for migration {migration.id}: {e}")
+
+
+async def _batches(files, scope: Dict, batch_size: int, projection: Optional[Dict] = None):
+    """Documents matching ``scope`` in ``_id`` order, ``batch_size`` at a time"""
+    last = None
+    while True:
+        query = scope if last is None else {**scope, '_id': {'$gt': last}}
+        docs = await files.find(query, projection).sort('_id', 1).limit(batch_size).to_list(batch_size)
+        if not docs:
+            return
+        yield docs
+        if len(docs) < batch_size:
+            return
+        last = docs[-1]['_id']
+
+
+class ClonePlacement:
+    """Routes clone data reads and writes, and moves clones between databases"""
+
+    MAX_MIGRATIONS = 20  # finished migrations kept for status queries
+    CATCHUP_ROUNDS = 10
+    CUTOVER_TIMEOUT = 30  # seconds to wait for running writes before giving up
+
+    def __init__(self, batch_size: int = 500):
+        self.batch_size = batch_size
+        self.routes: Dict[str, Route] = {}  # clones with an explicit placement
+        self.migrations: 'OrderedDict[str, Migration]' = OrderedDict()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._clients: Dict[str, object] = {}  # dedicated database URL -> motor client
+        self._tenants: Dict[str, _Tenant] = {}
+        self._writers: Counter = Counter()  # clone id -> writes in progress
+
+    async def load(self) -> int:
+        """Read the placement of every clone that has one"""
+        from bot.database.clone_db import clones_collection
+
+        routes = {}
+        async for clone in clones_collection.find({PLACEMENT_FIELD: {'$in': list(PLACEMENTS)}}):
+            try:
+                routes[str(clone['_id'])] = route_for(clone, clone[PLACEMENT_FIELD])
+            except ValueError as e:
+                logger.error(f"❌ Clone {clone['_id']} placement ignored: {e}")
+        self.routes = routes
+        if routes:
+            logger.info(f"🗄️ Loaded data placement of {len(routes)} clones "
+                        f"({sum(1 for route in routes.values() if route.placement == DEDICATED)} dedicated)")
+        return len(routes)
+
+    # ==================== ROUTING ====================
+
+    def placement_of(self, clone_id: str) -> Optional[str]:
+        """``shared``/``dedicated``, or None for clones that never had one set"""
+        route = self.routes.get(str(clone_id))
+        return route.placement if route is not None else None
+
+    def _collections(self, route: Route) -> Tuple:
+        if route.placement == SHARED:
+            from bot.database import mongo_db
+            return mongo_db.collection, mongo_db.clone_stats_collection
+        client = self._clients.get(route.url)
+        if client is None:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            client = self._clients[route.url] = AsyncIOMotorClient(route.url, serverSelectionTimeoutMS=30000)
+        database = client[route.db_name]
+        return database.files, database.clone_stats
+
+    def collections(self, clone_id: str) -> Tuple:
+        """(files, clone_stats) collections holding the clone's index"""
+        return self._collections(self.routes.get(str(clone_id)) or Route(SHARED))
+
+    @asynccontextmanager
+    async def writing(self, clone_id: str, query: Optional[Dict] = None):
+        """Collections to write the clone's data to; ``query`` matches the documents written
+
+        Waits while a migration switches the clone over, and logs ``query`` for its
+        catch-up while it copies. An empty or missing query means any document.
+        """
+        clone_id = str(clone_id)
+        tenant = self._tenants.get(clone_id)
+        if tenant is not None and not tenant.open.is_set():
+            await tenant.open.wait()
+        # No await between the gate check and this count, so a cutover sees every writer
+        with self._writer(clone_id):
+            try:
+                yield self.collections(clone_id)
+            finally:
+                tenant = self._tenants.get(clone_id)
+                if tenant is not None:
+                    tenant.dirty.append(query or {})
+
+    @contextmanager
+    def _writer(self, clone_id: str):
+        self._writers[clone_id] += 1
+        try:
+            yield
+        finally:
+            self._writers[clone_id] -= 1
+            if self._writers[clone_id] <= 0:
+                del self._writers[clone_id]
+
+    def _write_query(self, clone_id: str, document: Dict) -> Dict:
+        """Dirty-log query for an indexer document, matching its id on either side"""
+        return file_dedup.dedup_filter(document) or \
+            {'_id': {'$in': list({document['_id']: None, shared_id(clone_id, document['_id']): None})}}
+
+    def _routed(self, clone_id: str, documents: List[Dict]) -> List[Dict]:
+        """Indexer documents as stored where the clone is routed: namespaced ids in shared"""
+        if self.placement_of(clone_id) != SHARED:
+            return documents
+        return [dict(doc, _id=shared_id(clone_id, doc['_id'])) for doc in documents]
+
+    async def merge_files(self, clone_id: str, documents: List[Dict], collection) -> List[Dict]:
+        """Indexer write: ``collection`` until the clone has a placement, then the routed one
+
+        Returns the documents that were new. Routed clones also count them in the
+        stats rollup browsing reads; the old split never kept one for indexer writes.
+        """
+        from bot.database.mongo_db import add_new_files_to_clone_stats
+
+        clone_id = str(clone_id)
+        if clone_id not in self.routes:
+            with self._writer(clone_id):
+                return await file_dedup.merge_many(documents, collection)
+        query = {'$or': [self._write_query(clone_id, doc) for doc in documents]}
+        async with self.writing(clone_id, query) as (files, stats):
+            inserted = await file_dedup.merge_many(self._routed(clone_id, documents), files)
+            await add_new_files_to_clone_stats(clone_id, inserted, stats)
+            return inserted
+
+    async def upsert_file(self, clone_id: str, document: Dict, collection) -> Optional[Dict]:
+        """Single-document ``merge_files``; the document if it was new, else None"""
+        from bot.database.mongo_db import add_new_files_to_clone_stats
+
+        clone_id = str(clone_id)
+        if clone_id not in self.routes:
+            with self._writer(clone_id):
+                return await file_dedup.upsert_file(document, collection)
+        async with self.writing(clone_id, self._write_query(clone_id, document)) as (files, stats):
+            inserted = await file_dedup.upsert_file(self._routed(clone_id, [document])[0], files)
+            if inserted is not None:
+                await add_new_files_to_clone_stats(clone_id, [inserted], stats)
+            return inserted
+
+    # ==================== MIGRATION ====================
+
+    def _new_migration(self, clone_id: str, target: str) -> Migration:
+        migration = Migration(str(clone_id), target)
+        self.migrations[migration.id] = migration
+        while len(self.migrations) > self.MAX_MIGRATIONS:
+            self.migrations.popitem(last=False)
+        return migration
+
+    def get_migration(self, migration_id: str) -> Optional[Migration]:
+        return self.migrations.get(migration_id)
+
+    async def migrate(self, clone_id: str, target: str, cleanup: bool = False,
+                      on_progress: Optional[Callable] = None, migration: Optional[Migration] = None) -> Migration:
+        """Move the clone's files and stats rollup to ``target`` without stopping it"""
+        from bot.database.clone_db import clones_collection
+
+        clone_id = str(clone_id)
+        migration = migration or self._new_migration(clone_id, target)
+        migration.status = 'running'
+        claimed = split = False
+        try:
+            clone = await clones_collection.find_one({'_id': clone_id})
+            if not clone:
+                raise ValueError(f"Clone {clone_id} not found")
+            # Without a placement, a clone with a database of its own still has the old split
+            split = clone_id not in self.routes and bool(clone.get('mongodb_url') or clone.get('db_url'))
+            migration.source = self.placement_of(clone_id) or (DEDICATED if split and target == SHARED else SHARED)
+            if migration.source == target:
+                raise ValueError(f"Clone {clone_id} is already {target}")
+            source_route, target_route = route_for(clone, migration.source), route_for(clone, target)
+            source, source_stats = self._collections(source_route)
+            files, stats = self._collections(target_route)
+            scope = {'clone_id': clone_id}
+
+            if not split:
+                existing = await files.count_documents(scope)
+                if existing:
+                    raise ValueError(f"The {target} database already holds {existing} files of clone {clone_id}; "
+                                     f"remove them before moving the clone there")
+
+            result = await clones_collection.update_one(
+                {'_id': clone_id, MIGRATION_FIELD: {'$exists': False}},
+                {'$set': {MIGRATION_FIELD: migration.id, PLACEMENT_FIELD: target if split else migration.source}}
+            )
+            if not result.modified_count:
+                raise RuntimeError(f"Clone {clone_id} is already being migrated "
+                                   f"(clear {MIGRATION_FIELD} in its record if no migration is running)")
+            claimed = True
+            self.routes[clone_id] = target_route if split else source_route
+            logger.info(f"🚚 Migration {migration.id}: {'merging' if split else 'moving'} clone {clone_id} "
+                        f"{migration.source} → {target}")
+
+            to_target = self._id_mapper(clone_id, target)
+            await self._ensure_indexes(files)
+            move = self._merge_split if split else self._mirror
+            await move(migration, scope, source, (files, stats), target_route, to_target, on_progress)
+            claimed = False
+            logger.info(f"✅ Migration {migration.id}: clone {clone_id} now reads and writes {target}")
+
+            from bot.database.clone_db import _config_changed
+            _config_changed(clone_id, [PLACEMENT_FIELD])
+
+            if cleanup:
+                migration.phase = 'cleanup'
+                await _notify(on_progress, migration)
+                async for docs in _batches(source, scope, self.batch_size, {'_id': 1}):
+                    deleted = await source.delete_many({**scope, '_id': {'$in': [doc['_id'] for doc in docs]}})
+                    migration.cleaned += deleted.deleted_count
+                await source_stats.delete_one({'_id': clone_id})
+
+            migration.finish('completed')
+        except Exception as e:
+            logger.error(f"❌ Migration {migration.id} of clone {clone_id} failed in {migration.phase}: {e}")
+            self._tenants.pop(clone_id, None)
+            if claimed:
+                # Reads and writes stay on the source (a split clone goes back to the split);
+                # the partial copy is left for inspection
+                undo = {MIGRATION_FIELD: ''}
+                if split:
+                    undo[PLACEMENT_FIELD] = ''
+                    self.routes.pop(clone_id, None)
+                await clones_collection.update_one({'_id': clone_id, MIGRATION_FIELD: migration.id},
+                                                   {'$unset': undo})
+            migration.finish('failed', str(e))
+        await _notify(on_progress, migration)
+        return migration
+
+    async def _mirror(self, migration: Migration, scope: Dict, source, target: Tuple, route: Route,
+                      to_target: Callable, on_progress):
+        """Copy, catch up, verify and cut over while writers stay on the source"""
+        clone_id, files = migration.clone_id, target[0]
+        tenant = self._tenants[clone_id] = _Tenant()
+        migration.phase = 'copy'
+        migration.total = await source.count_documents(scope)
+        await _notify(on_progress, migration)
+        async for docs in _batches(source, scope, self.batch_size):
+            docs = [dict(doc, _id=to_target(doc['_id'])) for doc in docs]
+            await self._check_owner(clone_id, files, [doc['_id'] for doc in docs])
+            await files.bulk_write([self._replace(clone_id, doc) for doc in docs], ordered=False)
+            migration.copied += len(docs)
+            await _notify(on_progress, migration)
+
+        migration.phase = 'catch-up'
+        for _ in range(self.CATCHUP_ROUNDS):
+            if len(tenant.dirty) <= self.batch_size:
+                break
+            migration.caught_up += await self._drain(tenant, clone_id, source, files, to_target)
+            await _notify(on_progress, migration)
+
+        migration.phase = 'verify'
+        await _notify(on_progress, migration)
+        await self._verify(migration, scope, source, files, to_target, on_progress)
+
+        migration.phase = 'cutover'
+        await _notify(on_progress, migration)
+        tenant.open.clear()
+        try:
+            await self._wait_for_writers(clone_id)
+            migration.caught_up += await self._drain(tenant, clone_id, source, files, to_target)
+            source_count, target_count = await asyncio.gather(
+                source.count_documents(scope), files.count_documents(scope))
+            if source_count != target_count:
+                raise RuntimeError(f"{source_count} files in {migration.source} but {target_count} in "
+                                   f"{migration.target}")
+            await self._switch(migration, target, route)
+        finally:
+            del self._tenants[clone_id]
+            tenant.open.set()
+
+    async def _merge_split(self, migration: Migration, scope: Dict, source, target: Tuple, route: Route,
+                           to_target: Callable, on_progress):
+        """Fold the other side of a split clone into ``target``, where it already reads and writes
+
+        Both sides hold files the clone owns, so nothing is mirrored: the other side's
+        files are merged in like indexer writes (documents already there win) and a
+        second pass merges whatever the first one missed.
+        """
+        clone_id, files = migration.clone_id, target[0]
+        # Indexer writes that started before the route switch still go to the other side
+        await self._wait_for_writers(clone_id)
+        migration.phase = 'merge'
+        migration.total = await source.count_documents(scope)
+        await _notify(on_progress, migration)
+        async for docs in _batches(source, scope, self.batch_size):
+            docs = [dict(doc, _id=to_target(doc['_id'])) for doc in docs]
+            await self._check_owner(clone_id, files, [doc['_id'] for doc in docs])
+            await file_dedup.merge_many(docs, files)
+            migration.copied += len(docs)
+            await _notify(on_progress, migration)
+
+        migration.phase = 'verify'
+        await _notify(on_progress, migration)
+        async for docs in _batches(source, scope, self.batch_size):
+            migration.repaired += len(await file_dedup.merge_many(
+                [dict(doc, _id=to_target(doc['_id'])) for doc in docs], files))
+            migration.verified += len(docs)
+            await _notify(on_progress, migration)
+
+        migration.phase = 'cutover'
+        await _notify(on_progress, migration)
+        await self._switch(migration, target, route)
+
+    async def _switch(self, migration: Migration, target: Tuple, route: Route):
+        """Rebuild the target's stats rollup, then flip the clone record and route to it"""
+        from bot.database.clone_db import clones_collection
+        from bot.database.mongo_db import rebuild_clone_stats
+
+        if await rebuild_clone_stats(migration.clone_id, target) is None:
+            raise RuntimeError("Could not build the stats rollup in the target database")
+        result = await clones_collection.update_one(
+            {'_id': migration.clone_id, MIGRATION_FIELD: migration.id},
+            {'$set': {PLACEMENT_FIELD: migration.target, 'placement_changed_at': datetime.now()},
+             '$unset': {MIGRATION_FIELD: ''}}
+        )
+        if not result.modified_count:
+            raise RuntimeError("The clone record changed during the migration")
+        self.routes[migration.clone_id] = route
+
+    async def _ensure_indexes(self, files):
+        await file_dedup.ensure_dedup_index(files)
+        for keys in FILE_INDEXES:
+            await files.create_index(keys)
+
+    def _id_mapper(self, clone_id: str, target: str) -> Callable:
+        """Source ``_id`` -> target ``_id``: namespaced into shared, unchanged otherwise"""
+        if target == SHARED:
+            return lambda doc_id: shared_id(clone_id, doc_id)
+        return lambda doc_id: doc_id
+
+    @staticmethod
+    def _replace(clone_id: str, doc: Dict) -> ReplaceOne:
+        # An _id held by another clone fails the upsert instead of being overwritten
+        return ReplaceOne({'_id': doc['_id'], 'clone_id': clone_id}, doc, upsert=True)
+
+    @staticmethod
+    async def _check_owner(clone_id: str, files, ids: List):
+        taken = await files.find({'_id': {'$in': ids}, 'clone_id': {'$ne': clone_id}},
+                                 {'_id': 1, 'clone_id': 1}).to_list(5)
+        if taken:
+            owners = ", ".join(f"{doc['_id']} ({doc.get('clone_id')})" for doc in taken)
+            raise RuntimeError(f"Target ids already belong to other documents: {owners}")
+
+    async def _sync(self, clone_id: str, query: Dict, source, files, to_target: Callable) -> int:
+        """Make the target's documents matching ``query`` equal the source's"""
+        scope = {'clone_id': clone_id}
+        docs = [dict(doc, _id=to_target(doc['_id'])) for doc in await source.find({**scope, **query}).to_list(None)]
+        target_query = _id_query(query, lambda doc_id: (doc_id, to_target(doc_id)))
+        stale = await files.find({**scope, **target_query}, {'_id': 1}).to_list(None)
+        kept = {doc['_id'] for doc in docs}
+        operations = [self._replace(clone_id, doc) for doc in docs]
+        operations += [DeleteOne({'_id': doc['_id'], **scope}) for doc in stale if doc['_id'] not in kept]
+        if operations:
+            await files.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    async def _drain(self, tenant: _Tenant, clone_id: str, source, files, to_target: Callable) -> int:
+        """Re-sync what the logged writes touched; returns how many queries were replayed"""
+        queries, tenant.dirty = tenant.dirty, []
+        if any(not query for query in queries):
+            await self._sync(clone_id, {}, source, files, to_target)
+            return len(queries)
+        for start in range(0, len(queries), 50):
+            await self._sync(clone_id, {'$or': queries[start:start + 50]}, source, files, to_target)
+        return len(queries)
+
+    async def _verify(self, migration: Migration, scope: Dict, source, files, to_target: Callable, on_progress):
+        """Compare both sides batch by batch, repairing whatever differs"""
+        async for docs in _batches(source, scope, self.batch_size):
+            docs = [dict(doc, _id=to_target(doc['_id'])) for doc in docs]
+            ids = [doc['_id'] for doc in docs]
+            copies = {doc['_id']: doc for doc in await files.find({**scope, '_id': {'$in': ids}}).to_list(None)}
+            repairs = [self._replace(migration.clone_id, doc) for doc in docs if copies.get(doc['_id']) != doc]
+            if repairs:
+                await files.bulk_write(repairs, ordered=False)
+            migration.verified += len(docs)
+            migration.repaired += len(repairs)
+            await _notify(on_progress, migration)
+        prefix = f"{migration.clone_id}_"
+        async for docs in _batches(files, scope, self.batch_size, {'_id': 1}):
+            ids = [doc['_id'] for doc in docs]
+            # A namespaced target id may come from the source id without the prefix
+            candidates = ids + [doc_id[len(prefix):] for doc_id in ids
+                                if isinstance(doc_id, str) and doc_id.startswith(prefix)]
+            found = await source.find({**scope, '_id': {'$in': candidates}}, {'_id': 1}).to_list(None)
+            present = {to_target(doc['_id']) for doc in found}
+            extra = [doc_id for doc_id in ids if doc_id not in present]
+            if extra:
+                await files.delete_many({**scope, '_id': {'$in': extra}})
+                migration.repaired += len(extra)
+
+    async def _wait_for_writers(self, clone_id: str):
+        deadline = asyncio.get_running_loop().time() + self.CUTOVER_TIMEOUT
+        while self._writers.get(clone_id):
+            if asyncio.get_running_loop().time() > deadline:
+                raise RuntimeError(f"{self._writers[clone_id]} writes still running after {self.CUTOVER_TIMEOUT}s")
+            await asyncio.sleep(0.01)
+
+    def submit(self, clone_id: str, target: str, cleanup: bool = False) -> Migration:
+        """Queue a migration on the bot's event loop from another thread (the web dashboard)"""
+        if target not in PLACEMENTS:
+            raise ValueError(f"Unknown placement: {target}")
+        loop = self.loop
+        if loop is None or loop.is_closed() or not loop.is_running():
+            raise RuntimeError("The bot is not running")
+        migration = self._new_migration(clone_id, target)
+        asyncio.run_coroutine_threadsafe(self.migrate(clone_id, target, cleanup, migration=migration), loop)
+        return migration
+
+
+placement = ClonePlacement(batch_size=Config.CLONE_MIGRATION_BATCH_SIZE)
+
+
+async def _main(argv: List[str]) -> int:
+    args = [arg for arg in argv if not arg.startswith('--')]
+    if len(args) != 2 or args[1] not in PLACEMENTS:
+        print("Usage: python -m bot.database.clone_placement <clone_id> shared|dedicated [--cleanup]")
+        return 2
+    await placement.load()
+    migration = await placement.migrate(
+        args[0], args[1], cleanup='--cleanup' in argv,
+        on_progress=lambda m: print(f"  {m.phase}: {m.copied}/{m.total} copied, {m.verified} verified")
+    )
+    print(migration.summary())
+    return 0 if migration.status == 'completed' else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main(sys.argv[1:])))
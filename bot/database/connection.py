@@ -1,9 +1,106 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+import threading
 from info import Config
 
-client = AsyncIOMotorClient(Config.DATABASE_URI)
+
+class LazyMotorClient:
+    """The process-wide AsyncIOMotorClient, constructed on first use
+
+    Building a client resolves ``mongodb+srv://`` records and starts pool monitoring,
+    so doing it at import time (once per database module) made every entry point slow
+    to start. Database modules share this one instance instead.
+    """
+
+    def __init__(self, uri: str, **kwargs):
+        self._uri = uri
+        self._kwargs = kwargs
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def created(self) -> bool:
+        return self._client is not None
+
+    def get(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from motor.motor_asyncio import AsyncIOMotorClient
+                    self._client = AsyncIOMotorClient(self._uri, **self._kwargs)
+        return self._client
+
+    def __getitem__(self, name: str) -> 'LazyDatabase':
+        return LazyDatabase(self, name)
+
+    def __getattr__(self, attr):
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        return getattr(self.get(), attr)
+
+
+class LazyDatabase:
+    """A database of a LazyMotorClient; attribute access mirrors AsyncIOMotorDatabase"""
+
+    def __init__(self, client: LazyMotorClient, name: str):
+        self.client = client
+        self.name = name
+        self._database = None
+
+    def get(self):
+        if self._database is None:
+            self._database = self.client.get()[self.name]
+        return self._database
+
+    def __getitem__(self, name: str) -> 'LazyCollection':
+        return LazyCollection(self, name)
+
+    def __getattr__(self, attr):
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        from motor.motor_asyncio import AsyncIOMotorDatabase
+        # Unknown attributes are collections, as on a motor database
+        if hasattr(AsyncIOMotorDatabase, attr):
+            return getattr(self.get(), attr)
+        return LazyCollection(self, attr)
+
+
+class LazyCollection:
+    """A collection handle that binds to the real motor collection on first use"""
+
+    def __init__(self, database: LazyDatabase, name: str):
+        self.database = database
+        self.name = name
+        self._collection = None
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.database.name}.{self.name}"
+
+    def get(self):
+        if self._collection is None:
+            self._collection = self.database.get()[self.name]
+        return self._collection
+
+    def __getitem__(self, name: str):
+        return self.get()[name]
+
+    def __getattr__(self, attr):
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        return getattr(self.get(), attr)
+
+    def __repr__(self):
+        return f"LazyCollection({self.full_name!r})"
+
+
+client = LazyMotorClient(Config.DATABASE_URI)
 db = client[Config.DATABASE_NAME]
 
+
+def get_client():
+    """The shared motor client, created if needed"""
+    return client.get()
+
+
 async def get_database():
     """Get database instance for health checks"""
     return db
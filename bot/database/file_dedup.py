@@ -0,0 +1,295 @@
+"""Clone file deduplication by Telegram ``file_unique_id``
+
+The same file reposted in several channels, or uploaded again, gets a new message
+and a new ``file_id`` each time, but always the same ``file_unique_id``. Clone
+files are stored once per (clone_id, file_unique_id):
+
+- the first copy indexed keeps its ``_id``, ``file_id`` and metadata;
+- every location the file was seen at is kept in ``sources`` as
+  ``{'chat_id', 'message_id'}``, so later copies only add a source.
+
+Documents without a ``file_unique_id`` (and no decodable ``file_id`` to derive one
+from) are stored as before, keyed by their ``_id``.
+
+Existing data is compacted with ``python -m bot.database.file_dedup [clone_id]``,
+which fills in missing ``file_unique_id`` values, merges duplicates in batches and
+then creates the unique index.
+"""
+import asyncio
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional
+from pymongo import DeleteMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from bot.logging import LOGGER
+
+logger = LOGGER(__name__)
+
+DEDUP_INDEX = 'clone_file_unique'
+DEDUP_BATCH = 500
+DUPLICATE_KEY = 11000
+INDEX_OPTIONS_CONFLICT = (85, 86)  # IndexOptionsConflict, IndexKeySpecsConflict
+
+# Fields of the first copy that later copies never overwrite
+IDENTITY_FIELDS = ('_id', 'file_id', 'chat_id', 'message_id', 'sources')
+
+# Counters summed into the kept copy when duplicates are merged
+MERGED_COUNTERS = ('access_count', 'download_count')
+
+
+def file_unique_id_from(file_id) -> Optional[str]:
+    """``file_unique_id`` of a Telegram ``file_id``, derived locally like pyrogram does"""
+    if not isinstance(file_id, str) or not file_id:
+        return None
+    try:
+        from pyrogram.file_id import FileId, FileUniqueId, FileUniqueType
+        return FileUniqueId(file_unique_type=FileUniqueType.DOCUMENT,
+                            media_id=FileId.decode(file_id).media_id).encode()
+    except Exception:
+        return None
+
+
+def unique_id_of(document: Dict) -> Optional[str]:
+    return document.get('file_unique_id') or file_unique_id_from(document.get('file_id'))
+
+
+def source_of(document: Dict) -> Optional[Dict]:
+    if document.get('chat_id') is None or document.get('message_id') is None:
+        return None
+    return {'chat_id': document['chat_id'], 'message_id': document['message_id']}
+
+
+def dedup_filter(document: Dict) -> Optional[Dict]:
+    """Filter matching stored copies of ``document``; None if it cannot be deduplicated"""
+    file_unique_id = unique_id_of(document)
+    if not file_unique_id:
+        return None
+    return {'clone_id': document.get('clone_id'), 'file_unique_id': file_unique_id}
+
+
+def _merge(document: Dict):
+    """Query and update inserting the first copy of a file and adding a source for later copies"""
+    document = dict(document)
+    source = source_of(document)
+    document.pop('sources', None)
+    query = dedup_filter(document)
+    if query is None:
+        return {'_id': document['_id']}, {'$setOnInsert': document}
+
+    document['file_unique_id'] = query['file_unique_id']
+    update = {'$setOnInsert': document}
+    if source:
+        update['$addToSet'] = {'sources': source}
+    return query, update
+
+
+def merge_operation(document: Dict) -> UpdateOne:
+    return UpdateOne(*_merge(document), upsert=True)
+
+
+async def upsert_file(document: Dict, collection) -> Optional[Dict]:
+    """Store one clone file; returns it if it was new, None if it was already stored
+    (at this or another location)"""
+    query, update = _merge(document)
+    # A concurrent insert of the same file can lose the upsert race on the unique
+    # index; the retry then finds that copy and only adds the source
+    for attempt in range(2):
+        try:
+            result = await collection.update_one(query, update, upsert=True)
+            return document if result.upserted_id is not None else None
+        except DuplicateKeyError:
+            if attempt:
+                return None
+    return None
+
+
+def _upserted_ids(result) -> List:
+    """``_id`` of every document an upsert inserted, from a bulk result or BulkWriteError"""
+    details = result.details if isinstance(result, BulkWriteError) else result.bulk_api_result
+    return [upsert['_id'] for upsert in (details or {}).get('upserted', [])]
+
+
+async def merge_many(documents: List[Dict], collection) -> List[Dict]:
+    """Store clone files in one unordered bulk write; returns the ones that were new"""
+    if not documents:
+        return []
+    # Inserted documents keep their own _id, which identifies them in the result
+    by_id = {doc['_id']: doc for doc in documents}
+    operations = [merge_operation(doc) for doc in documents]
+    try:
+        result = await collection.bulk_write(operations, ordered=False)
+        inserted = _upserted_ids(result)
+    except BulkWriteError as e:
+        errors = (e.details or {}).get('writeErrors', [])
+        if any(error.get('code') != DUPLICATE_KEY for error in errors):
+            raise
+        # Upsert races on the unique index: retrying finds the stored copies
+        inserted = _upserted_ids(e)
+        try:
+            result = await collection.bulk_write([operations[error['index']] for error in errors], ordered=False)
+            inserted += _upserted_ids(result)
+        except BulkWriteError as retry_error:
+            inserted += _upserted_ids(retry_error)
+    return [by_id[doc_id] for doc_id in inserted if doc_id in by_id]
+
+
+async def ensure_dedup_index(collection) -> bool:
+    """Create the (clone_id, file_unique_id) unique index
+
+    Only clone files are covered: the shared ``files`` collection also holds records
+    without a ``clone_id``. Fails while duplicates are still stored; run the
+    compaction job first.
+    """
+    for attempt in range(2):
+        try:
+            await collection.create_index(
+                [('clone_id', 1), ('file_unique_id', 1)],
+                name=DEDUP_INDEX,
+                unique=True,
+                partialFilterExpression={'file_unique_id': {'$type': 'string'}, 'clone_id': {'$exists': True}}
+            )
+            return True
+        except OperationFailure as e:
+            if attempt == 0 and e.code in INDEX_OPTIONS_CONFLICT:
+                # Built with an older filter; replace it
+                await collection.drop_index(DEDUP_INDEX)
+                continue
+            logger.warning(f"⚠️ Could not create {DEDUP_INDEX} on {collection.name}: {e}. "
+                           f"Run `python -m bot.database.file_dedup` to merge duplicates")
+            return False
+    return False
+
+
+# ==================== COMPACTION ====================
+
+def _scope(clone_id: Optional[str]) -> Dict:
+    """One clone's files, or every clone file (never records without a clone_id)"""
+    return {'clone_id': clone_id} if clone_id else {'clone_id': {'$exists': True, '$ne': None}}
+
+
+async def backfill_unique_ids(collection, clone_id: Optional[str] = None, batch_size: int = DEDUP_BATCH) -> int:
+    """Derive ``file_unique_id`` for stored files missing one; returns how many got one
+
+    Files whose ``file_id`` cannot be decoded are marked with ``None`` so they are not
+    read again, and stay outside the unique index.
+    """
+    query = {**_scope(clone_id), 'file_unique_id': {'$exists': False}}
+    filled = 0
+    while True:
+        # Each batch is updated out of the query, so the next one starts where it ended
+        batch = await collection.find(query, {'file_id': 1}).limit(batch_size).to_list(batch_size)
+        if not batch:
+            return filled
+        operations = []
+        for doc in batch:
+            file_unique_id = file_unique_id_from(doc.get('file_id'))
+            filled += file_unique_id is not None
+            operations.append(UpdateOne({'_id': doc['_id']}, {'$set': {'file_unique_id': file_unique_id}}))
+        await collection.bulk_write(operations, ordered=False)
+
+
+def _merge_group(docs: List[Dict]) -> List:
+    """Operations folding duplicate copies into the first one indexed"""
+    docs.sort(key=lambda doc: (doc.get('indexed_at') or datetime.max, str(doc['_id'])))
+    keep, duplicates = docs[0], docs[1:]
+
+    sources = []
+    for doc in docs:
+        for source in (doc.get('sources') or []) + [source_of(doc)]:
+            if source and source not in sources:
+                sources.append(source)
+
+    update = {'$set': {'sources': sources}}
+    counters = {name: sum(doc.get(name) or 0 for doc in duplicates) for name in MERGED_COUNTERS}
+    counters = {name: value for name, value in counters.items() if value}
+    if counters:
+        update['$inc'] = counters
+    return [UpdateOne({'_id': keep['_id']}, update),
+            DeleteMany({'_id': {'$in': [doc['_id'] for doc in duplicates]}})]
+
+
+async def _merge_batch(collection, groups: List[Dict]) -> int:
+    ids = [doc_id for group in groups for doc_id in group['ids']]
+    projection = {'indexed_at': 1, 'chat_id': 1, 'message_id': 1, 'sources': 1,
+                  **{name: 1 for name in MERGED_COUNTERS}}
+    docs = {doc['_id']: doc for doc in await collection.find({'_id': {'$in': ids}}, projection).to_list(None)}
+
+    operations = []
+    removed = 0
+    for group in groups:
+        copies = [docs[doc_id] for doc_id in group['ids'] if doc_id in docs]
+        if len(copies) > 1:
+            operations.extend(_merge_group(copies))
+            removed += len(copies) - 1
+    if operations:
+        await collection.bulk_write(operations, ordered=False)
+    return removed
+
+
+async def compact_duplicates(collection, clone_id: Optional[str] = None,
+                             batch_size: int = DEDUP_BATCH) -> Dict:
+    """Merge stored duplicates of each file into one document, ``batch_size`` files at a time
+
+    Returns counts and the clone ids whose files changed, so callers can refresh
+    anything derived from them.
+    """
+    backfilled = await backfill_unique_ids(collection, clone_id, batch_size)
+    pipeline = [
+        {'$match': {**_scope(clone_id), 'file_unique_id': {'$type': 'string'}}},
+        {'$group': {
+            '_id': {'clone_id': '$clone_id', 'file_unique_id': '$file_unique_id'},
+            'ids': {'$push': '$_id'},
+            'count': {'$sum': 1}
+        }},
+        {'$match': {'count': {'$gt': 1}}}
+    ]
+
+    groups, removed, clones, batch = 0, 0, set(), []
+    async for group in collection.aggregate(pipeline, allowDiskUse=True):
+        batch.append(group)
+        clones.add(group['_id']['clone_id'])
+        if len(batch) >= batch_size:
+            removed += await _merge_batch(collection, batch)
+            groups += len(batch)
+            batch = []
+    if batch:
+        removed += await _merge_batch(collection, batch)
+        groups += len(batch)
+
+    indexed = await ensure_dedup_index(collection)
+    logger.info(f"🧹 Deduplicated {collection.name}: {removed} copies of {groups} files removed, "
+                f"{backfilled} file ids filled in")
+    return {'backfilled': backfilled, 'groups': groups, 'removed': removed,
+            'clones': sorted(c for c in clones if c), 'indexed': indexed}
+
+
+async def compact_all(clone_id: Optional[str] = None, batch_size: int = DEDUP_BATCH) -> Dict[str, Dict]:
+    """Compact the shared clone file index and every clone's own database"""
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from bot.database import clone_db, mongo_db
+
+    results = {}
+    shared = results['shared'] = await compact_duplicates(mongo_db.collection, clone_id, batch_size)
+    for changed in shared['clones']:
+        await mongo_db.rebuild_clone_stats(changed)
+
+    clones = [await clone_db.get_clone(clone_id)] if clone_id else await clone_db.get_all_clones()
+    for clone in filter(None, clones):
+        mongodb_url = clone.get('mongodb_url') or clone.get('db_url')
+        if not mongodb_url:
+            continue
+        client = AsyncIOMotorClient(mongodb_url, serverSelectionTimeoutMS=30000)
+        try:
+            files = client[clone.get('db_name', f"clone_{clone['_id']}")].files
+            results[str(clone['_id'])] = await compact_duplicates(files, None, batch_size)
+        except Exception as e:
+            logger.error(f"❌ Could not deduplicate files of clone {clone['_id']}: {e}")
+        finally:
+            client.close()
+    return results
+
+
+if __name__ == "__main__":
+    for name, result in asyncio.run(compact_all(sys.argv[1] if len(sys.argv) > 1 else None)).items():
+        print(f"{name}: {result['removed']} duplicates removed from {result['groups']} files, "
+              f"{result['backfilled']} file ids filled in, unique index {'ok' if result['indexed'] else 'missing'}")
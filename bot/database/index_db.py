@@ -2,17 +2,19 @@ from .connection import db
 from datetime import datetime
 from typing import List, Dict, Optional
 import re
+from pymongo import UpdateOne
 from info import Config
 from ..utils.helper import get_collection_name, get_readable_file_size
 from ..utils.security import security_manager
 import logging
+from bot.logging import debug_print
 
 logger = logging.getLogger(__name__)
 
 collection = db["file_index"]
 
-async def add_to_index(file_id: str, file_name: str, file_type: str, file_size: int, caption: str = "", user_id: int = None):
-    """Add a file to the search index"""
+def build_index_document(file_id: str, file_name: str, file_type: str, file_size: int, caption: str = "", user_id: int = None) -> Dict:
+    """Sanitized search index document for a file"""
 
     # Sanitize and validate inputs
     file_name = security_manager.sanitize_filename(file_name)
@@ -27,7 +29,7 @@ async def add_to_index(file_id: str, file_name: str, file_type: str, file_size:
     # Extract keywords from filename and caption
     keywords = extract_keywords(file_name, caption)
 
-    document = {
+    return {
         "_id": file_id,
         "file_name": file_name,
         "file_type": file_type,
@@ -39,7 +41,47 @@ async def add_to_index(file_id: str, file_name: str, file_type: str, file_size:
         "access_count": 0
     }
 
-    await collection.replace_one({"_id": file_id}, document, upsert=True)
+async def add_to_index(file_id: str, file_name: str, file_type: str, file_size: int, caption: str = "", user_id: int = None):
+    """Add a file to the search index"""
+    document = build_index_document(file_id, file_name, file_type, file_size, caption, user_id)
+    await collection.replace_one({"_id": document["_id"]}, document, upsert=True)
+
+async def add_many_to_index(documents: List[Dict], target=None) -> int:
+    """Insert documents missing from ``target`` (the search index by default) in one bulk write
+
+    Documents already present are left as they are, so replaying a range is harmless.
+    Returns how many were new.
+    """
+    if not documents:
+        return 0
+    target = collection if target is None else target
+    result = await target.bulk_write(
+        [UpdateOne({"_id": doc["_id"]}, {"$setOnInsert": doc}, upsert=True) for doc in documents],
+        ordered=False
+    )
+    return result.upserted_count
+
+# Last message id indexed per (owner, channel); owner is "mother" or a clone id
+checkpoints_collection = db["index_checkpoints"]
+
+async def get_index_checkpoints(owner: str) -> Dict[int, int]:
+    """Channel id -> last indexed message id for ``owner``"""
+    checkpoints = {}
+    async for doc in checkpoints_collection.find({"owner": owner}, {"chat_id": 1, "last_message_id": 1}):
+        checkpoints[doc["chat_id"]] = doc.get("last_message_id", 0)
+    return checkpoints
+
+async def advance_index_checkpoint(owner: str, chat_id: int, message_id: int):
+    """Record ``message_id`` as indexed for the channel unless a later one already is"""
+    await checkpoints_collection.update_one(
+        {"_id": f"{owner}:{chat_id}"},
+        {
+            "$max": {"last_message_id": message_id},
+            "$set": {"updated_at": datetime.utcnow()},
+            "$setOnInsert": {"owner": owner, "chat_id": chat_id}
+        },
+        upsert=True
+    )
 
 async def search_files(query: str, limit: int = 50) -> List[Dict]:
     """Search files by query"""
@@ -172,7 +214,7 @@ async def search_files_by_name(query: str, limit: int = 50) -> List[Dict]:
 
 async def get_random_files(limit: int = 10, clone_id: str = None) -> List[Dict]:
     """Enhanced random files retrieval with better filtering and clone support"""
-    print(f"DEBUG: Starting get_random_files with limit={limit}, clone_id={clone_id}")
+    debug_print(f"DEBUG: Starting get_random_files with limit={limit}, clone_id={clone_id}")
 
     try:
         # Base match criteria
@@ -226,15 +268,15 @@ async def get_random_files(limit: int = 10, clone_id: str = None) -> List[Dict]:
             {"$limit": limit}                   # Take top results
         ]
 
-        print(f"DEBUG: Executing enhanced aggregation pipeline")
+        debug_print(f"DEBUG: Executing enhanced aggregation pipeline")
 
         try:
             cursor = collection.aggregate(pipeline)
             results = await cursor.to_list(length=limit)
-            print(f"DEBUG: Enhanced aggregation returned {len(results)} results")
+            debug_print(f"DEBUG: Enhanced aggregation returned {len(results)} results")
 
         except Exception as agg_error:
-            print(f"ERROR: Enhanced aggregation failed: {agg_error}")
+            logger.error(f"Enhanced aggregation failed: {agg_error}")
 
             # Simple fallback
             try:
@@ -243,10 +285,10 @@ async def get_random_files(limit: int = 10, clone_id: str = None) -> List[Dict]:
 
                 import random
                 results = random.sample(all_results, min(limit, len(all_results))) if all_results else []
-                print(f"DEBUG: Fallback returned {len(results)} random results")
+                debug_print(f"DEBUG: Fallback returned {len(results)} random results")
 
             except Exception as fallback_error:
-                print(f"ERROR: Fallback also failed: {fallback_error}")
+                logger.error(f"Fallback also failed: {fallback_error}")
                 return []
 
         # Enhanced validation
@@ -281,17 +323,17 @@ async def get_random_files(limit: int = 10, clone_id: str = None) -> List[Dict]:
                 result['access_count'] = result.get('access_count', 0)
 
                 valid_results.append(result)
-                print(f"DEBUG: Validated random file: {result['file_name']} (Score: {result.get('quality_score', 0):.1f})")
+                debug_print(f"DEBUG: Validated random file: {result['file_name']} (Score: {result.get('quality_score', 0):.1f})")
 
             except Exception as validation_error:
-                print(f"ERROR: Validation failed for result {idx}: {validation_error}")
+                logger.error(f"Validation failed for result {idx}: {validation_error}")
                 continue
 
-        print(f"DEBUG: Random files validation complete - Valid: {len(valid_results)}")
+        debug_print(f"DEBUG: Random files validation complete - Valid: {len(valid_results)}")
         return valid_results
 
     except Exception as main_error:
-        print(f"CRITICAL ERROR in get_random_files: {main_error}")
+        logger.error(f"Critical error in get_random_files: {main_error}")
         return []
 
 async def add_file_to_index(file_id, file_name, file_size, file_type, message_id, channel_id, caption="", user_id=None):
@@ -327,7 +369,7 @@ async def add_file_to_index(file_id, file_name, file_size, file_type, message_id
         await collection.insert_one(file_data)
         return True
     except Exception as e:
-        print(f"ERROR: Error adding file to index: {e}") # Use print for error logging as logger is not defined here
+        logger.error(f"Error adding file to index: {e}")
         return False
 
 async def get_file_by_id(file_id):
@@ -337,12 +379,12 @@ async def get_file_by_id(file_id):
         sanitized_file_id = str(file_id)[:100] if file_id else ""
 
         if not sanitized_file_id:
-            print("ERROR: file_id is empty or invalid.")
+            logger.error("file_id is empty or invalid.")
             return None
 
         collection_name = get_collection_name(None) # Assuming collection name doesn't depend on file_id in this context
         collection = db[collection_name]
         return await collection.find_one({'_id': sanitized_file_id})
     except Exception as e:
-        print(f"ERROR: Error getting file by ID: {e}") # Use print for error logging as logger is not defined here
+        logger.error(f"Error getting file by ID: {e}")
         return None
\ No newline at end of file
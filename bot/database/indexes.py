@@ -3,6 +3,7 @@ import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
 from info import Config
 from bot.logging import LOGGER
+from bot.database.file_dedup import ensure_dedup_index
 
 logger = LOGGER(__name__)
 
@@ -38,6 +39,15 @@ async def create_indexes():
         await files_collection.create_index("file_type")
         await files_collection.create_index("created_at")
         await files_collection.create_index([("owner_id", 1), ("created_at", -1)])
+        # One document per clone file (see bot/database/file_dedup.py)
+        await ensure_dedup_index(files_collection)
+
+        # Keyset-paginated admin listings (see bot/database/pagination.py)
+        await db.user_balances.create_index([("balance", -1), ("_id", 1)])
+        await db.balance_transactions.create_index([("user_id", 1), ("timestamp", -1), ("_id", -1)])
+
+        # Clone session peer cache, loaded per session on start
+        await db.clone_session_peers.create_index("s")
 
         # TTL index for logs cleanup
         logs_collection = db.logs
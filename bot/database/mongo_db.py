@@ -15,9 +15,13 @@ from typing import List, Dict, Optional
 logger = LOGGER(__name__)
 
 # MongoDB Connection
-mongo_client = motor.motor_asyncio.AsyncIOMotorClient(Config.DATABASE_URI)
-db = mongo_client[Config.DATABASE_NAME]
+# Shared client from connection.py, created on first use
+from bot.database.connection import db
+from bot.database import file_dedup
+from bot.database.clone_placement import placement
 collection = db['files']
+# One rollup document per clone, kept current with $inc as files come and go
+clone_stats_collection = db['clone_stats']
 
 # Dictionary to store clone-specific MongoDB clients and collections
 # This part is removed and replaced by the new structure in the edited snippet.
@@ -32,25 +36,35 @@ async def add_file_to_clone_index(file_data: dict, clone_id: str) -> bool:
 
         # Create unique identifier for clone files
         unique_id = f"{clone_id}_{file_data.get('file_id', ObjectId())}" # Use get with default ObjectId for safety
-        file_data['_id'] = unique_id
 
-        # Check for duplicates if enabled
-        existing = await collection.find_one({ # Changed to use main collection for clone files indexing
-            'clone_id': clone_id,
-            'file_id': file_data['file_id']
-        })
-
-        if existing:
-            # Update existing file
-            await collection.update_one(
-                {'_id': unique_id},
-                {'$set': file_data}
-            )
-            return False  # Indicates duplicate/update
+        # The same file reposted elsewhere is one document with another source
+        query = file_dedup.dedup_filter(file_data)
+        if query is not None:
+            file_data['file_unique_id'] = query['file_unique_id']
         else:
-            # Insert new file
-            await collection.insert_one(file_data)
-            return True  # Indicates new file
+            query = {'clone_id': clone_id, 'file_id': file_data['file_id']}
+        source = file_dedup.source_of(file_data)
+
+        async with placement.writing(clone_id, {'$or': [query, {'_id': unique_id}]}) as (files, stats):
+            existing = await files.find_one(query)
+
+            if existing:
+                # Update existing file, keeping the identity of the first copy
+                update = {'$set': {k: v for k, v in file_data.items() if k not in file_dedup.IDENTITY_FIELDS}}
+                if source:
+                    update['$addToSet'] = {'sources': source}
+                await files.update_one({'_id': existing['_id']}, update)
+                await _update_clone_stats(clone_id, existing, -1, stats)
+                await _update_clone_stats(clone_id, {**existing, **update['$set']}, 1, stats)
+                return False  # Indicates duplicate/update
+            else:
+                # Insert new file
+                file_data['_id'] = unique_id
+                if source:
+                    file_data['sources'] = [source]
+                await files.insert_one(file_data)
+                await _update_clone_stats(clone_id, file_data, 1, stats)
+                return True  # Indicates new file
 
     except Exception as e:
         logger.error(f"Error adding file to clone index: {e}")
@@ -83,19 +97,21 @@ async def search_clone_files(clone_id: str, query: str, limit: int = 50) -> List
             ])
 
         # Execute search
-        cursor = collection.find(search_filter).sort('indexed_at', -1).limit(limit) # Changed to use main collection
+        files, _ = placement.collections(clone_id)
+        cursor = files.find(search_filter).sort('indexed_at', -1).limit(limit)
         results = await cursor.to_list(length=limit)
 
         # Update access count for found files
         if results:
             file_ids = [result['_id'] for result in results]
-            await collection.update_many( # Changed to use main collection
-                {'_id': {'$in': file_ids}},
-                {
-                    '$inc': {'access_count': 1},
-                    '$set': {'last_accessed': datetime.utcnow()}
-                }
-            )
+            async with placement.writing(clone_id, {'_id': {'$in': file_ids}}) as (files, _):
+                await files.update_many(
+                    {'_id': {'$in': file_ids}},
+                    {
+                        '$inc': {'access_count': 1},
+                        '$set': {'last_accessed': datetime.utcnow()}
+                    }
+                )
 
         return results
 
@@ -115,7 +131,8 @@ async def get_clone_random_files(clone_id: str, limit: int = 10) -> List[Dict]:
             {'$sample': {'size': limit}}
         ]
 
-        cursor = collection.aggregate(pipeline) # Changed to use main collection
+        files, _ = placement.collections(clone_id)
+        cursor = files.aggregate(pipeline)
         results = await cursor.to_list(length=limit)
 
         return results
@@ -127,7 +144,8 @@ async def get_clone_random_files(clone_id: str, limit: int = 10) -> List[Dict]:
 async def get_clone_recent_files(clone_id: str, limit: int = 10) -> List[Dict]:
     """Get recently indexed files from clone"""
     try:
-        cursor = collection.find({ # Changed to use main collection
+        files, _ = placement.collections(clone_id)
+        cursor = files.find({
             'clone_id': clone_id,
             'file_type': {'$in': ['video', 'document', 'photo', 'audio']}
         }).sort('indexed_at', -1).limit(limit)
@@ -142,7 +160,8 @@ async def get_clone_recent_files(clone_id: str, limit: int = 10) -> List[Dict]:
 async def get_clone_popular_files(clone_id: str, limit: int = 10) -> List[Dict]:
     """Get most accessed files from clone"""
     try:
-        cursor = collection.find({ # Changed to use main collection
+        files, _ = placement.collections(clone_id)
+        cursor = files.find({
             'clone_id': clone_id,
             'file_type': {'$in': ['video', 'document', 'photo', 'audio']},
             'access_count': {'$gt': 0}
@@ -155,56 +174,182 @@ async def get_clone_popular_files(clone_id: str, limit: int = 10) -> List[Dict]:
         logger.error(f"Error getting popular clone files: {e}")
         return []
 
-async def get_clone_index_stats(clone_id: str) -> Dict:
-    """Get indexing statistics for a clone"""
+def _stats_key(value) -> str:
+    """Make a counter value safe to use as a MongoDB field name"""
+    return str(value).replace('$', '\uff04').replace('.', '\uff0e')
+
+def _stats_value(key: str):
+    """Reverse of _stats_key; channel ids come back as ints"""
+    value = key.replace('\uff04', '$').replace('\uff0e', '.')
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+def _clone_stats_update(file_data: dict, sign: int) -> dict:
+    """Build the $inc for adding (sign=1) or removing (sign=-1) one file from the rollup"""
+    inc = {
+        'total_files': sign,
+        'total_size': sign * (file_data.get('file_size') or 0)
+    }
+    if file_data.get('file_type'):
+        inc[f"file_types.{_stats_key(file_data['file_type'])}"] = sign
+    if file_data.get('quality'):
+        inc[f"qualities.{_stats_key(file_data['quality'])}"] = sign
+    if file_data.get('chat_id'):
+        inc[f"channels.{_stats_key(file_data['chat_id'])}"] = sign
+    indexed_at = file_data.get('indexed_at')
+    if isinstance(indexed_at, datetime):
+        inc[f"daily.{indexed_at.strftime('%Y-%m-%d')}"] = sign
+
+    update = {'$inc': inc}
+    if sign > 0 and isinstance(indexed_at, datetime):
+        update['$max'] = {'last_indexed': indexed_at}
+    return update
+
+async def _update_clone_stats(clone_id: str, file_data: dict, sign: int, stats=None):
+    """Apply one file to the clone's stats rollup; start_clone_stats_repair fixes any drift"""
     try:
-        # Basic stats
-        total_files = await collection.count_documents({'clone_id': clone_id}) # Changed to use main collection
+        if stats is None:
+            stats = placement.collections(clone_id)[1]
+        await stats.update_one(
+            {'_id': clone_id},
+            _clone_stats_update(file_data, sign),
+            upsert=True
+        )
+    except Exception as e:
+        logger.error(f"Error updating clone stats rollup for {clone_id}: {e}")
 
-        if total_files == 0:
-            return {
-                'total_files': 0,
-                'total_size': 0,
-                'file_types': {},
-                'last_indexed': 'Never'
-            }
+async def add_new_files_to_clone_stats(clone_id: str, documents: List[Dict], stats):
+    """Apply newly stored files to the clone's stats rollup in one update"""
+    if not documents:
+        return
+    try:
+        inc, latest = {}, None
+        for document in documents:
+            update = _clone_stats_update(document, 1)
+            for key, value in update['$inc'].items():
+                inc[key] = inc.get(key, 0) + value
+            if '$max' in update:
+                latest = max(latest or update['$max']['last_indexed'], update['$max']['last_indexed'])
+        update = {'$inc': inc}
+        if latest is not None:
+            update['$max'] = {'last_indexed': latest}
+        await stats.update_one({'_id': clone_id}, update, upsert=True)
+    except Exception as e:
+        logger.error(f"Error updating clone stats rollup for {clone_id}: {e}")
 
-        # Aggregation pipeline for detailed stats
+async def rebuild_clone_stats(clone_id: str, collections=None) -> Optional[Dict]:
+    """Recompute a clone's stats rollup from its files
+
+    ``collections`` is a (files, clone_stats) pair; by default the clone's own.
+    """
+    try:
+        files, stats_collection = collections or placement.collections(clone_id)
+        def counter(field):
+            return [
+                {'$match': {field: {'$nin': [None, '']}}},
+                {'$group': {'_id': f"${field}", 'count': {'$sum': 1}}}
+            ]
+
+        # Every facet groups by a bounded key, so nothing grows with the number of files
         pipeline = [
             {'$match': {'clone_id': clone_id}},
-            {'$group': {
-                '_id': None,
-                'total_files': {'$sum': 1},
-                'total_size': {'$sum': '$file_size'},
-                'last_indexed': {'$max': '$indexed_at'},
-                'file_types': {'$push': '$file_type'}
+            {'$facet': {
+                'totals': [{'$group': {
+                    '_id': None,
+                    'total_files': {'$sum': 1},
+                    'total_size': {'$sum': '$file_size'},
+                    'last_indexed': {'$max': '$indexed_at'}
+                }}],
+                'file_types': counter('file_type'),
+                'qualities': counter('quality'),
+                'channels': counter('chat_id'),
+                'daily': [
+                    {'$match': {'indexed_at': {'$type': 'date'}}},
+                    {'$group': {
+                        '_id': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$indexed_at'}},
+                        'count': {'$sum': 1}
+                    }}
+                ]
             }}
         ]
 
-        result = await collection.aggregate(pipeline).to_list(length=1) # Changed to use main collection
+        result = await files.aggregate(pipeline, allowDiskUse=True).to_list(length=1)
+        facets = result[0] if result else {}
+        totals = (facets.get('totals') or [{}])[0]
 
-        if not result:
-            return {'total_files': 0, 'total_size': 0, 'file_types': {}, 'last_indexed': 'Never'}
+        stats = {
+            '_id': clone_id,
+            'total_files': totals.get('total_files', 0),
+            'total_size': totals.get('total_size', 0),
+            'last_indexed': totals.get('last_indexed'),
+            'rebuilt_at': datetime.utcnow()
+        }
+        for name in ('file_types', 'qualities', 'channels', 'daily'):
+            stats[name] = {_stats_key(row['_id']): row['count'] for row in facets.get(name, [])}
 
-        stats = result[0]
+        await stats_collection.replace_one({'_id': clone_id}, stats, upsert=True)
+        return stats
 
-        # Count file types
-        file_types = {}
-        for file_type in stats.get('file_types', []):
-            file_types[file_type] = file_types.get(file_type, 0) + 1
+    except Exception as e:
+        logger.error(f"Error rebuilding clone stats for {clone_id}: {e}")
+        return None
 
-        # Format last indexed date
-        last_indexed = stats.get('last_indexed')
-        if last_indexed:
-            last_indexed = last_indexed.strftime('%Y-%m-%d %H:%M')
-        else:
-            last_indexed = 'Never'
+async def rebuild_all_clone_stats() -> int:
+    """Repair job: rebuild the stats rollup of every clone that has indexed files"""
+    rebuilt = 0
+    try:
+        # Clones in dedicated databases may have nothing left in the shared one
+        clone_ids = set(await collection.distinct('clone_id')) | set(placement.routes)
+        for clone_id in clone_ids:
+            if clone_id and await rebuild_clone_stats(clone_id) is not None:
+                rebuilt += 1
+        logger.info(f"📊 Rebuilt stats rollups for {rebuilt} clones")
+    except Exception as e:
+        logger.error(f"Error rebuilding clone stats rollups: {e}")
+    return rebuilt
+
+async def start_clone_stats_repair():
+    """Periodically rebuild every clone's stats rollup, undoing drift from failed $inc updates"""
+    while True:
+        try:
+            await asyncio.sleep(Config.CLONE_STATS_REPAIR_INTERVAL)
+            await rebuild_all_clone_stats()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in clone stats repair: {e}")
+
+async def _get_clone_stats_doc(clone_id: str) -> Optional[Dict]:
+    """Read a clone's rollup, building it first if it never went through a full rebuild"""
+    stats = await placement.collections(clone_id)[1].find_one({'_id': clone_id})
+    if not stats or 'rebuilt_at' not in stats:
+        stats = await rebuild_clone_stats(clone_id)
+    return stats
+
+def _nonzero_counts(counts: Optional[Dict]) -> Dict:
+    return {_stats_value(key): count for key, count in (counts or {}).items() if count > 0}
+
+def _format_last_indexed(stats: Dict) -> str:
+    last_indexed = stats.get('last_indexed')
+    if stats.get('total_files', 0) > 0 and last_indexed:
+        return last_indexed.strftime('%Y-%m-%d %H:%M')
+    return 'Never'
+
+async def get_clone_index_stats(clone_id: str) -> Dict:
+    """Get indexing statistics for a clone"""
+    try:
+        stats = await _get_clone_stats_doc(clone_id)
+
+        if not stats or stats.get('total_files', 0) <= 0:
+            return {'total_files': 0, 'total_size': 0, 'file_types': {}, 'last_indexed': 'Never'}
 
         return {
             'total_files': stats.get('total_files', 0),
             'total_size': stats.get('total_size', 0),
-            'file_types': file_types,
-            'last_indexed': last_indexed
+            'file_types': _nonzero_counts(stats.get('file_types')),
+            'last_indexed': _format_last_indexed(stats)
         }
 
     except Exception as e:
@@ -214,81 +359,35 @@ async def get_clone_index_stats(clone_id: str) -> Dict:
 async def get_detailed_clone_stats(clone_id: str) -> Dict:
     """Get detailed statistics for clone indexing"""
     try:
-        # Complex aggregation for detailed stats
-        pipeline = [
-            {'$match': {'clone_id': clone_id}},
-            {'$group': {
-                '_id': None,
-                'total_files': {'$sum': 1},
-                'total_size': {'$sum': '$file_size'},
-                'last_indexed': {'$max': '$indexed_at'},
-                'file_types': {'$push': '$file_type'},
-                'qualities': {'$push': '$quality'},
-                'channels': {'$push': '$chat_id'},
-                'daily_counts': {'$push': {
-                    'date': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$indexed_at'}},
-                    'count': 1
-                }}
-            }}
-        ]
-
-        result = await collection.aggregate(pipeline).to_list(length=1) # Changed to use main collection
+        stats = await _get_clone_stats_doc(clone_id)
 
-        if not result:
+        if not stats or stats.get('total_files', 0) <= 0:
             return None
 
-        stats = result[0]
-
-        # Process file types
-        file_types = {}
-        for file_type in stats.get('file_types', []):
-            if file_type:
-                file_types[file_type] = file_types.get(file_type, 0) + 1
-
-        # Process quality breakdown
-        quality_breakdown = {}
-        for quality in stats.get('qualities', []):
-            if quality and quality != 'unknown':
-                quality_breakdown[quality] = quality_breakdown.get(quality, 0) + 1
-
-        # Process top channels
-        channel_counts = {}
-        for channel_id in stats.get('channels', []):
-            if channel_id:
-                channel_counts[channel_id] = channel_counts.get(channel_id, 0) + 1
+        quality_breakdown = {
+            quality: count
+            for quality, count in _nonzero_counts(stats.get('qualities')).items()
+            if quality != 'unknown'
+        }
 
+        channel_counts = _nonzero_counts(stats.get('channels'))
         top_channels = sorted(channel_counts.items(), key=lambda x: x[1], reverse=True)[:5]
 
-        # Process daily activity
-        daily_activity = {}
-        for entry in stats.get('daily_counts', []):
-            date = entry['date']
-            daily_activity[date] = daily_activity.get(date, 0) + 1
-
-        # Find most active day
+        # Daily buckets are keyed by date, so "this week" is the last seven of them
+        daily_activity = {
+            day: count for day, count in (stats.get('daily') or {}).items() if count > 0
+        }
         most_active_day = max(daily_activity.items(), key=lambda x: x[1])[0] if daily_activity else 'N/A'
-
-        # Files this week
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        files_this_week = await collection.count_documents({ # Changed to use main collection
-            'clone_id': clone_id,
-            'indexed_at': {'$gte': week_ago}
-        })
-
-        # Format last indexed date
-        last_indexed = stats.get('last_indexed')
-        if last_indexed:
-            last_indexed = last_indexed.strftime('%Y-%m-%d %H:%M')
-        else:
-            last_indexed = 'Never'
+        week_start = (datetime.utcnow() - timedelta(days=7)).strftime('%Y-%m-%d')
+        files_this_week = sum(count for day, count in daily_activity.items() if day >= week_start)
 
         return {
             'total_files': stats.get('total_files', 0),
             'total_size': stats.get('total_size', 0),
-            'file_types': file_types,
+            'file_types': _nonzero_counts(stats.get('file_types')),
             'quality_breakdown': quality_breakdown,
             'top_channels': top_channels,
-            'last_indexed': last_indexed,
+            'last_indexed': _format_last_indexed(stats),
             'files_this_week': files_this_week,
             'most_active_day': most_active_day
         }
@@ -300,30 +399,56 @@ async def get_detailed_clone_stats(clone_id: str) -> Dict:
 async def clear_clone_index(clone_id: str) -> bool:
     """Clear all indexed files for a clone"""
     try:
-        result = await collection.delete_many({'clone_id': clone_id}) # Changed to use main collection
+        async with placement.writing(clone_id) as (files, stats):
+            result = await files.delete_many({'clone_id': clone_id})
+            await stats.delete_one({'_id': clone_id})
         return result.deleted_count > 0
 
     except Exception as e:
         logger.error(f"Error clearing clone index: {e}")
         return False
 
+async def remove_file_from_clone_index(clone_id: str, file_id: str) -> bool:
+    """Remove a single file from a clone index"""
+    try:
+        query = {'clone_id': clone_id, 'file_id': file_id}
+        async with placement.writing(clone_id, query) as (files, stats):
+            file_data = await files.find_one_and_delete(query)
+            if not file_data:
+                return False
+
+            await _update_clone_stats(clone_id, file_data, -1, stats)
+        return True
+
+    except Exception as e:
+        logger.error(f"Error removing file from clone index: {e}")
+        return False
+
 async def get_clone_file_by_id(clone_id: str, file_id: str) -> Optional[Dict]:
     """Get a specific file from clone index"""
     try:
-        file_data = await collection.find_one({ # Changed to use main collection
+        files, _ = placement.collections(clone_id)
+        file_data = await files.find_one({
             'clone_id': clone_id,
             'file_id': file_id
         })
+        if not file_data and file_dedup.file_unique_id_from(file_id):
+            # A copy merged into another document by deduplication
+            file_data = await files.find_one({
+                'clone_id': clone_id,
+                'file_unique_id': file_dedup.file_unique_id_from(file_id)
+            })
 
         if file_data:
             # Update access count
-            await collection.update_one( # Changed to use main collection
-                {'_id': file_data['_id']},
-                {
-                    '$inc': {'access_count': 1},
-                    '$set': {'last_accessed': datetime.utcnow()}
-                }
-            )
+            async with placement.writing(clone_id, {'_id': file_data['_id']}) as (files, _):
+                await files.update_one(
+                    {'_id': file_data['_id']},
+                    {
+                        '$inc': {'access_count': 1},
+                        '$set': {'last_accessed': datetime.utcnow()}
+                    }
+                )
 
         return file_data
 
@@ -334,13 +459,15 @@ async def get_clone_file_by_id(clone_id: str, file_id: str) -> Optional[Dict]:
 async def update_clone_file_access(clone_id: str, file_id: str):
     """Update file access count and timestamp"""
     try:
-        await collection.update_one( # Changed to use main collection
-            {'clone_id': clone_id, 'file_id': file_id},
-            {
-                '$inc': {'access_count': 1},
-                '$set': {'last_accessed': datetime.utcnow()}
-            }
-        )
+        query = {'clone_id': clone_id, 'file_id': file_id}
+        async with placement.writing(clone_id, query) as (files, _):
+            await files.update_one(
+                query,
+                {
+                    '$inc': {'access_count': 1},
+                    '$set': {'last_accessed': datetime.utcnow()}
+                }
+            )
 
     except Exception as e:
         logger.error(f"Error updating clone file access: {e}")
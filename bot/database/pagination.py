@@ -0,0 +1,162 @@
+"""Keyset pagination for admin listings
+
+Pages are read with an index-backed range query from the last row shown, so page N
+costs the same as page 1 and nothing beyond one page is loaded. The position is
+carried in a compact cursor short enough to fit in Telegram callback data.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from bson import ObjectId
+from bot.logging import LOGGER
+
+logger = LOGGER(__name__)
+
+Sort = Sequence[Tuple[str, int]]
+
+_EPOCH = datetime(1970, 1, 1)
+_SEPARATOR = '~'
+_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+
+class Page(NamedTuple):
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+
+def _base36(number: int) -> str:
+    if number < 0:
+        return '-' + _base36(-number)
+    digits = ''
+    while True:
+        number, remainder = divmod(number, 36)
+        digits = _DIGITS[remainder] + digits
+        if not number:
+            return digits
+
+
+def _encode_value(value) -> str:
+    # bool before int: it is an int subclass
+    if value is None:
+        return 'n'
+    if isinstance(value, bool):
+        return 'b1' if value else 'b0'
+    if isinstance(value, int):
+        return f"i{value}"
+    if isinstance(value, float):
+        return f"f{value!r}"
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return 'd' + _base36((value - _EPOCH) // timedelta(microseconds=1))
+    if isinstance(value, ObjectId):
+        return 'o' + _base36(int(str(value), 16))
+    if isinstance(value, str):
+        return 's' + value.replace('%', '%25').replace(_SEPARATOR, '%7E')
+    raise TypeError(f"Unsupported cursor value: {type(value).__name__}")
+
+
+def _decode_value(token: str):
+    tag, body = token[:1], token[1:]
+    if tag == 'n':
+        return None
+    if tag == 'b':
+        return body == '1'
+    if tag == 'i':
+        return int(body)
+    if tag == 'f':
+        return float(body)
+    if tag == 'd':
+        return _EPOCH + timedelta(microseconds=int(body, 36))
+    if tag == 'o':
+        return ObjectId(f"{int(body, 36):024x}")
+    if tag == 's':
+        return body.replace('%7E', _SEPARATOR).replace('%25', '%')
+    raise ValueError(f"Unknown cursor token: {token!r}")
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Cursor for the sort key values of the last row on a page"""
+    return _SEPARATOR.join(_encode_value(value) for value in values)
+
+
+def decode_cursor(cursor: str, sort: Sort) -> List:
+    """Sort key values of a cursor; ValueError if it does not match ``sort``"""
+    try:
+        values = [_decode_value(token) for token in cursor.split(_SEPARATOR)]
+    except Exception as e:
+        raise ValueError(f"Invalid cursor {cursor!r}: {e}") from e
+    if len(values) != len(sort):
+        raise ValueError(f"Cursor {cursor!r} does not match sort {list(sort)}")
+    return values
+
+
+def _field(document: Dict, path: str):
+    for part in path.split('.'):
+        document = document.get(part) if isinstance(document, dict) else None
+    return document
+
+
+def _after(sort: Sort, values: Sequence) -> Dict:
+    """Filter for rows strictly after ``values`` in ``sort`` order"""
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {prev: value for (prev, _), value in zip(sort[:i], values[:i])}
+        clause[field] = {'$lt' if direction < 0 else '$gt': values[i]}
+        clauses.append(clause)
+    return clauses[0] if len(clauses) == 1 else {'$or': clauses}
+
+
+def _with_tiebreak(sort: Sort) -> List[Tuple[str, int]]:
+    sort = list(sort)
+    if not any(field == '_id' for field, _ in sort):
+        sort.append(('_id', sort[-1][1] if sort else 1))
+    return sort
+
+
+async def fetch_page(collection, query: Optional[Dict] = None, sort: Sort = (('_id', 1),),
+                     cursor: Optional[str] = None, limit: int = 20,
+                     projection: Optional[Dict[str, int]] = None) -> Page:
+    """One page of ``collection`` matching ``query``, starting after ``cursor``
+
+    ``_id`` is appended to the sort as a tie-breaker so the order is total; the
+    collection should have an index on the same keys. An invalid cursor restarts
+    from the first page.
+    """
+    sort = _with_tiebreak(sort)
+    query = dict(query or {})
+    if cursor:
+        try:
+            after = _after(sort, decode_cursor(cursor, sort))
+            query = {'$and': [query, after]} if query else after
+        except ValueError as e:
+            logger.warning(f"⚠️ {e}; showing the first page")
+
+    if projection is not None:
+        projection = {**projection, **{field: 1 for field, _ in sort}}
+
+    rows = await collection.find(query, projection).sort(sort).limit(limit + 1).to_list(limit + 1)
+    if len(rows) <= limit:
+        return Page(rows)
+    rows = rows[:limit]
+    return Page(rows, encode_cursor([_field(rows[-1], field) for field, _ in sort]))
+
+
+async def aggregate_totals(collection, query: Optional[Dict] = None,
+                           sums: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+    """Row count and field sums computed by the server in one ``$group``
+
+    ``sums`` maps result names to document fields, e.g. ``{'balance': 'balance'}``.
+    """
+    sums = sums or {}
+    group = {'_id': None, 'count': {'$sum': 1}}
+    group.update({name: {'$sum': f"${field}"} for name, field in sums.items()})
+    pipeline = ([{'$match': query}] if query else []) + [{'$group': group}]
+
+    totals = {'count': 0, **{name: 0 for name in sums}}
+    async for row in collection.aggregate(pipeline):
+        totals.update({name: row.get(name) or 0 for name in totals})
+    return totals
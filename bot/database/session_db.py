@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from pymongo import UpdateOne
+from bot.database.connection import db
+from bot.logging import LOGGER
+
+logger = LOGGER(__name__)
+
+# Pyrogram sessions of clone clients: one small document per session, peers kept apart
+session_db = db
+sessions_collection = session_db.clone_sessions
+session_peers_collection = session_db.clone_session_peers
+
+# (id, access_hash, type, username, phone_number), as pyrogram passes them to update_peers
+Peer = Tuple[int, int, str, Optional[str], Optional[str]]
+
+
+def _peer_doc_id(name: str, peer_id: int) -> str:
+    return f"{name}:{peer_id}"
+
+
+async def load_session(name: str) -> Optional[Dict]:
+    """Stored auth data and update state of a session, or None for a new one"""
+    return await sessions_collection.find_one({'_id': name})
+
+
+async def save_session(name: str, session: Dict):
+    await sessions_collection.update_one(
+        {'_id': name},
+        {'$set': dict(session, updated_at=datetime.now())},
+        upsert=True
+    )
+
+
+async def load_peers(name: str) -> List[Tuple[Peer, int]]:
+    """Cached peers of a session with the time each was last seen"""
+    peers = []
+    async for doc in session_peers_collection.find({'s': name}):
+        peers.append(((doc['i'], doc.get('h'), doc['t'], doc.get('u'), doc.get('p')), doc.get('ts', 0)))
+    return peers
+
+
+async def write_peers(name: str, peers: Iterable[Peer], seen_at: int):
+    """Upsert peers in a single unordered bulk write; field names kept short on purpose"""
+    operations = [
+        UpdateOne(
+            {'_id': _peer_doc_id(name, peer_id)},
+            {'$set': {'s': name, 'i': peer_id, 'h': access_hash, 't': peer_type,
+                      'u': username, 'p': phone_number, 'ts': seen_at}},
+            upsert=True
+        )
+        for peer_id, access_hash, peer_type, username, phone_number in peers
+    ]
+    if operations:
+        await session_peers_collection.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+async def delete_session(name: str):
+    await sessions_collection.delete_one({'_id': name})
+    await session_peers_collection.delete_many({'s': name})
@@ -1,14 +1,14 @@
 import asyncio
 from datetime import datetime, timedelta
-from motor.motor_asyncio import AsyncIOMotorClient
+from typing import Optional
+from bot.database.connection import db
 from info import Config
 from bot.logging import LOGGER
 
 logger = LOGGER(__name__)
 
 # Subscription database
-subscription_client = AsyncIOMotorClient(Config.DATABASE_URI)
-subscription_db = subscription_client[Config.DATABASE_NAME]
+subscription_db = db
 subscriptions_collection = subscription_db.subscriptions
 pricing_collection = subscription_db.pricing
 
@@ -27,6 +27,14 @@ TOKEN_PLANS = {
     "unlimited": {"name": "Unlimited", "price": 20.00, "duration_days": 30, "tokens": -1, "features": ["All Features", "Priority Support", "Custom Channels"]}
 }
 
+def _notify_lifecycle(bot_id: str, subscription: Optional[dict]):
+    """Keep the lifecycle scheduler's deadlines in step with subscription writes"""
+    try:
+        from bot.utils.subscription_scheduler import lifecycle_scheduler
+        lifecycle_scheduler.subscription_changed(bot_id, subscription)
+    except Exception as e:
+        logger.error(f"Error updating lifecycle schedule for {bot_id}: {e}")
+
 async def init_pricing_tiers():
     """Initialize pricing tiers in database"""
     try:
@@ -75,6 +83,7 @@ async def create_subscription(bot_id: str, user_id: int, plan: str, payment_veri
             {"$set": subscription_data},
             upsert=True
         )
+        _notify_lifecycle(bot_id, subscription_data)
 
         logger.info(f"✅ Created subscription for bot {bot_id}: {plan} - ${plan_data['price']}")
         return True
@@ -90,6 +99,7 @@ async def activate_subscription(bot_id: str):
             {"_id": bot_id},
             {"$set": {"status": "active", "activated_at": datetime.now()}}
         )
+        _notify_lifecycle(bot_id, await subscriptions_collection.find_one({"_id": bot_id}))
         return True
     except Exception as e:
         logger.error(f"Error activating subscription: {e}")
@@ -174,28 +184,34 @@ async def delete_subscription(bot_id: str):
         logger.error(f"Error deleting subscription {bot_id}: {e}")
         return False
 
+async def aggregate_subscription_status() -> dict:
+    """Count and verified revenue per subscription status in one $group (raises on database errors)"""
+    pipeline = [
+        {"$group": {
+            "_id": "$status",
+            "count": {"$sum": 1},
+            "revenue": {"$sum": {"$cond": [{"$eq": ["$payment_verified", True]}, "$total_paid", 0]}}
+        }}
+    ]
+    by_status = {}
+    async for row in subscriptions_collection.aggregate(pipeline):
+        by_status[row["_id"] or "unknown"] = {"count": row["count"], "revenue": row["revenue"] or 0}
+    return by_status
+
 async def get_subscription_stats():
     """Get subscription statistics"""
     try:
-        total = await subscriptions_collection.count_documents({})
-        active = await subscriptions_collection.count_documents({"status": "active"})
-        pending = await subscriptions_collection.count_documents({"status": "pending_payment"})
-        expired = await subscriptions_collection.count_documents({"status": "expired"})
-
-        # Calculate total revenue
-        revenue_pipeline = [
-            {"$match": {"payment_verified": True}},
-            {"$group": {"_id": None, "total": {"$sum": "$total_paid"}}}
-        ]
-        revenue_result = await subscriptions_collection.aggregate(revenue_pipeline).to_list(None)
-        total_revenue = revenue_result[0]["total"] if revenue_result else 0
+        by_status = await aggregate_subscription_status()
+
+        def count(status):
+            return by_status.get(status, {}).get("count", 0)
 
         return {
-            "total": total,
-            "active": active,
-            "pending": pending,
-            "expired": expired,
-            "total_revenue": total_revenue
+            "total": sum(row["count"] for row in by_status.values()),
+            "active": count("active"),
+            "pending": count("pending_payment"),
+            "expired": count("expired"),
+            "total_revenue": sum(row["revenue"] for row in by_status.values())
         }
     except Exception as e:
         logger.error(f"❌ Error getting subscription stats: {e}")
@@ -225,6 +241,7 @@ async def extend_subscription(clone_id: str, months: int, additional_price: floa
             },
             "$inc": {"total_paid": additional_price}}
         )
+        _notify_lifecycle(clone_id, {"status": "active", "expires_at": new_expiry})
 
         logger.info(f"✅ Extended subscription for clone {clone_id} by {months} months (+${additional_price})")
 
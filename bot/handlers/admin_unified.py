@@ -12,18 +12,24 @@ from info import Config
 from bot.database.clone_db import *
 from bot.database.subscription_db import *
 from bot.database.balance_db import *
-from bot.database import full_userbase, del_user, add_premium_user, remove_premium, get_users_count
+from bot.database import del_user, add_premium_user, remove_premium, get_users_count
 from bot.database.premium_db import get_all_premium_users
 from bot.utils.clone_config_loader import clone_config_loader
+from bot.utils.stats_service import stats_service
+from bot.utils.ui_builders import build_page_nav, page_cursor
+from bot.utils.callback_router import CallbackRouter
 from clone_manager import clone_manager
 from bot.logging import LOGGER
 from dotenv import set_key
 
 logger = LOGGER(__name__)
+router = CallbackRouter(__name__)
 
 # Store admin sessions
 admin_sessions = {}
 
+CLONES_PAGE_SIZE = 10
+
 # Premium plans
 PREMIUM_PLANS = {
     "monthly": {
@@ -141,10 +147,11 @@ async def mother_admin_panel(client: Client, query_or_message):
             return
     
     try:
-        total_clones = len(await get_all_clones())
-        active_clones = len([c for c in await get_all_clones() if c['status'] == 'active'])
+        stats = await stats_service.get()
+        total_clones = stats['total_clones']
+        active_clones = stats['active_clones']
         running_clones = len(clone_manager.get_running_clones())
-        total_subscriptions = len(await get_all_subscriptions())
+        total_subscriptions = stats['total_subscriptions']
     except:
         total_clones = active_clones = running_clones = total_subscriptions = 0
     
@@ -220,7 +227,7 @@ async def clone_admin_panel(client: Client, message: Message):
 # MOTHER BOT CALLBACKS
 # =====================================================
 
-@Client.on_callback_query(filters.regex("^mother_"), group=0)
+@router.prefix("mother_")
 async def mother_admin_callbacks(client: Client, query: CallbackQuery):
     """Handle Mother Bot callbacks"""
     user_id = query.from_user.id
@@ -230,8 +237,8 @@ async def mother_admin_callbacks(client: Client, query: CallbackQuery):
     
     callback_data = query.data
     
-    if callback_data == "mother_manage_clones":
-        await handle_manage_clones(client, query)
+    if callback_data == "mother_manage_clones" or callback_data.startswith("mother_manage_clones#"):
+        await handle_manage_clones(client, query, page_cursor(callback_data))
     elif callback_data == "mother_statistics":
         await handle_statistics(client, query)
     elif callback_data == "mother_broadcast":
@@ -241,9 +248,10 @@ async def mother_admin_callbacks(client: Client, query: CallbackQuery):
     else:
         await query.answer("⚠️ Feature in development", show_alert=True)
 
-async def handle_manage_clones(client: Client, query: CallbackQuery):
+async def handle_manage_clones(client: Client, query: CallbackQuery, cursor: str = None):
     """Show clone management"""
-    clones = await get_all_clones()
+    page = await get_clones_page(cursor, CLONES_PAGE_SIZE)
+    clones = page.items
     running_clones = clone_manager.get_running_clones()
     
     if not clones:
@@ -254,10 +262,11 @@ async def handle_manage_clones(client: Client, query: CallbackQuery):
         await query.edit_message_text(text, reply_markup=buttons)
         return
     
-    text = f"🤖 **Clone Management** ({len(clones)} total)\n\n"
+    total_clones = (await stats_service.get())['total_clones']
+    text = f"🤖 **Clone Management** ({max(total_clones, len(clones))} total)\n\n"
     buttons = []
     
-    for clone in clones[:10]:
+    for clone in clones:
         status_emoji = "🟢" if clone['_id'] in running_clones else "🔴"
         text += f"{status_emoji} @{clone.get('username', 'Unknown')}\n"
         buttons.append([
@@ -267,21 +276,20 @@ async def handle_manage_clones(client: Client, query: CallbackQuery):
             )
         ])
     
+    buttons += build_page_nav("mother_manage_clones", page, is_first_page=cursor is None)
     buttons.append([InlineKeyboardButton("« Back", callback_data="back_to_mother_panel")])
     await query.edit_message_text(text, reply_markup=InlineKeyboardMarkup(buttons))
 
 async def handle_statistics(client: Client, query: CallbackQuery):
     """Show statistics"""
     try:
-        total_users = await get_users_count()
-        all_clones = await get_all_clones()
-        active_clones = len([c for c in all_clones if c.get('status') == 'active'])
+        stats = await stats_service.get()
         
         text = f"📊 **System Statistics**\n\n"
-        text += f"👥 Total Users: {total_users:,}\n"
-        text += f"🤖 Total Clones: {len(all_clones)}\n"
-        text += f"✅ Active Clones: {active_clones}\n"
-        text += f"❌ Inactive: {len(all_clones) - active_clones}\n"
+        text += f"👥 Total Users: {stats['total_users']:,}\n"
+        text += f"🤖 Total Clones: {stats['total_clones']}\n"
+        text += f"✅ Active Clones: {stats['active_clones']}\n"
+        text += f"❌ Inactive: {stats['inactive_clones']}\n"
         
         buttons = InlineKeyboardMarkup([
             [InlineKeyboardButton("« Back", callback_data="back_to_mother_panel")]
@@ -307,47 +315,7 @@ async def handle_broadcast_info(client: Client, query: CallbackQuery):
 # BROADCAST COMMAND
 # =====================================================
 
-@Client.on_message(filters.command("broadcast") & filters.private)
-async def broadcast_command(client: Client, message: Message):
-    """Broadcast message to all users"""
-    if not is_mother_admin(message.from_user.id):
-        return await message.reply_text("❌ Admin only command")
-    
-    if not message.reply_to_message:
-        return await message.reply_text("❌ Reply to a message to broadcast it")
-    
-    users = await full_userbase()
-    original = message.reply_to_message
-    status = {"total": 0, "sent": 0, "blocked": 0, "deleted": 0, "failed": 0}
-    
-    wait = await message.reply("<i>Broadcasting...</i>")
-    
-    for user_id in users:
-        try:
-            await original.copy(user_id)
-            status["sent"] += 1
-        except FloodWait as e:
-            await asyncio.sleep(e.value)
-            await original.copy(user_id)
-            status["sent"] += 1
-        except UserIsBlocked:
-            await del_user(user_id)
-            status["blocked"] += 1
-        except InputUserDeactivated:
-            await del_user(user_id)
-            status["deleted"] += 1
-        except:
-            status["failed"] += 1
-        status["total"] += 1
-    
-    summary = f"📢 **Broadcast Summary**\n\n"
-    summary += f"👥 Total: {status['total']}\n"
-    summary += f"✅ Sent: {status['sent']}\n"
-    summary += f"⛔ Blocked: {status['blocked']}\n"
-    summary += f"❌ Deleted: {status['deleted']}\n"
-    summary += f"⚠️ Failed: {status['failed']}"
-    
-    await wait.edit(summary)
+# /broadcast is served by the mother bot's admin_ops plugin
 
 # =====================================================
 # ADMIN COMMANDS
@@ -12,6 +12,8 @@ from info import Config
 from bot.database.clone_db import *
 from bot.database.subscription_db import *
 from bot.database.balance_db import *
+from bot.core.events.base import event_bus
+from bot.core.events.clone_events import CloneCreatedEvent
 from bot.logging import LOGGER
 from bot.utils.session_manager import SessionManager
 
@@ -93,6 +95,7 @@ async def create_clone_directly(user_id: int, data: dict):
 
         await create_subscription(str(data['bot_id']), user_id, data['plan_id'], True)
         logger.info(f"📅 Subscription created for bot {data['bot_id']}")
+        event_bus.publish_sync(CloneCreatedEvent(str(data['bot_id']), user_id, plan=data['plan_id']))
 
         from clone_manager import clone_manager
         success, message = await clone_manager.start_clone(str(data['bot_id']))
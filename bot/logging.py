@@ -1,23 +1,241 @@
+import atexit
+import json
 import logging
+import queue
 import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
-def setup_logging():
-    """Set up logging configuration"""
+from info import Config
+
+LOG_FORMAT = '[%(asctime)s - %(levelname)s] - %(name)s - %(message)s'
+DATE_FORMAT = '%d-%b-%y %H:%M:%S'
+
+# Attributes every LogRecord carries; anything else was passed as structured data
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+_setup_lock = threading.Lock()
+_configured = False
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formatter that renders structured ``extra`` fields after the message
+
+    In ``json`` mode every record becomes a single JSON object per line.
+    """
+
+    def __init__(self, json_mode: bool = False):
+        super().__init__(fmt=LOG_FORMAT, datefmt=DATE_FORMAT)
+        self.json_mode = json_mode
+
+    @staticmethod
+    def _fields(record: logging.LogRecord) -> Dict:
+        return {k: v for k, v in record.__dict__.items() if k not in _RESERVED_ATTRS}
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = self._fields(record)
+        if self.json_mode:
+            payload = {
+                'ts': record.created,
+                'level': record.levelname,
+                'logger': record.name,
+                'msg': record.getMessage(),
+                **fields
+            }
+            if record.exc_text:
+                payload['exc'] = record.exc_text
+            return json.dumps(payload, default=str, ensure_ascii=False)
+
+        line = super().format(record)
+        if fields:
+            line += ' | ' + ' '.join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+class DebugRateLimitFilter(logging.Filter):
+    """Rate-limit DEBUG records per call site
+
+    The first ``burst`` records from a given (logger, line) in each ``window``
+    seconds pass through; after that only one in ``sample_every`` is kept.
+    Records above DEBUG are never filtered.
+    """
+
+    def __init__(self, burst: int = 20, window: float = 10.0, sample_every: int = 100):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.sample_every = max(1, sample_every)
+        self._sites: Dict[Tuple[str, int], list] = {}
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+
+        key = (record.name, record.lineno)
+        now = time.monotonic()
+        site = self._sites.get(key)
+        if site is None or now - site[0] >= self.window:
+            self._sites[key] = [now, 1]
+            return True
+
+        site[1] += 1
+        if site[1] <= self.burst or site[1] % self.sample_every == 0:
+            return True
+
+        self.suppressed += 1
+        return False
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _parse_level(level) -> int:
+    if isinstance(level, int):
+        return level
+    level = str(level).strip().upper()
+    if level.isdigit():
+        return int(level)
+    value = logging.getLevelName(level)
+    return value if isinstance(value, int) else logging.INFO
+
+
+def set_log_level(name: str, level) -> None:
+    """Set the level of a single logger (e.g. ``set_log_level('pyrogram', 'WARNING')``)"""
+    logging.getLogger(name or None).setLevel(_parse_level(level))
+
+
+def apply_module_levels(spec: str) -> None:
+    """Apply a ``module=LEVEL,module=LEVEL`` specification"""
+    for item in (spec or '').split(','):
+        if '=' not in item:
+            continue
+        name, level = item.split('=', 1)
+        set_log_level(name.strip(), level)
+
+
+def _build_handlers() -> list:
     logs_dir = Path("logs")
     logs_dir.mkdir(exist_ok=True)
 
-    # Configure root logger
-    logging.basicConfig(
-        level=logging.INFO,
-        format='[%(asctime)s - %(levelname)s] - %(name)s - %(message)s',
-        datefmt='%d-%b-%y %H:%M:%S',
-        handlers=[
-            logging.FileHandler('logs/bot.log'),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+    formatter = StructuredFormatter(json_mode=Config.LOG_FORMAT == 'json')
+    handlers = [
+        logging.FileHandler('logs/bot.log'),
+        logging.StreamHandler(sys.stdout)
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def setup_logging():
+    """Set up logging configuration
+
+    Records are pushed onto a bounded in-memory queue by the calling thread and
+    written to disk/stdout by a dedicated listener thread, so the event loop
+    never waits on log I/O. Entry points call this at startup; otherwise it runs on
+    the first record logged through LOGGER, so importing the package has no side effects.
+    """
+    global _listener, _queue_handler, _configured
+
+    with _setup_lock:
+        if _listener is not None:
+            return
+        _configured = True
+
+        log_queue = queue.Queue(maxsize=Config.LOG_QUEUE_SIZE)
+        _queue_handler = NonBlockingQueueHandler(log_queue)
+        _queue_handler.addFilter(DebugRateLimitFilter(
+            burst=Config.LOG_DEBUG_BURST,
+            window=Config.LOG_DEBUG_WINDOW,
+            sample_every=Config.LOG_DEBUG_SAMPLE_EVERY
+        ))
+
+        _listener = QueueListener(log_queue, *_build_handlers(), respect_handler_level=True)
+        _listener.start()
+
+        root = logging.getLogger()
+        root.addHandler(_queue_handler)
+        root.setLevel(_parse_level(Config.LOG_LEVEL))
+
+        logging.getLogger("pyrogram").setLevel(logging.WARNING)
+        apply_module_levels(Config.LOG_LEVELS)
+
+        atexit.register(shutdown_logging)
+
+
+def add_log_handler(handler: logging.Handler) -> None:
+    """Attach an extra output handler to the background writer thread"""
+    global _listener
+
+    setup_logging()
+    with _setup_lock:
+        if handler.formatter is None:
+            handler.setFormatter(StructuredFormatter(json_mode=Config.LOG_FORMAT == 'json'))
+        _listener.stop()
+        _listener = QueueListener(_listener.queue, *_listener.handlers, handler, respect_handler_level=True)
+        _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+
+    with _setup_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            try:
+                handler.flush()
+                handler.close()
+            except Exception:
+                pass
+        if _queue_handler is not None:
+            logging.getLogger().removeHandler(_queue_handler)
+        _listener = None
+
+
+def get_logging_stats() -> Dict[str, int]:
+    """Queue depth and drop counters of the logging pipeline"""
+    if _queue_handler is None:
+        return {'queued': 0, 'dropped': 0, 'debug_suppressed': 0}
+
+    suppressed = sum(getattr(f, 'suppressed', 0) for f in _queue_handler.filters)
+    return {
+        'queued': _queue_handler.queue.qsize(),
+        'dropped': _queue_handler.dropped,
+        'debug_suppressed': suppressed
+    }
+
+
+def debug_print(*args, sep: str = ' ', **kwargs) -> None:
+    """Drop-in replacement for debug ``print()`` calls
+
+    Routes the text to the caller module's logger at DEBUG level so it goes
+    through the queue, level control and rate limiting instead of stdout.
+    """
+    name = sys._getframe(1).f_globals.get('__name__', 'root')
+    logger = logging.getLogger(name)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(sep.join(str(arg) for arg in args), stacklevel=2)
+
 
 class LOGGER:
     """Enhanced logger wrapper with proper error handling"""
@@ -27,20 +245,29 @@ class LOGGER:
         self._logger = logging.getLogger(name)
 
     def _log_with_context(self, level: str, msg: str, *args, **kwargs):
-        """Log with context, filtering out invalid kwargs"""
-        # Remove any invalid kwargs that logging doesn't accept
-        valid_kwargs = {k: v for k, v in kwargs.items() 
+        """Log with context; unknown kwargs become structured fields"""
+        valid_kwargs = {k: v for k, v in kwargs.items()
                        if k in ['exc_info', 'stack_info', 'stacklevel', 'extra']}
+        fields = {k: v for k, v in kwargs.items() if k not in valid_kwargs and k not in _RESERVED_ATTRS}
+        if fields:
+            valid_kwargs['extra'] = {**valid_kwargs.get('extra', {}), **fields}
+        valid_kwargs.setdefault('stacklevel', 3)
 
+        if not _configured:
+            setup_logging()
         getattr(self._logger, level)(msg, *args, **valid_kwargs)
 
+    def isEnabledFor(self, level: int) -> bool:
+        return self._logger.isEnabledFor(level)
+
     def info(self, msg: str, *args, **kwargs):
         """Log info message"""
         self._log_with_context('info', msg, *args, **kwargs)
 
     def debug(self, msg: str, *args, **kwargs):
         """Log debug message"""
-        self._log_with_context('debug', msg, *args, **kwargs)
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._log_with_context('debug', msg, *args, **kwargs)
 
     def warning(self, msg: str, *args, **kwargs):
         """Log warning message"""
@@ -57,6 +284,3 @@ class LOGGER:
 def get_context_logger(name: str):
     """Get a context-aware logger - compatibility function"""
     return LOGGER(name)
-
-# Setup logging on import
-setup_logging()
\ No newline at end of file
@@ -7,6 +7,45 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Plugins registered on the mother bot client (main.py, tests/update_replay.py)
+MOTHER_BOT_PLUGINS = dict(
+    root="bot.plugins",
+    include=[
+        "rate_limit_guard",
+        "callback_unified",
+        "mother_clone_handlers",
+        "start_handler",
+        "balance_management",
+        "indexing_unified",
+        "live_index",
+        "admin_ops",
+        "clone_admin_settings",
+        "clone_database_commands",
+        "clone_index",
+        "clone_auto_index",
+        "clone_forward_indexer",
+        "clone_status_commands"
+    ]
+)
+
+# Plugins served by every clone client (clone_manager, via bot.utils.handler_table)
+CLONE_BOT_PLUGINS = dict(
+    root="bot.plugins",
+    include=[
+        "rate_limit_guard",
+        "start_handler", "simple_test_commands", "admin", "channel",
+        "clone_admin", "clone_admin_commands", "clone_force_commands",
+        "clone_token_commands", "debug_callbacks", "debug_commands",
+        "enhanced_about", "force_sub_commands", "genlink", "index",
+        "referral_program", "simple_file_sharing",
+        "token", "auto_post", "clone_random_files", "live_index"
+    ],
+    exclude=[
+        "clone_management", "step_clone_creation", "mother_admin",
+        "admin_commands", "balance_management", "admin_panel", "missing_commands", "missing_callbacks"
+    ]
+)
+
 def load_plugins():
     """Load plugins in safe order to prevent conflicts"""
     plugins_loaded = []
@@ -72,6 +111,3 @@ def load_plugins():
         logger.warning(f"⚠️ Failed to load {len(plugins_failed)} plugins: {plugins_failed}")
 
     return plugins_loaded, plugins_failed
-
-# Auto-load plugins when module is imported
-load_plugins()
\ No newline at end of file
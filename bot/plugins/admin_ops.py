@@ -0,0 +1,283 @@
+"""
+Mother Bot admin operations - see clone_manager.BulkOperation, bot/database/clone_placement.py
+and bot/utils/live_profiler.py, plus the paginated /clones listing and /broadcast
+
+Long-running operations report progress by editing one status message.
+"""
+import asyncio
+import time
+from pyrogram import Client, filters
+from pyrogram.types import CallbackQuery, InlineKeyboardMarkup, Message
+from info import Config
+from clone_manager import clone_manager
+from bot.utils.callback_router import CallbackRouter
+from bot.utils.ui_builders import build_page_nav, page_cursor
+from bot.logging import LOGGER
+
+logger = LOGGER(__name__)
+router = CallbackRouter(__name__)
+_background = set()  # tasks that outlive their command handler
+
+PROGRESS_EDIT_INTERVAL = 3  # seconds between status message edits
+
+
+def _throttled(status_message, render):
+    """Progress callback editing ``status_message`` with ``render(op)``, at most once per interval"""
+    last_edit = [0.0]
+
+    async def update(operation):
+        now = time.monotonic()
+        if not operation.finished and now - last_edit[0] < PROGRESS_EDIT_INTERVAL:
+            return
+        last_edit[0] = now
+        try:
+            await status_message.edit_text(render(operation))
+        except Exception:
+            pass
+
+    return update
+
+
+def _bulk_progress(operation) -> str:
+    wave = f"\nWave: {operation.wave}/{operation.waves}" if operation.waves else ""
+    return (f"⏳ **Bulk {operation.action}** `{operation.id}`{wave}\n"
+            f"Done: {len(operation.results)}/{len(operation.bot_ids)} "
+            f"(✅ {operation.succeeded} ❌ {operation.failed})")
+
+
+def _bulk_result(operation) -> str:
+    icon = "✅" if operation.status == 'completed' and not operation.failed else "⚠️"
+    text = f"{icon} **Bulk {operation.action} {operation.status}**\n\n{operation.summary()}"
+    failed = [f"• `{bot_id}`: {result['message']}" for bot_id, result in operation.results.items()
+              if result['ok'] is False]
+    if failed:
+        text += "\n\n**Failed:**\n" + "\n".join(failed[:20])
+    return text
+
+
+# =====================================================
+# BULK CLONE LIFECYCLE
+# =====================================================
+
+@Client.on_message(filters.command("restartall") & filters.private)
+async def restart_all_clones_command(client: Client, message: Message):
+    """Rolling restart of every running clone"""
+    if not Config.is_admin(message.from_user.id):
+        return await message.reply_text("❌ Only Mother Bot admins can restart clones.")
+
+    wave_size = None
+    if len(message.command) > 1:
+        if not message.command[1].isdigit():
+            return await message.reply_text("❌ Usage: `/restartall [wave_size]`")
+        wave_size = int(message.command[1])
+
+    status_message = await message.reply_text("🔄 Starting rolling restart...")
+    operation = await clone_manager.rolling_restart(
+        wave_size=wave_size, on_progress=_throttled(status_message, _bulk_progress)
+    )
+    await status_message.edit_text(_bulk_result(operation))
+
+
+@Client.on_message(filters.command("stopall") & filters.private)
+async def stop_all_clones_command(client: Client, message: Message):
+    """Stop every running clone"""
+    if not Config.is_admin(message.from_user.id):
+        return await message.reply_text("❌ Only Mother Bot admins can stop clones.")
+
+    status_message = await message.reply_text("🛑 Stopping all clones...")
+    operation = await clone_manager.bulk_stop(on_progress=_throttled(status_message, _bulk_progress))
+    await status_message.edit_text(_bulk_result(operation))
+
+
+# =====================================================
+# BROADCAST
+# =====================================================
+
+@Client.on_message(filters.command("broadcast") & filters.private)
+async def broadcast_command(client: Client, message: Message):
+    """Copy the replied-to message to every user, as bulk sends on the send scheduler"""
+    from bot.database import full_userbase
+    from bot.utils.messages import broadcast_copy
+
+    if not Config.is_admin(message.from_user.id):
+        return await message.reply_text("❌ This command is only for admins.")
+    if not message.reply_to_message:
+        return await message.reply_text(
+            "📢 **Broadcast Message**\n\n"
+            "Reply to any message with `/broadcast` to send it to all users."
+        )
+
+    status_message = await message.reply_text("📢 Broadcasting...")
+    status = await broadcast_copy(client, message.reply_to_message, await full_userbase())
+    await status_message.edit_text(
+        "📢 **Broadcast Summary**\n\n"
+        f"👥 Total: {status['total']}\n"
+        f"✅ Sent: {status['sent']}\n"
+        f"⛔ Blocked: {status['blocked']}\n"
+        f"❌ Deleted: {status['deleted']}\n"
+        f"⚠️ Failed: {status['failed']}"
+    )
+
+
+# =====================================================
+# CLONE LISTINGS
+# =====================================================
+
+CLONES_PAGE_SIZE = 10
+
+
+async def build_clones_status_page(cursor: str = None):
+    """Text and keyboard for one page of the /clones listing"""
+    from bot.database.clone_db import get_clones_page
+    from bot.utils.stats_service import stats_service
+
+    page = await get_clones_page(cursor, CLONES_PAGE_SIZE)
+    if not page.items:
+        return "📋 **Clone Status**\n\nNo clones found.", None
+
+    total_clones = max((await stats_service.get())['total_clones'], len(page.items))
+    text = f"📋 **All Clones Status** ({total_clones} total)\n\n"
+    for clone in page.items:
+        status_emoji = "🟢" if clone.get('status') == 'active' else "🔴"
+        text += f"{status_emoji} **@{clone.get('username', 'Unknown')}** (`{clone.get('bot_id')}`)\n"
+
+    nav = build_page_nav("clones_status", page, is_first_page=cursor is None)
+    return text, InlineKeyboardMarkup(nav) if nav else None
+
+
+@Client.on_message(filters.command(["clones", "clonestatus"]) & filters.private)
+async def clones_status_command(client: Client, message: Message):
+    """Status of every clone, a page at a time"""
+    if not Config.is_admin(message.from_user.id):
+        return await message.reply_text("❌ Only admins can view all clone status.")
+
+    text, markup = await build_clones_status_page()
+    await message.reply_text(text, reply_markup=markup)
+
+
+@router.prefix("clones_status")
+async def clones_status_page_callback(client: Client, query: CallbackQuery):
+    """Page through the /clones listing"""
+    if not Config.is_admin(query.from_user.id):
+        return await query.answer("❌ Unauthorized!", show_alert=True)
+
+    text, markup = await build_clones_status_page(page_cursor(query.data))
+    await query.edit_message_text(text, reply_markup=markup)
+
+
+# =====================================================
+# CLONE DATA PLACEMENT
+# =====================================================
+
+def _migration_progress(bot_id: str, target: str):
+    def render(migration) -> str:
+        return (f"🚚 **Moving** `{bot_id}` → {target} (`{migration.id}`)\n"
+                f"Phase: {migration.phase}\n"
+                f"Copied: {migration.copied}/{migration.total} | Verified: {migration.verified}")
+    return render
+
+
+@Client.on_message(filters.command("moveclone") & filters.private)
+async def move_clone_data_command(client: Client, message: Message):
+    """Move a clone's files and stats between the shared and its dedicated database"""
+    from bot.database.clone_placement import PLACEMENTS, placement
+
+    if not Config.is_admin(message.from_user.id):
+        return await message.reply_text("❌ Only Mother Bot admins can move clone data.")
+
+    args = message.command[1:]
+    if len(args) < 2 or args[1] not in PLACEMENTS or args[2:] not in ([], ['cleanup']):
+        return await message.reply_text("❌ Usage: `/moveclone <bot_id> <shared|dedicated> [cleanup]`")
+
+    bot_id, target = args[0], args[1]
+    status_message = await message.reply_text(f"🚚 Moving clone `{bot_id}` data to {target}...")
+    migration = await placement.migrate(
+        bot_id, target, cleanup=bool(args[2:]),
+        on_progress=_throttled(status_message, _migration_progress(bot_id, target))
+    )
+    icon = "✅" if migration.status == 'completed' else "❌"
+    await status_message.edit_text(f"{icon} **Clone `{bot_id}` data move {migration.status}**\n\n{migration.summary()}")
+
+
+# =====================================================
+# PROFILING
+# =====================================================
+
+async def _send_profile(message: Message, status_message: Message, profile):
+    """Wait for ``profile`` in the background and send its file to the admin"""
+    try:
+        await profile.wait()
+        if profile.status == 'completed' and profile.output:
+            await message.reply_document(profile.document(), caption=profile.caption())
+            await status_message.delete()
+        else:
+            await status_message.edit_text(profile.caption())
+    except Exception as e:
+        logger.error(f"Error sending {profile.kind} profile {profile.id}: {e}")
+
+
+def _deliver_profile(message: Message, status_message: Message, profile):
+    task = asyncio.create_task(_send_profile(message, status_message, profile))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+def _start_profile(message: Message, kind: str, usage: str):
+    """Parse ``[seconds] [bot_id]`` and start a profile; returns (profile, error text)"""
+    from bot.utils.live_profiler import live_profiler
+
+    args = message.command[1:]
+    if args and not args[0].replace('.', '', 1).isdigit():
+        return None, f"❌ Usage: `{usage}`"
+    seconds = float(args[0]) if args else 30
+    clone = args[1] if len(args) > 1 and kind == 'cpu' else None
+    try:
+        return live_profiler.start(kind, seconds, clone=clone), None
+    except (ValueError, RuntimeError) as e:
+        return None, f"❌ {e}"
+
+
+@Client.on_message(filters.command("profile_cpu") & filters.private)
+async def profile_cpu_command(client: Client, message: Message):
+    """Time-boxed sampling CPU profile, sent as collapsed stacks"""
+    if not Config.is_admin(message.from_user.id):
+        return await message.reply_text("❌ Only admins can use debug commands.")
+
+    profile, error = _start_profile(message, 'cpu', "/profile_cpu [seconds] [bot_id]")
+    if error:
+        return await message.reply_text(error)
+    status_message = await message.reply_text(
+        f"🔬 CPU profile `{profile.id}` running for {profile.seconds:.0f}s"
+        + (f" on `{profile.clone}`" if profile.clone else "") + "...\nUse `/profile_stop` to end it early."
+    )
+    _deliver_profile(message, status_message, profile)
+
+
+@Client.on_message(filters.command("profile_mem") & filters.private)
+async def profile_memory_command(client: Client, message: Message):
+    """Time-boxed tracemalloc snapshot diff, sent as the top allocators"""
+    if not Config.is_admin(message.from_user.id):
+        return await message.reply_text("❌ Only admins can use debug commands.")
+
+    profile, error = _start_profile(message, 'memory', "/profile_mem [seconds]")
+    if error:
+        return await message.reply_text(error)
+    status_message = await message.reply_text(
+        f"🧠 Memory profile `{profile.id}` tracing allocations for {profile.seconds:.0f}s...\n"
+        "Allocations are slower while tracing; use `/profile_stop` to end it early."
+    )
+    _deliver_profile(message, status_message, profile)
+
+
+@Client.on_message(filters.command("profile_stop") & filters.private)
+async def profile_stop_command(client: Client, message: Message):
+    """End running profiles early"""
+    if not Config.is_admin(message.from_user.id):
+        return await message.reply_text("❌ Only admins can use debug commands.")
+
+    from bot.utils.live_profiler import live_profiler
+
+    stopped = live_profiler.stop_all()
+    if not stopped:
+        return await message.reply_text("ℹ️ No profile is running.")
+    await message.reply_text("⏹️ Stopping " + ", ".join(f"{profile.kind} `{profile.id}`" for profile in stopped))
@@ -56,6 +56,7 @@ from bot.database.users import get_total_users, get_user_stats
 from bot.utils import handle_force_sub
 from bot.utils.command_verification import check_command_limit
 from bot.utils.clone_config_loader import clone_config_loader
+from bot.utils.stats_service import stats_service
 from bot.logging import LOGGER
 from clone_manager import clone_manager
 
@@ -315,10 +316,11 @@ async def dashboard_command(client: Client, message: Message):
         return await message.reply_text("❌ Only Mother Bot admins can access dashboard.")
 
     try:
-        total_clones = len(await get_all_clones())
-        active_clones = len([c for c in await get_all_clones() if c['status'] == 'active'])
+        stats = await stats_service.get()
+        total_clones = stats['total_clones']
+        active_clones = stats['active_clones']
         running_clones = len(clone_manager.get_running_clones())
-        total_subscriptions = len(await get_all_subscriptions())
+        total_subscriptions = stats['total_subscriptions']
 
         dashboard_text = f"📊 **System Dashboard**\n\n"
         dashboard_text += f"🤖 **Clone Statistics:**\n"
@@ -353,17 +355,15 @@ async def stats_command(client: Client, message: Message):
         return await message.reply_text("❌ This command is only for admins.")
 
     try:
-        total_users = await get_total_users()
-        all_clones = await get_all_clones()
-        active_clones = len([c for c in all_clones if c.get('status') == 'active'])
+        stats = await stats_service.get()
 
         stats_text = f"""
 📊 **Bot Statistics**
 
-👥 Total Users: {total_users}
-🤖 Total Clones: {len(all_clones)}
-✅ Active Clones: {active_clones}
-❌ Inactive Clones: {len(all_clones) - active_clones}
+👥 Total Users: {stats['total_users']}
+🤖 Total Clones: {stats['total_clones']}
+✅ Active Clones: {stats['active_clones']}
+❌ Inactive Clones: {stats['inactive_clones']}
 """
 
         await message.reply_text(stats_text)
@@ -400,21 +400,10 @@ async def clones_status_command(client: Client, message: Message):
         if not Config.is_admin(user_id):
             return await message.reply_text("❌ Only admins can view all clone status.")
 
-        all_clones = await get_all_clones()
-        if not all_clones:
-            return await message.reply_text("📋 **Clone Status**\n\nNo clones found.")
-
-        text = f"📋 **All Clones Status** ({len(all_clones)} total)\n\n"
-        active_count = sum(1 for c in all_clones if c.get('status') == 'active')
-
-        for clone in all_clones[:10]:
-            status_emoji = "🟢" if clone.get('status') == 'active' else "🔴"
-            text += f"{status_emoji} **@{clone.get('username', 'Unknown')}** (`{clone.get('bot_id')}`)\n"
-
-        if len(all_clones) > 10:
-            text += f"\n... and {len(all_clones) - 10} more clones"
-
-        await message.reply_text(text)
+        # The mother bot serves /clones from admin_ops; this keeps the same listing
+        from bot.plugins.admin_ops import build_clones_status_page
+        text, markup = await build_clones_status_page()
+        await message.reply_text(text, reply_markup=markup)
     else:
         # Clone bot - show this clone's status
         clone_data = await get_clone_by_bot_token(bot_token)
@@ -658,7 +647,6 @@ Created At: {clone_data.get('created_at')}
         logger.error(f"Error debugging clone {bot_id}: {e}")
         await message.reply_text(f"❌ Error debugging clone {bot_id}: {str(e)}")
 
-
 # =====================================================
 # SIMPLE TEST COMMANDS (from simple_test_commands.py)
 # =====================================================
@@ -5,9 +5,13 @@ from bot.database.balance_db import *
 from bot.logging import LOGGER
 from bot.utils.session_manager import get_session, clear_session, session_expired
 from bot.utils.clone_detection import is_clone_bot_instance
+from bot.utils.ui_builders import build_page_nav, page_cursor
 
 logger = LOGGER(__name__)
 
+BALANCES_PAGE_SIZE = 20
+TRANSACTIONS_PAGE_SIZE = 20
+
 @Client.on_callback_query(filters.regex("^add_balance$"))
 async def show_balance_options(client: Client, query: CallbackQuery):
     """Show balance addition options"""
@@ -175,6 +179,27 @@ async def add_balance_command(client: Client, message: Message):
     except Exception as e:
         await message.reply_text(f"❌ Error adding balance: {e}")
 
+async def build_user_balances_page(cursor: str = None):
+    """Text and keyboard for one page of /userbalances"""
+    page = await get_user_balances_page(cursor, BALANCES_PAGE_SIZE)
+    if not page.items:
+        return "📊 No user profiles found.", None
+
+    totals = await get_balance_totals()
+    response = "💰 **All User Balances**\n\n"
+    for user in page.items:
+        username_display = f"@{user.get('username', 'N/A')}" if user.get('username') else "No username"
+        response += (
+            f"• **{user.get('first_name', 'Unknown')}** ({username_display})\n"
+            f"   💵 ${user['balance']:.2f} | 📊 Spent: ${user.get('total_spent', 0):.2f}\n"
+        )
+
+    response += f"\n💼 **Total System Balance:** ${totals['balance']:.2f}"
+    response += f"\n👥 **Users:** {totals['count']}"
+
+    nav = build_page_nav("userbalances", page, is_first_page=cursor is None)
+    return response, InlineKeyboardMarkup(nav) if nav else None
+
 @Client.on_message(filters.command("userbalances") & filters.private)
 async def list_user_balances_command(client: Client, message: Message):
     """List all user balances (admin only)"""
@@ -185,32 +210,23 @@ async def list_user_balances_command(client: Client, message: Message):
         return await message.reply_text("❌ Only administrators can view user balances.")
 
     try:
-        users = await get_all_user_balances()
-
-        if not users:
-            return await message.reply_text("📊 No user profiles found.")
-
-        # Build response
-        response = "💰 **All User Balances**\n\n"
-        total_balance = 0
-
-        for i, user in enumerate(users[:20]):  # Limit to top 20
-            total_balance += user['balance']
-            username_display = f"@{user.get('username', 'N/A')}" if user.get('username') else "No username"
-            response += (
-                f"{i+1}. **{user.get('first_name', 'Unknown')}** ({username_display})\n"
-                f"   💵 ${user['balance']:.2f} | 📊 Spent: ${user.get('total_spent', 0):.2f}\n"
-            )
+        text, markup = await build_user_balances_page()
+        await message.reply_text(text, reply_markup=markup)
 
-        response += f"\n💼 **Total System Balance:** ${total_balance:.2f}"
-
-        if len(users) > 20:
-            response += f"\n\n*Showing top 20 of {len(users)} users*"
+    except Exception as e:
+        await message.reply_text(f"❌ Error retrieving balances: {e}")
 
-        await message.reply_text(response)
+@Client.on_callback_query(filters.regex("^userbalances(#|$)"))
+async def user_balances_page_callback(client: Client, query: CallbackQuery):
+    """Page through /userbalances"""
+    if query.from_user.id not in [Config.OWNER_ID] + list(Config.ADMINS):
+        return await query.answer("❌ Unauthorized!", show_alert=True)
 
+    try:
+        text, markup = await build_user_balances_page(page_cursor(query.data))
+        await query.edit_message_text(text, reply_markup=markup)
     except Exception as e:
-        await message.reply_text(f"❌ Error retrieving balances: {e}")
+        await query.answer(f"Error loading balances: {e}", show_alert=True)
 
 @Client.on_message(filters.command("checkbalance") & filters.private)
 async def check_user_balance_command(client: Client, message: Message):
@@ -288,13 +304,15 @@ async def refresh_balance_callback(client: Client, query: CallbackQuery):
 
     await check_balance_command(client, fake_message)
 
-@Client.on_callback_query(filters.regex("^full_transaction_history$"))
+@Client.on_callback_query(filters.regex("^full_transaction_history(#|$)"))
 async def full_transaction_history_callback(client: Client, query: CallbackQuery):
     """Show full transaction history"""
     user_id = query.from_user.id
 
     try:
-        transactions = await get_user_transactions(user_id, 20)
+        cursor = page_cursor(query.data)
+        page = await get_user_transactions_page(user_id, cursor, TRANSACTIONS_PAGE_SIZE)
+        transactions = page.items
 
         if not transactions:
             return await query.answer("No transactions found.", show_alert=True)
@@ -313,9 +331,10 @@ async def full_transaction_history_callback(client: Client, query: CallbackQuery
 
         await query.edit_message_text(
             response,
-            reply_markup=InlineKeyboardMarkup([
-                [InlineKeyboardButton("🔙 Back to Balance", callback_data="refresh_balance")]
-            ])
+            reply_markup=InlineKeyboardMarkup(
+                build_page_nav("full_transaction_history", page, is_first_page=cursor is None) +
+                [[InlineKeyboardButton("🔙 Back to Balance", callback_data="refresh_balance")]]
+            )
         )
 
     except Exception as e:
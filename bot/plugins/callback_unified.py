@@ -11,11 +11,13 @@ from bot.database import add_user, present_user, is_verified, validate_token_and
 from bot.utils.command_verification import check_command_limit, use_command
 from bot.database.verify_db import create_verification_token
 from bot.utils.callback_error_handler import safe_callback_handler
+from bot.utils.callback_router import CallbackRouter
 from bot.logging import LOGGER
 import traceback
 import logging
 
 logger = LOGGER(__name__)
+router = CallbackRouter(__name__)
 
 # =====================================================
 # CALLBACK PRIORITIES
@@ -33,7 +35,7 @@ CALLBACK_PRIORITIES = {
 # =====================================================
 # CLONE SETTINGS HANDLERS
 # =====================================================
-@Client.on_callback_query(filters.regex("^clone_settings_panel$"), group=-5)
+@router.route("clone_settings_panel", group=-5)
 async def clone_settings_panel_callback(client: Client, query: CallbackQuery):
     """Handle clone settings panel callback"""
     user_id = query.from_user.id
@@ -76,7 +78,7 @@ async def clone_settings_panel_callback(client: Client, query: CallbackQuery):
 # =====================================================
 # FILE BROWSING HANDLERS
 # =====================================================
-@Client.on_callback_query(filters.regex(r"^(random_files|recent_files|popular_files)$"), group=-3)
+@router.route("random_files", "recent_files", "popular_files", group=-3)
 async def file_browsing_callback_handler(client: Client, query: CallbackQuery):
     """Handle file browsing callbacks for clone bots"""
     callback_data = query.data
@@ -140,7 +142,7 @@ async def file_browsing_callback_handler(client: Client, query: CallbackQuery):
 # =====================================================
 # TOGGLE SETTINGS HANDLERS
 # =====================================================
-@Client.on_callback_query(filters.regex(r"^toggle_(random|recent|popular)$"), group=-4)
+@router.route("toggle_random", "toggle_recent", "toggle_popular", group=-4)
 async def handle_toggle_settings(client: Client, query: CallbackQuery):
     """Handle toggle settings"""
     await query.answer()
@@ -172,7 +174,7 @@ async def handle_toggle_settings(client: Client, query: CallbackQuery):
 # =====================================================
 # GENERAL CALLBACK HANDLERS
 # =====================================================
-@Client.on_callback_query(filters.regex("^about$"))
+@router.route("about")
 async def about_callback(client, query: CallbackQuery):
     text = f"""
 👨‍💻 <b>Developer:</b> This Person
@@ -187,7 +189,7 @@ async def about_callback(client, query: CallbackQuery):
         ])
     )
 
-@Client.on_callback_query(filters.regex("^my_stats$"))
+@router.route("my_stats")
 async def my_stats_callback(client, query: CallbackQuery):
     """Handle My Stats button click"""
     try:
@@ -240,7 +242,7 @@ async def my_stats_callback(client, query: CallbackQuery):
         logger.error(f"ERROR in my_stats_callback: {e}")
         await query.answer("❌ Error retrieving stats. Please try again.", show_alert=True)
 
-@Client.on_callback_query(filters.regex("^get_token$"))
+@router.route("get_token")
 async def get_token_callback(client, query):
     if await handle_force_sub(client, query.message):
         await query.answer()
@@ -294,7 +296,7 @@ async def get_token_callback(client, query):
         await query.answer()
         await query.edit_message_text("⚠️ An error occurred. Please try again later.")
 
-@Client.on_callback_query(filters.regex("^back_to_start$"))
+@router.route("back_to_start")
 async def back_to_start_callback(client: Client, query: CallbackQuery):
     """Handle back to start callback"""
     try:
@@ -317,12 +319,12 @@ async def back_to_start_callback(client: Client, query: CallbackQuery):
         logger.error(f"Error in back_to_start callback: {e}")
         await query.answer("❌ Error going back to start. Please send /start", show_alert=True)
 
-@Client.on_callback_query(filters.regex("^close$"))
+@router.route("close")
 async def close(client, query):
     await query.message.delete()
     await query.answer("Closed Successfully!")
 
-@Client.on_callback_query(filters.regex("^show_premium_plans$"))
+@router.route("show_premium_plans")
 async def show_premium_callback(client, query: CallbackQuery):
     if await handle_force_sub(client, query.message):
         await query.answer()
@@ -382,7 +384,7 @@ async def show_premium_callback(client, query: CallbackQuery):
         logger.error(f"Error showing premium plans: {e}")
         await query.answer("❌ Error loading plans", show_alert=True)
 
-@Client.on_callback_query(filters.regex("^settings$"))
+@router.route("settings")
 async def settings_callback(client: Client, query: CallbackQuery):
     """Handle settings button callback"""
     try:
@@ -444,7 +446,8 @@ async def settings_callback(client: Client, query: CallbackQuery):
 # =====================================================
 # START MENU HANDLERS
 # =====================================================
-@Client.on_callback_query(filters.regex("^(manage_my_clone|user_profile|premium_info|help_menu|about_bot|about_water|admin_panel|bot_management)$"), group=95)
+@router.route("manage_my_clone", "user_profile", "premium_info", "help_menu", "about_bot", "about_water",
+              "admin_panel", "bot_management", group=95)
 async def handle_start_menu_callbacks(client: Client, query: CallbackQuery):
     """Handle start menu button callbacks"""
     callback_data = query.data
@@ -521,7 +524,7 @@ async def handle_start_menu_callbacks(client: Client, query: CallbackQuery):
 # =====================================================
 # CLONE SPECIFIC HANDLERS
 # =====================================================
-@Client.on_callback_query(filters.regex("^goto_clone_settings$"))
+@router.route("goto_clone_settings")
 async def handle_goto_clone_settings(client: Client, query: CallbackQuery):
     """Handle goto clone settings callback"""
     try:
@@ -531,7 +534,7 @@ async def handle_goto_clone_settings(client: Client, query: CallbackQuery):
         logger.error(f"Error in goto clone settings: {e}")
         await query.answer("❌ Error opening settings.", show_alert=True)
 
-@Client.on_callback_query(filters.regex("^goto_admin_panel$"))
+@router.route("goto_admin_panel")
 async def handle_goto_admin_panel(client: Client, query: CallbackQuery):
     """Handle goto admin panel callback"""
     try:
@@ -598,6 +601,10 @@ async def handle_popular_files(client: Client, query: CallbackQuery):
 @Client.on_callback_query(group=99)
 async def catch_all_callback_handler(client: Client, query: CallbackQuery):
     """Catch-all callback handler for unhandled callbacks"""
+    # Set by the callback router on queries one of its routes handled
+    if getattr(query, 'route', None) is not None:
+        return
+
     callback_data = query.data
     user_id = query.from_user.id
 
@@ -4,11 +4,12 @@
 import asyncio
 from pyrogram import filters, Client
 from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton
-from pyrogram.errors import FloodWait
+from functools import partial
 import logging
 
 from info import Config
 from bot.utils import encode
+from bot.utils.send_scheduler import BULK, send
 
 logger = logging.getLogger(__name__)
 
@@ -34,10 +35,10 @@ async def create_link(client: Client, message: Message):
     reply_text = await file_message.reply_text("Creating shareable link...!", quote=True)
 
     try:
-        post_message = await file_message.copy(chat_id=client.db_channel.id, disable_notification=True)
-    except FloodWait as e:
-        await asyncio.sleep(e.value)
-        post_message = await file_message.copy(chat_id=client.db_channel.id, disable_notification=True)
+        post_message = await send(
+            client, partial(file_message.copy, chat_id=client.db_channel.id, disable_notification=True),
+            chat_id=client.db_channel.id
+        )
     except Exception as e:
         print(e)
         await reply_text.edit_text("Something went Wrong..!")
@@ -54,10 +55,7 @@ async def create_link(client: Client, message: Message):
 
     if not Config.DISABLE_CHANNEL_BUTTON:
         try:
-            await post_message.edit_reply_markup(reply_markup)
-        except FloodWait as e:
-            await asyncio.sleep(e.value)
-            await post_message.edit_reply_markup(reply_markup)
+            await send(client, partial(post_message.edit_reply_markup, reply_markup), chat_id=client.db_channel.id)
         except Exception:
             pass
 
@@ -75,9 +73,6 @@ async def new_post(client: Client, message: Message):
         link = f"https://t.me/{client.username}?start={base64_string}"
         reply_markup = InlineKeyboardMarkup([[InlineKeyboardButton("🔁 Share URL", url=f'https://telegram.me/share/url?url={link}')]])
         try:
-            await message.edit_reply_markup(reply_markup)
-        except FloodWait as e:
-            await asyncio.sleep(e.value)
-            await message.edit_reply_markup(reply_markup)
+            await send(client, partial(message.edit_reply_markup, reply_markup), chat_id=message.chat.id, priority=BULK)
         except Exception:
             pass
\ No newline at end of file
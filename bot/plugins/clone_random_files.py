@@ -22,8 +22,10 @@ from bot.database.clone_db import get_clone_by_bot_token
 from bot.utils.helper import get_readable_file_size
 from info import Config
 import bot.utils.clone_config_loader as clone_config_loader
+from bot.utils.callback_router import CallbackRouter
 
 logger = LOGGER(__name__)
+router = CallbackRouter(__name__)
 
 async def check_clone_feature_enabled(client: Client, feature_name: str):
     """Check if a feature is enabled for the current clone"""
@@ -430,7 +432,7 @@ async def handle_clone_popular_files(client: Client, query):
         logger.error(f"Error in clone popular files callback: {e}")
         await query.answer("❌ Error retrieving popular files.", show_alert=True)
 
-@Client.on_callback_query(filters.regex("^get_file:"))
+@router.prefix("get_file:")
 async def handle_get_file(client: Client, query: CallbackQuery):
     """Handle file download request with enhanced tracking and UI"""
     try:
@@ -544,7 +546,7 @@ async def track_file_view(file_id, user_id, clone_id=None):
     except Exception as e:
         logger.error(f"Error tracking file view: {e}")
 
-@Client.on_callback_query(filters.regex("^share_file:"))
+@router.prefix("share_file:")
 async def handle_share_file(client: Client, query):
     """Handle file sharing"""
     try:
@@ -567,7 +569,7 @@ async def handle_share_file(client: Client, query):
     except Exception as e:
         logger.error(f"Error handling file share: {e}")
 
-@Client.on_callback_query(filters.regex("^like_file:"))
+@router.prefix("like_file:")
 async def handle_like_file(client: Client, query):
     """Handle file likes"""
     try:
@@ -594,7 +596,7 @@ async def handle_like_file(client: Client, query):
     except Exception as e:
         logger.error(f"Error handling file like: {e}")
 
-@Client.on_callback_query(filters.regex("^get_random_file$"))
+@router.route("get_random_file")
 async def handle_get_random_file(client: Client, query):
     """Get a single random file quickly"""
     try:
@@ -622,7 +624,7 @@ async def handle_get_random_file(client: Client, query):
         await query.answer("❌ Error getting random file.", show_alert=True)
 
 # Callback handlers for clone bot file browsing
-@Client.on_callback_query(filters.regex(r"^clone_random_files$"))
+@router.route("clone_random_files")
 async def handle_clone_random_files_callback(client: Client, query: CallbackQuery):
     """Handle clone random files callback"""
     try:
@@ -631,7 +633,7 @@ async def handle_clone_random_files_callback(client: Client, query: CallbackQuer
         logger.error(f"Error in clone random files callback: {e}")
         await query.answer("❌ Error loading random files.", show_alert=True)
 
-@Client.on_callback_query(filters.regex(r"^random_files$"))
+@router.route("random_files")
 async def handle_random_files_button(client: Client, query: CallbackQuery):
     """Handle random files button from start menu"""
     try:
@@ -641,7 +643,7 @@ async def handle_random_files_button(client: Client, query: CallbackQuery):
         await query.answer("❌ Error loading random files.", show_alert=True)
 
 
-@Client.on_callback_query(filters.regex("^clone_popular_files$"))
+@router.route("clone_popular_files")
 async def handle_clone_popular_files_callback(client: Client, query: CallbackQuery):
     """Handle popular files callback for clone bot"""
     try:
@@ -689,7 +691,7 @@ async def handle_clone_popular_files_callback(client: Client, query: CallbackQue
 
 
 
-@Client.on_callback_query(filters.regex(r"^get_file:"))
+@router.prefix("get_file:")
 async def handle_get_file_callback(client: Client, query: CallbackQuery):
     """Handle file download callback"""
     try:
@@ -735,7 +737,7 @@ async def handle_get_file_callback(client: Client, query: CallbackQuery):
         logger.error(f"Error in get file callback: {e}")
         await query.edit_message_text("❌ Error processing file request. Please try again.")
 
-@Client.on_callback_query(filters.regex("^get_random_file$"))
+@router.route("get_random_file")
 async def handle_quick_random_file_callback(client: Client, query: CallbackQuery):
     """Handle quick random file callback"""
     try:
@@ -11,12 +11,16 @@ import logging
 import asyncio
 import re
 from datetime import datetime
+from functools import partial
 from pyrogram import Client, filters, enums
 from pyrogram.errors import FloodWait, ChannelInvalid, ChatAdminRequired, UsernameInvalid
 from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 from info import Config
 from bot.database.clone_db import get_clone_by_bot_token
+from bot.database import file_dedup
+from bot.database.clone_placement import placement
 from bot.database.index_db import add_to_index
+from bot.utils.send_scheduler import BULK, scheduler_for, send
 from motor.motor_asyncio import AsyncIOMotorClient
 
 logger = logging.getLogger(__name__)
@@ -204,6 +208,8 @@ async def index_files_to_db(lst_msg_id, chat, msg, bot, clone_id=None, clone_dat
     unsupported = 0
 
     clone_client = None  # Initialize outside try block
+    # Final status edits share the progress key so a queued progress edit cannot land after them
+    progress_key = ('index_progress', msg.chat.id, msg.id)
     try:
         current = index_config.CURRENT_SKIP
         index_config.CANCEL = False
@@ -222,18 +228,19 @@ async def index_files_to_db(lst_msg_id, chat, msg, bot, clone_id=None, clone_dat
             db_name = clone_data.get('db_name', f"clone_{clone_id}")
             clone_db = clone_client[db_name]
             files_collection = clone_db.files
+            await file_dedup.ensure_dedup_index(files_collection)
             logger.info(f"📊 Connected to database: {db_name}, collection: files")
         else:
             files_collection = None
 
         async for message in bot.iter_messages(chat, lst_msg_id, index_config.CURRENT_SKIP):
             if index_config.CANCEL:
-                await msg.edit(f"Successfully Cancelled!\n\n"
+                await send(bot, partial(msg.edit, f"Successfully Cancelled!\n\n"
                                f"Saved <code>{total_files}</code> files to database!\n"
                                f"Duplicate Files Skipped: <code>{duplicate}</code>\n"
                                f"Deleted Messages Skipped: <code>{deleted}</code>\n"
                                f"Non-Media messages skipped: <code>{no_media + unsupported}</code>\n"
-                               f"Errors Occurred: <code>{errors}</code>")
+                               f"Errors Occurred: <code>{errors}</code>"), chat_id=msg.chat.id, key=progress_key)
                 break
 
             current += 1
@@ -241,14 +248,18 @@ async def index_files_to_db(lst_msg_id, chat, msg, bot, clone_id=None, clone_dat
             if current % 80 == 0:
                 can = [[InlineKeyboardButton('Cancel', callback_data='index_cancel')]]
                 reply = InlineKeyboardMarkup(can)
-                await msg.edit_text(
+                # Queued behind user-facing sends and not awaited; a newer progress
+                # edit replaces one that has not gone out yet
+                scheduler_for(bot).post(partial(
+                    msg.edit_text,
                     text=f"Total messages fetched: <code>{current}</code>\n"
                          f"Total messages saved: <code>{total_files}</code>\n"
                          f"Duplicate Files Skipped: <code>{duplicate}</code>\n"
                          f"Deleted Messages Skipped: <code>{deleted}</code>\n"
                          f"Non-Media messages skipped: <code>{no_media + unsupported}</code>\n"
                          f"Errors Occurred: <code>{errors}</code>",
-                    reply_markup=reply)
+                    reply_markup=reply
+                ), chat_id=msg.chat.id, priority=BULK, key=progress_key)
 
             if message.empty:
                 deleted += 1
@@ -271,12 +282,12 @@ async def index_files_to_db(lst_msg_id, chat, msg, bot, clone_id=None, clone_dat
             caption = message.caption or ''
 
             try:
-                if files_collection:
-                    # Clone bot - use MongoDB directly
-                    unique_file_id = f"{chat}_{message.id}"
+                if files_collection is not None:
+                    # Clone bot - use MongoDB directly, one document per file across channels
                     file_doc = {
-                        "_id": unique_file_id,
+                        "_id": f"{chat}_{message.id}",
                         "file_id": getattr(media, 'file_id', str(message.id)),
+                        "file_unique_id": getattr(media, 'file_unique_id', None),
                         "message_id": message.id,
                         "chat_id": chat,
                         "file_name": file_name,
@@ -288,16 +299,10 @@ async def index_files_to_db(lst_msg_id, chat, msg, bot, clone_id=None, clone_dat
                         "clone_id": clone_id,
                         "indexed_at": datetime.utcnow()
                     }
-                    # Check if document already exists
-                    existing = await files_collection.find_one({"_id": unique_file_id})
-                    if existing:
-                        duplicate += 1
+                    if await placement.upsert_file(clone_id, file_doc, files_collection):
+                        total_files += 1
                     else:
-                        result = await files_collection.insert_one(file_doc)
-                        if result.inserted_id:
-                            total_files += 1
-                        else:
-                            errors += 1
+                        duplicate += 1
                 else:
                     # Mother bot - use index_db
                     try:
@@ -323,13 +328,22 @@ async def index_files_to_db(lst_msg_id, chat, msg, bot, clone_id=None, clone_dat
 
     except Exception as e:
         logger.exception(e)
-        await msg.edit(f'Error: {e}')
+        await send(bot, partial(msg.edit, f'Error: {e}'), chat_id=msg.chat.id, key=progress_key)
     else:
-        await msg.edit(f'Successfully saved <code>{total_files}</code> files to database!\n'
+        await send(bot, partial(msg.edit, f'Successfully saved <code>{total_files}</code> files to database!\n'
                        f'Duplicate Files Skipped: <code>{duplicate}</code>\n'
                        f'Deleted Messages Skipped: <code>{deleted}</code>\n'
                        f'Non-Media messages skipped: <code>{no_media + unsupported}</code>\n'
-                       f'Errors Occurred: <code>{errors}</code>')
+                       f'Errors Occurred: <code>{errors}</code>'), chat_id=msg.chat.id, key=progress_key)
+        if clone_id and clone_data and isinstance(chat, int):
+            # Posts after the indexed range are picked up by live indexing from here on
+            try:
+                from bot.database import index_db
+                from bot.utils.live_indexer import live_indexer
+                await index_db.advance_index_checkpoint(clone_id, chat, lst_msg_id)
+                await live_indexer.track_clone_channel(clone_id, bot, clone_data, chat, checkpoint=lst_msg_id)
+            except Exception as e:
+                logger.error(f"❌ Could not start live indexing of {chat} for clone {clone_id}: {e}")
     finally:
         if clone_client is not None:
             clone_client.close()
@@ -611,41 +625,5 @@ async def cancel_clone_index_callback(client: Client, query: CallbackQuery):
 
 
 # ===================== AUTO-INDEXING =====================
-
-@Client.on_message(filters.channel & filters.incoming & filters.chat(Config.INDEX_CHANNEL_ID if hasattr(Config, 'INDEX_CHANNEL_ID') else 0))
-async def auto_index_channel_media(client: Client, message: Message):
-    """Auto-index media from designated channel"""
-    if message.video or message.document or message.photo:
-        try:
-            media_type = "unknown"
-            file_size = 0
-            file_name = message.caption or f"File_{message.id}"
-
-            if message.video:
-                media_type = "video"
-                file_size = message.video.file_size or 0
-                if message.video.file_name:
-                    file_name = message.video.file_name
-            elif message.photo:
-                media_type = "photo"
-                file_size = getattr(message.photo, 'file_size', 0)
-            elif message.document:
-                media_type = "document"
-                file_size = message.document.file_size or 0
-                if message.document.file_name:
-                    file_name = message.document.file_name
-
-            unique_file_id = f"{Config.INDEX_CHANNEL_ID}_{message.id}"
-            await add_to_index(
-                file_id=unique_file_id,
-                file_name=file_name,
-                file_type=media_type,
-                file_size=file_size,
-                caption=message.caption or '',
-                user_id=message.from_user.id if message.from_user else 0
-            )
-
-            logger.info(f"✅ Auto-indexed {media_type} file {message.id} from indexing channel")
-
-        except Exception as e:
-            logger.error(f"❌ Error auto-indexing: {e}")
\ No newline at end of file
+# New posts in Config.INDEX_CHANNEL_ID and in channels a clone has indexed are
+# handled by bot/plugins/live_index.py
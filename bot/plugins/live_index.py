@@ -0,0 +1,17 @@
+"""
+Live indexing of channel posts - see bot/utils/live_indexer.py
+
+Served by the mother bot and every clone; a post is buffered only if its channel
+is indexed by the bot that received it.
+"""
+from pyrogram import Client, filters
+from pyrogram.types import Message
+from bot.utils.live_indexer import MOTHER, live_indexer
+from bot.utils.clone_detection import get_clone_id_from_client
+
+LIVE_INDEX_GROUP = 5
+
+
+@Client.on_message(filters.channel & filters.incoming, group=LIVE_INDEX_GROUP)
+async def live_index_channel_post(client: Client, message: Message):
+    await live_indexer.on_message(get_clone_id_from_client(client) or MOTHER, message)
@@ -8,10 +8,12 @@ from bot.database.subscription_db import get_token_plans
 from bot.database.balance_db import get_user_balance, deduct_balance
 from bot.database.referral_db import process_referral_reward
 from info import Config
+from bot.utils.callback_router import CallbackRouter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
+router = CallbackRouter(__name__)
 
 # Token verification plans - These are for bot command usage, NOT for clone creation
 TOKEN_VERIFICATION_PLANS = {
@@ -125,9 +127,9 @@ async def premium_handler(client, message):
         reply_markup=InlineKeyboardMarkup(buttons)
     )
 
-@Client.on_callback_query(filters.regex("^buy_premium:"))
+@router.prefix("buy_premium:")
 async def buy_premium_callback(client, query: CallbackQuery):
-    plan_key = query.data.split(":")[1]
+    plan_key = query.route_args[0] if query.route_args else None
     plan = PREMIUM_PLANS.get(plan_key)
 
     if not plan:
@@ -158,7 +160,7 @@ async def buy_premium_callback(client, query: CallbackQuery):
         reply_markup=InlineKeyboardMarkup(buttons)
     )
 
-@Client.on_callback_query(filters.regex("^show_premium_plans$"))
+@router.route("show_premium_plans")
 async def show_premium_plans_callback(client, query: CallbackQuery):
     buttons = []
     for plan_key, plan_info in PREMIUM_PLANS.items():
@@ -0,0 +1,31 @@
+"""
+Rate limit guard - refuses flooding users before any other handler runs
+
+Registered in the lowest handler group of the mother bot and every clone, so an
+update over the limit stops here instead of reaching handlers that query MongoDB.
+"""
+from pyrogram import Client, filters, StopPropagation
+from pyrogram.types import CallbackQuery, Message
+from bot.utils.rate_limiter import check_update, notify_limited, rate_limiter
+
+GUARD_GROUP = -100
+
+
+async def _guard(client: Client, update):
+    user = update.from_user
+    decision = check_update(client, user.id if user else None)
+    if decision.allowed:
+        return
+    if rate_limiter.should_notify(user.id):
+        await notify_limited(update, decision)
+    raise StopPropagation
+
+
+@Client.on_message(filters.private & filters.incoming, group=GUARD_GROUP)
+async def rate_limit_messages(client: Client, message: Message):
+    await _guard(client, message)
+
+
+@Client.on_callback_query(group=GUARD_GROUP)
+async def rate_limit_callbacks(client: Client, query: CallbackQuery):
+    await _guard(client, query)
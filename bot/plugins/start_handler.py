@@ -4,8 +4,9 @@ from pyrogram.client import Client
 from pyrogram import filters
 from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 from info import Config
-from bot.logging import LOGGER
+from bot.logging import LOGGER, debug_print
 from bot.plugins.handler_registry import handler_registry
+from bot.utils.callback_router import CallbackRouter
 
 # Import with error handling
 try:
@@ -62,6 +63,7 @@ except ImportError:
             return False  # Allow all users if force sub is not available
 
 logger = LOGGER(__name__)
+router = CallbackRouter(__name__)
 
 # User settings storage (in-memory dictionary)
 user_settings = {}
@@ -158,8 +160,7 @@ async def start_command(client: Client, message: Message):
     user_id = user.id
 
     try:
-        print(f"🚀 DEBUG COMMAND: /start command from user {user_id}")
-        print(f"👤 DEBUG COMMAND: User details - ID: {user_id}, Username: @{user.username}, First: {user.first_name}")
+        debug_print(f"👤 DEBUG COMMAND: User details - ID: {user_id}, Username: @{user.username}, First: {user.first_name}")
         logger.info(f"Start command received from user {user_id}")
 
         # Prevent duplicate processing using registry
@@ -173,11 +174,9 @@ async def start_command(client: Client, message: Message):
             # Handle force subscription first (with admin exemption)
             force_sub_blocked = await utils.handle_force_sub(client, message)
             if force_sub_blocked:
-                print(f"🔒 DEBUG: User {user_id} blocked by force subscription")
                 logger.info(f"User {user_id} blocked by force subscription")
                 return
 
-            print(f"✅ DEBUG: User {user_id} passed force subscription check")
             logger.info(f"User {user_id} passed force subscription check")
         finally:
             # Remove from processing using registry
@@ -192,10 +191,10 @@ async def start_command(client: Client, message: Message):
 
     # Check if session has expired for the user
     if await session_expired(user.id):
-        print(f"⏰ DEBUG SESSION: Session expired for user {user.id}, clearing session")
+        debug_print(f"⏰ DEBUG SESSION: Session expired for user {user.id}, clearing session")
         await clear_session(user.id)
     else:
-        print(f"✅ DEBUG SESSION: Session valid for user {user.id}")
+        debug_print(f"✅ DEBUG SESSION: Session valid for user {user.id}")
 
     # Add user to database
     await add_user(user.id)
@@ -260,7 +259,6 @@ async def start_command(client: Client, message: Message):
         if is_admin_user:
             # Clone admin gets settings access AND file access
             logger.info(f"🎛️ ADMIN ACCESS: Showing settings button to clone admin {user_id}")
-            print(f"🎛️ ADMIN ACCESS: Showing settings button to clone admin {user_id}")
 
             buttons = []
 
@@ -413,7 +411,7 @@ async def start_command(client: Client, message: Message):
 # Settings handlers are now handled in callback_handlers.py
 
 # Toggle handlers - Unified toggle handling
-@Client.on_callback_query(filters.regex("^toggle_"), group=3)
+@router.prefix("toggle_", group=3)
 async def toggle_feature_callback(client: Client, query: CallbackQuery):
     """Handle feature toggle callbacks"""
     await query.answer()
@@ -455,7 +453,7 @@ async def toggle_feature_callback(client: Client, query: CallbackQuery):
         await clone_settings_callback(client, query)
 
 # Change URL/API handlers - Prevent conflicts
-@Client.on_callback_query(filters.regex("^change_shortener_url$"), group=4)
+@router.route("change_shortener_url", group=4)
 async def change_shortener_url_callback(client: Client, query: CallbackQuery):
     """Handle shortener URL change"""
     await query.answer()
@@ -527,7 +525,7 @@ async def handle_settings_input(client: Client, message: Message):
         del user_settings[user_id]['waiting_for']
         await message.reply_text("✅ **API Key Updated**\n\nYour API key has been saved securely.")
 
-@Client.on_callback_query(filters.regex("^back_to_start$"), group=7)
+@router.route("back_to_start", group=7)
 async def back_to_start_callback(client: Client, query: CallbackQuery):
     """Return to main start menu"""
     await query.answer()
@@ -654,7 +652,7 @@ async def back_to_start_callback(client: Client, query: CallbackQuery):
 
         await query.edit_message_text(text, reply_markup=InlineKeyboardMarkup(buttons))
 
-@Client.on_callback_query(filters.regex("^user_profile$"))
+@router.route("user_profile")
 async def user_profile_callback(client: Client, query: CallbackQuery):
     """Handle user profile callback"""
     await query.answer()
@@ -748,7 +746,7 @@ async def user_profile_callback(client: Client, query: CallbackQuery):
 
     await safe_edit_message(query, text, reply_markup=InlineKeyboardMarkup(buttons))
 
-@Client.on_callback_query(filters.regex("^help_menu$"))
+@router.route("help_menu")
 async def help_callback(client: Client, query: CallbackQuery):
     """Show comprehensive help menu"""
     await query.answer()
@@ -827,7 +825,7 @@ async def help_callback(client: Client, query: CallbackQuery):
 
     await safe_edit_message(query, text, reply_markup=buttons)
 
-@Client.on_callback_query(filters.regex("^about_bot$"))
+@router.route("about_bot")
 async def about_callback(client: Client, query: CallbackQuery):
     """Show about information for clone bot"""
     await query.answer()
@@ -870,7 +868,7 @@ async def about_callback(client: Client, query: CallbackQuery):
 
     await safe_edit_message(query, text, reply_markup=buttons)
 
-@Client.on_callback_query(filters.regex("^about_water$"))
+@router.route("about_water")
 async def about_water_callback(client: Client, query: CallbackQuery):
     """Show about information for mother bot"""
     await query.answer()
@@ -1,9 +1,27 @@
-from .messages import (
-    get_messages, 
-    get_message_id
-)
-from .scheduler import schedule_manager
-from .helper import get_readable_time, get_readable_file_size, get_shortlink
-from .subscription import handle_force_sub
-from .encoder import encode, decode
-from .session_manager import SessionManager
\ No newline at end of file
+import importlib
+
+# Re-exported helpers, resolved on first access: several of these modules import
+# pyrogram, which every `bot.utils.<module>` import would otherwise pay for
+_EXPORTS = {
+    "get_messages": "messages",
+    "get_message_id": "messages",
+    "schedule_manager": "scheduler",
+    "get_readable_time": "helper",
+    "get_readable_file_size": "helper",
+    "get_shortlink": "helper",
+    "handle_force_sub": "subscription",
+    "encode": "encoder",
+    "decode": "encoder",
+    "SessionManager": "session_manager",
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = list(_EXPORTS)
@@ -0,0 +1,246 @@
+"""Callback query routing
+
+Callback handlers register exact names or prefixes on their module's
+``CallbackRouter`` instead of one ``filters.regex`` handler each. For every
+pyrogram group it is used in, a router adds a single handler whose filter resolves
+``query.data`` with one dict lookup (exact names) or one walk of a prefix trie
+(bounded by the 64-byte callback data limit), and stores the match on the query;
+the handler then calls the route directly. Groups keep their pyrogram meaning, so
+routed and regex handlers can be mixed while modules migrate.
+
+Prefix routes get the rest of the data split on ``:`` once, as ``query.route_args``.
+Every route is timed under its own name in the handler metrics, and the routes of
+all routers are kept in ``registry`` for the startup conflict report.
+"""
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from pyrogram import filters
+from pyrogram.handlers import CallbackQueryHandler
+from bot.logging import LOGGER
+from bot.utils.metrics import instrument_handler
+
+logger = LOGGER(__name__)
+
+ARG_SEPARATOR = ':'
+_VALUE = object()  # trie node key holding the route that ends at that node
+
+
+class Route(NamedTuple):
+    pattern: str
+    exact: bool
+    group: int
+    callback: Callable
+    module: str
+
+    @property
+    def label(self) -> str:
+        return self.pattern if self.exact else f"{self.pattern}*"
+
+
+class PrefixTrie:
+    """Longest-prefix lookup over callback data"""
+
+    def __init__(self):
+        self._root: Dict = {}
+
+    def add(self, prefix: str, value) -> Optional[object]:
+        """Store ``value`` under ``prefix``; returns the value already stored there, if any"""
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        existing = node.get(_VALUE)
+        if existing is None:
+            node[_VALUE] = value
+        return existing
+
+    def longest(self, data: str):
+        """Value of the longest stored prefix of ``data``, or None"""
+        node, found = self._root, self._root.get(_VALUE)
+        for char in data:
+            node = node.get(char)
+            if node is None:
+                break
+            found = node.get(_VALUE, found)
+        return found
+
+    def items(self) -> List[Tuple[str, object]]:
+        items, stack = [], [('', self._root)]
+        while stack:
+            prefix, node = stack.pop()
+            for key, child in node.items():
+                if key is _VALUE:
+                    items.append((prefix, child))
+                else:
+                    stack.append((prefix + key, child))
+        return sorted(items, key=lambda item: item[0])
+
+
+class CallbackRouter:
+    """Exact and prefix callback routes of one module, per pyrogram group
+
+    Expose the router as a module attribute: pyrogram's plugin loader and the clone
+    handler table pick up its ``handlers`` like those of a decorated function.
+    """
+
+    def __init__(self, module: str):
+        self.module = module
+        self._exact: Dict[int, Dict[str, Route]] = {}
+        self._prefixes: Dict[int, PrefixTrie] = {}
+        self._handlers: Dict[int, CallbackQueryHandler] = {}
+        registry.add(self)
+
+    @property
+    def handlers(self) -> List[Tuple[CallbackQueryHandler, int]]:
+        return [(handler, group) for group, handler in sorted(self._handlers.items())]
+
+    def routes(self) -> List[Route]:
+        routes = [route for table in self._exact.values() for route in table.values()]
+        routes += [route for trie in self._prefixes.values() for _, route in trie.items()]
+        return routes
+
+    # ==================== REGISTRATION ====================
+
+    def route(self, *names: str, group: int = 0):
+        """Decorator routing callback data equal to one of ``names``"""
+        def decorator(func):
+            for name in names:
+                self._add(Route(name, True, group, func, self.module))
+            return func
+        return decorator
+
+    def prefix(self, *prefixes: str, group: int = 0):
+        """Decorator routing callback data starting with one of ``prefixes``"""
+        def decorator(func):
+            for prefix in prefixes:
+                self._add(Route(prefix, False, group, func, self.module))
+            return func
+        return decorator
+
+    def _add(self, route: Route):
+        route = route._replace(callback=instrument_handler(route.callback, name=f"callback:{route.label}"))
+        if route.exact:
+            table = self._exact.setdefault(route.group, {})
+            existing = table.setdefault(route.pattern, route)
+            if existing is route:
+                existing = None
+        else:
+            existing = self._prefixes.setdefault(route.group, PrefixTrie()).add(route.pattern, route)
+        # Like pyrogram, the first handler registered for a pattern in a group wins
+        if existing is not None:
+            registry.duplicate(existing, route)
+        if route.group not in self._handlers:
+            self._handlers[route.group] = self._make_handler(route.group)
+
+    # ==================== DISPATCH ====================
+
+    def resolve(self, group: int, data) -> Optional[Tuple[Route, Tuple[str, ...]]]:
+        """Route for ``data`` in ``group`` and its arguments; exact names win over prefixes"""
+        if not isinstance(data, str):
+            return None
+        route = self._exact.get(group, {}).get(data)
+        if route is not None:
+            return route, ()
+        trie = self._prefixes.get(group)
+        route = trie.longest(data) if trie is not None else None
+        if route is None:
+            return None
+        rest = data[len(route.pattern):]
+        return route, tuple(rest.split(ARG_SEPARATOR)) if rest else ()
+
+    def _make_handler(self, group: int) -> CallbackQueryHandler:
+        # Async filter: pyrogram runs plain filter functions in its thread pool
+        async def matches(_, __, query):
+            match = self.resolve(group, query.data)
+            if match is None:
+                return False
+            query.route, query.route_args = match
+            return True
+
+        async def dispatch(client, query):
+            return await query.route.callback(client, query)
+
+        dispatch.__name__ = f"route_group_{group}"
+        return CallbackQueryHandler(dispatch, filters.create(matches, f"CallbackRoutes[{self.module}:{group}]"))
+
+
+class RouteRegistry:
+    """Every router in the process, for reporting"""
+
+    def __init__(self):
+        self.routers: List[CallbackRouter] = []
+        self.duplicates: List[Tuple[Route, Route]] = []
+
+    def add(self, router: CallbackRouter):
+        self.routers.append(router)
+
+    def duplicate(self, kept: Route, ignored: Route):
+        self.duplicates.append((kept, ignored))
+
+    def routes(self) -> List[Route]:
+        return [route for router in self.routers for route in router.routes()]
+
+    def report(self) -> Dict:
+        """Routes per group and the patterns that shadow or repeat one another
+
+        - ``duplicates``: a pattern registered twice in one group; only the first handler
+          registered (or the first module loaded) runs
+        - ``shadowed``: a route in one group also matched by a prefix route in the same group
+          (the exact name or longer prefix wins)
+        - ``cross_group``: callback data handled in more than one group, so several
+          handlers run for it unless one stops propagation
+        """
+        routes = self.routes()
+        by_group: Dict[int, List[Route]] = {}
+        for route in routes:
+            by_group.setdefault(route.group, []).append(route)
+
+        def where(route: Route) -> str:
+            return f"{route.label} ({route.module.rsplit('.', 1)[-1]}.{getattr(route.callback, '__name__', '?')})"
+
+        duplicates = [f"group {kept.group}: {where(ignored)} repeats {where(kept)}"
+                      for kept, ignored in self.duplicates]
+        shadowed, cross_group = [], []
+        for group, group_routes in sorted(by_group.items()):
+            # Routers of different modules in one group: only the first one loaded runs
+            first: Dict[Tuple[bool, str], Route] = {}
+            for route in group_routes:
+                kept = first.setdefault((route.exact, route.pattern), route)
+                if kept is not route:
+                    duplicates.append(f"group {group}: {where(route)} repeats {where(kept)}")
+            prefixes = [route for route in group_routes if not route.exact]
+            for route in group_routes:
+                for prefix in prefixes:
+                    if route.pattern.startswith(prefix.pattern) and \
+                            (route.exact or route.pattern != prefix.pattern):
+                        shadowed.append(f"group {group}: {where(route)} inside {where(prefix)}")
+
+        for route in routes:
+            for other in routes:
+                if other.group <= route.group:
+                    continue
+                if (route.exact and other.exact and route.pattern == other.pattern) or \
+                        (not other.exact and route.pattern.startswith(other.pattern)) or \
+                        (not route.exact and other.pattern.startswith(route.pattern)):
+                    cross_group.append(f"{where(route)} in group {route.group} and "
+                                       f"{where(other)} in group {other.group}")
+
+        return {
+            'routers': len(self.routers),
+            'routes': len(routes),
+            'groups': {group: len(group_routes) for group, group_routes in sorted(by_group.items())},
+            'duplicates': duplicates,
+            'shadowed': sorted(set(shadowed)),
+            'cross_group': sorted(set(cross_group)),
+        }
+
+    def log_report(self) -> Dict:
+        report = self.report()
+        logger.info(f"🧭 Callback routes: {report['routes']} in {len(report['groups'])} groups "
+                    f"from {report['routers']} modules")
+        for line in report['duplicates']:
+            logger.warning(f"⚠️ Duplicate callback route, {line}")
+        for line in report['shadowed'] + report['cross_group']:
+            logger.info(f"🧭 Overlapping callback routes: {line}")
+        return report
+
+
+registry = RouteRegistry()
@@ -15,9 +15,18 @@ from bot.utils.error_handler import safe_callback_handler
 # Re-export for backward compatibility
 __all__ = ['safe_callback_handler']
 
+_patched = False
+
 def suppress_handler_removal_errors():
-    """Comprehensive handler removal error suppression"""
-    
+    """Comprehensive handler removal error suppression
+
+    Patches pyrogram classes; entry points call it once at startup (repeat calls are no-ops).
+    """
+    global _patched
+    if _patched:
+        return
+    _patched = True
+
     # Patch Client.remove_handler
     original_remove_handler = Client.remove_handler
     
@@ -75,6 +84,3 @@ def suppress_handler_removal_errors():
         logger.debug("Dispatcher patching skipped - not available")
     
     logger.info("✅ Handler removal error suppression enabled")
-
-# Initialize suppression when module is imported
-suppress_handler_removal_errors()
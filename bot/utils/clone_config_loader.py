@@ -1,45 +1,98 @@
 import asyncio
-from datetime import datetime, timedelta
+import time
+from collections import OrderedDict
+from datetime import datetime
+from functools import partial
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple
 from bot.database.clone_db import get_clone_config, get_global_force_channels, get_clone, get_clone_by_bot_token
 from bot.database.subscription_db import get_subscription
 from info import Config
 from bot.logging import LOGGER
+from bot.utils.metrics import metrics
 from telegram import InlineKeyboardButton
 
 logger = LOGGER(__name__)
 
-# Global cache for clone configurations
-clone_config_cache = {}
+config_cache_lookups = metrics.counter('clone_config_cache_total', 'Clone config cache lookups', ('result',))
+config_cache_size = metrics.gauge('clone_config_cache_entries', 'Clone configs held in the cache')
+
+# Settings changes that make cached configs stale
+INVALIDATING_EVENTS = ('clone.config_changed', 'subscription.expired')
+
+
+class ConfigCache:
+    """Bounded LRU of loaded configs with single-flight misses
+
+    Entries are dropped when a settings change is published, and after ``ttl``
+    seconds as a backstop. Concurrent misses for one key share a single load; a load
+    that an invalidation overtakes is returned to its callers but not cached.
+    """
+
+    def __init__(self, maxsize: int = 1000, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[object, float]]" = OrderedDict()
+        self._loads: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable):
+        return key in self._entries
+
+    async def get(self, key: Hashable, load: Callable[[], Awaitable]):
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[1] < self.ttl:
+            self._entries.move_to_end(key)
+            config_cache_lookups.inc(result='hit')
+            return entry[0]
+
+        task = self._loads.get(key)
+        if task is None:
+            config_cache_lookups.inc(result='miss')
+            task = self._loads[key] = asyncio.create_task(self._load(key, load))
+        else:
+            config_cache_lookups.inc(result='shared')
+        # One caller being cancelled must not cancel the load the others wait on
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, load: Callable[[], Awaitable]):
+        task = asyncio.current_task()
+        try:
+            value = await load()
+            if self._loads.get(key) is task:
+                self._entries[key] = (value, time.monotonic())
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                config_cache_size.set(len(self._entries))
+            return value
+        finally:
+            if self._loads.get(key) is task:
+                del self._loads[key]
+
+    def invalidate(self, key: Hashable):
+        self._entries.pop(key, None)
+        self._loads.pop(key, None)
+        config_cache_size.set(len(self._entries))
+
+    def clear(self):
+        self._entries.clear()
+        self._loads.clear()
+        config_cache_size.set(0)
+
 
 class CloneConfigLoader:
     """Advanced configuration loader for dynamic bot behavior"""
 
-    def __init__(self):
-        self.config_cache = {}
-        self.cache_timeout = 300  # 5 minutes
+    def __init__(self, cache_size: int = 1000, cache_ttl: float = 300):
+        self.cache = ConfigCache(cache_size, cache_ttl)
 
     async def get_bot_config(self, bot_token: str):
         """Get comprehensive configuration for a specific bot"""
         # Extract bot ID from token
         bot_id = bot_token.split(':')[0]
-
-        # Check cache first
-        cache_key = f"config_{bot_id}"
-        if cache_key in self.config_cache:
-            cached_data = self.config_cache[cache_key]
-            if datetime.now() - cached_data['timestamp'] < timedelta(seconds=self.cache_timeout):
-                return cached_data['config']
-
-        # Load configuration from database
-        config = await self._load_bot_config(bot_id, bot_token)
-
-        # Cache the configuration
-        self.config_cache[cache_key] = {
-            'config': config,
-            'timestamp': datetime.now()
-        }
-
-        return config
+        return await self.cache.get(('config', bot_id), partial(self._load_bot_config, bot_id, bot_token))
 
     async def _load_bot_config(self, bot_id: str, bot_token: str):
         """Load configuration from database"""
@@ -47,10 +100,13 @@ class CloneConfigLoader:
         if bot_token == Config.BOT_TOKEN:
             return await self._get_mother_bot_config()
 
-        # Get clone-specific configuration
-        clone_config = await get_clone_config(bot_id)
-        clone_data = await get_clone(bot_id)
-        subscription = await get_subscription(bot_id)
+        # Get clone-specific configuration; the reads are independent, so run them together
+        clone_config, clone_data, subscription, global_channels = await asyncio.gather(
+            get_clone_config(bot_id),
+            get_clone(bot_id),
+            get_subscription(bot_id),
+            get_global_force_channels()
+        )
 
         if not clone_config or not clone_data:
             # Return restricted config for unregistered bots
@@ -80,7 +136,7 @@ class CloneConfigLoader:
             },
             "features": clone_config.get('features', self._get_default_features()),
             "token_settings": clone_config.get('token_settings', self._get_default_token_settings()),
-            "channels": await self._get_channel_config(clone_config),
+            "channels": self._get_channel_config(clone_config, global_channels),
             "custom_messages": clone_config.get('custom_messages', {}),
             "url_shortener": clone_config.get('url_shortener', self._get_default_shortener()),
             "permissions": self._get_clone_permissions(subscription_active)
@@ -162,9 +218,8 @@ class CloneConfigLoader:
             }
         }
 
-    async def _get_channel_config(self, clone_config):
+    def _get_channel_config(self, clone_config, global_channels):
         """Get channel configuration combining global and local channels"""
-        global_channels = await get_global_force_channels()
         local_channels = clone_config.get('channels', {}).get('force_channels', [])
         request_channels = clone_config.get('channels', {}).get('request_channels', [])
 
@@ -267,45 +322,55 @@ class CloneConfigLoader:
         config = await self.get_bot_config(bot_token)
         return config.get('custom_messages', {})
 
+    def invalidate(self, bot_id: Optional[str] = None):
+        """Drop the cached configs of ``bot_id``, or of every bot"""
+        if bot_id is None:
+            self.cache.clear()
+            return
+        for kind in ('config', 'clone'):
+            self.cache.invalidate((kind, str(bot_id)))
+
+    async def on_config_changed(self, event):
+        self.invalidate(event.data.get('clone_id'))
+
+    def subscribe(self, event_bus):
+        for event_type in INVALIDATING_EVENTS:
+            event_bus.subscribe_async(event_type, self.on_config_changed,
+                                      name=f"clone_config_loader.{event_type}")
+
     def clear_cache(self, bot_token: str = None):
         """Clear configuration cache"""
-        if bot_token:
-            bot_id = bot_token.split(':')[0]
-            cache_key = f"config_{bot_id}"
-            self.config_cache.pop(cache_key, None)
-        else:
-            self.config_cache.clear()
+        self.invalidate(bot_token.split(':')[0] if bot_token else None)
 
     async def reload_config(self, bot_token: str):
         """Force reload configuration for a bot"""
         self.clear_cache(bot_token)
         return await self.get_bot_config(bot_token)
 
+async def _fetch_clone_config(bot_token: str):
+    clone_data = await get_clone_by_bot_token(bot_token)
+    if not clone_data:
+        return None
+    return {
+        'bot_id': clone_data.get('bot_id'),
+        'admin_id': clone_data.get('admin_id'),
+        'bot_name': clone_data.get('bot_name'),
+        'random_mode': clone_data.get('random_mode', True),
+        'recent_mode': clone_data.get('recent_mode', True),
+        'popular_mode': clone_data.get('popular_mode', True),
+        'force_channels': clone_data.get('force_channels', []),
+        'token_verification': clone_data.get('token_verification', False),
+        'shortener_api': clone_data.get('shortener_api'),
+        'command_limit': clone_data.get('command_limit'),
+        'time_base_hours': clone_data.get('time_base_hours', 24)
+    }
+
 async def load_clone_config(bot_token: str):
     """Load configuration for a clone bot"""
     try:
-        clone_data = await get_clone_by_bot_token(bot_token)
-
-        if clone_data:
-            config = {
-                'bot_id': clone_data.get('bot_id'),
-                'admin_id': clone_data.get('admin_id'),
-                'bot_name': clone_data.get('bot_name'),
-                'random_mode': clone_data.get('random_mode', True),
-                'recent_mode': clone_data.get('recent_mode', True),
-                'popular_mode': clone_data.get('popular_mode', True),
-                'force_channels': clone_data.get('force_channels', []),
-                'token_verification': clone_data.get('token_verification', False),
-                'shortener_api': clone_data.get('shortener_api'),
-                'command_limit': clone_data.get('command_limit'),
-                'time_base_hours': clone_data.get('time_base_hours', 24)
-            }
-
-            # Cache the config
-            clone_config_cache[bot_token] = config
-            return config
-
-        return None
+        # Shares the loader's cache, so settings changes invalidate it too
+        return await clone_config_loader.cache.get(('clone', bot_token.split(':')[0]),
+                                                   partial(_fetch_clone_config, bot_token))
     except Exception as e:
         logger.error(f"Error loading clone config: {e}")
         return None
@@ -315,4 +380,7 @@ async def get_bot_config(bot_token: str):
     return await load_clone_config(bot_token)
 
 # Global instance
-clone_config_loader = CloneConfigLoader()
\ No newline at end of file
+clone_config_loader = CloneConfigLoader(
+    cache_size=Config.CLONE_CONFIG_CACHE_SIZE,
+    cache_ttl=Config.CLONE_CONFIG_CACHE_TTL,
+)
@@ -4,12 +4,15 @@ from bot.database import get_user_command_count, increment_command_count, is_ver
 from bot.database.premium_db import use_premium_token
 from bot.database.command_usage_db import reset_command_count
 from info import Config
+from bot.utils.keyed_locks import KeyedLocks
 from pyrogram import Client
-from loguru import logger
+from bot.logging import LOGGER, debug_print
 from bot.utils import clone_config_loader
 
+logger = LOGGER(__name__)
+
 # User locks to prevent race conditions
-_user_locks = {}
+_user_locks = KeyedLocks()
 
 async def check_command_limit(user_id: int, client=None) -> tuple[bool, int]:
     """
@@ -26,7 +29,7 @@ async def check_command_limit(user_id: int, client=None) -> tuple[bool, int]:
             # Fallback to legacy logic
             # Skip verification for admins and owner only
             if user_id in Config.ADMINS or user_id == Config.OWNER_ID:
-                print(f"DEBUG: User {user_id} has unlimited access (admin/owner)")
+                debug_print(f"DEBUG: User {user_id} has unlimited access (admin/owner)")
                 return False, -1  # -1 means unlimited
 
             # Check if user is premium and get their token count
@@ -38,21 +41,21 @@ async def check_command_limit(user_id: int, client=None) -> tuple[bool, int]:
                     tokens_remaining = premium_info.get('tokens_remaining', 0)
 
                     if tokens_remaining == -1:  # Unlimited plan
-                        print(f"DEBUG: Premium user {user_id} has unlimited access")
+                        debug_print(f"DEBUG: Premium user {user_id} has unlimited access")
                         return False, -1
                     elif tokens_remaining > 0:  # Token-based plan
-                        print(f"DEBUG: Premium user {user_id} has {tokens_remaining} tokens remaining")
+                        debug_print(f"DEBUG: Premium user {user_id} has {tokens_remaining} tokens remaining")
                         return False, tokens_remaining
                     else:  # No tokens left
-                        print(f"DEBUG: Premium user {user_id} has no tokens left")
+                        debug_print(f"DEBUG: Premium user {user_id} has no tokens left")
                         return True, 0
                 else:
-                    print(f"DEBUG: Premium user {user_id} has no premium info - treating as expired")
+                    debug_print(f"DEBUG: Premium user {user_id} has no premium info - treating as expired")
                     return True, 0
 
             # Handle regular free users
             command_count = await get_user_command_count(user_id)
-            print(f"DEBUG: User {user_id} command count check: {command_count}/3")
+            debug_print(f"DEBUG: User {user_id} command count check: {command_count}/3")
 
             # Every user gets exactly 3 commands before needing verification
             max_commands = 3
@@ -63,7 +66,7 @@ async def check_command_limit(user_id: int, client=None) -> tuple[bool, int]:
             remaining = max_commands - command_count
             return False, remaining
     except Exception as e:
-        print(f"Error in check_command_limit: {e}")
+        logger.error(f"Error in check_command_limit: {e}")
         return True, 0
 
 async def reset_user_commands(user_id: int) -> bool:
@@ -88,40 +91,37 @@ async def use_command(user_id: int, client=None) -> bool:
             # Fallback to legacy logic
             # Skip limits entirely for admins and owner - no counting at all
             if user_id in Config.ADMINS or user_id == Config.OWNER_ID:
-                print(f"DEBUG: User {user_id} has unlimited access (admin/owner)")
+                debug_print(f"DEBUG: User {user_id} has unlimited access (admin/owner)")
                 return True
 
             # Get or create user-specific lock
-            if user_id not in _user_locks:
-                _user_locks[user_id] = asyncio.Lock()
-
-            async with _user_locks[user_id]:
+            async with _user_locks.hold(user_id):
                 # Check if user is premium and handle token deduction
                 if await is_premium_user(user_id):
                     from bot.database.premium_db import use_premium_token
                     if await use_premium_token(user_id):
-                        print(f"DEBUG: Premium user {user_id} used a token successfully")
+                        debug_print(f"DEBUG: Premium user {user_id} used a token successfully")
                         return True
                     else:
-                        print(f"DEBUG: Premium user {user_id} has no tokens left - premium expired")
+                        debug_print(f"DEBUG: Premium user {user_id} has no tokens left - premium expired")
                         return False
 
                 # Handle regular users with free commands
                 current_count = await get_user_command_count(user_id)
-                print(f"DEBUG: User {user_id} current command count: {current_count}")
+                debug_print(f"DEBUG: User {user_id} current command count: {current_count}")
 
                 # Check if user has reached the limit (3 free commands)
                 if current_count >= 3:
-                    print(f"DEBUG: User {user_id} reached command limit")
+                    debug_print(f"DEBUG: User {user_id} reached command limit")
                     return False
 
                 # Increment command count atomically for regular users
                 await increment_command_count(user_id)
-                print(f"DEBUG: Incremented command count for user {user_id} to {current_count + 1}")
+                debug_print(f"DEBUG: Incremented command count for user {user_id} to {current_count + 1}")
                 return True
 
     except Exception as e:
-        print(f"Error in use_command: {e}")
+        logger.error(f"Error in use_command: {e}")
         return False
 
 async def reset_user_commands(user_id):
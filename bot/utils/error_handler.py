@@ -9,6 +9,7 @@ from pyrogram.errors import (
 )
 from functools import wraps
 from bot.logging import LOGGER
+from bot.utils.metrics import instrument_handler
 
 logger = LOGGER(__name__)
 
@@ -70,7 +71,9 @@ async def handle_callback_error(client, query, error: Exception, context: str) -
         return False
 
 def safe_callback_handler(func):
-    """Decorator for safe callback handling"""
+    """Decorator for safe callback handling (latency and errors are recorded in metrics)"""
+    instrumented = instrument_handler(func)
+
     @wraps(func)
     async def wrapper(client, query):
         try:
@@ -78,7 +81,7 @@ def safe_callback_handler(func):
                 await query.answer()
             except:
                 pass
-            return await func(client, query)
+            return await instrumented(client, query)
         except Exception as e:
             logger.error(f"❌ Error in callback handler {func.__name__}: {e}")
             try:
@@ -93,6 +96,8 @@ def safe_callback_handler(func):
                             pass
             except Exception as notify_error:
                 logger.error(f"Failed to notify user of callback error: {notify_error}")
+
+    wrapper.__metrics_instrumented__ = True
     return wrapper
 
 async def safe_execute_async(func, *args, config: Optional[ErrorRecoveryConfig] = None, context: Optional[Dict[str, Any]] = None, **kwargs):
@@ -2,10 +2,13 @@ import os
 import asyncio
 import hashlib
 import mimetypes
+import shutil
+import sqlite3
+import threading
+import time
 from typing import Optional, Dict, List, Tuple
 from pathlib import Path
 from datetime import datetime, timedelta
-import aiofiles
 from pyrogram.types import Message
 from info import Config
 from bot.utils.security import security_manager
@@ -13,15 +16,272 @@ from bot.logging import LOGGER
 
 logger = LOGGER(__name__)
 
+HASH_CHUNK_SIZE = 1024 * 1024
+USAGE_COUNTERS = ('stored_files', 'stored_bytes', 'temp_files', 'temp_bytes')
+
+
+def scan_storage(storage_path: Path, temp_path: Path, incoming_path: Path,
+                 rate: int = 0, skip_prefix: str = '') -> Dict[str, int]:
+    """Walk the storage and temp directories with os.scandir and total what is on disk.
+
+    Blocking; run it in a thread. ``rate`` caps directory entries per second so a big
+    tree doesn't saturate the disk. Files whose path starts with ``skip_prefix`` (the
+    index database and its journals) are not counted.
+    """
+    usage = dict.fromkeys(USAGE_COUNTERS, 0)
+    started = time.monotonic()
+    seen = 0
+    temp_dir = os.path.abspath(temp_path)
+    incoming_dir = os.path.abspath(incoming_path)
+
+    def visit(directory: str, temp_only: bool):
+        nonlocal seen
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            try:
+                entries = os.scandir(current)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    seen += 1
+                    if rate and seen % 100 == 0:
+                        ahead = seen / rate - (time.monotonic() - started)
+                        if ahead > 0:
+                            time.sleep(ahead)
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not temp_only:
+                                stack.append(entry.path)
+                            continue
+                        if not entry.is_file(follow_symlinks=False):
+                            continue
+                        if skip_prefix and entry.path.startswith(skip_prefix):
+                            continue
+                        is_temp = current == incoming_dir or (current == temp_dir and entry.name.startswith('temp_'))
+                        if temp_only and not is_temp:
+                            continue
+                        size = entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        # Removed or unreadable mid-scan
+                        continue
+                    prefix = 'temp' if is_temp else 'stored'
+                    usage[f"{prefix}_files"] += 1
+                    usage[f"{prefix}_bytes"] += size
+
+    storage_dir = os.path.abspath(storage_path)
+    if os.path.isdir(storage_dir):
+        visit(storage_dir, temp_only=False)
+    if os.path.isdir(temp_dir) and os.path.commonpath([storage_dir, temp_dir]) != storage_dir:
+        visit(temp_dir, temp_only=True)
+    return usage
+
+
+class ContentIndex:
+    """On-disk index of stored objects: file_id -> content path, size and reference count
+
+    Blocking; FileManager calls it from worker threads. Placing or removing a blob and
+    updating its row happen under one lock so a delete can never race a store of the
+    same content. Storage usage counters are kept in the same database and updated in
+    the same transactions.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS objects ("
+                "file_id TEXT PRIMARY KEY, digest TEXT, path TEXT NOT NULL, "
+                "size INTEGER NOT NULL, refcount INTEGER NOT NULL, created_at TEXT NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            if not conn.execute("SELECT 1 FROM counters WHERE name = 'stored_files'").fetchone():
+                files, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects").fetchone()
+                self._bump(conn, stored_files=files, stored_bytes=size, temp_files=0, temp_bytes=0)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, **deltas):
+        for name, delta in deltas.items():
+            conn.execute(
+                "INSERT INTO counters (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                (name, delta)
+            )
+
+    def usage(self) -> Dict:
+        """Current usage counters plus when they were last reconciled with the disk"""
+        with self.lock:
+            conn = self._connect()
+            usage = {name: max(0, value) for name, value in conn.execute("SELECT name, value FROM counters")}
+            row = conn.execute("SELECT value FROM meta WHERE key = 'last_reconciled'").fetchone()
+            usage['last_reconciled'] = row[0] if row else None
+            return usage
+
+    def adjust_usage(self, **deltas):
+        with self.lock:
+            conn = self._connect()
+            self._bump(conn, **deltas)
+            conn.commit()
+
+    def reconcile_usage(self, scanned: Dict[str, int], baseline: Dict) -> Dict[str, int]:
+        """Replace the counters with a disk scan, keeping changes made while the scan ran"""
+        with self.lock:
+            conn = self._connect()
+            current = dict(conn.execute("SELECT name, value FROM counters"))
+            drift = {}
+            for name in USAGE_COUNTERS:
+                during_scan = current.get(name, 0) - baseline.get(name, 0)
+                value = scanned.get(name, 0) + during_scan
+                drift[name] = value - current.get(name, 0)
+                conn.execute("INSERT OR REPLACE INTO counters (name, value) VALUES (?, ?)", (name, value))
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_reconciled', ?)",
+                         (datetime.now().isoformat(),))
+            conn.commit()
+            return drift
+
+    def lookup(self, file_id: str) -> Optional[Tuple[str, int, int]]:
+        """(path, size, refcount) for a file_id, or None"""
+        with self.lock:
+            return self._connect().execute(
+                "SELECT path, size, refcount FROM objects WHERE file_id = ?", (file_id,)
+            ).fetchone()
+
+    def add(self, file_id: str, digest: str, source: Path, target: Path) -> bool:
+        """Move ``source`` into place as ``target`` unless the content is already stored.
+
+        Returns True when new content was written, False when it was deduplicated.
+        """
+        with self.lock:
+            conn = self._connect()
+            temp_size = source.stat().st_size
+            stored = target.exists()
+            if stored:
+                os.unlink(source)
+            else:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    os.replace(source, target)
+                except OSError:
+                    # Temp dir on another filesystem
+                    shutil.move(str(source), str(target))
+            size = target.stat().st_size
+            conn.execute(
+                "INSERT INTO objects (file_id, digest, path, size, refcount, created_at) "
+                "VALUES (?, ?, ?, ?, 1, ?) "
+                "ON CONFLICT(file_id) DO UPDATE SET refcount = refcount + 1, path = excluded.path",
+                (file_id, digest, str(target), size, datetime.now().isoformat())
+            )
+            # The temp copy was counted when it was downloaded
+            self._bump(conn, temp_files=-1, temp_bytes=-temp_size)
+            if not stored:
+                self._bump(conn, stored_files=1, stored_bytes=size)
+            conn.commit()
+            return not stored
+
+    def release(self, file_id: str) -> Optional[bool]:
+        """Drop one reference. True if the content was removed, False if still referenced, None if unknown"""
+        with self.lock:
+            conn = self._connect()
+            row = conn.execute("SELECT path, size, refcount FROM objects WHERE file_id = ?", (file_id,)).fetchone()
+            if not row:
+                return None
+            path, size, refcount = row
+            if refcount > 1:
+                conn.execute("UPDATE objects SET refcount = refcount - 1 WHERE file_id = ?", (file_id,))
+                conn.commit()
+                return False
+            conn.execute("DELETE FROM objects WHERE file_id = ?", (file_id,))
+            self._bump(conn, stored_files=-1, stored_bytes=-size)
+            conn.commit()
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            return True
+
+    def import_legacy(self, storage_path: Path) -> int:
+        """Register files stored as ``{file_id}_{filename}`` before the content store existed (runs once)"""
+        with self.lock:
+            conn = self._connect()
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_imported'").fetchone():
+                return 0
+            imported = 0
+            if storage_path.is_dir():
+                with os.scandir(storage_path) as entries:
+                    for entry in entries:
+                        file_id, sep, _ = entry.name.partition('_')
+                        if not sep or len(file_id) != 16 or not entry.is_file(follow_symlinks=False):
+                            continue
+                        try:
+                            int(file_id, 16)
+                        except ValueError:
+                            continue
+                        size = entry.stat().st_size
+                        cursor = conn.execute(
+                            "INSERT OR IGNORE INTO objects (file_id, digest, path, size, refcount, created_at) "
+                            "VALUES (?, NULL, ?, ?, 1, ?)",
+                            (file_id, entry.path, size, datetime.now().isoformat())
+                        )
+                        if cursor.rowcount:
+                            self._bump(conn, stored_files=1, stored_bytes=size)
+                            imported += 1
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_imported', ?)",
+                         (datetime.now().isoformat(),))
+            conn.commit()
+            return imported
+
+    def close(self):
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
 class FileManager:
-    """Enhanced file management system with security and optimization"""
+    """Enhanced file management system with security and optimization
+
+    Files are stored by content: ``objects/<aa>/<bb>/<sha256>`` under STORAGE_PATH, with
+    ``file_index.sqlite3`` mapping each file_id to its path and reference count, so
+    identical uploads share one copy on disk.
+    """
 
     def __init__(self):
-        self.storage_path = Config.STORAGE_PATH
-        self.temp_path = Config.TEMP_PATH
+        self.storage_path = Path(Config.STORAGE_PATH)
+        self.temp_path = Path(Config.TEMP_PATH)
+        self.objects_path = self.storage_path / 'objects'
+        # Downloads stream here so the final move into objects/ is a same-filesystem rename
+        self.incoming_path = self.objects_path / 'incoming'
         self.max_file_size = Config.MAX_FILE_SIZE * 1024 * 1024  # Convert MB to bytes
+        self.index = ContentIndex(self.storage_path / 'file_index.sqlite3')
         self.active_downloads = {}
         self.file_cache = {}
+        self._legacy_checked = False
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def _ensure_index(self):
+        if not self._legacy_checked:
+            imported = await self._run(self.index.import_legacy, self.storage_path)
+            if imported:
+                logger.info(f"📦 Indexed {imported} files from the old storage layout")
+            self._legacy_checked = True
+
+    def object_path(self, digest: str) -> Path:
+        """Sharded location of a blob with the given SHA-256"""
+        return self.objects_path / digest[:2] / digest[2:4] / digest
 
     async def validate_file(self, message: Message) -> Tuple[bool, str]:
         """Validate file before processing"""
@@ -57,6 +317,53 @@ class FileManager:
         hasher.update(file_content)
         return hasher.hexdigest()[:16]
 
+    @staticmethod
+    def _hash_file(file_path: str) -> str:
+        hasher = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def _write_chunk(handle, hasher, chunk: bytes):
+        handle.write(chunk)
+        hasher.update(chunk)
+
+    async def download_and_hash(self, message: Message) -> Optional[Tuple[Path, str]]:
+        """Stream a file to disk, hashing each chunk as it arrives.
+
+        Writes and hashing run in a worker thread so the event loop only moves chunks.
+        Falls back to a normal download plus a chunked hash when streaming isn't available.
+        """
+        client = getattr(message, '_client', None)
+        if client is None or not hasattr(client, 'stream_media'):
+            file_path = await self.download_file(message)
+            if not file_path:
+                return None
+            return Path(file_path), await self._run(self._hash_file, file_path)
+
+        await self._run(lambda: self.incoming_path.mkdir(parents=True, exist_ok=True))
+        temp_file_path = self.incoming_path / f"temp_{message.id}_{int(datetime.now().timestamp() * 1000)}"
+        hasher = hashlib.sha256()
+        received = 0
+        handle = await self._run(open, temp_file_path, 'wb')
+        try:
+            async for chunk in client.stream_media(message):
+                received += len(chunk)
+                if received > self.max_file_size:
+                    raise ValueError(f"File exceeds {Config.MAX_FILE_SIZE}MB while downloading")
+                await self._run(self._write_chunk, handle, hasher, chunk)
+            await self._run(handle.close)
+        except BaseException:
+            await self._run(handle.close)
+            await self._run(lambda: temp_file_path.unlink(missing_ok=True))
+            raise
+        await self._run(lambda: self.index.adjust_usage(temp_files=1, temp_bytes=received))
+
+        logger.info(f"File downloaded: {temp_file_path} ({received} bytes)")
+        return temp_file_path, hasher.hexdigest()
+
     async def store_file(self, message: Message, user_id: int) -> Optional[Dict]:
         """Store file with metadata"""
         try:
@@ -66,25 +373,23 @@ class FileManager:
                 logger.error(f"File validation failed: {validation_msg}")
                 return None
 
-            # Download file
-            file_path = await self.download_file(message)
-            if not file_path:
-                return None
-
-            # Read file content for ID generation
-            async with aiofiles.open(file_path, 'rb') as f:
-                file_content = await f.read()
+            await self._ensure_index()
 
-            file_id = await self.generate_file_id(file_content)
+            # Download and hash in one pass
+            downloaded = await self.download_and_hash(message)
+            if not downloaded:
+                return None
+            file_path, digest = downloaded
+            file_id = digest[:16]
 
             # Get file info
             file_info = self.get_file_info(message)
 
-            # Create storage path
-            storage_file_path = self.storage_path / f"{file_id}_{file_info['filename']}"
-
-            # Move file to storage
-            os.rename(file_path, storage_file_path)
+            # Move into the content store, or drop the copy if the content is already there
+            storage_file_path = self.object_path(digest)
+            is_new = await self._run(self.index.add, file_id, digest, file_path, storage_file_path)
+            if not is_new:
+                logger.info(f"Duplicate content, reusing stored file: {file_id}")
 
             # Create file metadata
             metadata = {
@@ -121,6 +426,8 @@ class FileManager:
             downloaded_file = await message.download(file_name=str(temp_file_path))
 
             if downloaded_file:
+                size = await self._run(os.path.getsize, downloaded_file)
+                await self._run(lambda: self.index.adjust_usage(temp_files=1, temp_bytes=size))
                 logger.info(f"File downloaded: {downloaded_file}")
                 return downloaded_file
 
@@ -163,73 +470,89 @@ class FileManager:
     async def get_file_path(self, file_id: str) -> Optional[Path]:
         """Get file path by file ID"""
         try:
-            # Search for file in storage
-            for file_path in self.storage_path.glob(f"{file_id}_*"):
-                if file_path.exists():
-                    return file_path
-            return None
+            await self._ensure_index()
+            row = await self._run(self.index.lookup, file_id)
+            return Path(row[0]) if row else None
         except Exception as e:
             logger.error(f"Error getting file path: {e}")
             return None
 
     async def delete_file(self, file_id: str) -> bool:
-        """Delete file from storage"""
+        """Delete file from storage; shared content stays until its last reference goes"""
         try:
-            file_path = await self.get_file_path(file_id)
-            if file_path and file_path.exists():
-                file_path.unlink()
+            await self._ensure_index()
+            removed = await self._run(self.index.release, file_id)
+            if removed is None:
+                return False
+            if removed:
                 logger.info(f"File deleted: {file_id}")
-                return True
-            return False
+            else:
+                logger.info(f"File reference released, content still shared: {file_id}")
+            return True
         except Exception as e:
             logger.error(f"Error deleting file: {e}")
             return False
 
+    def _remove_stale_temp_files(self, cutoff_time: datetime) -> Tuple[int, int]:
+        removed, removed_bytes = 0, 0
+        temp_files = list(self.temp_path.glob("temp_*"))
+        if self.incoming_path.exists():
+            temp_files.extend(self.incoming_path.glob("temp_*"))
+        for temp_file in temp_files:
+            try:
+                stat = temp_file.stat()
+                if datetime.fromtimestamp(stat.st_mtime) < cutoff_time:
+                    temp_file.unlink()
+                    removed += 1
+                    removed_bytes += stat.st_size
+                    logger.debug(f"Cleaned up temp file: {temp_file.name}")
+            except Exception as e:
+                logger.warning(f"Error cleaning temp file {temp_file.name}: {e}")
+        return removed, removed_bytes
+
     async def cleanup_temp_files(self):
         """Clean up temporary files older than 1 hour"""
         try:
             cutoff_time = datetime.now() - timedelta(hours=1)
-            for temp_file in self.temp_path.glob("temp_*"):
-                try:
-                    file_time = datetime.fromtimestamp(temp_file.stat().st_mtime)
-                    if file_time < cutoff_time:
-                        temp_file.unlink()
-                        logger.debug(f"Cleaned up temp file: {temp_file.name}")
-                except Exception as e:
-                    logger.warning(f"Error cleaning temp file {temp_file.name}: {e}")
+            removed, removed_bytes = await self._run(self._remove_stale_temp_files, cutoff_time)
+            if removed:
+                await self._run(lambda: self.index.adjust_usage(temp_files=-removed, temp_bytes=-removed_bytes))
         except Exception as e:
             logger.error(f"Error during temp file cleanup: {e}")
 
+    async def reconcile_storage(self) -> Dict[str, int]:
+        """Rescan the disk in a worker thread and correct the usage counters"""
+        await self._ensure_index()
+        baseline = await self._run(self.index.usage)
+        scanned = await self._run(
+            scan_storage, self.storage_path, self.temp_path, self.incoming_path,
+            Config.STORAGE_SCAN_RATE, os.path.abspath(self.index.db_path)
+        )
+        drift = await self._run(self.index.reconcile_usage, scanned, baseline)
+        if any(drift.values()):
+            logger.info(f"📦 Storage usage reconciled, drift: {drift}")
+        return drift
+
     async def get_storage_stats(self) -> Dict:
         """Get storage statistics"""
         try:
-            from pathlib import Path
-            import os
-
-            # Ensure storage_path is a Path object
-            if isinstance(self.storage_path, str):
-                storage_path = Path(self.storage_path)
-            else:
-                storage_path = self.storage_path
+            # Counters are kept current by store/delete/cleanup and corrected by the reconciler
+            await self._ensure_index()
+            usage = await self._run(self.index.usage)
 
-            total_files = 0
-            total_size = 0
-
-            if storage_path.exists():
-                for file_path in storage_path.rglob('*'):
-                    if file_path.is_file():
-                        total_files += 1
-                        try:
-                            total_size += file_path.stat().st_size
-                        except (OSError, FileNotFoundError):
-                            # Skip files that can't be accessed
-                            continue
+            total_files = usage['stored_files'] + usage['temp_files']
+            total_size = usage['stored_bytes'] + usage['temp_bytes']
 
             return {
                 'total_files': total_files,
                 'total_size_bytes': total_size,
                 'total_size_mb': round(total_size / (1024 * 1024), 2),
-                'storage_path': str(self.storage_path)
+                'storage_path': str(self.storage_path),
+                'stored_files': usage['stored_files'],
+                'stored_size_bytes': usage['stored_bytes'],
+                'temp_files': usage['temp_files'],
+                'temp_size_bytes': usage['temp_bytes'],
+                'last_reconciled': usage['last_reconciled']
             }
         except Exception as e:
             logger.error(f"Error getting storage stats: {e}")
@@ -247,4 +570,16 @@ async def start_cleanup_task():
             await asyncio.sleep(3600)  # Run every hour
         except Exception as e:
             logger.error(f"Error in cleanup task: {e}")
-            await asyncio.sleep(300)  # Wait 5 minutes on error
\ No newline at end of file
+            await asyncio.sleep(300)  # Wait 5 minutes on error
+
+async def start_storage_reconciler():
+    """Periodically reconcile storage usage counters with the disk"""
+    while True:
+        try:
+            await file_manager.reconcile_storage()
+            await asyncio.sleep(Config.STORAGE_RECONCILE_INTERVAL)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in storage reconciler: {e}")
+            await asyncio.sleep(300)  # Wait 5 minutes on error
@@ -0,0 +1,189 @@
+import asyncio
+import inspect
+import sys
+import threading
+import time
+from collections import OrderedDict
+from importlib import import_module
+from typing import Dict, List, Optional, Tuple
+from pyrogram import Client
+from pyrogram.handlers.handler import Handler
+from bot.logging import LOGGER
+from bot.utils.callback_router import CallbackRouter
+
+logger = LOGGER(__name__)
+
+
+def _parse_entries(entries) -> List[Tuple[str, Optional[List[str]]]]:
+    """Pyrogram plugin entries: ``"module"`` or ``"module func1 func2"``"""
+    parsed = []
+    for entry in entries or []:
+        parts = entry.split()
+        parsed.append((parts[0], parts[1:] or None))
+    return parsed
+
+
+def _module_handlers(module, names=None):
+    """(handler, group) pairs that pyrogram's decorators attached to module attributes"""
+    pairs = []
+    for name in names if names is not None else list(vars(module)):
+        value = getattr(module, name, None)
+        # Only decorated functions and routers carry handlers; probing any other global
+        # could trigger it (a lazy database handle would connect)
+        if not (inspect.isfunction(value) or isinstance(value, CallbackRouter)):
+            continue
+        handlers = getattr(value, 'handlers', None)
+        if not isinstance(handlers, list):
+            continue
+        for pair in handlers:
+            try:
+                handler, group = pair
+            except (TypeError, ValueError):
+                continue
+            if isinstance(handler, Handler) and isinstance(group, int):
+                pairs.append((handler, group))
+    return pairs
+
+
+class HandlerTable:
+    """Handlers of a plugin set, resolved once per process and shared by every client
+
+    Accepts the same ``root``/``include``/``exclude`` dict as ``Client(plugins=...)``.
+    The modules are imported and their handlers collected on the first build; each
+    client then gets the prebuilt groups merged into its dispatcher, instead of running
+    pyrogram's plugin discovery (and re-trying missing modules) on every start.
+    """
+
+    def __init__(self, plugins: dict):
+        self.root = plugins.get('root', 'bot.plugins')
+        self.include = _parse_entries(plugins.get('include'))
+        self.exclude = _parse_entries(plugins.get('exclude'))
+        self.groups: List[Tuple[int, Tuple[Handler, ...]]] = []
+        self.modules: List[str] = []
+        self.missing: List[str] = []
+        self.failed: List[str] = []  # plugins that exist but raised ImportError themselves
+        self.build_ms = 0.0
+        self._built = False
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return sum(len(handlers) for _, handlers in self.groups)
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    def build(self) -> 'HandlerTable':
+        """Import the plugin modules and collect their handlers (only the first call does work)"""
+        if self._built:
+            return self
+        with self._lock:
+            if not self._built:
+                self._build()
+                self._built = True
+        return self
+
+    def _build(self):
+        started = time.perf_counter()
+        collected: Dict[int, List[Handler]] = {}
+        seen = set()
+
+        for path, names in self.include:
+            module_path = f"{self.root}.{path}"
+            try:
+                module = import_module(module_path)
+            except ImportError as e:
+                # Only the plugin module itself (or its package) being absent means "not here";
+                # a plugin whose own imports fail is broken and must not vanish quietly
+                if e.name and (module_path == e.name or module_path.startswith(f"{e.name}.")):
+                    self.missing.append(path)
+                    logger.debug(f"Plugin {module_path} not importable: {e}")
+                else:
+                    self.failed.append(path)
+                    logger.error(f"❌ Plugin {module_path} failed to import: {e}", exc_info=True)
+                continue
+            if hasattr(module, '__path__'):
+                self.missing.append(path)
+                continue
+            self.modules.append(path)
+            for handler, group in _module_handlers(module, names):
+                # Plugins that import each other's handlers would otherwise register them twice
+                if id(handler) in seen:
+                    continue
+                seen.add(id(handler))
+                collected.setdefault(group, []).append(handler)
+
+        # An excluded module can only contribute handlers if an included one imported it
+        for path, names in self.exclude:
+            module = sys.modules.get(f"{self.root}.{path}")
+            if module is None:
+                continue
+            for handler, group in _module_handlers(module, names):
+                if handler in collected.get(group, ()):
+                    collected[group].remove(handler)
+
+        # attach() bypasses Client.add_handler, which is where handler metrics are hooked in
+        from bot.utils.metrics import instrument_handler
+        for handlers in collected.values():
+            for handler in handlers:
+                if asyncio.iscoroutinefunction(handler.callback):
+                    handler.callback = instrument_handler(handler.callback)
+
+        self.groups = [(group, tuple(handlers)) for group, handlers in sorted(collected.items()) if handlers]
+        self.build_ms = (time.perf_counter() - started) * 1000
+
+        logger.info(f"🧩 Handler table for {self.root}: {len(self)} handlers in {len(self.groups)} groups "
+                    f"from {len(self.modules)} plugins ({self.build_ms:.1f}ms)")
+        if self.missing:
+            logger.warning(f"⚠️ Plugins listed but not found in {self.root}: {', '.join(self.missing)}")
+
+    def attach(self, client) -> int:
+        """Merge the shared handlers into ``client``'s dispatcher before it starts (idempotent)"""
+        self.build()
+        dispatcher = client.dispatcher
+        groups = dispatcher.groups
+        for group, handlers in self.groups:
+            attached = groups.setdefault(group, [])
+            attached.extend(handler for handler in handlers if handler not in attached)
+        dispatcher.groups = OrderedDict(sorted(groups.items()))
+        return len(self)
+
+    def report(self) -> Dict:
+        return {
+            'root': self.root,
+            'modules': list(self.modules),
+            'missing': list(self.missing),
+            'failed': list(self.failed),
+            'handlers': len(self),
+            'groups': {group: len(handlers) for group, handlers in self.groups},
+            'build_ms': round(self.build_ms, 1),
+        }
+
+
+class TableClient(Client):
+    """Client serving the handlers of a shared HandlerTable
+
+    Stopping a client clears its dispatcher's groups, and ``initialize()`` reloads
+    plugins on every start; the table is attached at that same point, so a restarted
+    or reconnected client keeps its handlers.
+    """
+
+    def __init__(self, *args, handler_table: HandlerTable, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.handler_table = handler_table
+
+    def load_plugins(self):
+        super().load_plugins()
+        self.handler_table.attach(self)
+
+
+_clone_handler_table: Optional[HandlerTable] = None
+
+
+def get_clone_handler_table() -> HandlerTable:
+    """Process-wide handler table for clone bots"""
+    global _clone_handler_table
+    if _clone_handler_table is None:
+        from bot.plugins import CLONE_BOT_PLUGINS
+        _clone_handler_table = HandlerTable(CLONE_BOT_PLUGINS)
+    return _clone_handler_table
@@ -1,18 +1,19 @@
 import asyncio
-import logging
 import time
 from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
-import psutil
+from datetime import datetime
 
 from bot.logging import LOGGER
+from bot.utils.resource_sampler import ResourceSampler, resource_sampler
 
 logger = LOGGER(__name__)
 
 class HealthChecker:
     """Production health monitoring system"""
 
-    def __init__(self):
+    def __init__(self, sampler: Optional[ResourceSampler] = None):
+        self.sampler = sampler or resource_sampler
+        self.window = 300  # seconds of history used for percentiles/rates
         self.status = "unknown"
         self.last_check = None
         self.checks = {}
@@ -20,7 +21,9 @@ class HealthChecker:
             'memory_percent': 85.0,
             'cpu_percent': 80.0,
             'disk_percent': 90.0,
-            'response_time': 5.0  # seconds
+            'response_time': 5.0,  # seconds
+            'loop_lag_p99': 0.1,  # seconds; 5x this is critical
+            'loop_stall': 5.0  # seconds the loop may be blocked at once before it is critical
         }
         self.check_interval = 60  # seconds
         self.running = False
@@ -28,6 +31,7 @@ class HealthChecker:
     async def start_monitoring(self):
         """Start health monitoring"""
         self.running = True
+        self.sampler.start()
         logger.info("🏥 Health monitoring started")
 
         while self.running:
@@ -59,11 +63,14 @@ class HealthChecker:
             # Clone system check
             clone_check = await self.check_clone_system()
 
+            # Event loop responsiveness
+            loop_check = await self.check_event_loop()
+
             # Calculate response time
             response_time = time.time() - start_time
 
             # Overall health status
-            all_checks = [memory_check, cpu_check, disk_check, db_check, clone_check]
+            all_checks = [memory_check, cpu_check, disk_check, db_check, clone_check, loop_check]
 
             if all(check['status'] == 'healthy' for check in all_checks):
                 self.status = "healthy"
@@ -83,7 +90,8 @@ class HealthChecker:
                     'cpu': cpu_check,
                     'disk': disk_check,
                     'database': db_check,
-                    'clone_system': clone_check
+                    'clone_system': clone_check,
+                    'event_loop': loop_check
                 }
             }
 
@@ -105,11 +113,19 @@ class HealthChecker:
                 'last_check': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
 
+    async def _ensure_sample(self):
+        """Make sure the shared sampler has data, sampling once off the loop if not"""
+        if not self.sampler.cpu:
+            await asyncio.get_running_loop().run_in_executor(None, self.sampler.sample_once)
+
     async def check_memory(self) -> Dict[str, Any]:
         """Check memory usage"""
         try:
-            memory = psutil.virtual_memory()
-            percent = memory.percent
+            await self._ensure_sample()
+            memory = self.sampler.memory
+            if not memory:
+                raise RuntimeError("No memory samples available")
+            percent = memory.latest('percent')
 
             if percent > self.alert_thresholds['memory_percent']:
                 status = 'critical'
@@ -121,20 +137,26 @@ class HealthChecker:
             return {
                 'status': status,
                 'percent': percent,
-                'available_gb': round(memory.available / (1024**3), 2),
-                'total_gb': round(memory.total / (1024**3), 2)
+                'p95': memory.percentile('percent', 95, self.window),
+                'available_gb': round(memory.latest('available') / (1024**3), 2),
+                'total_gb': round(memory.latest('total') / (1024**3), 2)
             }
         except Exception as e:
             return {'status': 'critical', 'error': str(e)}
 
     async def check_cpu(self) -> Dict[str, Any]:
-        """Check CPU usage"""
+        """Check CPU usage (p95 over the window, so one spike isn't critical)"""
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
-
-            if cpu_percent > self.alert_thresholds['cpu_percent']:
+            await self._ensure_sample()
+            cpu = self.sampler.cpu
+            cpu_percent = cpu.latest('percent')
+            cpu_p95 = cpu.percentile('percent', 95, self.window)
+            # A single sample has no history to smooth over
+            effective = cpu_p95 if len(cpu) > 1 else cpu_percent
+
+            if effective > self.alert_thresholds['cpu_percent']:
                 status = 'critical'
-            elif cpu_percent > (self.alert_thresholds['cpu_percent'] - 20):
+            elif effective > (self.alert_thresholds['cpu_percent'] - 20):
                 status = 'degraded'
             else:
                 status = 'healthy'
@@ -142,7 +164,8 @@ class HealthChecker:
             return {
                 'status': status,
                 'percent': cpu_percent,
-                'cores': psutil.cpu_count()
+                'p95': cpu_p95,
+                'cores': int(cpu.latest('count'))
             }
         except Exception as e:
             return {'status': 'critical', 'error': str(e)}
@@ -150,8 +173,11 @@ class HealthChecker:
     async def check_disk(self) -> Dict[str, Any]:
         """Check disk usage"""
         try:
-            disk = psutil.disk_usage('/')
-            percent = (disk.used / disk.total) * 100
+            await self._ensure_sample()
+            disk = self.sampler.disk
+            if not disk:
+                raise RuntimeError("No disk samples available")
+            percent = disk.latest('percent')
 
             if percent > self.alert_thresholds['disk_percent']:
                 status = 'critical'
@@ -163,8 +189,9 @@ class HealthChecker:
             return {
                 'status': status,
                 'percent': round(percent, 2),
-                'free_gb': round(disk.free / (1024**3), 2),
-                'total_gb': round(disk.total / (1024**3), 2)
+                'free_gb': round(disk.latest('free') / (1024**3), 2),
+                'total_gb': round(disk.latest('total') / (1024**3), 2),
+                'write_rate': round(disk.rate('write_bytes', self.window), 2)
             }
         except Exception as e:
             return {'status': 'critical', 'error': str(e)}
@@ -305,6 +332,35 @@ class HealthChecker:
                 'error': str(e)
             }
 
+    async def check_event_loop(self) -> Dict[str, Any]:
+        """Check scheduling lag and stalls of the event loop over the window"""
+        try:
+            from bot.utils.loop_monitor import loop_monitor
+            snapshot = loop_monitor.snapshot(self.window)
+            if not snapshot['running']:
+                return {'status': 'healthy', 'monitored': False}
+
+            lag_p99 = snapshot['lag_p99']
+            longest = max(snapshot['longest_stall'], snapshot['blocked_for'])
+            if lag_p99 > self.alert_thresholds['loop_lag_p99'] * 5 or longest > self.alert_thresholds['loop_stall']:
+                status = 'critical'
+            elif lag_p99 > self.alert_thresholds['loop_lag_p99'] or snapshot['stalls']:
+                status = 'degraded'
+            else:
+                status = 'healthy'
+
+            return {
+                'status': status,
+                'lag_p50': round(snapshot['lag_p50'], 4),
+                'lag_p99': round(lag_p99, 4),
+                'lag_max': round(snapshot['lag_max'], 4),
+                'stalls': snapshot['stalls'],
+                'longest_stall': round(longest, 3),
+                'by_handler': snapshot['by_handler']
+            }
+        except Exception as e:
+            return {'status': 'critical', 'error': str(e)}
+
     def get_status(self) -> str:
         """Get current health status"""
         return self.status
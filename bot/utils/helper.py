@@ -1,7 +1,8 @@
 import asyncio
-from shortzy import Shortzy
 
 async def get_shortlink(api, site, long_url):
+    # shortzy brings in aiohttp; only load it when a link is actually shortened
+    from shortzy import Shortzy
     shortzy = Shortzy(api, site)
     try:
         link = await shortzy.convert(long_url)
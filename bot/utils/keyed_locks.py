@@ -0,0 +1,35 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Hashable, List
+
+
+class KeyedLocks:
+    """An asyncio.Lock per key, dropped as soon as nobody holds or waits for it
+
+    Replaces ``dict.setdefault(key, asyncio.Lock())`` tables, which keep one lock for
+    every user ever seen.
+    """
+
+    def __init__(self):
+        # key -> [lock, holders + waiters]
+        self._locks: Dict[Hashable, List] = {}
+
+    def __len__(self):
+        return len(self._locks)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._locks
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable):
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
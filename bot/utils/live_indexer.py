@@ -0,0 +1,307 @@
+"""
+Live channel indexing
+
+New posts in indexed channels are buffered per channel and written as one bulk
+upsert every ``batch_size`` files or ``flush_interval`` seconds, whichever comes
+first. Each channel keeps a checkpoint (the last message id written), so posts made
+while a bot was offline are found and backfilled: on startup by reading forward from
+the checkpoint, and whenever a live post arrives more than one id past it.
+
+The mother bot indexes ``Config.INDEX_CHANNEL_ID`` into the search index. A clone
+indexes, into its own database, every channel it has been manually indexed from.
+"""
+import asyncio
+import time
+from datetime import datetime
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+from info import Config
+from bot.logging import LOGGER
+from bot.database import index_db
+from bot.database.clone_placement import placement
+from bot.utils.metrics import metrics
+
+logger = LOGGER(__name__)
+
+MOTHER = 'mother'
+BACKFILL_BATCH = 200  # message ids per get_messages call
+
+live_index_documents = metrics.counter('live_index_documents_total', 'Files written by live indexing', ('source',))
+live_index_flushes = metrics.counter('live_index_flushes_total', 'Bulk writes made by live indexing', ('owner',))
+
+
+def _media(message, media_types):
+    media_type = message.media.value if getattr(message, 'media', None) else None
+    if media_type not in media_types:
+        return None, None
+    return media_type, getattr(message, media_type, None)
+
+
+def mother_document(message, chat_id: int) -> Optional[Dict]:
+    """Search index document for a post in the mother bot's index channel"""
+    media_type, media = _media(message, ('video', 'document', 'photo'))
+    if media is None:
+        return None
+    return index_db.build_index_document(
+        file_id=f"{chat_id}_{message.id}",
+        file_name=getattr(media, 'file_name', None) or message.caption or f"File_{message.id}",
+        file_type=media_type,
+        file_size=getattr(media, 'file_size', 0) or 0,
+        caption=message.caption or '',
+        user_id=message.from_user.id if message.from_user else 0
+    )
+
+
+def clone_document(clone_id: str, message, chat_id: int) -> Optional[Dict]:
+    """Clone ``files`` document, in the shape written by manual indexing"""
+    media_type, media = _media(message, ('video', 'audio', 'document'))
+    if media is None:
+        return None
+    return {
+        "_id": f"{chat_id}_{message.id}",
+        "file_id": getattr(media, 'file_id', str(message.id)),
+        "file_unique_id": getattr(media, 'file_unique_id', None),
+        "message_id": message.id,
+        "chat_id": chat_id,
+        "file_name": getattr(media, 'file_name', None) or message.caption or f"File_{message.id}",
+        "file_type": media_type,
+        "file_size": getattr(media, 'file_size', 0),
+        "caption": message.caption or '',
+        "user_id": message.from_user.id if message.from_user else 0,
+        "date": message.date,
+        "clone_id": clone_id,
+        "indexed_at": datetime.utcnow()
+    }
+
+
+class _Channel:
+    """Buffer and checkpoint state of one (owner, channel) pair"""
+
+    def __init__(self, owner: str, chat_id: int, client, collection, build: Callable, write: Callable,
+                 checkpoint: int):
+        self.owner = owner
+        self.chat_id = chat_id
+        self.client = client
+        self.collection = collection
+        self.build = build
+        self.write = write
+        self.checkpoint = checkpoint  # last id known to be written
+        self.seen = checkpoint        # highest id buffered or written
+        self.buffer: List[Tuple[int, Dict, str]] = []
+        self.lock = asyncio.Lock()
+        self.timer: Optional[asyncio.Task] = None
+        self.backfill: Optional[asyncio.Task] = None
+        self.hold: Optional[int] = None  # checkpoint ceiling while a backfill is running
+
+
+class LiveIndexer:
+    """Micro-batched channel indexing with gap catch-up"""
+
+    def __init__(self, batch_size: int = 50, flush_interval: float = 0.5, max_backfill: int = 5000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backfill = max_backfill
+        self._channels: Dict[Tuple[str, int], _Channel] = {}
+        self._clone_clients: Dict[str, object] = {}  # clone id -> motor client of its database
+
+    def __len__(self):
+        return len(self._channels)
+
+    def channels(self, owner: str) -> List[int]:
+        return [chat_id for (o, chat_id) in self._channels if o == owner]
+
+    # ==================== REGISTRATION ====================
+
+    async def track(self, owner: str, client, chat_id: int, collection, build: Callable,
+                    checkpoint: Optional[int] = None, catch_up: bool = True,
+                    write: Callable = index_db.add_many_to_index) -> _Channel:
+        """Index new posts of ``chat_id`` from now on, backfilling from its checkpoint
+
+        ``write(documents, collection)`` stores a batch of documents made by ``build``.
+        """
+        key = (owner, chat_id)
+        channel = self._channels.get(key)
+        if channel is not None:
+            channel.client = client
+            return channel
+
+        if checkpoint is None:
+            checkpoint = (await index_db.get_index_checkpoints(owner)).get(chat_id, 0)
+        channel = self._channels[key] = _Channel(owner, chat_id, client, collection, build, write, checkpoint)
+        if catch_up and checkpoint:
+            self._start_backfill(channel, checkpoint + 1, None)
+        logger.info(f"📡 Live indexing channel {chat_id} for {owner} (checkpoint {checkpoint})")
+        return channel
+
+    async def start_mother(self, client):
+        if not Config.INDEX_CHANNEL_ID:
+            return
+        await self.track(MOTHER, client, Config.INDEX_CHANNEL_ID, index_db.collection, mother_document)
+
+    def _clone_collection(self, clone_id: str, clone_data: Dict):
+        mongodb_url = clone_data.get('mongodb_url') or clone_data.get('db_url')
+        if not mongodb_url:
+            return None
+        motor_client = self._clone_clients.get(clone_id)
+        if motor_client is None:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            motor_client = self._clone_clients[clone_id] = AsyncIOMotorClient(
+                mongodb_url, serverSelectionTimeoutMS=30000)
+        return motor_client[clone_data.get('db_name', f"clone_{clone_id}")].files
+
+    async def track_clone_channel(self, clone_id: str, client, clone_data: Dict, chat_id: int,
+                                  checkpoint: Optional[int] = None, catch_up: bool = True):
+        collection = self._clone_collection(clone_id, clone_data)
+        if collection is None:
+            logger.warning(f"⚠️ Clone {clone_id} has no database URL; not live indexing {chat_id}")
+            return None
+        # Once the clone has a placement its files go wherever that routes them
+        return await self.track(clone_id, client, chat_id, collection, partial(clone_document, clone_id),
+                                checkpoint, catch_up, write=partial(placement.merge_files, clone_id))
+
+    async def start_clone(self, clone_id: str, client, clone_data: Dict):
+        """Resume live indexing of every channel the clone has indexed before"""
+        for chat_id, checkpoint in (await index_db.get_index_checkpoints(clone_id)).items():
+            await self.track_clone_channel(clone_id, client, clone_data, chat_id, checkpoint)
+
+    async def stop_owner(self, owner: str):
+        """Flush and forget the channels of ``owner``"""
+        for key in [key for key in self._channels if key[0] == owner]:
+            channel = self._channels.pop(key)
+            for task in (channel.timer, channel.backfill):
+                if task is not None and not task.done():
+                    task.cancel()
+            await self._flush(channel)
+        motor_client = self._clone_clients.pop(owner, None)
+        if motor_client is not None:
+            motor_client.close()
+
+    async def on_clone_started(self, event):
+        from clone_manager import clone_manager
+        clone_id = event.data['clone_id']
+        info = clone_manager.active_clones.get(clone_id)
+        if info:
+            await self.start_clone(clone_id, info['client'], info.get('data') or {})
+
+    async def on_clone_stopped(self, event):
+        await self.stop_owner(event.data['clone_id'])
+
+    def subscribe(self, event_bus):
+        event_bus.subscribe_async('clone.started', self.on_clone_started, name='live_indexer.started')
+        event_bus.subscribe_async('clone.stopped', self.on_clone_stopped, name='live_indexer.stopped')
+
+    # ==================== LIVE POSTS ====================
+
+    async def on_message(self, owner: str, message) -> bool:
+        """Buffer a new channel post; False if the channel is not indexed by ``owner``"""
+        channel = self._channels.get((owner, message.chat.id))
+        if channel is None:
+            return False
+        if channel.checkpoint and message.id > channel.seen + 1 and channel.backfill is None:
+            self._start_backfill(channel, channel.seen + 1, message.id - 1)
+        await self._add(channel, message, 'live')
+        return True
+
+    async def _add(self, channel: _Channel, message, source: str):
+        channel.seen = max(channel.seen, message.id)
+        document = channel.build(message, channel.chat_id)
+        channel.buffer.append((message.id, document, source))
+        if len(channel.buffer) >= self.batch_size:
+            await self._flush(channel)
+        elif channel.timer is None or channel.timer.done():
+            channel.timer = asyncio.create_task(self._flush_later(channel))
+
+    async def _flush_later(self, channel: _Channel):
+        await asyncio.sleep(self.flush_interval)
+        await self._flush(channel)
+
+    async def _flush(self, channel: _Channel):
+        async with channel.lock:
+            batch, channel.buffer = channel.buffer, []
+            documents = [doc for _, doc, _ in batch if doc is not None]
+            try:
+                await channel.write(documents, channel.collection)
+            except Exception as e:
+                # Kept for the next flush rather than skipped past by the checkpoint
+                channel.buffer[:0] = batch
+                logger.error(f"❌ Live indexing write failed for {channel.owner}/{channel.chat_id}: {e}")
+                return
+
+            if documents:
+                live_index_flushes.inc(owner='mother' if channel.owner == MOTHER else 'clone')
+            for _, doc, source in batch:
+                if doc is not None:
+                    live_index_documents.inc(source=source)
+
+            # With nothing left buffered, every id seen so far has been written
+            last = channel.seen if not channel.buffer else max(message_id for message_id, _, _ in batch)
+            if channel.hold is not None:
+                last = min(last, channel.hold)
+            if last > channel.checkpoint:
+                channel.checkpoint = last
+                try:
+                    await index_db.advance_index_checkpoint(channel.owner, channel.chat_id, last)
+                except Exception as e:
+                    logger.error(f"❌ Could not save index checkpoint for {channel.owner}/{channel.chat_id}: {e}")
+
+    # ==================== BACKFILL ====================
+
+    def _start_backfill(self, channel: _Channel, start: int, end: Optional[int]):
+        # Held before the task runs: the post that revealed the gap is flushed first
+        channel.hold = start - 1
+        channel.backfill = asyncio.create_task(self._backfill(channel, start, end))
+
+    async def _backfill(self, channel: _Channel, start: int, end: Optional[int]):
+        """Index ``start..end``; with no ``end``, read forward until a batch is empty
+
+        The checkpoint is held below ``start`` until the range is written, so live
+        posts flushed meanwhile cannot move it past posts still being fetched.
+        """
+        from bot.utils.send_scheduler import BULK, send
+
+        started = time.perf_counter()
+        found = 0
+        next_id = start
+        limit = start + self.max_backfill
+        try:
+            while next_id < limit and (end is None or next_id <= end):
+                last_id = min(next_id + BACKFILL_BATCH, limit) - 1
+                if end is not None:
+                    last_id = min(last_id, end)
+                ids = list(range(next_id, last_id + 1))
+                messages = await send(channel.client, partial(channel.client.get_messages, channel.chat_id, ids),
+                                      priority=BULK)
+                posts = [m for m in (messages or []) if m and not m.empty]
+                for message in posts:
+                    await self._add(channel, message, 'backfill')
+                found += len(posts)
+                if end is None and not posts:
+                    break
+                next_id = last_id + 1
+            if next_id >= limit:
+                logger.warning(f"⚠️ Backfill of {channel.owner}/{channel.chat_id} stopped after "
+                               f"{self.max_backfill} ids at {next_id - 1}")
+            channel.hold = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # The checkpoint stays below the unfetched ids, so the next start retries them
+            channel.hold = next_id - 1
+            logger.error(f"❌ Backfill of {channel.owner}/{channel.chat_id} failed at {next_id}: {e}")
+        finally:
+            channel.backfill = None
+        await self._flush(channel)
+        if found:
+            logger.info(f"📥 Backfilled {found} posts in {channel.owner}/{channel.chat_id} "
+                        f"({time.perf_counter() - started:.1f}s)")
+
+    async def flush_all(self):
+        for channel in list(self._channels.values()):
+            await self._flush(channel)
+
+
+live_indexer = LiveIndexer(
+    batch_size=Config.LIVE_INDEX_BATCH_SIZE,
+    flush_interval=Config.LIVE_INDEX_FLUSH_MS / 1000,
+    max_backfill=Config.LIVE_INDEX_MAX_BACKFILL,
+)
@@ -0,0 +1,320 @@
+"""
+On-demand profiling of the running bot
+
+Admins start a time-boxed profile from ``/profile_cpu`` / ``/profile_mem`` or
+the dashboard and get the result back as a file:
+
+- **cpu**: a thread samples the event loop thread's stack (optionally every
+  thread) every ``PROFILE_SAMPLE_INTERVAL`` seconds and writes collapsed stacks
+  (``frame;frame;frame count``, the input of flamegraph.pl / speedscope). Each
+  stack is rooted at the clone whose instrumented handler was running, so one
+  clone's hot path can be told from another's. At the default 100 Hz this costs
+  well under 1% of one core.
+- **memory**: ``tracemalloc`` traces allocations for the window and the file
+  lists the allocation sites that grew the most between the two snapshots.
+  Tracing slows allocations down while it runs, so keep memory windows short.
+  Allocations can't be tied to a clone: all clones share the same code.
+
+Only one profile of each kind runs at a time; the last few are kept for download.
+"""
+import asyncio
+import io
+import linecache
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional
+
+from info import Config
+from bot.logging import LOGGER
+from bot.utils.loop_monitor import handler_context
+
+logger = LOGGER(__name__)
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+STACK_LIMIT = 64  # outermost frames are dropped beyond this depth
+TOP_ALLOCATORS = 50
+TOP_TRACEBACKS = 10
+NO_CLONE = '-'  # root frame of samples taken outside any instrumented handler
+
+KINDS = ('cpu', 'memory')
+
+
+def _short_path(filename: str) -> str:
+    for marker in ('site-packages' + os.sep, 'dist-packages' + os.sep):
+        if marker in filename:
+            return filename.split(marker, 1)[1]
+    if filename.startswith(ROOT + os.sep):
+        return os.path.relpath(filename, ROOT)
+    return '/'.join(filename.split(os.sep)[-2:])
+
+
+class Profile:
+    """One profiling run; ``output`` holds the file contents once it has finished"""
+
+    def __init__(self, kind: str, seconds: float, clone: Optional[str] = None, all_threads: bool = False):
+        self.id = uuid.uuid4().hex[:8]
+        self.kind = kind
+        self.seconds = seconds
+        self.clone = clone
+        self.all_threads = all_threads
+        self.status = 'running'
+        self.error: Optional[str] = None
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.samples = 0
+        self.summary: Dict[str, Any] = {}
+        self.output = ''
+        self._stop = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def filename(self) -> str:
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started_at))
+        return f"{self.kind}-profile-{stamp}-{self.id}.{'folded' if self.kind == 'cpu' else 'txt'}"
+
+    def stop(self):
+        """End the profile early; the samples taken so far are kept"""
+        self._stop.set()
+
+    def finish(self, status: str, error: Optional[str] = None):
+        self.status = status
+        self.error = error
+        self.finished_at = time.time()
+        self._done.set()
+
+    async def wait(self, poll: float = 0.5) -> 'Profile':
+        while not self._done.is_set():
+            await asyncio.sleep(poll)
+        return self
+
+    def document(self) -> io.BytesIO:
+        """The output as an in-memory file for ``reply_document``"""
+        document = io.BytesIO(self.output.encode())
+        document.name = self.filename
+        return document
+
+    def caption(self) -> str:
+        if self.status != 'completed':
+            return f"❌ {self.kind} profile `{self.id}` {self.status}: {self.error or 'no output'}"
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        lines = [f"📊 **{self.kind.upper()} profile** `{self.id}` ({elapsed:.0f}s)"]
+        if self.kind == 'cpu':
+            lines.append(f"Samples: {self.samples}")
+            lines += [f"• {clone}: {share:.0%}" for clone, share in self.summary.get('by_clone', {}).items()][:5]
+            lines += [f"🔥 {name}" for name in self.summary.get('hottest', [])[:3]]
+        else:
+            lines.append(f"Growth: {self.summary.get('growth_kib', 0):+.1f} KiB "
+                         f"in {self.summary.get('growth_blocks', 0):+d} blocks")
+            lines += [f"• {site}" for site in self.summary.get('top_sites', [])[:3]]
+        return "\n".join(lines)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'seconds': self.seconds,
+            'clone': self.clone,
+            'all_threads': self.all_threads,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'samples': self.samples,
+            'summary': self.summary,
+            'filename': self.filename,
+            'error': self.error,
+        }
+
+
+class LiveProfiler:
+    """Runs time-boxed CPU and memory profiles in background threads"""
+
+    MAX_PROFILES = 10  # finished profiles kept for download
+
+    def __init__(self, interval: float = 0.01, max_seconds: float = 300, memory_frames: int = 5):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.memory_frames = memory_frames
+        self.profiles: 'OrderedDict[str, Profile]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._labels: Dict[Any, str] = {}
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        return self.profiles.get(profile_id)
+
+    def running(self, kind: Optional[str] = None) -> List[Profile]:
+        return [profile for profile in list(self.profiles.values())
+                if not profile.finished and kind in (None, profile.kind)]
+
+    def start(self, kind: str, seconds: float, clone: Optional[str] = None, all_threads: bool = False) -> Profile:
+        """Start a profile in a background thread and return it at once
+
+        Raises ``ValueError`` for an unknown kind and ``RuntimeError`` if one of
+        the same kind is already running.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown profile kind: {kind}")
+        seconds = min(max(float(seconds), 1.0), self.max_seconds)
+        if clone and clone != 'mother_bot' and not clone.startswith('clone_'):
+            clone = f"clone_{clone}"  # bot id -> the clone's client name (see CloneManager.start_clone)
+        with self._lock:
+            if self.running(kind):
+                raise RuntimeError(f"A {kind} profile is already running")
+            profile = Profile(kind, seconds, clone, all_threads)
+            self.profiles[profile.id] = profile
+            while len(self.profiles) > self.MAX_PROFILES:
+                oldest = next(iter(self.profiles.values()))
+                if not oldest.finished:
+                    break
+                self.profiles.popitem(last=False)
+
+        target = self._run_cpu if kind == 'cpu' else self._run_memory
+        threading.Thread(target=self._run, args=(profile, target), name=f"profile-{kind}", daemon=True).start()
+        logger.info(f"🔬 {kind} profile {profile.id} started for {seconds:.0f}s"
+                    + (f" (clone {clone})" if clone else ""))
+        return profile
+
+    def stop_all(self) -> List[Profile]:
+        profiles = self.running()
+        for profile in profiles:
+            profile.stop()
+        return profiles
+
+    def _run(self, profile: Profile, target):
+        try:
+            target(profile)
+            profile.finish('completed')
+            logger.info(f"🔬 {profile.kind} profile {profile.id} finished ({profile.samples} samples)")
+        except Exception as e:
+            logger.error(f"❌ {profile.kind} profile {profile.id} failed: {e}", exc_info=True)
+            profile.finish('failed', str(e))
+
+    # ==================== CPU ====================
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({_short_path(code.co_filename)})"
+        return label
+
+    def _stack(self, frame) -> List[str]:
+        """Frame labels, outermost first"""
+        labels = []
+        while frame is not None and len(labels) < STACK_LIMIT:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        labels.reverse()
+        return labels
+
+    def _run_cpu(self, profile: Profile):
+        main_thread = threading.main_thread().ident
+        own_thread = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks: Counter = Counter()
+        clones: Counter = Counter()
+        leaves: Counter = Counter()
+        deadline = time.monotonic() + profile.seconds
+        next_sample = time.monotonic()
+
+        while not profile._stop.is_set() and time.monotonic() < deadline:
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                if ident == own_thread or (not profile.all_threads and ident != main_thread):
+                    continue
+                context = handler_context(frame)
+                handler, client = context if context is not None else (None, None)
+                if profile.clone and client != profile.clone:
+                    continue
+                labels = self._stack(frame)
+                root = [client or NO_CLONE] + ([f"handler:{handler}"] if handler else [])
+                if profile.all_threads:
+                    root.insert(0, names.get(ident) or f"thread-{ident}")
+                stacks[tuple(root + labels)] += 1
+                clones[client or NO_CLONE] += 1
+                leaves[labels[-1] if labels else '?'] += 1
+            del frames
+            profile.samples += 1
+            next_sample += self.interval
+            profile._stop.wait(max(0.0, next_sample - time.monotonic()))
+
+        total = sum(clones.values()) or 1
+        profile.summary = {
+            'stacks': len(stacks),
+            'by_clone': {clone: round(count / total, 3) for clone, count in clones.most_common(10)},
+            'hottest': [name for name, _ in leaves.most_common(10)],
+        }
+        profile.output = "".join(f"{';'.join(stack)} {count}\n" for stack, count in stacks.most_common())
+
+    # ==================== MEMORY ====================
+
+    def _run_memory(self, profile: Profile):
+        started_here = not tracemalloc.is_tracing()
+        if started_here:
+            tracemalloc.start(self.memory_frames)
+        try:
+            before = tracemalloc.take_snapshot()
+            profile._stop.wait(profile.seconds)
+            after = tracemalloc.take_snapshot()
+        finally:
+            if started_here:
+                tracemalloc.stop()
+
+        ignore = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, linecache.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<unknown>'),
+        ]
+        before = before.filter_traces(ignore)
+        after = after.filter_traces(ignore)
+        by_line = after.compare_to(before, 'lineno')
+        by_traceback = after.compare_to(before, 'traceback')
+
+        growth = sum(stat.size_diff for stat in by_line)
+        blocks = sum(stat.count_diff for stat in by_line)
+        sites = []
+        for stat in by_line:
+            if stat.size_diff <= 0:
+                continue
+            frame = stat.traceback[0]
+            sites.append((stat, f"{_short_path(frame.filename)}:{frame.lineno}"))
+            if len(sites) >= TOP_ALLOCATORS:
+                break
+
+        lines = [
+            f"# tracemalloc diff over {time.time() - profile.started_at:.0f}s ({self.memory_frames} frames per trace)",
+            f"# growth: {growth / 1024:+.1f} KiB in {blocks:+d} blocks; "
+            f"traced now: {sum(stat.size for stat in by_line) / 1024:.1f} KiB",
+            "",
+            "## Top allocation sites by growth",
+        ]
+        for stat, site in sites:
+            source = linecache.getline(stat.traceback[0].filename, stat.traceback[0].lineno).strip()
+            lines.append(f"{stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8d} blocks  {site}  {source}")
+
+        lines += ["", "## Top tracebacks by growth"]
+        for stat in [stat for stat in by_traceback if stat.size_diff > 0][:TOP_TRACEBACKS]:
+            lines.append(f"\n{stat.size_diff / 1024:+.1f} KiB in {stat.count_diff:+d} blocks")
+            lines += [f"    {_short_path(frame.filename)}:{frame.lineno}" for frame in reversed(stat.traceback)]
+
+        profile.summary = {
+            'growth_kib': round(growth / 1024, 1),
+            'growth_blocks': blocks,
+            'top_sites': [f"{stat.size_diff / 1024:+.1f} KiB {site}" for stat, site in sites[:10]],
+        }
+        profile.output = "\n".join(lines) + "\n"
+
+
+live_profiler = LiveProfiler(
+    interval=Config.PROFILE_SAMPLE_INTERVAL,
+    max_seconds=Config.PROFILE_MAX_SECONDS,
+    memory_frames=Config.PROFILE_MEMORY_FRAMES,
+)
@@ -0,0 +1,245 @@
+"""
+Event loop health
+
+One event loop runs the mother bot and every clone, so anything that blocks it
+stalls all of them. Two parts watch for that:
+
+- a probe task wakes every ``interval`` seconds and records how late it woke (the
+  scheduling lag) in a ring buffer and the ``event_loop_lag_seconds`` histogram;
+- a watchdog thread notices when the probe has not run for ``slow_threshold``
+  seconds past its deadline and samples the loop thread's stack while the stall
+  lasts. This is what asyncio's debug mode reports for slow callbacks, without
+  its per-callback overhead.
+
+Each stall is attributed to the instrumented handler (and its client) found on
+the sampled stack, or else to the task that was running. ``HealthChecker``
+reports the lag percentiles and recent stalls in its ``event_loop`` check, and
+the dashboard shows them.
+"""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import Counter as Tally, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from info import Config
+from bot.logging import LOGGER
+from bot.utils.metrics import instrument_handler, metrics
+from bot.utils.resource_sampler import RingBuffer
+
+logger = LOGGER(__name__)
+
+LAG_FIELDS = ('timestamp', 'lag')
+STACK_LIMIT = 30  # innermost frames kept per stack sample
+MAX_SAMPLES = 10  # stack samples kept per stall
+
+loop_lag = metrics.histogram('event_loop_lag_seconds', 'How late the event loop ran the lag probe',
+                             buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+loop_stalls = metrics.counter('event_loop_stalls_total', 'Times the event loop was blocked past the slow threshold',
+                              ('handler',))
+
+
+async def _handler(*args, **kwargs):
+    pass
+
+
+# Code object of instrument_handler's wrapper: its frame on a stack marks the running handler
+_HANDLER_CODE = instrument_handler(_handler).__code__
+
+
+def handler_context(frame) -> Optional[Tuple[Optional[str], Optional[str]]]:
+    """(handler name, client name) of the innermost instrumented handler on ``frame``'s stack"""
+    while frame is not None:
+        if frame.f_code is _HANDLER_CODE:
+            values = frame.f_locals
+            args = values.get('args') or ()
+            return values.get('handler_name'), getattr(args[0], 'name', None) if args else None
+        frame = frame.f_back
+    return None
+
+
+class Stall:
+    """A period the loop was blocked, with the stack samples taken while it lasted"""
+
+    def __init__(self, deadline: float):
+        self.deadline = deadline  # monotonic time the probe should have run
+        self.wall_time = time.time()
+        self.duration = 0.0
+        self.handler: Optional[str] = None
+        self.client: Optional[str] = None
+        self.task: Optional[str] = None
+        self.samples: List[List[str]] = []  # formatted frames, innermost last
+
+    @property
+    def culprit(self) -> str:
+        return self.handler or self.task or 'unknown'
+
+    def top_frame(self) -> Optional[str]:
+        """Innermost frame seen most often across the samples"""
+        frames = Tally(sample[-1] for sample in self.samples if sample)
+        return frames.most_common(1)[0][0] if frames else None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'time': self.wall_time,
+            'duration': round(self.duration, 3),
+            'handler': self.handler,
+            'client': self.client,
+            'task': self.task,
+            'top_frame': self.top_frame(),
+            'stack': self.samples[-1] if self.samples else [],
+            'samples': len(self.samples),
+        }
+
+
+class LoopMonitor:
+    """Scheduling lag probe and blocked-loop watchdog for one event loop"""
+
+    def __init__(self, interval: float = 0.1, slow_threshold: float = 0.25,
+                 history: int = 3000, max_stalls: int = 50):
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.lag = RingBuffer(LAG_FIELDS, history)
+        self.stalls: Deque[Stall] = deque(maxlen=max_stalls)
+        self._current: Optional[Stall] = None
+        self._beat = time.monotonic()  # last time the probe ran
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> asyncio.Task:
+        """Start probing the running loop and watching it from a thread (idempotent)"""
+        if self.running:
+            return self._task
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._task = self._loop.create_task(self._probe(), name='loop-lag-probe')
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._thread.start()
+        logger.info(f"⏱️ Event loop monitor started (probe every {self.interval * 1000:.0f}ms, "
+                    f"stalls over {self.slow_threshold * 1000:.0f}ms)")
+        return self._task
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+
+    async def _probe(self):
+        try:
+            while True:
+                expected = time.monotonic() + self.interval
+                await asyncio.sleep(self.interval)
+                now = time.monotonic()
+                self._beat = now
+                lag = max(0.0, now - expected)
+                self.lag.append_values((time.time(), lag))
+                loop_lag.observe(lag)
+        finally:
+            # Without the probe every moment would look like a stall
+            self._stop.set()
+
+    # ==================== WATCHDOG ====================
+
+    def _watch(self):
+        check_every = max(0.01, self.slow_threshold / 4)
+        while not self._stop.wait(check_every):
+            beat = self._beat
+            deadline = beat + self.interval
+            blocked = time.monotonic() - deadline
+            stall = self._current
+            if blocked >= self.slow_threshold:
+                if stall is None:
+                    stall = self._current = Stall(deadline)
+                stall.duration = blocked
+                if len(stall.samples) < MAX_SAMPLES:
+                    self._sample(stall)
+            elif stall is not None and beat > stall.deadline:
+                # The probe ran again, so the loop is free
+                stall.duration = max(stall.duration, beat - stall.deadline)
+                self._current = None
+                self._record(stall)
+
+    def _sample(self, stall: Stall):
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return
+        if stall.handler is None:
+            self._attribute(stall, frame)
+        try:
+            summary = traceback.extract_stack(frame, limit=STACK_LIMIT)
+            stall.samples.append([f"{entry.filename}:{entry.lineno} in {entry.name}" for entry in summary])
+        except Exception:
+            pass
+
+    def _attribute(self, stall: Stall, frame):
+        """Name the innermost instrumented handler on the stack, or the running task"""
+        context = handler_context(frame)
+        if context is not None:
+            stall.handler, stall.client = context
+            return
+        if stall.task is None and self._loop is not None:
+            try:
+                task = asyncio.current_task(self._loop)
+                if task is not None:
+                    coro = task.get_coro()
+                    stall.task = getattr(coro, '__qualname__', None) or task.get_name()
+            except Exception:
+                pass
+
+    def _record(self, stall: Stall):
+        self.stalls.append(stall)
+        loop_stalls.inc(handler=stall.handler or 'none')
+        where = f"{stall.culprit}" + (f" on {stall.client}" if stall.client else "")
+        logger.warning(f"🐢 Event loop blocked for {stall.duration * 1000:.0f}ms by {where}"
+                       f" at {stall.top_frame() or 'unknown frame'}")
+
+    # ==================== REPORTING ====================
+
+    def recent_stalls(self, window: Optional[float] = None) -> List[Stall]:
+        since = time.time() - window if window else 0
+        return [stall for stall in list(self.stalls) if stall.wall_time >= since]
+
+    def snapshot(self, window: float = 300.0) -> Dict[str, Any]:
+        """Lag percentiles and stalls over the last ``window`` seconds (safe from any thread)"""
+        since = time.time() - window
+        lags = self.lag.column('lag', since)
+        stalls = self.recent_stalls(window)
+        current = self._current
+        by_handler = Tally(stall.culprit for stall in stalls)
+        return {
+            'running': self.running,
+            'interval': self.interval,
+            'slow_threshold': self.slow_threshold,
+            'probes': len(lags),
+            'lag_latest': self.lag.latest('lag'),
+            'lag_p50': self.lag.percentile('lag', 50, window),
+            'lag_p99': self.lag.percentile('lag', 99, window),
+            'lag_max': max(lags) if lags else 0.0,
+            'blocked_for': current.duration if current is not None else 0.0,
+            'stalls': len(stalls),
+            'longest_stall': max((stall.duration for stall in stalls), default=0.0),
+            'by_handler': dict(by_handler.most_common(10)),
+            'recent_stalls': [stall.as_dict() for stall in stalls[-10:]],
+        }
+
+
+loop_monitor = LoopMonitor(
+    interval=Config.LOOP_PROBE_INTERVAL,
+    slow_threshold=Config.LOOP_SLOW_THRESHOLD,
+    history=Config.LOOP_LAG_HISTORY,
+)
@@ -1,17 +1,19 @@
 # Cleaned & Refactored by @Mak0912 (TG)
 
 import re, asyncio
-from pyrogram.errors import FloodWait
+from functools import partial
+from pyrogram.errors import UserIsBlocked, InputUserDeactivated
+from bot.utils.send_scheduler import BULK, INTERACTIVE, send
+
+# Broadcast copies queued at once; the send scheduler paces them
+BROADCAST_WINDOW = 100
 
 async def get_messages(client, message_ids):
     messages, total = [], 0
     while total != len(message_ids):
         batch = message_ids[total:total+200]
         try:
-            msgs = await client.get_messages(client.db_channel.id, batch)
-        except FloodWait as e:
-            await asyncio.sleep(e.x)
-            msgs = await client.get_messages(client.db_channel.id, batch)
+            msgs = await send(client, partial(client.get_messages, client.db_channel.id, batch), priority=INTERACTIVE)
         except Exception:
             msgs = []
         total += len(batch)
@@ -32,3 +34,29 @@ async def get_message_id(client, message):
             else:
                 return msg_id if chan_id == client.db_channel.username else 0
     return 0
+
+async def broadcast_copy(client, message, user_ids) -> dict:
+    """Copy ``message`` to every user as bulk sends; users who blocked the bot are removed"""
+    from bot.database import del_user
+
+    status = {"total": 0, "sent": 0, "blocked": 0, "deleted": 0, "failed": 0}
+
+    async def deliver(user_id):
+        try:
+            await send(client, partial(message.copy, user_id), chat_id=user_id, priority=BULK)
+            return "sent"
+        except UserIsBlocked:
+            await del_user(user_id)
+            return "blocked"
+        except InputUserDeactivated:
+            await del_user(user_id)
+            return "deleted"
+        except Exception:
+            return "failed"
+
+    user_ids = list(user_ids)
+    for start in range(0, len(user_ids), BROADCAST_WINDOW):
+        for outcome in await asyncio.gather(*(deliver(user_id) for user_id in user_ids[start:start + BROADCAST_WINDOW])):
+            status[outcome] += 1
+            status["total"] += 1
+    return status
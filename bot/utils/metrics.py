@@ -0,0 +1,326 @@
+"""
+Request-level instrumentation: counters and histograms exported in the
+Prometheus text exposition format.
+
+Three sources feed the default registry:
+- handler latency/errors (``instrument_handler`` / ``safe_callback_handler``
+  and every plugin handler registered through ``Client.add_handler``)
+- Mongo command latency per collection/op (pymongo ``CommandListener``)
+- Telegram API latency and FloodWait counts per client (``Client.invoke``)
+"""
+import asyncio
+import bisect
+import functools
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import monitoring
+
+from bot.logging import LOGGER, get_logging_stats
+
+logger = LOGGER(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Commands whose first value is the target collection name
+_COLLECTION_COMMANDS = frozenset([
+    'find', 'insert', 'update', 'delete', 'aggregate', 'count', 'distinct',
+    'findAndModify', 'createIndexes', 'dropIndexes', 'listIndexes', 'drop', 'getMore'
+])
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict) -> Tuple:
+        return tuple(labels.get(name, '') for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Point-in-time value, either set explicitly or read from a callback"""
+    kind = 'gauge'
+
+    def __init__(self, *args, callback: Optional[Callable[[], float]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple, float] = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        if self._callback is not None:
+            try:
+                lines.append(f"{self.name} {float(self._callback())}")
+            except Exception as e:
+                logger.debug(f"Gauge callback {self.name} failed: {e}")
+            return lines
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Bucketed latency histogram (per-bucket counts are cumulated on render)"""
+    kind = 'histogram'
+
+    def __init__(self, *args, buckets: Iterable[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        with self._lock:
+            items = [(key, list(series[0]), series[1], series[2]) for key, series in self._series.items()]
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                le_label = f'le="{le}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le_label)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together on /metrics"""
+
+    def __init__(self, prefix: str = 'storagebot_'):
+        self.prefix = prefix
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(self.prefix + name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = (), callback=None) -> Gauge:
+        return self._register(Gauge(self.prefix + name, documentation, labelnames, callback=callback))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(self.prefix + name, documentation, labelnames, buckets=buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+
+handler_latency = metrics.histogram('handler_duration_seconds', 'Update handler latency', ('handler',))
+handler_requests = metrics.counter('handler_requests_total', 'Handled updates by outcome', ('handler', 'status'))
+
+mongo_latency = metrics.histogram('mongo_command_duration_seconds', 'Mongo command latency', ('collection', 'op'))
+mongo_failures = metrics.counter('mongo_command_failures_total', 'Failed Mongo commands', ('collection', 'op'))
+
+telegram_latency = metrics.histogram('telegram_api_duration_seconds', 'Telegram API call latency', ('client', 'method'))
+telegram_errors = metrics.counter('telegram_api_errors_total', 'Failed Telegram API calls', ('client', 'method'))
+telegram_floodwaits = metrics.counter('telegram_floodwait_total', 'FloodWait responses', ('client', 'method'))
+telegram_floodwait_seconds = metrics.counter('telegram_floodwait_seconds_total', 'Seconds requested by FloodWait', ('client',))
+
+
+def _running_clones() -> int:
+    from clone_manager import clone_manager
+    return len(clone_manager.active_clones)
+
+
+metrics.gauge('running_clones', 'Clone clients currently running', callback=_running_clones)
+metrics.gauge('log_queue_depth', 'Records waiting for the log writer thread',
+              callback=lambda: get_logging_stats()['queued'])
+metrics.gauge('log_records_dropped', 'Records dropped because the log queue was full',
+              callback=lambda: get_logging_stats()['dropped'])
+
+
+# ==================== HANDLERS ====================
+
+def instrument_handler(func: Callable, name: Optional[str] = None) -> Callable:
+    """Wrap an async handler so its latency and outcome are recorded"""
+    if getattr(func, '__metrics_instrumented__', False):
+        return func
+
+    handler_name = name or f"{getattr(func, '__module__', '').rsplit('.', 1)[-1]}.{getattr(func, '__name__', 'handler')}"
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        status = 'ok'
+        try:
+            return await func(*args, **kwargs)
+        except Exception as e:
+            # Pyrogram uses exceptions for propagation control; those aren't errors
+            status = 'propagation' if type(e).__name__ in ('StopPropagation', 'ContinuePropagation') else 'error'
+            raise
+        finally:
+            handler_latency.observe(time.perf_counter() - start, handler=handler_name)
+            handler_requests.inc(handler=handler_name, status=status)
+
+    wrapper.__metrics_instrumented__ = True
+    return wrapper
+
+
+# ==================== MONGO ====================
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Records latency of every Mongo command per collection and operation"""
+
+    def __init__(self):
+        self._pending: Dict[Tuple, str] = {}
+
+    def started(self, event):
+        collection = event.command.get(event.command_name) if event.command_name in _COLLECTION_COMMANDS else None
+        if event.command_name == 'getMore':
+            collection = event.command.get('collection')
+        self._pending[(event.connection_id, event.request_id)] = collection if isinstance(collection, str) else '-'
+
+    def succeeded(self, event):
+        collection = self._pending.pop((event.connection_id, event.request_id), '-')
+        mongo_latency.observe(event.duration_micros / 1_000_000, collection=collection, op=event.command_name)
+
+    def failed(self, event):
+        collection = self._pending.pop((event.connection_id, event.request_id), '-')
+        mongo_latency.observe(event.duration_micros / 1_000_000, collection=collection, op=event.command_name)
+        mongo_failures.inc(collection=collection, op=event.command_name)
+
+
+mongo_command_listener = MongoCommandListener()
+_mongo_listener_registered = False
+
+
+def register_mongo_listener():
+    """Register the command listener for all Mongo clients created afterwards"""
+    global _mongo_listener_registered
+    if not _mongo_listener_registered:
+        monitoring.register(mongo_command_listener)
+        _mongo_listener_registered = True
+
+
+# ==================== TELEGRAM ====================
+
+_telegram_instrumented = False
+
+
+def install_telegram_instrumentation():
+    """Patch ``Client.invoke`` and ``Client.add_handler`` to record metrics
+
+    Every API call made by the mother bot or a clone goes through ``invoke``,
+    and every plugin handler is registered through ``add_handler``.
+    """
+    global _telegram_instrumented
+    if _telegram_instrumented:
+        return
+
+    from pyrogram import Client
+    from pyrogram.errors import FloodWait
+
+    original_invoke = Client.invoke
+    original_add_handler = Client.add_handler
+
+    async def invoke(self, query, *args, **kwargs):
+        client_name = getattr(self, 'name', 'unknown')
+        method = type(query).__name__
+        start = time.perf_counter()
+        try:
+            return await original_invoke(self, query, *args, **kwargs)
+        except FloodWait as e:
+            telegram_floodwaits.inc(client=client_name, method=method)
+            telegram_floodwait_seconds.inc(float(getattr(e, 'value', 0) or 0), client=client_name)
+            raise
+        except Exception:
+            telegram_errors.inc(client=client_name, method=method)
+            raise
+        finally:
+            telegram_latency.observe(time.perf_counter() - start, client=client_name, method=method)
+
+    def add_handler(self, handler, group: int = 0):
+        callback = getattr(handler, 'callback', None)
+        if callback is not None and asyncio.iscoroutinefunction(callback):
+            handler.callback = instrument_handler(callback)
+        return original_add_handler(self, handler, group)
+
+    Client.invoke = invoke
+    Client.add_handler = add_handler
+    _telegram_instrumented = True
+    logger.info("✅ Telegram API and handler instrumentation enabled")
+
+
+def render_metrics() -> str:
+    """Render all metrics in the Prometheus text format"""
+    return metrics.render()
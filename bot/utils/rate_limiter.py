@@ -0,0 +1,222 @@
+import asyncio
+import time
+from functools import wraps
+from typing import Callable, Dict, Hashable, NamedTuple, Optional
+from info import Config
+from bot.logging import LOGGER
+from bot.utils.metrics import metrics
+
+logger = LOGGER(__name__)
+
+rate_limited_total = metrics.counter('rate_limited_total', 'Updates refused by the rate limiter', ('scope',))
+
+USER = 'user'
+CLONE = 'clone'
+GLOBAL = 'global'
+MOTHER_BOT = 'mother'
+
+
+class _Bucket:
+    __slots__ = ('tokens', 'stamp')
+
+    def __init__(self, tokens: float, stamp: float):
+        self.tokens = tokens
+        self.stamp = stamp
+
+
+class TokenBuckets:
+    """One token bucket per key, refilled lazily on access
+
+    Every check is O(1). A bucket that has been idle long enough to refill completely
+    is indistinguishable from a new one, so it is dropped; sweeps run whenever the
+    table doubles in size (and from ``evict_idle``), which keeps memory proportional to
+    the keys seen within one refill period.
+    """
+
+    def __init__(self, rate: float, capacity: float, name: str = 'buckets'):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.name = name
+        self._buckets: Dict[Hashable, _Bucket] = {}
+        self._sweep_at = 1024
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def _bucket(self, key: Hashable, now: float) -> _Bucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self._sweep_at:
+                self.evict_idle(now)
+                self._sweep_at = max(1024, 2 * len(self._buckets))
+            bucket = self._buckets[key] = _Bucket(self.capacity, now)
+        elif now > bucket.stamp:
+            bucket.tokens = min(self.capacity, bucket.tokens + (now - bucket.stamp) * self.rate)
+            bucket.stamp = now
+        return bucket
+
+    def wait_time(self, key: Hashable, cost: float = 1.0, now: Optional[float] = None) -> float:
+        """Seconds until ``cost`` tokens are available for ``key`` (0 if they are now)"""
+        now = time.monotonic() if now is None else now
+        bucket = self._bucket(key, now)
+        missing = cost - bucket.tokens
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate if self.rate > 0 else float('inf')
+
+    def take(self, key: Hashable, cost: float = 1.0, now: Optional[float] = None):
+        """Spend ``cost`` tokens; call after wait_time() returned 0"""
+        now = time.monotonic() if now is None else now
+        self._bucket(key, now).tokens -= cost
+
+    def try_acquire(self, key: Hashable, cost: float = 1.0, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        if self.wait_time(key, cost, now):
+            return False
+        self.take(key, cost, now)
+        return True
+
+    def penalize(self, key: Hashable, seconds: float, now: Optional[float] = None):
+        """Hold ``key`` back so its next token is at least ``seconds`` away"""
+        now = time.monotonic() if now is None else now
+        bucket = self._bucket(key, now)
+        bucket.tokens = min(bucket.tokens, 1.0 - seconds * self.rate)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Drop buckets that are full again; returns how many were removed"""
+        now = time.monotonic() if now is None else now
+        idle = [key for key, bucket in self._buckets.items()
+                if bucket.tokens + (now - bucket.stamp) * self.rate >= self.capacity]
+        for key in idle:
+            del self._buckets[key]
+        return len(idle)
+
+
+class RateDecision(NamedTuple):
+    allowed: bool
+    scope: Optional[str] = None
+    retry_after: float = 0.0
+
+
+class RateLimiter:
+    """Per-user, per-clone and global token buckets checked together
+
+    A request is admitted only if all three scopes have a token; nothing is spent
+    otherwise, so a spamming user cannot drain their clone's or the global budget.
+    Users are checked first because that is where bursts are refused.
+    """
+
+    def __init__(self,
+                 user_rate: float, user_burst: float,
+                 clone_rate: float, clone_burst: float,
+                 global_rate: float, global_burst: float,
+                 notice_interval: float = 30.0,
+                 enabled: bool = True):
+        self.enabled = enabled
+        self.users = TokenBuckets(user_rate, user_burst, USER)
+        self.clones = TokenBuckets(clone_rate, clone_burst, CLONE)
+        self.global_bucket = TokenBuckets(global_rate, global_burst, GLOBAL)
+        # Refused users are told once per interval; replying to every spammed update
+        # would spend the API calls the limiter is meant to save
+        self.notices = TokenBuckets(1.0 / notice_interval, 1, 'notices')
+
+    def check(self, user_id: int, clone_id: Optional[str] = None, cost: float = 1.0,
+              now: Optional[float] = None) -> RateDecision:
+        if not self.enabled:
+            return RateDecision(True)
+        now = time.monotonic() if now is None else now
+        clone_key = clone_id or MOTHER_BOT
+        for scope, buckets, key in ((USER, self.users, user_id),
+                                    (CLONE, self.clones, clone_key),
+                                    (GLOBAL, self.global_bucket, GLOBAL)):
+            wait = buckets.wait_time(key, cost, now)
+            if wait:
+                rate_limited_total.inc(scope=scope)
+                return RateDecision(False, scope, wait)
+        self.users.take(user_id, cost, now)
+        self.clones.take(clone_key, cost, now)
+        self.global_bucket.take(GLOBAL, cost, now)
+        return RateDecision(True)
+
+    def should_notify(self, user_id: int, now: Optional[float] = None) -> bool:
+        return self.notices.try_acquire(user_id, now=now)
+
+    def evict_idle(self) -> int:
+        now = time.monotonic()
+        return sum(buckets.evict_idle(now) for buckets in
+                   (self.users, self.clones, self.global_bucket, self.notices))
+
+    async def run_eviction(self, interval: float = 60.0):
+        """Periodically drop idle buckets so a burst of one-off senders does not linger"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                evicted = self.evict_idle()
+                if evicted:
+                    logger.debug(f"Rate limiter evicted {evicted} idle buckets", **self.stats())
+            except Exception as e:
+                logger.error(f"❌ Error evicting rate limiter buckets: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        return {'users': len(self.users), 'clones': len(self.clones), 'notices': len(self.notices)}
+
+
+def _clone_id(client) -> Optional[str]:
+    """Clone id of a client, None for the mother bot"""
+    if getattr(client, 'is_clone', None) is False:
+        return None
+    name = getattr(client, 'name', '') or ''
+    return name[len('clone_'):] if name.startswith('clone_') else None
+
+
+def _exempt(user_id: int) -> bool:
+    try:
+        return Config.is_admin(user_id)
+    except Exception:
+        return False
+
+
+def check_update(client, user_id: Optional[int], cost: float = 1.0) -> RateDecision:
+    """Admit or refuse one update from ``user_id`` on ``client``"""
+    if user_id is None or _exempt(user_id):
+        return RateDecision(True)
+    return rate_limiter.check(user_id, _clone_id(client), cost)
+
+
+def rate_limited(cost: float = 1.0, notify: bool = True):
+    """Handler decorator: refuse the update before running the handler when over the limit"""
+    def decorator(func: Callable):
+        @wraps(func)
+        async def wrapper(client, update, *args, **kwargs):
+            user = getattr(update, 'from_user', None)
+            decision = check_update(client, user.id if user else None, cost)
+            if not decision.allowed:
+                if notify and rate_limiter.should_notify(user.id):
+                    await notify_limited(update, decision)
+                return None
+            return await func(client, update, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+async def notify_limited(update, decision: RateDecision):
+    text = f"⚠️ Too many requests. Please wait {max(1, round(decision.retry_after))}s and try again."
+    try:
+        if hasattr(update, 'answer') and hasattr(update, 'data'):
+            await update.answer(text, show_alert=False)
+        elif hasattr(update, 'reply'):
+            await update.reply(text)
+    except Exception as e:
+        logger.debug(f"Could not send rate limit notice: {e}")
+
+
+# Global rate limiter instance
+rate_limiter = RateLimiter(
+    user_rate=Config.MAX_REQUESTS_PER_MINUTE / 60.0,
+    user_burst=Config.RATE_LIMIT_USER_BURST,
+    clone_rate=Config.RATE_LIMIT_CLONE_PER_SECOND,
+    clone_burst=Config.RATE_LIMIT_CLONE_PER_SECOND * 2,
+    global_rate=Config.RATE_LIMIT_GLOBAL_PER_SECOND,
+    global_burst=Config.RATE_LIMIT_GLOBAL_PER_SECOND * 2,
+    enabled=Config.RATE_LIMIT_ENABLED,
+)
@@ -1,35 +1,4 @@
+# Kept for older imports; rate limiting lives in bot.utils.rate_limiter
+from bot.utils.rate_limiter import RateLimiter, rate_limiter
 
-import asyncio
-import time
-from collections import defaultdict, deque
-from typing import Dict, Optional
-
-# This file has been disabled to prevent indentation errors
-# Rate limiting functionality has been removed from the project
-
-class RateLimiter:
-    """Disabled rate limiter class"""
-
-    def __init__(self):
-        pass
-
-    def is_globally_rate_limited(self) -> bool:
-        return False
-
-    async def cleanup_expired_data(self):
-        pass
-
-    async def is_rate_limited(self, user_id: int, max_requests: int = 10, window_seconds: int = 60) -> bool:
-        return False
-
-    def is_rate_limited_sync(self, user_id: int, command_type: str = 'default') -> bool:
-        return False
-
-    def record_request(self, user_id: int, command_type: str = 'default'):
-        pass
-
-    def get_remaining_time(self, user_id: int, command_type: str = 'default') -> float:
-        return 0
-
-# Disabled rate limiter instance
-rate_limiter = RateLimiter()
+__all__ = ['RateLimiter', 'rate_limiter']
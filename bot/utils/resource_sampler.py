@@ -0,0 +1,258 @@
+"""
+Background resource sampler shared by SystemMonitor and HealthChecker.
+
+psutil calls (and the disk-usage probe of the storage path) run in a
+dedicated thread and are written into fixed-size ``array``-backed ring
+buffers, one per metric group. The event loop only ever reads from these
+buffers, which is lock-free: the writer fills a slot and then publishes it
+by bumping the write counter.
+"""
+import math
+import os
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import psutil
+
+from info import Config
+from bot.logging import LOGGER
+
+logger = LOGGER(__name__)
+
+CPU_FIELDS = ('timestamp', 'percent', 'count', 'load_1', 'load_5', 'load_15', 'process_cpu')
+MEMORY_FIELDS = ('timestamp', 'percent', 'available', 'total', 'swap_percent', 'process_memory')
+DISK_FIELDS = ('timestamp', 'percent', 'free', 'total', 'read_bytes', 'write_bytes', 'storage_percent')
+NETWORK_FIELDS = ('timestamp', 'bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv')
+
+
+class RingBuffer:
+    """Fixed-capacity ring buffer storing each field in its own float array
+
+    Rows are exposed as dicts only when read, so sampling allocates nothing
+    per tick. ``append`` accepts a dict for compatibility with the old
+    ``deque`` history; unknown keys are ignored and missing ones stored as NaN.
+    """
+
+    def __init__(self, fields: Sequence[str], capacity: int = 100):
+        self.fields = tuple(fields)
+        self.maxlen = capacity
+        self._index = {name: i for i, name in enumerate(self.fields)}
+        self._columns = [array('d', bytes(8 * capacity)) for _ in self.fields]
+        self._written = 0
+
+    def __len__(self) -> int:
+        return min(self._written, self.maxlen)
+
+    def append_values(self, values: Sequence[float]):
+        """Write one row (values in ``fields`` order) and publish it"""
+        slot = self._written % self.maxlen
+        for column, value in zip(self._columns, values):
+            column[slot] = value
+        self._written += 1
+
+    def append(self, row: Dict[str, Any]):
+        self.append_values([float(row.get(name, math.nan)) for name in self.fields])
+
+    def _slot(self, position: int, written: int) -> int:
+        size = min(written, self.maxlen)
+        if position < 0:
+            position += size
+        if not 0 <= position < size:
+            raise IndexError("ring buffer index out of range")
+        return (written - size + position) % self.maxlen
+
+    def __getitem__(self, position: int) -> Dict[str, float]:
+        slot = self._slot(position, self._written)
+        return {name: column[slot] for name, column in zip(self.fields, self._columns)}
+
+    def __iter__(self) -> Iterator[Dict[str, float]]:
+        written = self._written
+        for position in range(min(written, self.maxlen)):
+            slot = self._slot(position, written)
+            yield {name: column[slot] for name, column in zip(self.fields, self._columns)}
+
+    def __bool__(self) -> bool:
+        return self._written > 0
+
+    def column(self, field: str, since: Optional[float] = None) -> List[float]:
+        """Values of one field, oldest first, optionally newer than ``since``"""
+        written = self._written
+        values = self._columns[self._index[field]]
+        timestamps = self._columns[self._index['timestamp']]
+        result = []
+        for position in range(min(written, self.maxlen)):
+            slot = self._slot(position, written)
+            if since is None or timestamps[slot] > since:
+                value = values[slot]
+                if not math.isnan(value):
+                    result.append(value)
+        return result
+
+    def latest(self, field: str, default: float = 0.0) -> float:
+        if not self._written:
+            return default
+        return self._columns[self._index[field]][(self._written - 1) % self.maxlen]
+
+    def percentile(self, field: str, q: float, window: Optional[float] = None) -> float:
+        """Nearest-rank percentile (``q`` in 0-100) over the last ``window`` seconds"""
+        since = time.time() - window if window else None
+        values = sorted(self.column(field, since))
+        if not values:
+            return 0.0
+        rank = max(0, min(len(values) - 1, math.ceil(q / 100 * len(values)) - 1))
+        return values[rank]
+
+    def rate(self, field: str, window: Optional[float] = None) -> float:
+        """Per-second rate of a monotonically increasing counter field"""
+        since = time.time() - window if window else None
+        values = self.column(field, since)
+        stamps = self.column('timestamp', since)
+        if len(values) < 2 or stamps[-1] <= stamps[0]:
+            return 0.0
+        return max(0.0, (values[-1] - values[0]) / (stamps[-1] - stamps[0]))
+
+
+def resolve_storage_path() -> Optional[str]:
+    """First existing storage path from the configuration"""
+    for path in (getattr(Config, 'TEMP_PATH', None), getattr(Config, 'STORAGE_PATH', None), '/tmp', '.'):
+        if path and os.path.exists(path):
+            return path
+    return None
+
+
+class ResourceSampler:
+    """Samples system resources on a background thread"""
+
+    def __init__(self, interval: float = 15.0, capacity: int = 100):
+        self.interval = interval
+        self.cpu = RingBuffer(CPU_FIELDS, capacity)
+        self.memory = RingBuffer(MEMORY_FIELDS, capacity)
+        self.disk = RingBuffer(DISK_FIELDS, capacity)
+        self.network = RingBuffer(NETWORK_FIELDS, capacity)
+        self.storage_path = resolve_storage_path()
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._process = None
+
+    @property
+    def buffers(self) -> Dict[str, RingBuffer]:
+        return {'cpu': self.cpu, 'memory': self.memory, 'disk': self.disk, 'network': self.network}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the sampling thread (idempotent)"""
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+        self._thread.start()
+        logger.info(f"📊 Resource sampler started (every {self.interval}s)")
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        # cpu_percent(interval=None) measures since the previous call, so prime it
+        try:
+            psutil.cpu_percent(interval=None)
+        except Exception:
+            pass
+        while not self._stop.is_set():
+            self.sample_once()
+            self._stop.wait(self.interval)
+
+    def sample_once(self):
+        """Take one sample of every metric group (blocking; call off the loop)"""
+        timestamp = time.time()
+
+        try:
+            cpu_percent = psutil.cpu_percent(interval=None)
+            cpu_count = psutil.cpu_count()
+            load_avg = psutil.getloadavg() if hasattr(psutil, 'getloadavg') else (0, 0, 0)
+        except Exception as e:
+            logger.error(f"Error getting CPU metrics: {e}")
+            cpu_percent, cpu_count, load_avg = 0, 1, (0, 0, 0)
+
+        try:
+            if self._process is None:
+                self._process = psutil.Process()
+            process_cpu = self._process.cpu_percent()
+            process_rss = self._process.memory_info().rss
+        except Exception:
+            process_cpu, process_rss = 0, 0
+
+        try:
+            memory = psutil.virtual_memory()
+            swap = psutil.swap_memory()
+            memory_row = (timestamp, memory.percent, memory.available, memory.total, swap.percent, process_rss)
+        except Exception as e:
+            logger.error(f"Error getting memory metrics: {e}")
+            memory_row = None
+
+        try:
+            disk = psutil.disk_usage('/')
+            disk_io = psutil.disk_io_counters()
+            storage_percent = psutil.disk_usage(self.storage_path).percent if self.storage_path else 0
+            disk_row = (
+                timestamp, (disk.used / disk.total) * 100, disk.free, disk.total,
+                disk_io.read_bytes if disk_io else 0, disk_io.write_bytes if disk_io else 0,
+                storage_percent
+            )
+        except Exception as e:
+            logger.error(f"Error getting disk metrics: {e}")
+            disk_row = None
+
+        try:
+            network = psutil.net_io_counters()
+            network_row = (timestamp, network.bytes_sent, network.bytes_recv, network.packets_sent, network.packets_recv)
+        except Exception as e:
+            logger.error(f"Error getting network metrics: {e}")
+            network_row = None
+
+        with self._write_lock:
+            self.cpu.append_values((timestamp, cpu_percent, cpu_count, *load_avg, process_cpu))
+            if memory_row:
+                self.memory.append_values(memory_row)
+            if disk_row:
+                self.disk.append_values(disk_row)
+            if network_row:
+                self.network.append_values(network_row)
+
+    def snapshot(self, window: float = 300.0) -> Dict[str, Any]:
+        """Latest values with rolling percentiles and I/O rates (lock-free read)"""
+        return {
+            'timestamp': self.cpu.latest('timestamp'),
+            'samples': len(self.cpu),
+            'cpu_percent': self.cpu.latest('percent'),
+            'cpu_p50': self.cpu.percentile('percent', 50, window),
+            'cpu_p95': self.cpu.percentile('percent', 95, window),
+            'process_cpu': self.cpu.latest('process_cpu'),
+            'load_1': self.cpu.latest('load_1'),
+            'memory_percent': self.memory.latest('percent'),
+            'memory_p95': self.memory.percentile('percent', 95, window),
+            'memory_available': self.memory.latest('available'),
+            'process_memory': self.memory.latest('process_memory'),
+            'disk_percent': self.disk.latest('percent'),
+            'disk_free': self.disk.latest('free'),
+            'storage_percent': self.disk.latest('storage_percent'),
+            'disk_read_rate': self.disk.rate('read_bytes', window),
+            'disk_write_rate': self.disk.rate('write_bytes', window),
+            'net_sent_rate': self.network.rate('bytes_sent', window),
+            'net_recv_rate': self.network.rate('bytes_recv', window),
+        }
+
+
+# Shared instance used by SystemMonitor, HealthChecker and the dashboard
+resource_sampler = ResourceSampler(
+    interval=Config.SYSTEM_SAMPLE_INTERVAL,
+    capacity=Config.SYSTEM_SAMPLE_HISTORY
+)
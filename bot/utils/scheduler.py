@@ -4,10 +4,12 @@
 import datetime
 import tzlocal
 import asyncio
+from functools import partial
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from pyrogram import Client
 from info import Config
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from bot.utils.send_scheduler import BULK, send
 
 class ScheduleManager:
     def __init__(self) -> None:
@@ -98,10 +100,10 @@ class ScheduleManager:
 
             for chunk in chunked_ids:
                 try:
-                    await client.delete_messages(chat_id=chat_id, message_ids=chunk)
+                    await send(client, partial(client.delete_messages, chat_id=chat_id, message_ids=chunk),
+                               chat_id=chat_id, priority=BULK)
                     deleted_count += len(chunk)
                     print(f"DEBUG: Deleted {len(chunk)} messages from chat {chat_id}")
-                    await asyncio.sleep(1)  # Avoid rate limits
                 except Exception as e:
                     print(f"ERROR: Failed to delete chunk: {e}")
                     continue
@@ -114,11 +116,12 @@ class ScheduleManager:
 
                 success_msg = getattr(Config, 'AUTO_DEL_SUCCESS_MSG', f"✅ Successfully deleted {deleted_count} files. Click below to retrieve them again.")
 
-                await client.send_message(
+                await send(client, partial(
+                    client.send_message,
                     chat_id=chat_id,
                     text=success_msg,
                     reply_markup=retrieve_button,
-                )
+                ), chat_id=chat_id)
                 print(f"DEBUG: Auto-delete completed for {deleted_count} messages")
 
             if task_id:
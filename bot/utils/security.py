@@ -1,19 +1,23 @@
-import time
 import hashlib
 import hmac
 import secrets
-from typing import Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 from functools import wraps
 from datetime import datetime, timedelta
-from pyrogram import Client
-from pyrogram.types import Message
 from info import Config
+from bot.utils.rate_limiter import TokenBuckets
+
+# Annotations only; the database layer imports this module and should not pull in pyrogram
+if TYPE_CHECKING:
+    from pyrogram import Client
+    from pyrogram.types import Message
 
 class SecurityManager:
     """Enhanced security management system"""
 
     def __init__(self):
-        self.rate_limits: Dict[str, Dict[str, float]] = {}
+        # MAX_REQUESTS_PER_MINUTE per (user, action); idle entries are evicted
+        self.rate_limits = TokenBuckets(Config.MAX_REQUESTS_PER_MINUTE / 60.0, Config.MAX_REQUESTS_PER_MINUTE, 'security')
         self.blocked_users: Dict[int, datetime] = {}
         self.failed_attempts: Dict[int, int] = {}
         self.active_sessions: Dict[int, str] = {}
@@ -40,26 +44,7 @@ class SecurityManager:
 
     def is_rate_limited(self, user_id: int, action: str = "default") -> bool:
         """Check if user is rate limited for specific action"""
-        key = f"{user_id}_{action}"
-        now = time.time()
-
-        if key not in self.rate_limits:
-            self.rate_limits[key] = {"count": 0, "reset_time": now + 60}
-            return False
-
-        rate_data = self.rate_limits[key]
-
-        # Reset counter if time window passed
-        if now >= rate_data["reset_time"]:
-            rate_data["count"] = 0
-            rate_data["reset_time"] = now + 60
-
-        # Check rate limit
-        if rate_data["count"] >= Config.MAX_REQUESTS_PER_MINUTE:
-            return True
-
-        rate_data["count"] += 1
-        return False
+        return not self.rate_limits.try_acquire((user_id, action))
 
     def block_user(self, user_id: int, duration_minutes: int = 60):
         """Block user for specified duration"""
@@ -120,7 +105,7 @@ security_manager = SecurityManager()
 def admin_required(func):
     """Decorator to require admin privileges"""
     @wraps(func)
-    async def wrapper(client: Client, message: Message, *args, **kwargs):
+    async def wrapper(client: "Client", message: "Message", *args, **kwargs):
         if not Config.is_admin(message.from_user.id):
             await message.reply("❌ Admin access required.")
             return
@@ -131,7 +116,7 @@ def rate_limit(action: str = "default"):
     """Decorator for rate limiting"""
     def decorator(func):
         @wraps(func)
-        async def wrapper(client: Client, message: Message, *args, **kwargs):
+        async def wrapper(client: "Client", message: "Message", *args, **kwargs):
             user_id = message.from_user.id
 
             if security_manager.is_blocked(user_id):
@@ -150,7 +135,7 @@ def validate_user_input(max_length: int = 1000):
     """Decorator to validate user input"""
     def decorator(func):
         @wraps(func)
-        async def wrapper(client: Client, message: Message, *args, **kwargs):
+        async def wrapper(client: "Client", message: "Message", *args, **kwargs):
             if message.text and len(message.text) > max_length:
                 await message.reply("❌ Input too long.")
                 return
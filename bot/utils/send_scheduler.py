@@ -0,0 +1,365 @@
+"""
+Outbound Telegram call scheduler, one per client
+
+Calls are queued by priority and released under a bot-wide token bucket and a
+per-chat bucket, so a broadcast or an indexing run on a clone cannot take the whole
+send budget from interactive users of the same clone. Bulk calls additionally draw
+from a smaller bucket, which leaves headroom for replies that do not go through the
+scheduler at all. Calls to one chat run one at a time and in priority order.
+
+FloodWait is handled here instead of at every call site: the chat (or the whole
+client, for calls without a chat) is held back for the requested time, the call is
+retried, and the client's rate is lowered until enough calls succeed again.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+from pyrogram.errors import FloodWait
+from info import Config
+from bot.logging import LOGGER
+from bot.utils.metrics import metrics
+from bot.utils.rate_limiter import TokenBuckets
+
+logger = LOGGER(__name__)
+
+INTERACTIVE = 0
+NORMAL = 1
+BULK = 2
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', NORMAL: 'normal', BULK: 'bulk'}
+
+send_queue_depth = metrics.gauge('send_queue_depth', 'Outbound calls waiting in a client scheduler', ('client', 'priority'))
+send_queue_wait = metrics.histogram('send_queue_wait_seconds', 'Time outbound calls spent queued', ('priority',))
+send_calls = metrics.counter('send_calls_total', 'Outbound calls released by the scheduler', ('priority', 'status'))
+
+_GLOBAL = 'global'
+
+
+class _Job:
+    __slots__ = ('priority', 'seq', 'call', 'chat_id', 'key', 'future', 'attempts', 'queued_at')
+
+    def __init__(self, priority, seq, call, chat_id, key, future):
+        self.priority = priority
+        self.seq = seq
+        self.call = call
+        self.chat_id = chat_id
+        self.key = key
+        self.future = future
+        self.attempts = 0
+        self.queued_at = time.monotonic()
+
+    def __lt__(self, other: '_Job') -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class SendScheduler:
+    """Priority queue of Telegram API calls for one client"""
+
+    def __init__(self, name: str,
+                 rate: float = 25.0,
+                 chat_rate: float = 1.0,
+                 chat_burst: float = 3.0,
+                 bulk_share: float = 0.8,
+                 max_retries: int = 3,
+                 max_flood_wait: float = 300.0,
+                 recover_after: int = 50):
+        self.name = name
+        self.base_rate = float(rate)
+        self.bulk_share = bulk_share
+        self.max_retries = max_retries
+        self.max_flood_wait = max_flood_wait
+        self.recover_after = recover_after
+        self.global_bucket = TokenBuckets(rate, max(1.0, rate), 'send_global')
+        self.bulk_bucket = TokenBuckets(rate * bulk_share, max(1.0, rate * bulk_share), 'send_bulk')
+        self.chats = TokenBuckets(chat_rate, chat_burst, 'send_chats')
+
+        self._ready: List[_Job] = []
+        self._delayed: List = []  # (ready_at, job)
+        self._parked: Dict[Hashable, deque] = {}  # chat -> jobs behind an in-flight call
+        self._busy = set()
+        self._keyed: Dict[Hashable, _Job] = {}
+        self._in_flight: Dict[asyncio.Task, _Job] = {}
+        self._seq = itertools.count()
+        self._depth = {priority: 0 for priority in PRIORITY_NAMES}
+        self._wakeup = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        self._closing = False
+        self._successes = 0
+        self.flood_waits = 0
+
+    @property
+    def rate(self) -> float:
+        return self.global_bucket.rate
+
+    def __len__(self):
+        return sum(self._depth.values())
+
+    # ==================== SUBMISSION ====================
+
+    def submit(self, call: Callable[[], Awaitable], chat_id: Hashable = None,
+               priority: int = NORMAL, key: Hashable = None) -> asyncio.Future:
+        """Queue ``call`` (a zero-argument coroutine factory, called again on retry)
+
+        Returns a future with the call's result. A call submitted with the ``key`` of
+        one still queued replaces it, and both callers get the newer call's result;
+        use it for progress edits where only the latest matters.
+        """
+        self._ensure_worker()
+        if key is not None and key in self._keyed:
+            job = self._keyed[key]
+            job.call = call
+            return job.future
+
+        job = _Job(priority, next(self._seq), call, chat_id, key,
+                   asyncio.get_running_loop().create_future())
+        if key is not None:
+            self._keyed[key] = job
+        self._depth[priority] += 1
+        self._update_depth(priority)
+        self._push(job)
+        return job.future
+
+    async def call(self, call: Callable[[], Awaitable], chat_id: Hashable = None,
+                   priority: int = NORMAL, key: Hashable = None) -> Any:
+        """Queue ``call`` and wait for its result"""
+        return await self.submit(call, chat_id, priority, key)
+
+    def post(self, call: Callable[[], Awaitable], chat_id: Hashable = None,
+             priority: int = NORMAL, key: Hashable = None):
+        """Queue ``call`` without waiting for it; failures are logged"""
+        self.submit(call, chat_id, priority, key).add_done_callback(self._log_failure)
+
+    def _log_failure(self, future: asyncio.Future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.debug(f"Scheduled call on {self.name} failed: {future.exception()}")
+
+    # ==================== DISPATCH ====================
+
+    def _push(self, job: _Job):
+        heapq.heappush(self._ready, job)
+        self._wakeup.set()
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._closing = False
+            self._wakeup = asyncio.Event()
+            self._worker = loop.create_task(self._run())
+
+    def _next_job(self, now: float):
+        """The next job allowed to run now, or (None, seconds until one might be)"""
+        while self._delayed and self._delayed[0][0] <= now:
+            heapq.heappush(self._ready, heapq.heappop(self._delayed)[1])
+
+        wait = self.global_bucket.wait_time(_GLOBAL, now=now)
+        if wait:
+            return None, wait
+
+        held = []
+        job = None
+        while self._ready:
+            candidate = heapq.heappop(self._ready)
+            if candidate.priority >= BULK:
+                wait = self.bulk_bucket.wait_time(_GLOBAL, now=now)
+                if wait:
+                    # Everything left is bulk as well
+                    held.append(candidate)
+                    break
+            chat_id = candidate.chat_id
+            if chat_id is not None:
+                if chat_id in self._busy:
+                    self._parked.setdefault(chat_id, deque()).append(candidate)
+                    continue
+                chat_wait = self.chats.wait_time(chat_id, now=now)
+                if chat_wait:
+                    heapq.heappush(self._delayed, (now + chat_wait, candidate))
+                    continue
+            job = candidate
+            break
+
+        for candidate in held:
+            heapq.heappush(self._ready, candidate)
+        if job is not None:
+            self.global_bucket.take(_GLOBAL, now=now)
+            if job.priority >= BULK:
+                self.bulk_bucket.take(_GLOBAL, now=now)
+            if job.chat_id is not None:
+                self.chats.take(job.chat_id, now=now)
+            return job, 0.0
+
+        waits = [wait] if held else []
+        if self._delayed:
+            waits.append(self._delayed[0][0] - now)
+        return None, (min(waits) if waits else None)
+
+    async def _run(self):
+        # Checked as well as cancelling: wait_for can swallow a cancel that races the wakeup
+        while not self._closing:
+            job, wait = self._next_job(time.monotonic())
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._dispatch(job)
+
+    def _dispatch(self, job: _Job):
+        if job.key is not None and self._keyed.get(job.key) is job:
+            del self._keyed[job.key]
+        if job.chat_id is not None:
+            self._busy.add(job.chat_id)
+        if job.attempts == 0:
+            send_queue_wait.observe(time.monotonic() - job.queued_at, priority=PRIORITY_NAMES[job.priority])
+        task = asyncio.create_task(self._execute(job))
+        self._in_flight[task] = job
+        task.add_done_callback(lambda done: self._in_flight.pop(done, None))
+
+    async def _execute(self, job: _Job):
+        priority = PRIORITY_NAMES[job.priority]
+        retry = False
+        try:
+            if job.future.done():
+                return
+            try:
+                result = await job.call()
+            except FloodWait as e:
+                seconds = float(getattr(e, 'value', 0) or 0)
+                self._on_flood_wait(job.chat_id, seconds)
+                if job.attempts < self.max_retries and seconds <= self.max_flood_wait:
+                    job.attempts += 1
+                    retry = True
+                    send_calls.inc(priority=priority, status='retried')
+                    return
+                send_calls.inc(priority=priority, status='flood_wait')
+                job.future.set_exception(e)
+            except Exception as e:
+                send_calls.inc(priority=priority, status='error')
+                job.future.set_exception(e)
+            else:
+                send_calls.inc(priority=priority, status='ok')
+                self._on_success()
+                job.future.set_result(result)
+        finally:
+            if not retry:
+                self._depth[job.priority] -= 1
+                self._update_depth(job.priority)
+            if job.chat_id is not None:
+                self._busy.discard(job.chat_id)
+                for parked in self._parked.pop(job.chat_id, ()):
+                    heapq.heappush(self._ready, parked)
+            if retry:
+                self._push(job)
+            self._wakeup.set()
+
+    # ==================== FLOODWAIT LEARNING ====================
+
+    def _on_flood_wait(self, chat_id: Hashable, seconds: float):
+        self.flood_waits += 1
+        self._successes = 0
+        if chat_id is not None:
+            self.chats.penalize(chat_id, seconds)
+        else:
+            self.global_bucket.penalize(_GLOBAL, seconds)
+            self.bulk_bucket.penalize(_GLOBAL, seconds)
+        self._set_rate(max(1.0, self.rate * 0.75))
+        logger.warning(f"⚠️ FloodWait {seconds:.0f}s on {self.name}"
+                       f"{f' for chat {chat_id}' if chat_id is not None else ''}; "
+                       f"send rate now {self.rate:.1f}/s")
+
+    def _on_success(self):
+        if self.rate >= self.base_rate:
+            return
+        self._successes += 1
+        if self._successes >= self.recover_after:
+            self._successes = 0
+            self._set_rate(min(self.base_rate, self.rate + self.base_rate * 0.1))
+
+    def _set_rate(self, rate: float):
+        self.global_bucket.rate = rate
+        self.bulk_bucket.rate = rate * self.bulk_share
+
+    def _update_depth(self, priority: int):
+        send_queue_depth.set(self._depth[priority], client=self.name, priority=PRIORITY_NAMES[priority])
+
+    # ==================== LIFECYCLE ====================
+
+    async def close(self):
+        """Stop the worker and cancel everything still queued or running"""
+        if self._worker is not None:
+            self._closing = True
+            self._worker.cancel()
+            try:
+                await self._worker
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._worker = None
+
+        jobs = list(self._ready) + [job for _, job in self._delayed]
+        jobs += [job for queue in self._parked.values() for job in queue]
+        for job in jobs:
+            if not job.future.done():
+                job.future.cancel()
+        # A task cancelled before it starts never runs _execute, so resolve its caller here
+        for task, job in list(self._in_flight.items()):
+            task.cancel()
+            if not job.future.done():
+                job.future.cancel()
+        self._ready.clear()
+        self._delayed.clear()
+        self._parked.clear()
+        self._keyed.clear()
+        self._busy.clear()
+        for priority in self._depth:
+            self._depth[priority] = 0
+            self._update_depth(priority)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'queued': {PRIORITY_NAMES[p]: depth for p, depth in self._depth.items()},
+            'in_flight': len(self._in_flight),
+            'rate': round(self.rate, 2),
+            'base_rate': self.base_rate,
+            'flood_waits': self.flood_waits,
+        }
+
+
+_schedulers: Dict[str, SendScheduler] = {}
+
+
+def _client_name(client) -> str:
+    return getattr(client, 'name', None) or 'default'
+
+
+def scheduler_for(client) -> SendScheduler:
+    """The send scheduler of ``client``, created on first use"""
+    name = _client_name(client)
+    scheduler = _schedulers.get(name)
+    if scheduler is None:
+        scheduler = _schedulers[name] = SendScheduler(
+            name,
+            rate=Config.SEND_RATE_PER_SECOND,
+            chat_rate=Config.SEND_CHAT_RATE_PER_SECOND,
+            bulk_share=Config.SEND_BULK_SHARE,
+        )
+    return scheduler
+
+
+async def send(client, call: Callable[[], Awaitable], chat_id: Hashable = None,
+               priority: int = NORMAL, key: Hashable = None) -> Any:
+    """Run ``call`` through ``client``'s scheduler and return its result"""
+    return await scheduler_for(client).call(call, chat_id, priority, key)
+
+
+async def close_scheduler(client):
+    """Drop ``client``'s scheduler, cancelling calls still queued for it"""
+    scheduler = _schedulers.pop(_client_name(client), None)
+    if scheduler is not None:
+        await scheduler.close()
+
+
+def get_scheduler_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: scheduler.stats() for name, scheduler in _schedulers.items()}
@@ -5,7 +5,7 @@ import os
 import time
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
-from bot.logging import LOGGER
+from bot.logging import LOGGER, debug_print
 
 logger = LOGGER(__name__)
 
@@ -18,9 +18,9 @@ user_sessions: Dict[int, Dict[str, Any]] = {}
 async def create_session(user_id: int, session_type: str, data: dict = None) -> bool:
     """Create a new session for a user"""
     try:
-        print(f"🎬 DEBUG SESSION: Creating session for user {user_id}")
-        print(f"📋 DEBUG SESSION: Session type: {session_type}")
-        print(f"📊 DEBUG SESSION: Session data keys: {list(data.keys()) if data else 'None'}")
+        debug_print(f"🎬 DEBUG SESSION: Creating session for user {user_id}")
+        debug_print(f"📋 DEBUG SESSION: Session type: {session_type}")
+        debug_print(f"📊 DEBUG SESSION: Session data keys: {list(data.keys()) if data else 'None'}")
 
         session_data = {
             'user_id': user_id,
@@ -34,74 +34,71 @@ async def create_session(user_id: int, session_type: str, data: dict = None) ->
         # Store in memory
         user_sessions[user_id] = session_data
 
-        print(f"✅ DEBUG SESSION: Session created successfully for user {user_id}")
-        print(f"⏰ DEBUG SESSION: Expires at: {session_data['expires_at']}")
+        debug_print(f"✅ DEBUG SESSION: Session created successfully for user {user_id}")
+        debug_print(f"⏰ DEBUG SESSION: Expires at: {session_data['expires_at']}")
         logger.info(f"Created session for user {user_id}")
         return True
 
     except Exception as e:
-        print(f"❌ DEBUG SESSION: Error creating session for user {user_id}: {e}")
         logger.error(f"Error creating session for user {user_id}: {e}")
         return False
 
 async def get_session(user_id: int) -> dict:
     """Get session data for a user"""
     try:
-        print(f"🔍 DEBUG SESSION: Getting session for user {user_id}")
+        debug_print(f"🔍 DEBUG SESSION: Getting session for user {user_id}")
         session = user_sessions.get(user_id)
 
         if not session:
-            print(f"❌ DEBUG SESSION: No session found for user {user_id}")
+            debug_print(f"❌ DEBUG SESSION: No session found for user {user_id}")
             return None
 
-        print(f"📋 DEBUG SESSION: Session found for user {user_id}, type: {session.get('type', 'unknown')}")
-        print(f"⏰ DEBUG SESSION: Session expires at: {session.get('expires_at', 'unknown')}")
+        debug_print(f"📋 DEBUG SESSION: Session found for user {user_id}, type: {session.get('type', 'unknown')}")
+        debug_print(f"⏰ DEBUG SESSION: Session expires at: {session.get('expires_at', 'unknown')}")
 
         # Check if session has expired
         if datetime.now() > session['expires_at']:
-            print(f"⏰ DEBUG SESSION: Session expired for user {user_id}, clearing...")
+            debug_print(f"⏰ DEBUG SESSION: Session expired for user {user_id}, clearing...")
             await clear_session(user_id)
             return None
 
-        print(f"✅ DEBUG SESSION: Valid session retrieved for user {user_id}")
+        debug_print(f"✅ DEBUG SESSION: Valid session retrieved for user {user_id}")
         return session
 
     except Exception as e:
-        print(f"❌ DEBUG SESSION: Error getting session for user {user_id}: {e}")
         logger.error(f"Error getting session for user {user_id}: {e}")
         return None
 
 async def clear_session(user_id: int) -> bool:
     """Clear session data for a user"""
     try:
-        print(f"🧹 DEBUG SESSION: Clearing session for user {user_id}")
+        debug_print(f"🧹 DEBUG SESSION: Clearing session for user {user_id}")
         if user_id in user_sessions:
             del user_sessions[user_id]
-            print(f"✅ DEBUG SESSION: Session cleared for user {user_id}")
+            debug_print(f"✅ DEBUG SESSION: Session cleared for user {user_id}")
             logger.info(f"Cleared session for user {user_id}")
             return True
-        print(f"❌ DEBUG SESSION: No session found to clear for user {user_id}")
+        debug_print(f"❌ DEBUG SESSION: No session found to clear for user {user_id}")
         return False
     except Exception as e:
-        print(f"❌ DEBUG SESSION: Error clearing session for user {user_id}: {e}")
         logger.error(f"Error clearing session for user {user_id}: {e}")
         return False
 
 async def session_expired(user_id: int) -> bool:
     """Check if user's session has expired"""
     try:
-        print(f"⏰ DEBUG SESSION: Checking if session expired for user {user_id}")
+        debug_print(f"⏰ DEBUG SESSION: Checking if session expired for user {user_id}")
         session = user_sessions.get(user_id)
 
         if not session:
-            print(f"❌ DEBUG SESSION: No session found for user {user_id} - considered expired")
+            debug_print(f"❌ DEBUG SESSION: No session found for user {user_id} - considered expired")
             return True
 
         current_time = datetime.now()
         expires_at = session.get('expires_at')
 
         if not expires_at:
-            print(f"❌ DEBUG SESSION: No expiry time found for user {user_id} - considered expired")
+            debug_print(f"❌ DEBUG SESSION: No expiry time found for user {user_id} - considered expired")
             # Clean up corrupted session
             await clear_session(user_id)
             return True
@@ -112,20 +109,16 @@ async def session_expired(user_id: int) -> bool:
 
         is_expired = current_time > expires_at
 
-        print(f"📊 DEBUG SESSION: User {user_id} session status:")
-        print(f"   Current time: {current_time}")
-        print(f"   Expires at: {expires_at}")
-        print(f"   Is expired: {is_expired}")
+        debug_print(f"📊 DEBUG SESSION: User {user_id} session status: now={current_time} expires_at={expires_at} expired={is_expired}")
 
         # Auto-cleanup expired sessions
         if is_expired:
-            print(f"🧹 DEBUG SESSION: Auto-cleaning expired session for user {user_id}")
+            debug_print(f"🧹 DEBUG SESSION: Auto-cleaning expired session for user {user_id}")
             await clear_session(user_id)
 
         return is_expired
 
     except Exception as e:
-        print(f"❌ DEBUG SESSION: Error checking session expiry for user {user_id}: {e}")
         logger.error(f"Error checking session expiry for user {user_id}: {e}")
         # Clear problematic session
         await clear_session(user_id)
@@ -134,7 +127,7 @@ async def session_expired(user_id: int) -> bool:
 async def update_session_activity(user_id: int) -> bool:
     """Update last activity timestamp for a session"""
     try:
-        print(f"🔄 DEBUG SESSION: Updating session activity for user {user_id}")
+        debug_print(f"🔄 DEBUG SESSION: Updating session activity for user {user_id}")
         session = user_sessions.get(user_id)
 
         if session:
@@ -143,15 +136,13 @@ async def update_session_activity(user_id: int) -> bool:
             # Extend session by 2 more hours from current activity
             session['expires_at'] = current_time + SESSION_TIMEOUT
 
-            print(f"✅ DEBUG SESSION: Session activity updated for user {user_id}")
-            print(f"   New expiry: {session['expires_at']}")
+            debug_print(f"✅ DEBUG SESSION: Session activity updated for user {user_id}, new expiry: {session['expires_at']}")
             return True
 
-        print(f"❌ DEBUG SESSION: No session to update for user {user_id}")
+        debug_print(f"❌ DEBUG SESSION: No session to update for user {user_id}")
         return False
 
     except Exception as e:
-        print(f"❌ DEBUG SESSION: Error updating session activity for user {user_id}: {e}")
         logger.error(f"Error updating session activity for user {user_id}: {e}")
         return False
 
@@ -178,7 +169,7 @@ def cleanup_expired_sessions() -> int:
             expired_user_ids.append(user_id)
 
     for user_id in expired_user_ids:
-        print(f"🧹 DEBUG SESSION: Auto-cleaning expired session for user {user_id}")
+        debug_print(f"🧹 DEBUG SESSION: Auto-cleaning expired session for user {user_id}")
         try:
             del user_sessions[user_id]
         except KeyError:
@@ -190,13 +181,13 @@ def cleanup_expired_sessions() -> int:
 
 def get_all_sessions() -> Dict[int, Dict[str, Any]]:
     """Get all active sessions (for debugging)"""
-    print(f"ℹ️ DEBUG SESSION: Retrieving all active sessions ({len(user_sessions)} total)")
+    debug_print(f"ℹ️ DEBUG SESSION: Retrieving all active sessions ({len(user_sessions)} total)")
     return user_sessions.copy()
 
 def get_session_count() -> int:
     """Get total number of active sessions"""
     count = len(user_sessions)
-    print(f"📊 DEBUG SESSION: Current active session count: {count}")
+    debug_print(f"📊 DEBUG SESSION: Current active session count: {count}")
     return count
 
 async def get_sessions_by_type(session_type: str) -> Dict[int, Dict[str, Any]]:
@@ -206,7 +197,7 @@ async def get_sessions_by_type(session_type: str) -> Dict[int, Dict[str, Any]]:
         for user_id, session in user_sessions.items():
             if session.get('type') == session_type:
                 filtered_sessions[user_id] = session
-        print(f"🔍 DEBUG SESSION: Found {len(filtered_sessions)} sessions of type '{session_type}'")
+        debug_print(f"🔍 DEBUG SESSION: Found {len(filtered_sessions)} sessions of type '{session_type}'")
         return filtered_sessions
     except Exception as e:
         logger.error(f"Error getting sessions by type {session_type}: {e}")
@@ -222,9 +213,9 @@ async def update_session(user_id: int, session_data: dict) -> bool:
         if user_id in user_sessions:
             user_sessions[user_id].update(session_data)
             await update_session_activity(user_id)
-            print(f"✅ DEBUG SESSION: Session updated for user {user_id}")
+            debug_print(f"✅ DEBUG SESSION: Session updated for user {user_id}")
             return True
-        print(f"❌ DEBUG SESSION: No session found to update for user {user_id}")
+        debug_print(f"❌ DEBUG SESSION: No session found to update for user {user_id}")
         return False
     except Exception as e:
         logger.error(f"Error updating session for user {user_id}: {e}")
@@ -0,0 +1,156 @@
+import asyncio
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+from pyrogram.storage import MemoryStorage
+from bot.database import session_db
+from bot.logging import LOGGER
+
+logger = LOGGER(__name__)
+
+SESSION_FIELDS = ('dc_id', 'api_id', 'test_mode', 'auth_key', 'date', 'user_id', 'is_bot')
+
+
+class CloneSessionStorage(MemoryStorage):
+    """Pyrogram session kept in memory and persisted to MongoDB
+
+    Lookups are served by pyrogram's in-memory SQLite tables. The auth key and session
+    fields are written back right after they change, so a restarted clone (on this host
+    or another) resumes without signing in again. Peer-cache updates are coalesced per
+    peer and written in one bulk upsert every ``flush_interval`` seconds; peers whose
+    data did not change are never rewritten.
+    """
+
+    def __init__(self, name: str, flush_interval: float = 5.0):
+        super().__init__(name)
+        self.flush_interval = flush_interval
+        self._persisted_peers: Dict[int, Tuple] = {}
+        self._dirty_peers: Dict[int, Tuple] = {}
+        self._session_dirty = False
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self.restored = False
+
+    async def open(self):
+        await super().open()
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        try:
+            await self._restore()
+        except Exception as e:
+            # A fresh session still works; the client just signs in again
+            logger.error(f"❌ Could not restore session {self.name}: {e}")
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _restore(self):
+        session = await session_db.load_session(self.name)
+        if session and session.get('auth_key'):
+            with self.conn:
+                self.conn.execute(
+                    f"UPDATE sessions SET {', '.join(f'{field} = ?' for field in SESSION_FIELDS)}",
+                    tuple(session.get(field) for field in SESSION_FIELDS)
+                )
+                self.conn.executemany(
+                    "REPLACE INTO update_state (id, pts, qts, date, seq) VALUES (?, ?, ?, ?, ?)",
+                    [tuple(state) for state in session.get('update_state', [])]
+                )
+            self.restored = True
+
+        peers = await session_db.load_peers(self.name)
+        with self.conn:
+            self.conn.executemany(
+                "REPLACE INTO peers (id, access_hash, type, username, phone_number, last_update_on) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [peer + (seen_at,) for peer, seen_at in peers]
+            )
+        self._persisted_peers = {peer[0]: peer for peer, _ in peers}
+        logger.info(f"🔑 Session {self.name}: {'restored' if self.restored else 'new'}, {len(peers)} cached peers")
+
+    def _set(self, value):
+        # Same as SQLiteStorage._set, minus inspect.stack(), which reads source files on every call
+        attr = sys._getframe(2).f_code.co_name
+        with self.conn:
+            self.conn.execute(f"UPDATE sessions SET {attr} = ?", (value,))
+        self._mark_session_dirty()
+
+    def _mark_session_dirty(self):
+        self._session_dirty = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def update_state(self, value=object):
+        result = await super().update_state(value)
+        if value != object:
+            self._mark_session_dirty()
+        return result
+
+    async def update_peers(self, peers: List[Tuple]):
+        await super().update_peers(peers)
+        for peer in peers:
+            peer = tuple(peer)
+            if self._persisted_peers.get(peer[0]) != peer:
+                self._dirty_peers[peer[0]] = peer
+        if self._dirty_peers and self._wakeup is not None:
+            self._wakeup.set()
+
+    def _session_document(self) -> Dict:
+        row = self.conn.execute(f"SELECT {', '.join(SESSION_FIELDS)} FROM sessions").fetchone()
+        session = dict(zip(SESSION_FIELDS, row))
+        session['update_state'] = [list(state) for state in self.conn.execute(
+            "SELECT id, pts, qts, date, seq FROM update_state").fetchall()]
+        return session
+
+    async def flush(self):
+        """Write pending session and peer changes to MongoDB"""
+        if self._flush_lock is None:
+            return
+        async with self._flush_lock:
+            session_dirty, self._session_dirty = self._session_dirty, False
+            peers, self._dirty_peers = self._dirty_peers, {}
+            try:
+                if session_dirty:
+                    await session_db.save_session(self.name, self._session_document())
+                if peers:
+                    await session_db.write_peers(self.name, peers.values(), int(time.time()))
+                    self._persisted_peers.update(peers)
+            except Exception as e:
+                logger.error(f"❌ Error persisting session {self.name}: {e}")
+                # Keep the changes for the next flush; newer peer data wins
+                self._session_dirty = self._session_dirty or session_dirty
+                self._dirty_peers = {**peers, **self._dirty_peers}
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await self._wakeup.wait()
+                # Auth changes go out at once; peer updates are batched
+                if not self._session_dirty:
+                    await asyncio.sleep(self.flush_interval)
+                self._wakeup.clear()
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Error in session flush loop for {self.name}: {e}")
+                await asyncio.sleep(self.flush_interval)
+
+    async def save(self):
+        await super().save()
+        await self.flush()
+
+    async def close(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+        await super().close()
+
+    async def delete(self):
+        self._session_dirty = False
+        self._dirty_peers.clear()
+        await session_db.delete_session(self.name)
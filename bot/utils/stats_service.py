@@ -0,0 +1,145 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, Optional
+from info import Config
+from bot.logging import LOGGER
+
+logger = LOGGER(__name__)
+
+EMPTY_STATS = {
+    'total_clones': 0,
+    'active_clones': 0,
+    'pending_clones': 0,
+    'deactivated_clones': 0,
+    'inactive_clones': 0,
+    'clones_by_status': {},
+    'total_subscriptions': 0,
+    'active_subscriptions': 0,
+    'pending_subscriptions': 0,
+    'expired_subscriptions': 0,
+    'total_revenue': 0,
+    'total_users': 0,
+    'total_files': 0,
+    'computed_at': None,
+}
+
+
+class StatsService:
+    """Global counters for admin panels and the dashboard, computed once and shared
+
+    Each collection is read with a single aggregation (or its metadata count). Results
+    are fresh for ``ttl`` seconds; after that callers get the cached value immediately
+    while one background refresh runs, until the value is ``max_stale`` seconds old.
+
+    Refreshes always run on the loop that first used the service (the bots' loop), so the
+    web dashboard's per-request loops reuse its result instead of hitting the database.
+    """
+
+    def __init__(self, ttl: float = 30, max_stale: float = 600):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._value: Optional[Dict] = None
+        self._computed_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._home_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def age(self) -> Optional[float]:
+        return None if self._computed_at is None else time.monotonic() - self._computed_at
+
+    def invalidate(self):
+        """Force the next get() to recompute"""
+        self._computed_at = None
+
+    async def get(self, allow_stale: bool = True) -> Dict:
+        """Cached global statistics; ``stale`` is True when a refresh is still pending"""
+        age = self.age()
+        if self._value is not None and age is not None:
+            if age < self.ttl:
+                return dict(self._value, stale=False)
+            # Without a running home loop there is nowhere to refresh in the background
+            # (a per-request loop closes as soon as the request ends), so compute inline
+            if allow_stale and age < self.max_stale and self._home_running():
+                self._refresh_in_background()
+                return dict(self._value, stale=True)
+        return dict(await self.refresh(), stale=False)
+
+    def _home_running(self) -> bool:
+        home = self._home_loop
+        return home is not None and not home.is_closed() and home.is_running()
+
+    async def refresh(self) -> Dict:
+        """Recompute now, sharing any refresh already in flight"""
+        loop = asyncio.get_running_loop()
+        if not self._home_running():
+            self._home_loop = loop
+        home = self._home_loop
+        if home is not loop:
+            return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self.refresh(), home))
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._compute())
+        return await asyncio.shield(self._task)
+
+    def _refresh_in_background(self):
+        """Start one refresh on the home loop (callers check that it is running)"""
+        home = self._home_loop
+
+        def start():
+            if self._task is None or self._task.done():
+                self._task = home.create_task(self._compute())
+
+        try:
+            if asyncio.get_running_loop() is home:
+                start()
+                return
+        except RuntimeError:
+            pass
+        home.call_soon_threadsafe(start)
+
+    async def _compute(self) -> Dict:
+        from bot.database.clone_db import aggregate_clone_status_counts
+        from bot.database.subscription_db import aggregate_subscription_status
+        from bot.database.users import user_data
+        from bot.database.mongo_db import collection as files_collection
+
+        started = time.perf_counter()
+        try:
+            clones, subscriptions, users, files = await asyncio.gather(
+                aggregate_clone_status_counts(),
+                aggregate_subscription_status(),
+                user_data.estimated_document_count(),
+                files_collection.estimated_document_count()
+            )
+        except Exception as e:
+            logger.error(f"❌ Error computing global stats: {e}")
+            # Keep serving the last good value rather than zeros
+            return self._value if self._value is not None else dict(EMPTY_STATS)
+
+        total_clones = sum(clones.values())
+
+        def subscription_count(status):
+            return subscriptions.get(status, {}).get('count', 0)
+
+        self._value = {
+            'total_clones': total_clones,
+            'active_clones': clones.get('active', 0),
+            'pending_clones': clones.get('pending_payment', 0),
+            'deactivated_clones': clones.get('deactivated', 0),
+            'inactive_clones': total_clones - clones.get('active', 0),
+            'clones_by_status': clones,
+            'total_subscriptions': sum(row['count'] for row in subscriptions.values()),
+            'active_subscriptions': subscription_count('active'),
+            'pending_subscriptions': subscription_count('pending_payment'),
+            'expired_subscriptions': subscription_count('expired'),
+            'total_revenue': sum(row['revenue'] for row in subscriptions.values()),
+            'total_users': users,
+            'total_files': files,
+            'computed_at': datetime.now(),
+        }
+        self._computed_at = time.monotonic()
+        logger.debug(f"📊 Global stats refreshed in {(time.perf_counter() - started) * 1000:.1f}ms")
+        return self._value
+
+
+# Global stats service instance
+stats_service = StatsService(ttl=Config.STATS_CACHE_TTL, max_stale=Config.STATS_MAX_STALE)
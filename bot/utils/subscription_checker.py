@@ -15,14 +15,10 @@ class SubscriptionChecker:
 
     async def start_monitoring(self):
         """Start subscription monitoring"""
+        # Transitions fire at their deadlines instead of on an hourly sweep
+        from bot.utils.subscription_scheduler import lifecycle_scheduler
         logger.info("🔄 Starting subscription monitoring...")
-        while True:
-            try:
-                await self.check_subscriptions()
-                await asyncio.sleep(self.check_interval)
-            except Exception as e:
-                logger.error(f"❌ Error in subscription monitoring: {e}")
-                await asyncio.sleep(300)  # Wait 5 minutes on error
+        await lifecycle_scheduler.run()
 
     async def check_subscriptions(self):
         """Check for expired subscriptions and activate pending ones"""
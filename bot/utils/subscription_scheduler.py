@@ -0,0 +1,269 @@
+import asyncio
+import heapq
+import itertools
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from bot.database.clone_db import clones_collection
+from bot.database.subscription_db import subscriptions_collection
+from bot.core.events.base import event_bus
+from bot.core.events.clone_events import SubscriptionExpiredEvent
+from bot.logging import LOGGER
+
+logger = LOGGER(__name__)
+
+EXPIRE = 'expire'
+ACTIVATE = 'activate'
+
+# Pending clones whose start fails are retried this often, this many times
+ACTIVATION_RETRY_DELAY = 300
+ACTIVATION_MAX_ATTEMPTS = 12
+START_CONCURRENCY = 5
+
+
+def subscription_expiry(subscription: dict) -> Optional[datetime]:
+    """Expiry of a subscription document (``expiry_date`` is the legacy field)"""
+    expires_at = subscription.get('expires_at') or subscription.get('expiry_date')
+    return expires_at if isinstance(expires_at, datetime) else None
+
+
+class LifecycleScheduler:
+    """Fires subscription expiry and pending-clone activation at their deadlines
+
+    Deadlines sit in a min-heap keyed by time. The heap is loaded once from the database
+    and then kept current by subscription_db as subscriptions are created, extended or
+    activated, so nothing polls the collections. Re-scheduling a clone leaves its old
+    heap entry behind; entries that no longer match ``_deadlines`` are skipped when popped.
+    """
+
+    def __init__(self,
+                 start_clone: Optional[Callable[[str], Awaitable]] = None,
+                 stop_clone: Optional[Callable[[str], Awaitable]] = None):
+        self._heap: List[Tuple[datetime, int, str, str]] = []
+        self._deadlines: Dict[Tuple[str, str], datetime] = {}
+        self._attempts: Dict[str, int] = {}
+        self._counter = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._start_clone = start_clone
+        self._stop_clone = stop_clone
+        self.running = False
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def next_deadline(self) -> Optional[datetime]:
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def _push(self, bot_id: str, kind: str, when: datetime):
+        self._deadlines[(bot_id, kind)] = when
+        heapq.heappush(self._heap, (when, next(self._counter), bot_id, kind))
+        if self._wakeup is not None and self._heap[0][2:] == (bot_id, kind):
+            self._wakeup.set()
+
+    def _discard_stale(self):
+        while self._heap:
+            when, _, bot_id, kind = self._heap[0]
+            if self._deadlines.get((bot_id, kind)) == when:
+                return
+            heapq.heappop(self._heap)
+
+    def schedule_expiry(self, bot_id: str, expires_at: Optional[datetime]):
+        """Set (or move) the time an active subscription expires"""
+        if expires_at is None:
+            self.cancel(bot_id, EXPIRE)
+        else:
+            self._push(str(bot_id), EXPIRE, expires_at)
+
+    def schedule_activation(self, bot_id: str, delay: float = 0):
+        """Start a clone waiting on its subscription after ``delay`` seconds"""
+        self._push(str(bot_id), ACTIVATE, datetime.now() + timedelta(seconds=delay))
+
+    def cancel(self, bot_id: str, kind: Optional[str] = None):
+        for key in [(str(bot_id), kind)] if kind else [(str(bot_id), EXPIRE), (str(bot_id), ACTIVATE)]:
+            self._deadlines.pop(key, None)
+
+    def subscription_changed(self, bot_id: str, subscription: Optional[dict]):
+        """Called by subscription_db after any write to a subscription"""
+        if not subscription or subscription.get('status') != 'active':
+            self.cancel(bot_id)
+            return
+        self.schedule_expiry(bot_id, subscription_expiry(subscription))
+        self._attempts.pop(str(bot_id), None)
+        self.schedule_activation(bot_id)
+
+    def pop_due(self, now: Optional[datetime] = None) -> Dict[str, List[str]]:
+        """Remove and return every transition due at ``now``, grouped by kind"""
+        now = now or datetime.now()
+        due = {EXPIRE: [], ACTIVATE: []}
+        while self._heap:
+            self._discard_stale()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            _, _, bot_id, kind = heapq.heappop(self._heap)
+            del self._deadlines[(bot_id, kind)]
+            due[kind].append(bot_id)
+        return due
+
+    async def load(self):
+        """Rebuild the heap from the database with one join per side"""
+        self._heap.clear()
+        self._deadlines.clear()
+
+        # Active subscriptions and the state of their clone
+        active = subscriptions_collection.aggregate([
+            {'$match': {'status': 'active'}},
+            {'$lookup': {'from': clones_collection.name, 'localField': '_id',
+                         'foreignField': '_id', 'as': 'clone'}},
+            {'$project': {'expires_at': 1, 'expiry_date': 1,
+                          'clone_status': {'$arrayElemAt': ['$clone.status', 0]}}}
+        ])
+        expiring = pending = 0
+        async for subscription in active:
+            expires_at = subscription_expiry(subscription)
+            if expires_at:
+                self.schedule_expiry(subscription['_id'], expires_at)
+                expiring += 1
+            if subscription.get('clone_status') == 'pending_subscription':
+                self.schedule_activation(subscription['_id'])
+                pending += 1
+
+        # Pending clones whose subscription is gone for good
+        dead = clones_collection.aggregate([
+            {'$match': {'status': 'pending_subscription'}},
+            {'$lookup': {'from': subscriptions_collection.name, 'localField': '_id',
+                         'foreignField': '_id', 'as': 'subscription'}},
+            {'$match': {'subscription.status': {'$in': ['expired', 'cancelled']}}},
+            {'$project': {'_id': 1}}
+        ])
+        dead_ids = [clone['_id'] async for clone in dead]
+        if dead_ids:
+            await self._mark_clones(dead_ids, 'subscription_inactive')
+
+        logger.info(f"📅 Lifecycle scheduler loaded {expiring} expiries and {pending} pending activations")
+
+    async def run(self):
+        """Sleep until the next deadline, apply everything due, repeat"""
+        if self.running:
+            return
+        self.running = True
+        self._wakeup = asyncio.Event()
+        try:
+            await self.load()
+            while True:
+                try:
+                    await self.fire_due()
+                    self._wakeup.clear()
+                    next_deadline = self.next_deadline()
+                    timeout = None
+                    if next_deadline is not None:
+                        timeout = max(0.0, (next_deadline - datetime.now()).total_seconds())
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"❌ Error in lifecycle scheduler: {e}", exc_info=True)
+                    await asyncio.sleep(30)
+        finally:
+            self.running = False
+            self._wakeup = None
+
+    async def fire_due(self, now: Optional[datetime] = None):
+        due = self.pop_due(now)
+        if due[EXPIRE]:
+            await self._expire(due[EXPIRE])
+        if due[ACTIVATE]:
+            await self._activate(due[ACTIVATE])
+
+    async def _expire(self, bot_ids: List[str]):
+        now = datetime.now()
+        # An extension may have landed after the entry was queued; trust the stored expiry
+        expired, owners = [], {}
+        async for subscription in subscriptions_collection.find(
+                {'_id': {'$in': bot_ids}, 'status': 'active'},
+                {'expires_at': 1, 'expiry_date': 1, 'user_id': 1, 'admin_id': 1}):
+            expires_at = subscription_expiry(subscription)
+            if expires_at and expires_at > now:
+                self.schedule_expiry(subscription['_id'], expires_at)
+            else:
+                expired.append(subscription['_id'])
+                owners[subscription['_id']] = subscription.get('user_id') or subscription.get('admin_id')
+        if not expired:
+            return
+
+        await subscriptions_collection.update_many(
+            {'_id': {'$in': expired}},
+            {'$set': {'status': 'expired', 'expired_at': now}}
+        )
+        await clones_collection.update_many(
+            {'_id': {'$in': expired}},
+            {'$set': {'status': 'deactivated', 'deactivated_at': now}}
+        )
+        for bot_id in expired:
+            self.cancel(bot_id, ACTIVATE)
+            event_bus.publish_sync(SubscriptionExpiredEvent(bot_id, owners.get(bot_id)))
+        logger.info(f"⏰ Expired {len(expired)} subscriptions: {', '.join(map(str, expired))}")
+
+        stop_clone = self._stop_clone or self._default_stop_clone
+        results = await asyncio.gather(*(stop_clone(bot_id) for bot_id in expired), return_exceptions=True)
+        for bot_id, result in zip(expired, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Error stopping expired clone {bot_id}: {result}")
+
+    async def _activate(self, bot_ids: List[str]):
+        # Only clones still waiting on their subscription are started
+        waiting = [clone['_id'] async for clone in clones_collection.find(
+            {'_id': {'$in': bot_ids}, 'status': 'pending_subscription'}, {'_id': 1})]
+        if not waiting:
+            return
+
+        start_clone = self._start_clone or self._default_start_clone
+        semaphore = asyncio.Semaphore(START_CONCURRENCY)
+
+        async def start(bot_id):
+            async with semaphore:
+                return await start_clone(bot_id)
+
+        results = await asyncio.gather(*(start(bot_id) for bot_id in waiting), return_exceptions=True)
+        timed_out = []
+        for bot_id, result in zip(waiting, results):
+            success = not isinstance(result, Exception) and (result[0] if isinstance(result, tuple) else bool(result))
+            if success:
+                self._attempts.pop(bot_id, None)
+                logger.info(f"✅ Started pending clone {bot_id}")
+                continue
+            attempts = self._attempts.get(bot_id, 0) + 1
+            if attempts >= ACTIVATION_MAX_ATTEMPTS:
+                self._attempts.pop(bot_id, None)
+                timed_out.append(bot_id)
+            else:
+                self._attempts[bot_id] = attempts
+                self.schedule_activation(bot_id, ACTIVATION_RETRY_DELAY)
+                logger.warning(f"⚠️ Failed to start pending clone {bot_id} "
+                               f"(attempt {attempts}/{ACTIVATION_MAX_ATTEMPTS}): {result}")
+        if timed_out:
+            logger.error(f"⚠️ Giving up on pending clones after {ACTIVATION_MAX_ATTEMPTS} attempts: {timed_out}")
+            await self._mark_clones(timed_out, 'pending_timeout', field='last_check')
+
+    async def _mark_clones(self, bot_ids: Iterable[str], status: str, field: str = 'updated_at'):
+        await clones_collection.update_many(
+            {'_id': {'$in': list(bot_ids)}},
+            {'$set': {'status': status, field: datetime.now()}}
+        )
+
+    @staticmethod
+    async def _default_start_clone(bot_id: str):
+        from clone_manager import clone_manager
+        return await clone_manager.start_clone(bot_id)
+
+    @staticmethod
+    async def _default_stop_clone(bot_id: str):
+        from clone_manager import clone_manager
+        if bot_id in clone_manager.active_clones:
+            await clone_manager.stop_clone(bot_id, reason="subscription_expired")
+
+
+# Global lifecycle scheduler instance
+lifecycle_scheduler = LifecycleScheduler()
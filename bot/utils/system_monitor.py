@@ -1,212 +1,80 @@
 import asyncio
-import logging
+import threading
 import time
-import psutil
-import os
-from typing import Dict, Any, List
-from datetime import datetime, timedelta
-from collections import deque
+from typing import Dict, Any, List, Optional
+from datetime import datetime
 
 # Fix logger import
 from bot.logging import LOGGER
+from bot.utils.resource_sampler import ResourceSampler, resource_sampler
 
 logger = LOGGER(__name__)
 
 class SystemMonitor:
-    """Production system monitoring with metrics collection"""
+    """Production system monitoring with metrics collection
 
-    def __init__(self):
-        self.metrics_history = {
-            'cpu': deque(maxlen=100),
-            'memory': deque(maxlen=100),
-            'disk': deque(maxlen=100),
-            'network': deque(maxlen=100)
-        }
+    Sampling is done by a ``ResourceSampler`` thread; ``metrics_history``
+    exposes its ring buffers, so nothing here blocks the event loop.
+    """
+
+    def __init__(self, sampler: Optional[ResourceSampler] = None):
+        self.sampler = sampler or ResourceSampler(capacity=100)
+        self.metrics_history = self.sampler.buffers
         self.start_time = time.time()
         self.running = False
-        self.monitor_interval = 60  # seconds - increased from 30 to reduce CPU usage
+        self.monitor_interval = 60  # seconds - alert evaluation interval
+        self._sample_pending = threading.Event()
 
     async def start_monitoring(self):
         """Start system monitoring"""
         self.running = True
+        self.sampler.start()
         logger.info("📊 System monitoring started")
 
         while self.running:
             try:
-                await self.collect_metrics()
-                await asyncio.sleep(self.monitor_interval)
+                for alert in self.check_resource_alerts():
+                    logger.warning(alert)
             except Exception as e:
                 logger.error(f"System monitoring error: {e}")
-                await asyncio.sleep(self.monitor_interval)
+            await asyncio.sleep(self.monitor_interval)
 
     async def stop_monitoring(self):
         """Stop system monitoring"""
         self.running = False
+        await asyncio.get_running_loop().run_in_executor(None, self.sampler.stop)
         logger.info("📊 System monitoring stopped")
 
     async def collect_metrics(self):
-        """Collect system metrics with error recovery"""
-        try:
-            from bot.utils.error_handler import safe_execute_async, ErrorRecoveryConfig
-        except ImportError:
-            # Fallback if error_handler is not available
-            safe_execute_async = None
-            ErrorRecoveryConfig = None
-
-        context_logger = logger
-
+        """Take one sample immediately (runs in the default executor)"""
         try:
-            timestamp = time.time()
-
-            # CPU metrics with fallback - reduced interval to lower CPU usage
-            try:
-                cpu_percent = psutil.cpu_percent(interval=0.1)  # Reduced from 1 second
-                cpu_count = psutil.cpu_count()
-                load_avg = psutil.getloadavg() if hasattr(psutil, 'getloadavg') else (0, 0, 0)
-            except Exception as e:
-                logger.error(f"Error getting CPU metrics: {e}")
-                cpu_percent, cpu_count, load_avg = 0, 1, (0, 0, 0)
-
-            # Memory metrics
-            memory = psutil.virtual_memory()
-            swap = psutil.swap_memory()
-
-            # Disk metrics
-            disk = psutil.disk_usage('/')
-            disk_io = psutil.disk_io_counters()
-
-            # Network metrics
-            network = psutil.net_io_counters()
-
-            # Process metrics
-            process = psutil.Process()
-            process_memory = process.memory_info()
-            process_cpu = process.cpu_percent()
-
-            # Get storage stats safely
-            storage_stats = self.get_storage_stats_safe()
-
-            # Store metrics
-            cpu_metric = {
-                'timestamp': timestamp,
-                'percent': cpu_percent,
-                'count': cpu_count,
-                'load_avg': load_avg,
-                'process_cpu': process_cpu
-            }
-
-            memory_metric = {
-                'timestamp': timestamp,
-                'percent': memory.percent,
-                'available': memory.available,
-                'total': memory.total,
-                'swap_percent': swap.percent,
-                'process_memory': process_memory.rss
-            }
-
-            disk_metric = {
-                'timestamp': timestamp,
-                'percent': (disk.used / disk.total) * 100,
-                'free': disk.free,
-                'total': disk.total,
-                'read_bytes': disk_io.read_bytes if disk_io else 0,
-                'write_bytes': disk_io.write_bytes if disk_io else 0
-            }
-
-            network_metric = {
-                'timestamp': timestamp,
-                'bytes_sent': network.bytes_sent,
-                'bytes_recv': network.bytes_recv,
-                'packets_sent': network.packets_sent,
-                'packets_recv': network.packets_recv
-            }
-
-            # Add to history
-            self.metrics_history['cpu'].append(cpu_metric)
-            self.metrics_history['memory'].append(memory_metric)
-            self.metrics_history['disk'].append(disk_metric)
-            self.metrics_history['network'].append(network_metric)
-
-            # Log warnings for high usage
-            if cpu_percent > 80:
-                logger.warning(f"High CPU usage: {cpu_percent}%")
-            if memory.percent > 85:
-                logger.warning(f"High memory usage: {memory.percent}%")
-            if (disk.used / disk.total) * 100 > 90:
-                logger.warning(f"High disk usage: {(disk.used / disk.total) * 100:.1f}%")
-
+            await asyncio.get_running_loop().run_in_executor(None, self.sampler.sample_once)
         except Exception as e:
             logger.error(f"Failed to collect metrics: {e}")
 
-    def get_storage_stats_safe(self) -> Dict[str, Any]:
-        """Get storage statistics with error handling"""
-        try:
-            from info import Config  # Fix import path
-            # Try multiple path options in order of preference
-            path_options = [
-                getattr(Config, 'TEMP_PATH', None),
-                getattr(Config, 'STORAGE_PATH', None),
-                '/tmp',
-                '.'
-            ]
-
-            storage_path = None
-            for path in path_options:
-                if path and os.path.exists(path):
-                    storage_path = path
-                    break
-
-            if storage_path:
-                storage_usage = psutil.disk_usage(storage_path)
-                return {
-                    'total': storage_usage.total,
-                    'used': storage_usage.used,
-                    'free': storage_usage.free,
-                    'percent': (storage_usage.used / storage_usage.total) * 100,
-                    'path': storage_path
-                }
-            else:
-                return {
-                    'total': 0,
-                    'used': 0,
-                    'free': 0,
-                    'percent': 0,
-                    'error': 'No valid storage path found'
-                }
-        except Exception as e:
-            logger.warning(f"Could not get storage stats: {e}")
-            return {
-                'total': 0,
-                'used': 0,
-                'free': 0,
-                'percent': 0,
-                'error': str(e)
-            }
-
     def get_stats(self) -> Dict[str, Any]:
-        """Get current system statistics"""
-        try:
-            # Get latest metrics or calculate current ones
-            if self.metrics_history['cpu']:
-                latest_cpu = self.metrics_history['cpu'][-1]
-                latest_memory = self.metrics_history['memory'][-1]
-                latest_disk = self.metrics_history['disk'][-1]
-            else:
-                # Calculate current metrics if history is empty
-                cpu_percent = psutil.cpu_percent()
-                memory = psutil.virtual_memory()
-                disk = psutil.disk_usage('/')
-
-                latest_cpu = {'percent': cpu_percent}
-                latest_memory = {'percent': memory.percent}
-                latest_disk = {'percent': (disk.used / disk.total) * 100}
+        """Get current system statistics
 
+        Before the first sample exists this returns zeros with ``sampling``
+        set and has the sampler take one on its own thread.
+        """
+        try:
             uptime_seconds = time.time() - self.start_time
+            if not self.metrics_history['cpu']:
+                self._request_sample()
+                return {
+                    'cpu_percent': 0,
+                    'memory_percent': 0,
+                    'disk_percent': 0,
+                    'uptime_seconds': uptime_seconds,
+                    'timestamp': datetime.now().isoformat(),
+                    'sampling': True
+                }
 
             return {
-                'cpu_percent': latest_cpu.get('percent', 0),
-                'memory_percent': latest_memory.get('percent', 0),
-                'disk_percent': latest_disk.get('percent', 0),
+                'cpu_percent': self.metrics_history['cpu'].latest('percent'),
+                'memory_percent': self.metrics_history['memory'].latest('percent'),
+                'disk_percent': self.metrics_history['disk'].latest('percent'),
                 'uptime_seconds': uptime_seconds,
                 'timestamp': datetime.now().isoformat()
             }
@@ -220,6 +88,22 @@ class SystemMonitor:
                 'error': str(e)
             }
 
+    def _request_sample(self):
+        """Take one sample on a short-lived thread unless one is already pending"""
+        if self._sample_pending.is_set():
+            return
+        self._sample_pending.set()
+
+        def sample():
+            try:
+                self.sampler.sample_once()
+            except Exception as e:
+                logger.error(f"Failed to collect metrics: {e}")
+            finally:
+                self._sample_pending.clear()
+
+        threading.Thread(target=sample, name="resource-sample", daemon=True).start()
+
     def get_historical_data(self, metric_type: str, minutes: int = 60) -> List[Dict[str, Any]]:
         """Get historical data for a specific metric"""
         if metric_type not in self.metrics_history:
@@ -286,5 +170,5 @@ class SystemMonitor:
 
         return alerts
 
-# Global instance
-system_monitor = SystemMonitor()
\ No newline at end of file
+# Global instance, sharing the sampler with HealthChecker
+system_monitor = SystemMonitor(sampler=resource_sampler)
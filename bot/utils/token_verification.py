@@ -8,12 +8,13 @@ from bot.database import get_user_command_count, increment_command_count, is_ver
 from bot.database.premium_db import use_premium_token
 from bot.database.command_usage_db import reset_command_count
 from info import Config
+from bot.utils.keyed_locks import KeyedLocks
 import logging
 
 logger = logging.getLogger(__name__)
 
 # User locks to prevent race conditions
-_user_locks = {}
+_user_locks = KeyedLocks()
 
 class TokenVerificationManager:
     """Manages token verification for clone bots with different modes"""
@@ -189,10 +190,7 @@ class TokenVerificationManager:
         """Use token in command limit mode"""
         try:
             # Get or create user-specific lock
-            if user_id not in _user_locks:
-                _user_locks[user_id] = asyncio.Lock()
-
-            async with _user_locks[user_id]:
+            async with _user_locks.hold(user_id):
                 current_count = await get_user_command_count(user_id)
                 command_limit = token_settings.get('command_limit', 3)
                 
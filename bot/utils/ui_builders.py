@@ -20,6 +20,31 @@ CALLBACK_DATA = {
     'HELP': 'help_menu'
 }
 
+# Telegram rejects callback data longer than this many bytes
+MAX_CALLBACK_DATA = 64
+
+def build_page_nav(callback_prefix: str, page, is_first_page: bool) -> List[List[InlineKeyboardButton]]:
+    """Navigation row for a keyset-paginated listing
+
+    Next carries the page cursor as ``<prefix>#<cursor>``; cursors only move forward,
+    so the way back is a button to the first page.
+    """
+    row = []
+    if not is_first_page:
+        row.append(InlineKeyboardButton("⏮ First", callback_data=callback_prefix))
+    if page.next_cursor:
+        next_data = f"{callback_prefix}#{page.next_cursor}"
+        if len(next_data.encode()) <= MAX_CALLBACK_DATA:
+            row.append(InlineKeyboardButton("Next ▶️", callback_data=next_data))
+        else:
+            logger.warning(f"Page cursor too long for callback data: {next_data!r}")
+    return [row] if row else []
+
+def page_cursor(callback_data: str):
+    """Cursor from ``<prefix>#<cursor>`` callback data, None for the first page"""
+    _, _, cursor = callback_data.partition('#')
+    return cursor or None
+
 def build_clone_settings_panel(clone_data: Dict[str, Any], user_id: int) -> tuple[str, InlineKeyboardMarkup]:
     """Build clone settings panel text and keyboard"""
     show_random = clone_data.get('random_mode', True)
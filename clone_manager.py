@@ -1,26 +1,121 @@
 import asyncio
+import inspect
 import os
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime
-from typing import Optional, Tuple
-from pyrogram import Client
-from pyrogram.errors import AuthKeyUnregistered, AccessTokenExpired, AccessTokenInvalid
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
 from info import Config
-from bot.database.clone_db import *
+from bot.database.clone_db import (
+    activate_clone, deactivate_clone, delete_clone, delete_clone_config, get_all_clones, get_clone,
+    start_clone_in_db, stop_clone_in_db, update_clone_data, update_clone_last_seen
+)
 from bot.database.subscription_db import get_subscription, subscriptions_collection
+from bot.core.events.base import event_bus
+from bot.core.events.clone_events import CloneStartedEvent, CloneStoppedEvent, CloneErrorEvent
 from bot.logging import LOGGER
 
+# pyrogram takes about a second to import; the CLI only needs it once a clone is started
+if TYPE_CHECKING:
+    from pyrogram import Client
+
 logger = LOGGER(__name__)
 
+
+class BulkOperation:
+    """Progress and per-clone results of one bulk lifecycle operation"""
+
+    def __init__(self, action: str, bot_ids: Optional[List[str]] = None):
+        self.id = uuid.uuid4().hex[:8]
+        self.action = action
+        self.status = 'queued'  # queued -> running -> completed | aborted | failed
+        self.message = ''
+        self.bot_ids = list(bot_ids or [])
+        self.results: Dict[str, Dict] = {}  # bot id -> {'ok': True/False, None if skipped, 'message'}
+        self.wave = 0
+        self.waves = 0
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for result in self.results.values() if result['ok'])
+
+    @property
+    def failed(self) -> int:
+        return sum(1 for result in self.results.values() if result['ok'] is False)
+
+    @property
+    def skipped(self) -> int:
+        return sum(1 for result in self.results.values() if result['ok'] is None)
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def record(self, bot_id: str, ok: Optional[bool], message: str):
+        self.results[bot_id] = {'ok': ok, 'message': message}
+
+    def finish(self, status: str, message: str = ''):
+        self.status = status
+        self.message = message
+        self.finished_at = datetime.now()
+
+    def summary(self) -> str:
+        text = (f"{self.action} {self.status}: {self.succeeded}/{len(self.bot_ids)} ok, "
+                f"{self.failed} failed, {self.skipped} skipped")
+        if self.waves:
+            text += f", wave {self.wave}/{self.waves}"
+        return f"{text} ({self.message})" if self.message else text
+
+    def as_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'action': self.action,
+            'status': self.status,
+            'message': self.message,
+            'total': len(self.bot_ids),
+            'done': len(self.results),
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'skipped': self.skipped,
+            'wave': self.wave,
+            'waves': self.waves,
+            'results': self.results,
+            'created_at': self.created_at.isoformat(),
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+async def _notify(on_progress: Optional[Callable], operation: BulkOperation):
+    if on_progress is None:
+        return
+    try:
+        result = on_progress(operation)
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        logger.warning(f"⚠️ Progress callback failed for {operation.action} {operation.id}: {e}")
+
+
 class CloneManager:
+    MAX_OPERATIONS = 20  # finished bulk operations kept for status queries
+
     def __init__(self):
         self.instances = {}  # Changed from active_clones to instances for consistency
         self.active_clones = {}
         self.clone_tasks = {}
+        self.operations: "OrderedDict[str, BulkOperation]" = OrderedDict()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None  # the loop clones run on
+        self._bulk_lock = asyncio.Lock()
 
     async def start_clone(self, bot_id: str) -> Tuple[bool, str]:
         """Start a specific clone bot with enhanced error handling"""
         from bot.logging import LOGGER
         from bot.utils.security import security_manager
+        from pyrogram.errors import AuthKeyUnregistered, AccessTokenExpired, AccessTokenInvalid
         import asyncio
 
         logger = LOGGER(__name__)
@@ -75,7 +170,6 @@ class CloneManager:
 
         try:
             logger.info(f"📊 Starting clone: {bot_id}")
-            print(f"📊 DEBUG: Starting clone: {bot_id}")
 
             # Check if clone is already running
             if bot_id in self.active_clones:
@@ -98,13 +192,11 @@ class CloneManager:
             # Enhanced subscription validation (TESTING MODE - ALWAYS ALLOW)
             tracker.add_step("checking_subscription")
             subscription = await get_subscription(bot_id)
-            logger.info(f"🔍 DEBUG: Subscription for bot {bot_id}: {subscription}")
-            print(f"🔍 DEBUG SUBSCRIPTION: For bot {bot_id}: {subscription}")
+            logger.debug(f"🔍 DEBUG: Subscription for bot {bot_id}: {subscription}")
 
             # Always allow during development - bypass subscription validation
             subscription_valid, subscription_msg = True, "Development mode: subscription validation bypassed"
-            logger.info(f"✅ DEBUG: Subscription validation result: {subscription_valid} - {subscription_msg}")
-            print(f"✅ DEBUG SUBSCRIPTION: Result: {subscription_valid} - {subscription_msg}")
+            logger.debug(f"✅ DEBUG: Subscription validation result: {subscription_valid} - {subscription_msg}")
 
             if bot_id in self.active_clones:
                 # Check if clone is actually running
@@ -118,13 +210,11 @@ class CloneManager:
 
             # Validate bot token
             bot_token = clone.get('bot_token') or clone.get('token')
-            logger.info(f"🔍 DEBUG: Bot token for {bot_id}: {bot_token[:20] if bot_token else 'None'}...")
-            print(f"🔍 DEBUG TOKEN: For {bot_id}: {bot_token[:20] if bot_token else 'None'}...")
+            logger.debug(f"🔍 DEBUG: Bot token for {bot_id}: {bot_token[:20] if bot_token else 'None'}...")
 
             if not bot_token:
                 error_msg = "Missing bot token in clone data"
                 logger.error(f"❌ {error_msg} for bot {bot_id}")
-                print(f"❌ DEBUG TOKEN: {error_msg} for bot {bot_id}")
                 tracker.complete(success=False, error=error_msg)
                 return False, error_msg
 
@@ -132,13 +222,11 @@ class CloneManager:
             if not token_valid:
                 error_msg = "Invalid bot token format"
                 logger.error(f"❌ {error_msg} for bot {bot_id}")
-                print(f"❌ DEBUG TOKEN: {error_msg} for bot {bot_id}")
                 tracker.complete(success=False, error=error_msg)
                 return False, error_msg
 
             tracker.add_step("bot_token_validated")
-            logger.info(f"✅ Bot token validated for {bot_id}")
-            print(f"✅ DEBUG TOKEN: Token validated for {bot_id}")
+            logger.debug(f"✅ Bot token validated for {bot_id}")
 
             # Create bot instance with proper error handling
             logger.debug(f"Creating Pyrogram client for clone {bot_id}")
@@ -204,27 +292,32 @@ class CloneManager:
 
             logger.info(f"✅ Clone {bot_id} started successfully")
             tracker.complete(success=True)
+            event_bus.publish_sync(CloneStartedEvent(bot_id, username=bot_info.username))
             return True, f"Clone @{bot_info.username} started successfully"
 
         except AuthKeyUnregistered:
             logger.error(f"❌ AuthKeyUnregistered for clone {bot_id}. Deactivating.")
             tracker.complete(success=False, error="AuthKeyUnregistered")
             await self._handle_clone_auth_error(bot_id, "auth_key_unregistered")
+            event_bus.publish_sync(CloneErrorEvent(bot_id, "AuthKeyUnregistered", error_type="auth"))
             return False, "Authentication key unregistered"
         except AccessTokenExpired:
             logger.error(f"❌ AccessTokenExpired for clone {bot_id}. Deactivating.")
             tracker.complete(success=False, error="AccessTokenExpired")
             await self._handle_clone_auth_error(bot_id, "access_token_expired")
+            event_bus.publish_sync(CloneErrorEvent(bot_id, "AccessTokenExpired", error_type="auth"))
             return False, "Access token expired"
         except AccessTokenInvalid:
             logger.error(f"❌ AccessTokenInvalid for clone {bot_id}. Deactivating.")
             tracker.complete(success=False, error="AccessTokenInvalid")
             await self._handle_clone_auth_error(bot_id, "access_token_invalid")
+            event_bus.publish_sync(CloneErrorEvent(bot_id, "AccessTokenInvalid", error_type="auth"))
             return False, "Access token invalid"
         except Exception as e:
             error_msg = str(e)
             logger.error(f"❌ Unexpected error starting clone {bot_id}: {error_msg}", exc_info=True)
             tracker.complete(success=False, error=error_msg)
+            event_bus.publish_sync(CloneErrorEvent(bot_id, error_msg, error_type="startup"))
 
             # Clean up any partial state
             if bot_id in self.active_clones:
@@ -255,8 +348,7 @@ class CloneManager:
 
     async def _validate_subscription(self, subscription: dict, bot_id: str) -> Tuple[bool, str]:
         """Completely permissive subscription validation for testing"""
-        logger.info(f"🔄 Subscription validation for bot {bot_id} - ALLOWING ALL (TESTING MODE)")
-        print(f"🔄 DEBUG SUBSCRIPTION: Validation for bot {bot_id} - ALLOWING ALL (TESTING MODE)")
+        logger.debug(f"🔄 Subscription validation for bot {bot_id} - ALLOWING ALL (TESTING MODE)")
 
         # Always return True during development/testing
         return True, "Development mode: All clones allowed to start regardless of subscription status"
@@ -268,38 +360,29 @@ class CloneManager:
         pattern = r'^\d+:[A-Za-z0-9_-]+$'
         return bool(re.match(pattern, token))
 
-    async def _create_clone_client(self, bot_id: str, bot_token: str) -> Optional[Client]:
+    async def _create_clone_client(self, bot_id: str, bot_token: str) -> Optional["Client"]:
         """Create clone client with proper configuration"""
-        try:
-            clone_plugins = {
-                "root": "bot.plugins",
-                "include": [
-                    "start_handler", "simple_test_commands", "admin", "channel",
-                    "clone_admin", "clone_admin_commands", "clone_force_commands",
-                    "clone_token_commands", "debug_callbacks", "debug_commands",
-                    "enhanced_about", "force_sub_commands", "genlink", "index",
-                    "referral_program", "simple_file_sharing",
-                    "token", "auto_post", "clone_random_files"
-                ],
-                "exclude": [
-                    "clone_management", "step_clone_creation", "mother_admin",
-                    "admin_commands", "balance_management", "admin_panel", "missing_commands", "missing_callbacks"
-                ]
-            }
+        from bot.utils.handler_table import TableClient, get_clone_handler_table
+        from bot.utils.session_storage import CloneSessionStorage
 
-            return Client(
+        try:
+            client = TableClient(
                 f"clone_{bot_id}",
                 api_id=Config.API_ID,
                 api_hash=Config.API_HASH,
                 bot_token=bot_token,
-                plugins=clone_plugins,
-                workdir="temp_sessions"
+                # Auth key and peer cache live in MongoDB, so restarts skip sign-in
+                storage=CloneSessionStorage(f"clone_{bot_id}", flush_interval=Config.CLONE_SESSION_FLUSH_INTERVAL),
+                # Handlers are resolved once per process, shared by all clones and
+                # attached again on every start (stopping a client drops them)
+                handler_table=get_clone_handler_table()
             )
+            return client
         except Exception as e:
             logger.error(f"Error creating clone client {bot_id}: {e}")
             return None
 
-    async def _start_clone_client(self, client: Client, bot_id: str, max_retries: int = 3) -> bool:
+    async def _start_clone_client(self, client: "Client", bot_id: str, max_retries: int = 3) -> bool:
         """Start clone client with retry logic"""
         for attempt in range(max_retries):
             try:
@@ -375,7 +458,7 @@ class CloneManager:
         except Exception as e:
             logger.error(f"Error cleaning up stale clone {bot_id}: {e}")
 
-    async def _safe_stop_client(self, client: Client):
+    async def _safe_stop_client(self, client: "Client"):
         """Safely stop a client"""
         try:
             if client.is_connected:
@@ -428,7 +511,6 @@ class CloneManager:
 
             if not all_clones:
                 logger.warning("⚠️ No clones found in database to start.")
-                print("⚠️ DEBUG CLONE: No clones found in database")
                 return 0, 0
 
             # Show all clones with their statuses and activate stopped ones
@@ -437,43 +519,31 @@ class CloneManager:
                 username = clone.get('username', 'unknown')
                 bot_id = clone.get('_id', 'unknown')
                 logger.info(f"📋 Clone found: {username} ({bot_id}) - Status: {status}")
-                print(f"📋 DEBUG CLONE: Clone found: {username} ({bot_id}) - Status: {status}")
 
                 # Activate stopped clones for testing
                 if status == 'stopped':
                     from bot.database.clone_db import activate_clone
                     await activate_clone(bot_id)
                     logger.info(f"🔄 Activated stopped clone: {username} ({bot_id})")
-                    print(f"🔄 DEBUG CLONE: Activated stopped clone: {username} ({bot_id})")
 
             # Start ALL clones regardless of status (testing mode)
             logger.info(f"📊 Attempting to start ALL {len(all_clones)} clones (testing mode)")
-            print(f"📊 DEBUG CLONE: Attempting to start ALL {len(all_clones)} clones (testing mode)")
 
-            # Start all clones individually
-            started_count = 0
+            # Start clones CLONE_BULK_CONCURRENCY at a time
             total_count = len(all_clones)
+            operation = await self.bulk_start([str(clone['_id']) for clone in all_clones if clone.get('_id')])
+            for bot_id, result in operation.results.items():
+                if result['ok']:
+                    logger.info(f"Result for clone {bot_id}: Success - {result['message']}")
+                else:
+                    logger.error(f"Result for clone {bot_id}: Failure - {result['message']}")
 
-            for clone in all_clones:
-                bot_id = clone.get('_id')
-                if bot_id:
-                    try:
-                        logger.info(f"Attempting to start clone {bot_id}...")
-                        success, message = await self.start_clone(bot_id)
-                        if success:
-                            started_count += 1
-                            logger.info(f"Result for clone {bot_id}: Success - {message}")
-                        else:
-                            logger.error(f"Result for clone {bot_id}: Failure - {message}")
-                    except Exception as e:
-                        logger.error(f"An unexpected error occurred while trying to start clone {bot_id}: {e}", exc_info=True)
-
+            started_count = operation.succeeded
             logger.info(f"📊 Finished attempting to start all clones. Successfully started: {started_count}/{total_count}")
             return started_count, total_count
 
         except Exception as e:
             logger.error(f"Error in start_all_clones: {e}", exc_info=True)
-            print(f"❌ DEBUG CLONE: Error in start_all_clones: {e}")
             return 0, 0
 
     async def _monitor_clone(self, bot_id: str):
@@ -527,7 +597,7 @@ class CloneManager:
                 logger.info(f"Monitoring task for {bot_id} exiting, initiating cleanup.")
                 await self._cleanup_stale_clone(bot_id)
 
-    async def _reconnect_clone(self, client: Client, bot_id: str, max_attempts: int = 3) -> bool:
+    async def _reconnect_clone(self, client: "Client", bot_id: str, max_attempts: int = 3) -> bool:
         """Attempt to reconnect a clone"""
         logger.info(f"Attempting to reconnect clone {bot_id}...")
         for attempt in range(max_attempts):
@@ -542,7 +612,7 @@ class CloneManager:
         logger.error(f"Failed to reconnect clone {bot_id} after {max_attempts} attempts.")
         return False
 
-    async def stop_clone(self, bot_id: str):
+    async def stop_clone(self, bot_id: str, reason: str = "manual"):
         """Stop a clone bot"""
         logger.info(f"Stopping clone {bot_id}")
         try:
@@ -591,12 +661,16 @@ class CloneManager:
                     del self.active_clones[bot_id]
                     logger.debug(f"Removed {bot_id} from active_clones.")
 
+            # Calls still queued for this client can no longer be sent
+            from bot.utils.send_scheduler import close_scheduler
+            await close_scheduler(clone_bot)
 
             # Update database status
             await stop_clone_in_db(bot_id)
             logger.debug(f"Updated database status for clone {bot_id} to 'stopped'.")
 
             logger.info(f"🛑 Clone {bot_id} stopped successfully")
+            event_bus.publish_sync(CloneStoppedEvent(bot_id, reason=reason))
             return True, "Clone stopped successfully"
 
         except Exception as e:
@@ -722,132 +796,25 @@ class CloneManager:
 
     async def _retry_pending_clone(self, bot_id: str, delay: int = 300):
         """Retry starting a clone with pending subscription after delay"""
-        max_retries = 12  # 12 retries = 1 hour of checking (5 min intervals)
-        retry_count = 0
-        logger.info(f"Starting retry mechanism for pending clone {bot_id}. Max retries: {max_retries}, initial delay: {delay}s")
-
-        try:
-            while retry_count < max_retries:
-                await asyncio.sleep(delay)
-                retry_count += 1
-                logger.debug(f"Retry attempt {retry_count}/{max_retries} for pending clone {bot_id}")
-
-                # Check if subscription is now active
-                subscription = await get_subscription(bot_id)
-                if subscription and subscription['status'] == 'active':
-                    logger.info(f"🔄 Retrying clone {bot_id} - subscription now active (attempt {retry_count})")
-                    success, message = await self.start_clone(bot_id)
-                    if success:
-                        logger.info(f"✅ Successfully started pending clone {bot_id} on retry.")
-                        return # Stop retrying if successful
-                    else:
-                        logger.warning(f"⚠️ Still failed to start clone {bot_id} after subscription became active: {message}. Continuing retries.")
-                        # If it fails to start even with active subscription, continue retrying until max retries
-                elif subscription and subscription['status'] in ['expired', 'cancelled']:
-                    logger.warning(f"🛑 Stopping retry for clone {bot_id} - subscription status is {subscription['status']}. Deactivating.")
-                    await deactivate_clone(bot_id)
-                    await update_clone_data(bot_id, {'status': 'subscription_inactive'})
-                    return # Stop retrying
-                else:
-                    logger.info(f"⏳ Clone {bot_id} subscription still not active or status unknown (attempt {retry_count}/{max_retries}). Status: {subscription.get('status', 'N/A') if subscription else 'Not Found'}")
-
-            # If loop finishes without success
-            logger.error(f"⚠️ Max retries ({max_retries}) reached for clone {bot_id} - subscription never became active or start failed repeatedly. Marking as failed.")
-            await clones_collection.update_one(
-                {"_id": bot_id},
-                {"$set": {"status": "pending_timeout", "last_check": datetime.now()}}
-            )
-            logger.debug(f"Updated clone {bot_id} status to 'pending_timeout'.")
-
-        except Exception as e:
-            logger.error(f"❌ Error in retry mechanism for pending clone {bot_id}: {e}", exc_info=True)
+        from bot.utils.subscription_scheduler import lifecycle_scheduler
+        lifecycle_scheduler.schedule_activation(bot_id, delay)
 
     async def cleanup_inactive_clones(self):
         """Cleanup inactive or expired clones"""
-        logger.info("Running cleanup for inactive or expired clones.")
+        # Expiry is event driven; this only applies whatever is already due
+        from bot.utils.subscription_scheduler import lifecycle_scheduler
         try:
-            # Find expired subscriptions
-            from bot.database.subscription_db import subscriptions_collection
-            expired_subscriptions = await subscriptions_collection.find({
-                "expires_at": {"$lt": datetime.now()},
-                "status": "active"
-            }).to_list(None)
-
-            logger.debug(f"Found {len(expired_subscriptions)} subscriptions that have expired.")
-
-            for subscription in expired_subscriptions:
-                bot_id = subscription.get('bot_id')
-                if not bot_id:
-                    logger.warning("Found expired subscription with no bot_id. Skipping.")
-                    continue
-
-                logger.info(f"Deactivating expired clone {bot_id} (subscription expired at {subscription.get('expires_at')})")
-
-                # Stop the clone if it's running
-                if bot_id in self.active_clones:
-                    logger.debug(f"Clone {bot_id} is running, stopping it first.")
-                    await self.stop_clone(bot_id)
-
-                # Deactivate in database
-                await deactivate_clone(bot_id)
-                logger.debug(f"Deactivated clone {bot_id} in database.")
-
-                # Update subscription status
-                await subscriptions_collection.update_one(
-                    {"_id": bot_id},
-                    {"$set": {"status": "expired", "expires_at": subscription.get('expires_at')}}
-                )
-                logger.debug(f"Updated subscription status for {bot_id} to 'expired'.")
-
-            logger.info(f"Finished cleanup for {len(expired_subscriptions)} expired clones.")
-
+            await lifecycle_scheduler.fire_due()
         except Exception as e:
             logger.error(f"❌ Error during inactive clone cleanup: {e}", exc_info=True)
 
     async def check_pending_clones(self):
         """Check and attempt to start pending clones"""
-        logger.info("Checking for clones with pending subscriptions.")
+        # Reload deadlines from the database, then start anything that is ready
+        from bot.utils.subscription_scheduler import lifecycle_scheduler
         try:
-            from bot.database.subscription_db import subscriptions_collection
-
-            # Find clones that are marked as pending_subscription in the clones collection
-            # This assumes the status 'pending_subscription' is set in the clones_collection
-            pending_clones_in_db = await clones_collection.find({
-                "status": "pending_subscription"
-            }).to_list(None)
-
-            logger.debug(f"Found {len(pending_clones_in_db)} clones with status 'pending_subscription'.")
-
-            for clone in pending_clones_in_db:
-                bot_id = clone.get('_id')
-                if not bot_id:
-                    logger.warning("Found pending clone with no _id. Skipping.")
-                    continue
-
-                logger.info(f"Checking subscription status for pending clone {bot_id}.")
-
-                # Check if subscription is now active
-                subscription = await get_subscription(bot_id)
-                if subscription and subscription['status'] == 'active':
-                    logger.info(f"🔄 Subscription is active for pending clone {bot_id}. Attempting to start.")
-                    success, message = await self.start_clone(bot_id)
-                    if success:
-                        logger.info(f"✅ Successfully started previously pending clone {bot_id}.")
-                    else:
-                        logger.warning(f"⚠️ Failed to start clone {bot_id} even with active subscription: {message}. Will retry later if needed.")
-                        # Optionally, trigger the retry mechanism here if start fails
-                        # asyncio.create_task(self._retry_pending_clone(bot_id))
-                elif subscription and subscription['status'] in ['expired', 'cancelled']:
-                    logger.warning(f"🛑 Subscription for pending clone {bot_id} is now {subscription['status']}. Deactivating clone.")
-                    await deactivate_clone(bot_id)
-                    await update_clone_data(bot_id, {'status': 'subscription_inactive'})
-                else:
-                    logger.debug(f"Subscription for pending clone {bot_id} is still pending or not found. Status: {subscription.get('status', 'N/A') if subscription else 'Not Found'}")
-                    # If no subscription or status is still pending, consider starting the retry mechanism
-                    # asyncio.create_task(self._retry_pending_clone(bot_id))
-
-            logger.info("Finished checking pending clones.")
-
+            await lifecycle_scheduler.load()
+            await lifecycle_scheduler.fire_due()
         except Exception as e:
             logger.error(f"❌ Error checking pending clones: {e}", exc_info=True)
 
@@ -858,9 +825,7 @@ class CloneManager:
             # Stop all running clones first
             running_clones = list(self.active_clones.keys())
             logger.info(f"Stopping {len(running_clones)} currently running clones before deletion.")
-            for bot_id in running_clones:
-                await self.stop_clone(bot_id)
-                logger.info(f"🛑 Stopped clone {bot_id} in preparation for deletion.")
+            await self.bulk_stop(running_clones, reason="deleted")
 
             # Get all clones from database
             all_clones = await get_all_clones()
@@ -935,17 +900,178 @@ class CloneManager:
             logger.error(f"❌ Exception during force start for clone {clone_id}: {e}", exc_info=True)
             return False, f"Force start error: {str(e)}"
 
+    # ==================== BULK LIFECYCLE ====================
+
+    def _new_operation(self, action: str, bot_ids: Optional[List[str]] = None) -> BulkOperation:
+        operation = BulkOperation(action, bot_ids)
+        self.operations[operation.id] = operation
+        while len(self.operations) > self.MAX_OPERATIONS:
+            self.operations.popitem(last=False)
+        return operation
+
+    def get_operation(self, operation_id: str) -> Optional[BulkOperation]:
+        return self.operations.get(operation_id)
+
+    async def _all_clone_ids(self) -> List[str]:
+        return [str(clone['_id']) for clone in await get_all_clones() if clone.get('_id')]
+
+    async def _run_each(self, operation: BulkOperation, bot_ids: List[str], action: Callable,
+                        concurrency: int, on_progress: Optional[Callable] = None):
+        """Run ``action(bot_id) -> (ok, message)`` for each clone, ``concurrency`` at a time"""
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(bot_id):
+            async with semaphore:
+                try:
+                    ok, message = await action(bot_id)
+                except Exception as e:
+                    logger.error(f"❌ {operation.action} failed for clone {bot_id}: {e}", exc_info=True)
+                    ok, message = False, str(e)
+                operation.record(bot_id, bool(ok), message)
+                await _notify(on_progress, operation)
+
+        await asyncio.gather(*(run(bot_id) for bot_id in bot_ids))
+
+    async def _bulk(self, operation: BulkOperation, run: Callable) -> BulkOperation:
+        # One bulk operation at a time: a stop-all must not race a rolling restart
+        async with self._bulk_lock:
+            self.loop = asyncio.get_running_loop()
+            operation.status = 'running'
+            try:
+                await run()
+                if not operation.finished:
+                    operation.finish('completed')
+            except Exception as e:
+                logger.error(f"❌ Bulk {operation.action} {operation.id} failed: {e}", exc_info=True)
+                operation.finish('failed', str(e))
+        logger.info(f"📦 Bulk {operation.summary()}")
+        return operation
+
+    async def bulk_stop(self, bot_ids: Optional[List[str]] = None, concurrency: Optional[int] = None,
+                        reason: str = "manual", operation: Optional[BulkOperation] = None,
+                        on_progress: Optional[Callable] = None) -> BulkOperation:
+        """Stop clones (default: every running clone), ``concurrency`` at a time"""
+        operation = operation or self._new_operation('stop', bot_ids)
+
+        async def run():
+            operation.bot_ids = list(bot_ids) if bot_ids is not None else self.get_running_clones()
+            await self._run_each(operation, operation.bot_ids, partial(self.stop_clone, reason=reason),
+                                 concurrency or Config.CLONE_BULK_CONCURRENCY, on_progress)
+
+        return await self._bulk(operation, run)
+
+    async def bulk_start(self, bot_ids: Optional[List[str]] = None, concurrency: Optional[int] = None,
+                         activate: bool = False, operation: Optional[BulkOperation] = None,
+                         on_progress: Optional[Callable] = None) -> BulkOperation:
+        """Start clones (default: every clone in the database not running), ``concurrency`` at a time
+
+        With ``activate``, each clone is marked active first, as the CLI has always done.
+        """
+        operation = operation or self._new_operation('start', bot_ids)
+
+        async def start(bot_id):
+            if activate:
+                await activate_clone(bot_id)
+                await update_clone_data(bot_id, {"status": "active"})
+            return await self.start_clone(bot_id)
+
+        async def run():
+            if bot_ids is not None:
+                operation.bot_ids = list(bot_ids)
+            else:
+                operation.bot_ids = [bot_id for bot_id in await self._all_clone_ids()
+                                     if bot_id not in self.active_clones]
+            await self._run_each(operation, operation.bot_ids, start,
+                                 concurrency or Config.CLONE_BULK_CONCURRENCY, on_progress)
+
+        return await self._bulk(operation, run)
+
+    async def _wait_healthy(self, bot_id: str, timeout: float, interval: float = 1.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            if await self._verify_clone_health(bot_id):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(interval)
+
+    async def rolling_restart(self, bot_ids: Optional[List[str]] = None, wave_size: Optional[int] = None,
+                              health_timeout: Optional[float] = None, max_wave_failures: Optional[int] = None,
+                              operation: Optional[BulkOperation] = None,
+                              on_progress: Optional[Callable] = None) -> BulkOperation:
+        """Restart clones (default: every running clone) in waves of ``wave_size``
+
+        A wave's clones restart together and must each pass a health check within
+        ``health_timeout`` before the next wave starts. If more than ``max_wave_failures``
+        of a wave fail (by default, more than half of it), the remaining waves are
+        skipped, so a bad deploy takes down one wave instead of every clone.
+        """
+        operation = operation or self._new_operation('restart', bot_ids)
+        wave_size = max(1, wave_size or Config.CLONE_ROLLING_WAVE_SIZE)
+        health_timeout = Config.CLONE_HEALTH_TIMEOUT if health_timeout is None else health_timeout
+
+        async def restart(bot_id):
+            ok, message = await self.restart_clone(bot_id)
+            if ok and not await self._wait_healthy(bot_id, health_timeout):
+                return False, f"Not healthy {health_timeout:.0f}s after restart"
+            return ok, message
+
+        async def run():
+            ids = operation.bot_ids = list(bot_ids) if bot_ids is not None else self.get_running_clones()
+            waves = [ids[i:i + wave_size] for i in range(0, len(ids), wave_size)]
+            operation.waves = len(waves)
+            for number, wave in enumerate(waves, 1):
+                operation.wave = number
+                await self._run_each(operation, wave, restart, len(wave), on_progress)
+
+                failed = [bot_id for bot_id in wave if not operation.results[bot_id]['ok']]
+                allowed = len(wave) // 2 if max_wave_failures is None else max_wave_failures
+                if len(failed) > allowed:
+                    for bot_id in ids[number * wave_size:]:
+                        operation.record(bot_id, None, "Skipped: rolling restart aborted")
+                    operation.finish('aborted', f"{len(failed)}/{len(wave)} clones of wave {number} "
+                                                f"unhealthy after restart: {', '.join(failed)}")
+                    logger.error(f"❌ Rolling restart aborted at wave {number}/{len(waves)}: {operation.message}")
+                    await _notify(on_progress, operation)
+                    return
+                logger.info(f"🔄 Rolling restart wave {number}/{len(waves)} done: "
+                            f"{len(wave) - len(failed)}/{len(wave)} clones healthy")
+
+        return await self._bulk(operation, run)
+
+    BULK_ACTIONS = ('start', 'stop', 'restart')
+
+    def submit(self, action: str, **kwargs) -> BulkOperation:
+        """Queue a bulk operation on the clones' event loop from another thread (the web dashboard)
+
+        Returns at once; poll ``get_operation(operation.id)`` for progress.
+        """
+        methods = {'start': self.bulk_start, 'stop': self.bulk_stop, 'restart': self.rolling_restart}
+        if action not in methods:
+            raise ValueError(f"Unknown bulk action: {action}")
+        loop = self.loop
+        if loop is None or loop.is_closed() or not loop.is_running():
+            raise RuntimeError("Clone manager is not running")
+        operation = self._new_operation(action, kwargs.get('bot_ids'))
+        asyncio.run_coroutine_threadsafe(methods[action](operation=operation, **kwargs), loop)
+        return operation
+
 # Create global instance
 clone_manager = CloneManager()
 
 # ==================== CLI FUNCTIONS ====================
 
-async def start_all_clones_cli():
+def _print_progress(operation: BulkOperation):
+    wave = f" [wave {operation.wave}/{operation.waves}]" if operation.waves else ""
+    print(f"  {operation.action}{wave}: {len(operation.results)}/{len(operation.bot_ids)} done, "
+          f"{operation.failed} failed")
+
+async def start_all_clones_cli(concurrency: Optional[int] = None):
     """Start all clones in database (CLI wrapper)"""
     logger.info("CLI: Request received to start all clones.")
     try:
         logger.info("🚀 CLI: Starting all clones...")
-        all_clones = await get_all_clones()
+        all_clones = await clone_manager._all_clone_ids()
 
         if not all_clones:
             logger.warning("CLI: No clones found in database to start.")
@@ -953,46 +1079,24 @@ async def start_all_clones_cli():
             return 0, 0
 
         logger.info(f"CLI: Found {len(all_clones)} clones in the database.")
-        started_count = 0
-        total_clones = len(all_clones)
+        operation = await clone_manager.bulk_start(all_clones, concurrency=concurrency, activate=True,
+                                                   on_progress=_print_progress)
 
-        for clone in all_clones:
-            bot_id = clone.get('_id')
-            username = clone.get('username', 'Unknown')
-
-            if not bot_id:
-                logger.warning(f"CLI: Skipping clone entry with no _id during start-all.")
-                continue
-
-            try:
-                logger.info(f"CLI: Activating and starting clone {username} ({bot_id})...")
-                await activate_clone(bot_id)
-                await update_clone_data(bot_id, {"status": "active"}) # Ensure status is 'active'
-
-                success, message = await clone_manager.start_clone(bot_id)
-                if success:
-                    started_count += 1
-                    logger.info(f"CLI: Successfully started {username} ({bot_id}): {message}")
-                else:
-                    logger.error(f"CLI: Failed to start {username} ({bot_id}): {message}")
-            except Exception as e:
-                logger.error(f"CLI: An unexpected error occurred while starting {username} ({bot_id}): {e}", exc_info=True)
-
-        logger.info(f"CLI: Finished starting all clones. Result: {started_count}/{total_clones} started successfully.")
-        print(f"\nCLI Result: Started {started_count}/{total_clones} clones.")
-        return started_count, total_clones
+        logger.info(f"CLI: Finished starting all clones. Result: {operation.summary()}")
+        print(f"\nCLI Result: Started {operation.succeeded}/{len(all_clones)} clones.")
+        return operation.succeeded, len(all_clones)
 
     except Exception as e:
         logger.error(f"CLI: Fatal error during start_all_clones_cli: {e}", exc_info=True)
         print(f"CLI Error: A fatal error occurred. Check logs for details.")
         return 0, 0
 
-async def restart_all_clones_cli():
-    """Restart all clone bots (CLI wrapper)"""
+async def restart_all_clones_cli(wave_size: Optional[int] = None):
+    """Restart all clone bots in health-checked waves (CLI wrapper)"""
     logger.info("CLI: Request received to restart all clones.")
     try:
         logger.info("🔄 CLI: Restarting all clones...")
-        all_clones = await get_all_clones()
+        all_clones = await clone_manager._all_clone_ids()
 
         if not all_clones:
             logger.warning("CLI: No clones found in database to restart.")
@@ -1000,48 +1104,17 @@ async def restart_all_clones_cli():
             return 0, 0
 
         logger.info(f"CLI: Found {len(all_clones)} clones.")
+        for bot_id in all_clones:
+            await activate_clone(bot_id)
+            await update_clone_data(bot_id, {"status": "active"})
 
-        # First, stop all running clones
-        stopping_tasks = []
-        for clone in all_clones:
-            bot_id = clone.get('_id')
-            if bot_id in clone_manager.active_clones:
-                logger.info(f"CLI: Stopping clone {clone.get('username', bot_id)}...")
-                stopping_tasks.append(clone_manager.stop_clone(bot_id))
-        if stopping_tasks:
-            await asyncio.gather(*stopping_tasks)
-            logger.info("CLI: All running clones have been signaled to stop.")
-
-        await asyncio.sleep(3) # Give a moment for processes to shut down
-
-        # Then, start them again
-        started_count = 0
-        total_clones = len(all_clones)
-        for clone in all_clones:
-            bot_id = clone.get('_id')
-            username = clone.get('username', 'unknown')
-
-            if not bot_id:
-                logger.warning(f"CLI: Skipping clone entry with no _id during restart-all.")
-                continue
-
-            try:
-                logger.info(f"CLI: Activating and starting clone {username} ({bot_id}) after restart.")
-                await activate_clone(bot_id)
-                await update_clone_data(bot_id, {"status": "active"})
+        operation = await clone_manager.rolling_restart(all_clones, wave_size=wave_size, on_progress=_print_progress)
 
-                success, message = await clone_manager.start_clone(bot_id)
-                if success:
-                    started_count += 1
-                    logger.info(f"CLI: Successfully restarted {username} ({bot_id}): {message}")
-                else:
-                    logger.error(f"CLI: Failed to restart {username} ({bot_id}): {message}")
-            except Exception as e:
-                logger.error(f"CLI: An unexpected error occurred during restart of {username} ({bot_id}): {e}", exc_info=True)
-
-        logger.info(f"CLI: Finished restarting all clones. Result: {started_count}/{total_clones} started successfully.")
-        print(f"\nCLI Result: Restarted {started_count}/{total_clones} clones.")
-        return started_count, total_clones
+        logger.info(f"CLI: Finished restarting all clones. Result: {operation.summary()}")
+        print(f"\nCLI Result: Restarted {operation.succeeded}/{len(all_clones)} clones.")
+        if operation.status == 'aborted':
+            print(f"Rolling restart aborted: {operation.message}")
+        return operation.succeeded, len(all_clones)
 
     except Exception as e:
         logger.error(f"CLI: Fatal error during restart_all_clones_cli: {e}", exc_info=True)
@@ -1145,7 +1218,7 @@ async def stop_clone_cli(bot_id: str):
         print(f"CLI Error: An unexpected error occurred while stopping clone {bot_id}. Check logs.")
         return False
 
-async def stop_all_clones_cli():
+async def stop_all_clones_cli(concurrency: Optional[int] = None):
     """Stop all running clones (CLI wrapper)"""
     logger.info("CLI: Request received to stop all running clones.")
     try:
@@ -1157,25 +1230,15 @@ async def stop_all_clones_cli():
             return 0
 
         logger.info(f"CLI: Found {len(running_clones_ids)} running clones. Initiating stop process...")
+        operation = await clone_manager.bulk_stop(running_clones_ids, concurrency=concurrency,
+                                                  on_progress=_print_progress)
+        for bot_id, result in operation.results.items():
+            if not result['ok']:
+                logger.error(f"CLI: Failed to stop clone {bot_id}: {result['message']}")
 
-        stopping_tasks = []
-        for bot_id in running_clones_ids:
-            stopping_tasks.append(clone_manager.stop_clone(bot_id))
-
-        results = await asyncio.gather(*stopping_tasks, return_exceptions=True)
-
-        stopped_count = 0
-        for i, result in enumerate(results):
-            bot_id = running_clones_ids[i]
-            if isinstance(result, tuple) and result[0]: # (True, message)
-                stopped_count += 1
-                logger.info(f"CLI: Successfully stopped clone {bot_id}.")
-            else:
-                logger.error(f"CLI: Failed to stop clone {bot_id}. Result: {result}")
-
-        logger.info(f"CLI: Finished stopping clones. Stopped {stopped_count}/{len(running_clones_ids)} running clones.")
-        print(f"\nCLI Result: Stopped {stopped_count}/{len(running_clones_ids)} running clones.")
-        return stopped_count
+        logger.info(f"CLI: Finished stopping clones. Stopped {operation.succeeded}/{len(running_clones_ids)} running clones.")
+        print(f"\nCLI Result: Stopped {operation.succeeded}/{len(running_clones_ids)} running clones.")
+        return operation.succeeded
 
     except Exception as e:
         logger.error(f"CLI: Fatal error during stop_all_clones_cli: {e}", exc_info=True)
@@ -1225,6 +1288,8 @@ async def cli_main():
     parser.add_argument('action', choices=['start', 'restart', 'stop', 'list', 'start-all', 'restart-all', 'stop-all'],
                        help='Action to perform: start, restart, stop, list, start-all, restart-all, stop-all')
     parser.add_argument('--bot-id', type=str, help='Bot ID for single clone operations (start, restart, stop)')
+    parser.add_argument('--wave-size', type=int, help='Clones restarted per wave by restart-all')
+    parser.add_argument('--concurrency', type=int, help='Clones started or stopped at once by start-all/stop-all')
 
     # Parse arguments. If no args provided, print help and exit.
     if len(sys.argv) == 1:
@@ -1234,11 +1299,11 @@ async def cli_main():
     args = parser.parse_args()
 
     if args.action == 'start-all':
-        await start_all_clones_cli()
+        await start_all_clones_cli(args.concurrency)
     elif args.action == 'restart-all':
-        await restart_all_clones_cli()
+        await restart_all_clones_cli(args.wave_size)
     elif args.action == 'stop-all':
-        await stop_all_clones_cli()
+        await stop_all_clones_cli(args.concurrency)
     elif args.action == 'list':
         await list_clones_cli()
     elif args.action in ['start', 'restart', 'stop']:
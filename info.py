@@ -39,17 +39,46 @@ class Config(object):
     LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
     ENVIRONMENT = os.environ.get("ENVIRONMENT", "production")
 
+    # Logging pipeline
+    LOG_FORMAT = os.environ.get("LOG_FORMAT", "text").lower()  # text or json
+    LOG_LEVELS = os.environ.get("LOG_LEVELS", "")  # e.g. "bot.utils.session_manager=DEBUG,pyrogram=ERROR"
+    LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+    LOG_DEBUG_BURST = int(os.environ.get("LOG_DEBUG_BURST", "20"))
+    LOG_DEBUG_WINDOW = float(os.environ.get("LOG_DEBUG_WINDOW", "10"))
+    LOG_DEBUG_SAMPLE_EVERY = int(os.environ.get("LOG_DEBUG_SAMPLE_EVERY", "100"))
+
     # Rate Limiting
     RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() == "true"
     MAX_REQUESTS_PER_MINUTE = int(os.environ.get("MAX_REQUESTS_PER_MINUTE", "20"))
+    RATE_LIMIT_USER_BURST = int(os.environ.get("RATE_LIMIT_USER_BURST", "8"))  # updates a user may send at once
+    RATE_LIMIT_CLONE_PER_SECOND = float(os.environ.get("RATE_LIMIT_CLONE_PER_SECOND", "30"))
+    RATE_LIMIT_GLOBAL_PER_SECOND = float(os.environ.get("RATE_LIMIT_GLOBAL_PER_SECOND", "200"))
+
+    # Outbound send scheduler (per bot client)
+    SEND_RATE_PER_SECOND = float(os.environ.get("SEND_RATE_PER_SECOND", "25"))
+    SEND_CHAT_RATE_PER_SECOND = float(os.environ.get("SEND_CHAT_RATE_PER_SECOND", "1"))
+    SEND_BULK_SHARE = float(os.environ.get("SEND_BULK_SHARE", "0.8"))  # share of the send rate bulk jobs may use
+
+    # Clone config cache (entries are also dropped when settings change)
+    CLONE_CONFIG_CACHE_SIZE = int(os.environ.get("CLONE_CONFIG_CACHE_SIZE", "1000"))
+    CLONE_CONFIG_CACHE_TTL = float(os.environ.get("CLONE_CONFIG_CACHE_TTL", "300"))
 
     # Monitoring
     HEALTH_CHECK_ENABLED = os.environ.get("HEALTH_CHECK_ENABLED", "true").lower() == "true"
     SYSTEM_MONITORING_ENABLED = os.environ.get("SYSTEM_MONITORING_ENABLED", "true").lower() == "true"
+    SYSTEM_SAMPLE_INTERVAL = float(os.environ.get("SYSTEM_SAMPLE_INTERVAL", "15"))
+    SYSTEM_SAMPLE_HISTORY = int(os.environ.get("SYSTEM_SAMPLE_HISTORY", "240"))
+    LOOP_PROBE_INTERVAL = float(os.environ.get("LOOP_PROBE_INTERVAL", "0.1"))  # event loop lag probe, seconds
+    LOOP_SLOW_THRESHOLD = float(os.environ.get("LOOP_SLOW_THRESHOLD", "0.25"))  # loop blocked this long is a stall, seconds
+    LOOP_LAG_HISTORY = int(os.environ.get("LOOP_LAG_HISTORY", "3000"))  # lag probes kept (5 minutes at 0.1s)
+    PROFILE_SAMPLE_INTERVAL = float(os.environ.get("PROFILE_SAMPLE_INTERVAL", "0.01"))  # on-demand CPU profile, seconds
+    PROFILE_MAX_SECONDS = float(os.environ.get("PROFILE_MAX_SECONDS", "300"))  # longest profile an admin may start
+    PROFILE_MEMORY_FRAMES = int(os.environ.get("PROFILE_MEMORY_FRAMES", "5"))  # tracemalloc frames kept per allocation
 
     # Web Interface
     WEB_SERVER_ENABLED = os.environ.get("WEB_SERVER_ENABLED", "true").lower() == "true"
     WEB_SERVER_PORT = int(os.environ.get("WEB_SERVER_PORT", "5000"))
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")  # optional bearer token for /metrics
 
     # Error Handling
     DETAILED_ERRORS = os.environ.get("DETAILED_ERRORS", "false").lower() == "true"
@@ -58,6 +87,22 @@ class Config(object):
     # Storage Configuration
     STORAGE_PATH = os.environ.get("STORAGE_PATH", "/tmp")
     TEMP_PATH = os.environ.get("TEMP_PATH", "/tmp")
+    STORAGE_RECONCILE_INTERVAL = int(os.environ.get("STORAGE_RECONCILE_INTERVAL", "3600"))  # seconds
+    STORAGE_SCAN_RATE = int(os.environ.get("STORAGE_SCAN_RATE", "5000"))  # directory entries/second
+
+    # Admin/dashboard statistics cache
+    STATS_CACHE_TTL = int(os.environ.get("STATS_CACHE_TTL", "30"))  # seconds before a refresh
+    STATS_MAX_STALE = int(os.environ.get("STATS_MAX_STALE", "600"))  # oldest value served while refreshing
+    CLONE_STATS_REPAIR_INTERVAL = int(os.environ.get("CLONE_STATS_REPAIR_INTERVAL", "21600"))  # seconds between clone stats rollup rebuilds
+
+    # Clone session storage
+    CLONE_SESSION_FLUSH_INTERVAL = float(os.environ.get("CLONE_SESSION_FLUSH_INTERVAL", "5"))  # peer-cache write batching, seconds
+
+    # Bulk clone lifecycle (stop/start all, rolling restart)
+    CLONE_BULK_CONCURRENCY = int(os.environ.get("CLONE_BULK_CONCURRENCY", "5"))  # clones stopped/started at once
+    CLONE_ROLLING_WAVE_SIZE = int(os.environ.get("CLONE_ROLLING_WAVE_SIZE", "5"))  # clones restarted per wave
+    CLONE_HEALTH_TIMEOUT = float(os.environ.get("CLONE_HEALTH_TIMEOUT", "30"))  # seconds a restarted clone has to turn healthy
+    CLONE_MIGRATION_BATCH_SIZE = int(os.environ.get("CLONE_MIGRATION_BATCH_SIZE", "500"))  # files per batch when moving a clone's data
 
     # Web Configuration
     WEBHOOK_SECRET = os.environ.get("WEBHOOK_SECRET", "")
@@ -65,6 +110,9 @@ class Config(object):
 
     # Channel Configuration with defaults for missing vars  
     INDEX_CHANNEL_ID = int(os.environ.get("INDEX_CHANNEL_ID", "0"))
+    LIVE_INDEX_BATCH_SIZE = int(os.environ.get("LIVE_INDEX_BATCH_SIZE", "50"))  # files per bulk write
+    LIVE_INDEX_FLUSH_MS = int(os.environ.get("LIVE_INDEX_FLUSH_MS", "500"))  # max time a post waits in the buffer
+    LIVE_INDEX_MAX_BACKFILL = int(os.environ.get("LIVE_INDEX_MAX_BACKFILL", "5000"))  # message ids per catch-up
     CHANNEL_ID = int(os.environ.get("CHANNEL_ID", os.environ.get("INDEX_CHANNEL_ID", "0")))  # Fallback to INDEX_CHANNEL_ID
     OWNER_ID = int(os.environ.get("OWNER_ID", "0"))
 
@@ -1,21 +1,18 @@
 import logging
 from logging.handlers import RotatingFileHandler
 
+from bot.logging import add_log_handler
+
 LOG_FILE_NAME = "LinkVault.txt"
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="[%(asctime)s - %(levelname)s] - %(name)s - %(message)s",
-    datefmt='%d-%b-%y %H:%M:%S',
-    handlers=[
-        RotatingFileHandler(
-            LOG_FILE_NAME,
-            maxBytes=50_000_000,
-            backupCount=10,
-            encoding="utf-8"
-        ),
-        logging.StreamHandler()
-    ]
+# Rotating file output is written by the shared background logging thread
+add_log_handler(
+    RotatingFileHandler(
+        LOG_FILE_NAME,
+        maxBytes=50_000_000,
+        backupCount=10,
+        encoding="utf-8"
+    )
 )
 
 logging.getLogger("pyrogram").setLevel(logging.WARNING)
@@ -1,3 +1,7 @@
+# Import timings are recorded from here on when PROFILE_STARTUP=1
+from shared.utils.startup_profiler import startup_profiler, enable_from_env
+enable_from_env()
+
 # Setup uvloop if available (not on Windows)
 from shared.utils.uvloop_compat import setup_event_loop
 setup_event_loop()
@@ -8,18 +12,26 @@ import signal
 import sys
 from pathlib import Path
 from bot import Bot
+from bot.plugins import MOTHER_BOT_PLUGINS
 from clone_manager import clone_manager
 import pymongo
 from pyrogram.client import Client
 from info import Config
 
 # Setup logging first
-from bot.logging import LOGGER
+from bot.logging import LOGGER, setup_logging
+setup_logging()
 
-# Import callback safety to suppress handler errors (auto-initializes)
+# Suppress handler removal errors from pyrogram's dispatcher
 from bot.utils.callback_safety import suppress_handler_removal_errors
+suppress_handler_removal_errors()
+
+# Record Telegram API latency and handler metrics for every client
+from bot.utils.metrics import install_telegram_instrumentation
+install_telegram_instrumentation()
 
 logger = LOGGER(__name__)
+startup_profiler.mark("imports")
 
 class GracefulShutdown:
     """Handle graceful shutdown of the application"""
@@ -118,22 +130,7 @@ async def start_mother_bot():
             api_id=Config.API_ID,
             api_hash=Config.API_HASH,
             bot_token=Config.BOT_TOKEN,
-            plugins=dict(
-                root="bot.plugins",
-                include=[
-                    "callback_unified",
-                    "mother_clone_handlers",
-                    "start_handler",
-                    "balance_management",
-                    "indexing_unified",
-                    "clone_admin_settings",
-                    "clone_database_commands",
-                    "clone_index",
-                    "clone_auto_index",
-                    "clone_forward_indexer",
-                    "clone_status_commands"
-                ]
-            ),
+            plugins=MOTHER_BOT_PLUGINS,
             workdir=session_dir  # Use separate directory for sessions
         )
 
@@ -149,12 +146,12 @@ async def start_mother_bot():
                 else:
                     logger.info(f"✅ Mother Bot client already connected!")
                     print(f"✅ DEBUG BOT: Mother Bot client already connected!")
-                return app
+                break
             except Exception as start_error:
                 if "Client is already connected" in str(start_error):
                     logger.info(f"✅ Mother Bot client already connected (attempt {attempt + 1})")
                     print(f"✅ DEBUG BOT: Mother Bot client already connected (attempt {attempt + 1})")
-                    return app
+                    break
                 elif "FLOOD_WAIT" in str(start_error):
                     import re
                     match = re.search(r'(\d+)', str(start_error))
@@ -166,6 +163,16 @@ async def start_mother_bot():
                     if attempt == max_start_retries - 1:
                         raise
                     await asyncio.sleep(5)
+        else:
+            return None
+
+        # New posts in Config.INDEX_CHANNEL_ID are indexed as they arrive
+        try:
+            from bot.utils.live_indexer import live_indexer
+            await live_indexer.start_mother(app)
+        except Exception as e:
+            logger.error(f"❌ Could not start live indexing: {e}")
+        return app
 
     except Exception as e:
         logger.error(f"❌ Failed to start Mother Bot: {e}")
@@ -178,14 +185,35 @@ async def start_clone_system():
         logger.info("🔄 Starting Clone Manager...")
         print("🔄 DEBUG CLONE: Starting Clone Manager...")
 
+        # Resolve clone plugins once up front; this also reports any that are missing
+        from bot.utils.handler_table import get_clone_handler_table
+        get_clone_handler_table().build()
+
+        # Mother and clone plugins are both imported now, so every callback route is known
+        from bot.utils.callback_router import registry
+        registry.log_report()
+
+        # Bulk operations submitted from the dashboard thread run on this loop
+        clone_manager.loop = asyncio.get_running_loop()
+
+        # Clones moved to or from a dedicated database read and write where they were moved
+        from bot.database.clone_placement import placement
+        placement.loop = clone_manager.loop
+        try:
+            await placement.load()
+        except Exception as e:
+            logger.error(f"❌ Could not load clone data placement: {e}")
+
         # Get list of all clones first
         from bot.database.clone_db import get_all_clones
         all_clones = await get_all_clones()
 
+        from bot.utils.subscription_scheduler import lifecycle_scheduler
         if not all_clones:
             logger.warning("⚠️ No clones found in database")
             print("⚠️ DEBUG CLONE: No clones found in database")
-            return None
+            # Subscriptions created later still need their deadlines tracked
+            return asyncio.create_task(lifecycle_scheduler.run())
 
         # Show all clones with their statuses
         for clone in all_clones:
@@ -212,7 +240,7 @@ async def start_clone_system():
         # Start subscription monitoring in background
         logger.info("⏱️ Starting subscription monitoring...")
         print("⏱️ DEBUG CLONE: Starting subscription monitoring...")
-        task = asyncio.create_task(clone_manager.check_subscriptions())
+        task = asyncio.create_task(lifecycle_scheduler.run())
         logger.info("✅ Subscription monitoring started")
         print("✅ DEBUG CLONE: Subscription monitoring started")
         return task
@@ -224,19 +252,6 @@ async def start_clone_system():
         traceback.print_exc()
         return None
 
-async def start_subscription_monitoring():
-    """Start subscription monitoring for mother bot"""
-    try:
-        from bot.utils.subscription_checker import subscription_checker
-        task = asyncio.create_task(subscription_checker.start_monitoring())
-        logger.info("✅ Mother Bot subscription monitoring started")
-        print("✅ DEBUG SUBSCRIPTION: Mother Bot subscription monitoring started")
-        return task
-    except Exception as e:
-        logger.error(f"❌ Mother Bot subscription monitoring failed: {e}")
-        print(f"❌ DEBUG SUBSCRIPTION: Mother Bot subscription monitoring failed: {e}")
-        return None
-
 async def main():
     """Main function for Mother Bot + Clone System"""
     shutdown_handler = GracefulShutdown()
@@ -260,6 +275,10 @@ async def main():
         # Setup event system (optional)
         try:
             from bot.core.events.base import event_bus
+            from bot.utils.live_indexer import live_indexer
+            from bot.utils.clone_config_loader import clone_config_loader
+            live_indexer.subscribe(event_bus)
+            clone_config_loader.subscribe(event_bus)
             logger.info("✅ Event system initialized")
         except ImportError:
             logger.info("ℹ️ Event system not available, skipping")
@@ -271,6 +290,7 @@ async def main():
         # Initialize databases
         if not await initialize_databases():
             sys.exit(1)
+        startup_profiler.mark("databases")
 
         # Add startup delay to prevent immediate rate limiting
         await asyncio.sleep(2)
@@ -281,6 +301,7 @@ async def main():
         if not app:
             logger.error("❌ Failed to initialize Mother Bot")
             sys.exit(1)
+        startup_profiler.mark("mother bot")
 
         # Initialize handlers after bot is ready
         try:
@@ -321,6 +342,11 @@ async def main():
         logger.info("🔄 About to start clone system...")
         print("🔄 DEBUG MAIN: About to start clone system...")
         clone_task = await start_clone_system()
+        startup_profiler.mark("clone system")
+        if startup_profiler.active:
+            startup_profiler.stop()
+            report_path = startup_profiler.write_report()
+            logger.info(f"⏱️ Startup profile written to {report_path}\n{startup_profiler.summary()}")
         if clone_task:
             monitoring_tasks.append(clone_task)
             logger.info("✅ Clone system task added to monitoring")
@@ -329,23 +355,8 @@ async def main():
             logger.error("❌ Clone system task is None")
             print("❌ DEBUG MAIN: Clone system task is None")
 
-        # Start subscription monitoring
-        subscription_task = await start_subscription_monitoring()
-        if subscription_task:
-            monitoring_tasks.append(subscription_task)
-
-        # Add periodic pending clone check (every 10 minutes)
-        async def periodic_pending_check():
-            while True:
-                try:
-                    await asyncio.sleep(600)  # 10 minutes
-                    await clone_manager.check_pending_clones()
-                except Exception as e:
-                    logger.error(f"❌ Error in periodic pending check: {e}")
-                    await asyncio.sleep(300)  # Wait 5 minutes on error
-
-        pending_monitor = asyncio.create_task(periodic_pending_check())
-        monitoring_tasks.append(pending_monitor)
+        # Subscription expiry and pending activations are handled by the lifecycle
+        # scheduler started with the clone system; no periodic sweeps needed
 
         # Start session cleanup task if session manager exists
         try:
@@ -368,6 +379,13 @@ async def main():
         except Exception as e:
             logger.error(f"❌ System monitoring failed: {e}")
 
+        # Watch the event loop for lag and blocking calls
+        try:
+            from bot.utils.loop_monitor import loop_monitor
+            monitoring_tasks.append(loop_monitor.start())
+        except Exception as e:
+            logger.error(f"❌ Event loop monitor failed: {e}")
+
         # Start health monitoring
         try:
             from bot.utils.health_check import health_checker
@@ -377,6 +395,31 @@ async def main():
         except Exception as e:
             logger.error(f"❌ Health monitoring failed: {e}")
 
+        # Keep storage usage counters in line with the disk
+        try:
+            from bot.utils.file_manager import start_storage_reconciler
+            storage_task = asyncio.create_task(start_storage_reconciler())
+            monitoring_tasks.append(storage_task)
+            logger.info("✅ Storage reconciler started")
+        except Exception as e:
+            logger.error(f"❌ Storage reconciler failed: {e}")
+
+        # Rebuild clone stats rollups now and then, repairing any drift
+        try:
+            from bot.database.mongo_db import start_clone_stats_repair
+            monitoring_tasks.append(asyncio.create_task(start_clone_stats_repair()))
+            logger.info("✅ Clone stats repair scheduled")
+        except Exception as e:
+            logger.error(f"❌ Clone stats repair failed: {e}")
+
+        # Drop idle rate limit buckets so one-off senders do not accumulate
+        try:
+            from bot.utils.rate_limiter import rate_limiter
+            eviction_task = asyncio.create_task(rate_limiter.run_eviction())
+            monitoring_tasks.append(eviction_task)
+        except Exception as e:
+            logger.error(f"❌ Rate limiter eviction failed: {e}")
+
         # Start web server for monitoring dashboard
         try:
             from web.server import start_webserver
@@ -439,6 +482,14 @@ async def main():
         except Exception as e:
             logger.error(f"❌ Error stopping clones: {e}")
 
+        # Let queued events (including the clone stops above) reach their subscribers
+        try:
+            from bot.core.events.base import event_bus
+            if await event_bus.drain(timeout=10.0):
+                logger.info("✅ Event bus drained")
+        except Exception as e:
+            logger.error(f"❌ Error draining event bus: {e}")
+
         # Stop mother bot with timeout
         if app:
             try:
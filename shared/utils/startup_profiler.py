@@ -0,0 +1,193 @@
+"""
+Startup profiler
+
+Records how long each module takes to import, plus named startup phases, and
+writes them to a JSON report. Enabled for the bot with ``PROFILE_STARTUP=1``
+(report path from ``STARTUP_PROFILE_PATH``), or run directly:
+
+    python -m shared.utils.startup_profiler clone_manager
+
+Only the standard library is used here so the profiler can be installed before
+anything else is imported.
+"""
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_REPORT_PATH = "logs/startup_profile.json"
+
+
+class _TimedLoader:
+    """Wraps a module loader and times its exec_module()"""
+
+    def __init__(self, loader, profiler: "StartupProfiler", name: str):
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter(self._name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit(self._name)
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+
+class _TimingFinder:
+    """Meta path finder that defers to the real finders and wraps the loader they return"""
+
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, "busy", False):
+            return None
+        self._local.busy = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.busy = False
+
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self._profiler, fullname)
+        return spec
+
+
+class StartupProfiler:
+    """Per-module import timings (self and cumulative) and startup phase marks"""
+
+    def __init__(self):
+        self.active = False
+        self.started_at: Optional[float] = None
+        self._finder: Optional[_TimingFinder] = None
+        self._stack = threading.local()
+        self._modules: Dict[str, Dict] = {}
+        self._phases: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Install the import hook; modules imported before this are not timed"""
+        if self.active:
+            return
+        self.active = True
+        self.started_at = time.perf_counter()
+        self._finder = _TimingFinder(self)
+        sys.meta_path.insert(0, self._finder)
+
+    def stop(self):
+        if self._finder is not None and self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+        self.active = False
+
+    def mark(self, phase: str):
+        """Record that a startup phase finished (no-op unless profiling)"""
+        if not self.active:
+            return
+        with self._lock:
+            self._phases.append({
+                "phase": phase,
+                "at_ms": round((time.perf_counter() - self.started_at) * 1000, 1)
+            })
+
+    def _frames(self) -> list:
+        frames = getattr(self._stack, "frames", None)
+        if frames is None:
+            frames = self._stack.frames = []
+        return frames
+
+    def _enter(self, name: str):
+        # [name, started, time spent in nested imports]
+        self._frames().append([name, time.perf_counter(), 0.0])
+
+    def _exit(self, name: str):
+        frames = self._frames()
+        _, started, children = frames.pop()
+        elapsed = time.perf_counter() - started
+        parent = frames[-1][0] if frames else None
+        if frames:
+            frames[-1][2] += elapsed
+        with self._lock:
+            self._modules[name] = {
+                "module": name,
+                "self_ms": round((elapsed - children) * 1000, 2),
+                "total_ms": round(elapsed * 1000, 2),
+                "parent": parent,
+            }
+
+    def report(self, top: Optional[int] = None) -> Dict:
+        with self._lock:
+            modules = sorted(self._modules.values(), key=lambda m: m["self_ms"], reverse=True)
+            phases = list(self._phases)
+
+        packages: Dict[str, float] = {}
+        for module in modules:
+            package = module["module"].split(".", 1)[0]
+            packages[package] = packages.get(package, 0.0) + module["self_ms"]
+
+        return {
+            "import_ms": round(sum(m["total_ms"] for m in modules if m["parent"] is None), 1),
+            "module_count": len(modules),
+            "packages": dict(sorted(((k, round(v, 1)) for k, v in packages.items()),
+                                    key=lambda item: item[1], reverse=True)),
+            "modules": modules[:top] if top else modules,
+            "phases": phases,
+        }
+
+    def write_report(self, path: Optional[str] = None) -> Path:
+        """Write the JSON report and return its path"""
+        path = Path(path or os.environ.get("STARTUP_PROFILE_PATH") or DEFAULT_REPORT_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2))
+        return path
+
+    def summary(self, top: int = 15) -> str:
+        report = self.report(top=top)
+        lines = [f"Imported {report['module_count']} modules in {report['import_ms']:.0f}ms"]
+        lines += [f"  {package:<28} {ms:>8.1f}ms" for package, ms in list(report["packages"].items())[:top]]
+        if report["phases"]:
+            lines.append("Phases:")
+            lines += [f"  {phase['phase']:<28} {phase['at_ms']:>8.1f}ms" for phase in report["phases"]]
+        return "\n".join(lines)
+
+
+# Global startup profiler instance
+startup_profiler = StartupProfiler()
+
+
+def enable_from_env() -> bool:
+    """Start profiling when PROFILE_STARTUP is set; call before other imports"""
+    if os.environ.get("PROFILE_STARTUP", "").lower() in ("1", "true", "yes"):
+        startup_profiler.start()
+    return startup_profiler.active
+
+
+if __name__ == "__main__":
+    targets = sys.argv[1:] or ["main"]
+    startup_profiler.start()
+    for target in targets:
+        importlib.import_module(target)
+        startup_profiler.mark(f"import {target}")
+    startup_profiler.stop()
+    report_path = startup_profiler.write_report()
+    print(startup_profiler.summary())
+    print(f"Report written to {report_path}")
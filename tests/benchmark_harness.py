@@ -0,0 +1,335 @@
+"""
+Benchmark harness used by tests/test_performance.py.
+
+Runs real bot code paths against a local Mongo stand-in (mongomock-motor,
+or an ephemeral mongod when BENCH_MONGO_URL is set) and a fake Pyrogram
+client, and compares throughput/latency with a JSON baseline.
+
+Environment:
+    RUN_BENCHMARKS=1          enable the benchmark tests
+    BENCH_SIZES=10000,100000  dataset sizes (documents) to run at
+    BENCH_ITERATIONS=50       measured calls per scenario
+    BENCH_THRESHOLD=0.25      allowed relative regression vs the baseline
+    BENCH_UPDATE_BASELINE=1   overwrite the baseline with this run
+    BENCH_MONGO_URL=...       use a real (throwaway) mongod instead of mongomock
+"""
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from pyrogram import enums
+
+BASELINE_PATH = Path(__file__).with_name('performance_baseline.json')
+RESULTS_PATH = Path(__file__).with_name('performance_results.json')
+
+BENCH_ENABLED = os.environ.get('RUN_BENCHMARKS', '').lower() in ('1', 'true', 'yes')
+BENCH_SIZES = [int(size) for size in os.environ.get('BENCH_SIZES', '10000').split(',') if size.strip()]
+BENCH_ITERATIONS = int(os.environ.get('BENCH_ITERATIONS', '50'))
+BENCH_THRESHOLD = float(os.environ.get('BENCH_THRESHOLD', '0.25'))
+BENCH_UPDATE_BASELINE = os.environ.get('BENCH_UPDATE_BASELINE', '').lower() in ('1', 'true', 'yes')
+BENCH_MONGO_URL = os.environ.get('BENCH_MONGO_URL', '')
+
+WORDS = (
+    'avengers', 'matrix', 'inception', 'interstellar', 'breaking', 'dark', 'knight',
+    'office', 'friends', 'sherlock', 'narcos', 'vikings', 'dune', 'witcher', 'lost',
+    'arcane', 'ozark', 'fargo', 'tenet', 'joker', 'python', 'tutorial', 'lecture', 'album'
+)
+QUALITIES = ('480p', '720p', '1080p', '2160p')
+FILE_TYPES = ('video', 'document', 'audio')
+
+
+# ==================== MEASUREMENT ====================
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (``q`` in 0-100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+@dataclass
+class BenchResult:
+    name: str
+    size: int
+    backend: str
+    iterations: int
+    ops_per_sec: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.backend}:{self.name}@{self.size}"
+
+
+async def measure(name: str, size: int, operation: Callable[[int], Awaitable], *,
+                  iterations: int = BENCH_ITERATIONS, warmup: int = 3,
+                  units_per_call: int = 1, backend: str = 'mongomock') -> BenchResult:
+    """Time ``operation(i)`` sequentially; throughput counts ``units_per_call`` per call"""
+    for i in range(warmup):
+        await operation(-1 - i)
+
+    latencies = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        call_start = time.perf_counter()
+        await operation(i)
+        latencies.append(time.perf_counter() - call_start)
+    elapsed = time.perf_counter() - started
+
+    return BenchResult(
+        name=name,
+        size=size,
+        backend=backend,
+        iterations=iterations,
+        ops_per_sec=round(iterations * units_per_call / elapsed, 2) if elapsed else 0.0,
+        p50_ms=round(percentile(latencies, 50) * 1000, 3),
+        p95_ms=round(percentile(latencies, 95) * 1000, 3),
+        p99_ms=round(percentile(latencies, 99) * 1000, 3),
+    )
+
+
+# ==================== BASELINES ====================
+
+def load_baseline(path: Path = BASELINE_PATH) -> Dict[str, Dict]:
+    try:
+        return json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_results(results: List[BenchResult], path: Path) -> None:
+    data = load_baseline(path) if path.exists() else {}
+    for result in results:
+        data[result.key] = asdict(result)
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + '\n')
+
+
+def find_regressions(result: BenchResult, baseline: Dict[str, Dict],
+                     threshold: float = BENCH_THRESHOLD) -> List[str]:
+    """Describe every way ``result`` is worse than its baseline by more than ``threshold``"""
+    previous = baseline.get(result.key)
+    if not previous:
+        return []
+
+    problems = []
+    if result.ops_per_sec < previous['ops_per_sec'] * (1 - threshold):
+        problems.append(f"{result.key}: ops/sec {result.ops_per_sec} < baseline {previous['ops_per_sec']}")
+    # p99 over a few dozen samples is just the maximum, too noisy to gate on
+    if result.p95_ms > previous['p95_ms'] * (1 + threshold):
+        problems.append(f"{result.key}: p95 {result.p95_ms}ms > baseline {previous['p95_ms']}ms")
+    return problems
+
+
+# ==================== MONGO STAND-IN ====================
+
+def create_bench_client():
+    """Mongo client for benchmarks and the backend label used in baseline keys"""
+    if BENCH_MONGO_URL:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        return AsyncIOMotorClient(BENCH_MONGO_URL), 'mongod'
+
+    from mongomock_motor import AsyncMongoMockClient
+    return AsyncMongoMockClient(), 'mongomock'
+
+
+def bench_db_name(name: str) -> str:
+    return f"bench_{name}"
+
+
+def rebind_motor_handles(monkeypatch, bench_client) -> int:
+    """Point every module-level motor client/database/collection in the project at ``bench_client``"""
+    from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection, AsyncIOMotorDatabase
+    from bot.database.connection import LazyCollection, LazyDatabase, LazyMotorClient
+
+    project_root = str(Path(__file__).resolve().parent.parent)
+    rebound = 0
+    for module in list(sys.modules.values()):
+        module_file = getattr(module, '__file__', None) or ''
+        if not module_file.startswith(project_root) or '/tests/' in module_file:
+            continue
+        for attr, value in list(vars(module).items()):
+            if isinstance(value, (AsyncIOMotorClient, LazyMotorClient)):
+                replacement = bench_client
+            elif isinstance(value, (AsyncIOMotorDatabase, LazyDatabase)):
+                replacement = bench_client[bench_db_name(value.name)]
+            elif isinstance(value, (AsyncIOMotorCollection, LazyCollection)):
+                replacement = bench_client[bench_db_name(value.database.name)][value.name]
+            else:
+                continue
+            monkeypatch.setattr(module, attr, replacement)
+            rebound += 1
+    return rebound
+
+
+def make_file_doc(i: int, now: datetime, clone_id: Optional[str] = None) -> Dict:
+    rng = random.Random(i)
+    title = ' '.join(rng.sample(WORDS, 3))
+    quality = QUALITIES[i % len(QUALITIES)]
+    return {
+        '_id': f"file_{i}",
+        'file_id': f"BQAC{i:010d}",
+        'file_name': f"{title} S{i % 9 + 1:02d}E{i % 24 + 1:02d} {quality}.mkv",
+        'caption': f"{title} [{quality}]",
+        'file_type': FILE_TYPES[i % len(FILE_TYPES)],
+        'file_size': rng.randint(1 << 20, 2 << 30),
+        'keywords': title.split() + [quality],
+        'created_at': now - timedelta(seconds=i),
+        'indexed_at': now - timedelta(seconds=i),
+        # Zipf-like popularity: a few files get most of the downloads
+        'download_count': int(10000 / (1 + i % 5000)) if i % 3 else 0,
+        'access_count': int(1000 / (1 + i % 1000)),
+        'clone_id': clone_id,
+    }
+
+
+async def seed_dataset(bench_client, database_name: str, size: int, clone_id: str, chunk: int = 10000) -> None:
+    """Insert ``size`` files and ``size`` users into the benchmark database"""
+    database = bench_client[bench_db_name(database_name)]
+    now = datetime.utcnow()
+
+    await database.files.delete_many({})
+    await database.users.delete_many({})
+    for start in range(0, size, chunk):
+        stop = min(size, start + chunk)
+        await database.files.insert_many([
+            make_file_doc(i, now, clone_id if i % 2 else None) for i in range(start, stop)
+        ])
+        await database.users.insert_many([{'_id': 10_000_000 + i} for i in range(start, stop)])
+
+
+async def drop_bench_databases(bench_client, *names: str) -> None:
+    for name in names:
+        await bench_client.drop_database(bench_db_name(name))
+
+
+# ==================== FAKE PYROGRAM ====================
+
+class FakeUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.username = f"user{user_id}"
+        self.first_name = f"User {user_id}"
+        self.last_name = None
+        self.is_bot = False
+        self.mention = self.first_name
+
+
+class FakeMedia:
+    def __init__(self, message_id: int, chat_id: int = 0):
+        # Distinct per chat, so re-reading a new chat is not deduplicated as the same files
+        self.file_id = f"BQAD{abs(chat_id)}{message_id:010d}"
+        self.file_unique_id = f"AgAD{abs(chat_id)}{message_id:08d}"
+        self.file_name = f"{' '.join(random.Random(message_id).sample(WORDS, 2))} {message_id}.mkv"
+        self.file_size = 1 << 24
+
+
+class FakeMessage:
+    """Just enough of ``pyrogram.types.Message`` for the handlers under test"""
+
+    def __init__(self, client: "FakeClient", message_id: int = 1, user_id: int = 1,
+                 text: str = '', reply_to_message: "FakeMessage" = None, media: bool = False,
+                 chat_id: int = 0):
+        self._client = client
+        self.id = message_id
+        self.from_user = FakeUser(user_id)
+        self.chat = FakeUser(user_id)
+        self.text = text
+        self.command = text.lstrip('/').split() if text.startswith('/') else None
+        self.reply_to_message = reply_to_message
+        self.date = datetime.utcnow()
+        self.empty = False
+        self.caption = None
+        self.media = enums.MessageMediaType.DOCUMENT if media else None
+        self.document = FakeMedia(message_id, chat_id) if media else None
+
+    async def _api(self, method: str, *args, **kwargs):
+        return await self._client.call(method, *args, **kwargs)
+
+    async def reply_text(self, *args, **kwargs):
+        return await self._api('send_message', *args, **kwargs)
+
+    async def reply(self, *args, **kwargs):
+        return await self._api('send_message', *args, **kwargs)
+
+    async def edit(self, *args, **kwargs):
+        return await self._api('edit_message_text', *args, **kwargs)
+
+    async def edit_text(self, *args, **kwargs):
+        return await self._api('edit_message_text', *args, **kwargs)
+
+    async def delete(self, *args, **kwargs):
+        return await self._api('delete_messages', *args, **kwargs)
+
+    async def copy(self, chat_id, *args, **kwargs):
+        return await self._api('copy_message', chat_id, *args, **kwargs)
+
+
+class FakeClient:
+    """Pyrogram client stand-in: every API method succeeds after ``latency`` seconds"""
+
+    def __init__(self, bot_token: str, latency: float = 0.0):
+        self.bot_token = bot_token
+        self.latency = latency
+        self.name = 'bench'
+        self.me = FakeUser(int(bot_token.split(':', 1)[0]) if ':' in bot_token else 1)
+        self.me.is_bot = True
+        self.calls: Dict[str, int] = {}
+
+    async def call(self, method: str, *args, **kwargs):
+        self.calls[method] = self.calls.get(method, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return FakeMessage(self, message_id=sum(self.calls.values()))
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        async def method(*args, **kwargs):
+            return await self.call(name, *args, **kwargs)
+        return method
+
+    async def get_me(self):
+        return self.me
+
+    async def get_messages(self, chat_id, message_ids):
+        """Nothing was posted after the backlog ``iter_messages`` yields"""
+        self.calls['get_messages'] = self.calls.get('get_messages', 0) + 1
+        if isinstance(message_ids, (list, tuple, range)):
+            return []
+        message = FakeMessage(self, message_id=message_ids)
+        message.empty = True
+        return message
+
+    async def iter_messages(self, chat_id, limit: int, offset: int = 0):
+        """Yield ``limit - offset`` document messages, newest first"""
+        for message_id in range(limit - offset, 0, -1):
+            yield FakeMessage(self, message_id=message_id, user_id=42, media=True, chat_id=chat_id)
+
+
+def record(result: BenchResult) -> List[str]:
+    """Save ``result`` and return regressions against the stored baseline
+
+    A scenario without a baseline entry (or a run with BENCH_UPDATE_BASELINE)
+    writes the result as the new baseline.
+    """
+    save_results([result], RESULTS_PATH)
+    baseline = load_baseline()
+    regressions = [] if BENCH_UPDATE_BASELINE else find_regressions(result, baseline)
+    if BENCH_UPDATE_BASELINE or result.key not in baseline:
+        save_results([result], BASELINE_PATH)
+    print(f"{result.key}: {result.ops_per_sec} ops/s p50={result.p50_ms}ms "
+          f"p95={result.p95_ms}ms p99={result.p99_ms}ms")
+    return regressions
@@ -0,0 +1,160 @@
+import pytest
+import sys
+import os
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bot.plugins import MOTHER_BOT_PLUGINS
+from bot.utils.handler_table import HandlerTable
+
+
+def _commands(flt) -> set:
+    """Command names matched by a (possibly combined) pyrogram filter"""
+    found = set(getattr(flt, 'commands', ()) or ())
+    for part in ('base', 'other'):
+        if getattr(flt, part, None) is not None:
+            found |= _commands(getattr(flt, part))
+    return found
+
+
+@pytest.fixture(scope='module')
+def mother_commands():
+    table = HandlerTable(MOTHER_BOT_PLUGINS).build()
+    return {command for _, handlers in table.groups for handler in handlers
+            for command in _commands(handler.filters)}
+
+
+class StatusMessage:
+    def __init__(self):
+        self.edits = []
+
+    async def edit_text(self, text):
+        self.edits.append(text)
+
+
+class FakeMessage:
+    def __init__(self, user_id, command, reply_to_message=None):
+        self.from_user = SimpleNamespace(id=user_id)
+        self.command = command
+        self.reply_to_message = reply_to_message
+        self.replies = []
+        self.status = StatusMessage()
+
+    async def reply_text(self, text):
+        self.replies.append(text)
+        return self.status
+
+
+class TestAdminOps:
+    """Tests for the mother bot's admin operation commands"""
+
+    def test_bulk_commands_are_served_by_the_mother_bot(self, mother_commands):
+        assert {'restartall', 'stopall'} <= mother_commands
+
+    def test_moveclone_is_served_by_the_mother_bot(self, mother_commands):
+        assert 'moveclone' in mother_commands
+
+    def test_profile_commands_are_served_by_the_mother_bot(self, mother_commands):
+        assert {'profile_cpu', 'profile_mem', 'profile_stop'} <= mother_commands
+
+    def test_broadcast_is_served_by_the_mother_bot(self, mother_commands):
+        assert 'broadcast' in mother_commands
+
+    def test_clone_listing_pages_are_served_by_the_mother_bot(self, mother_commands):
+        from bot.plugins import admin_ops
+
+        assert {'clones', 'clonestatus'} <= mother_commands
+        for data in ('clones_status', 'clones_status#Y2xvbmVfOQ'):
+            route, _ = admin_ops.router.resolve(0, data)
+            assert route.module == 'bot.plugins.admin_ops'
+
+    @pytest.mark.asyncio
+    async def test_stopall_reports_the_operation(self, monkeypatch):
+        from info import Config
+        from bot.plugins import admin_ops
+
+        operation = SimpleNamespace(
+            id='op1', action='stop', status='completed', failed=1, succeeded=1,
+            results={'1': {'ok': True, 'message': 'stopped'}, '2': {'ok': False, 'message': 'timeout'}},
+            summary=lambda: '1 stopped, 1 failed'
+        )
+
+        async def bulk_stop(on_progress=None):
+            return operation
+
+        monkeypatch.setattr(admin_ops.clone_manager, 'bulk_stop', bulk_stop)
+        monkeypatch.setattr(Config, 'is_admin', staticmethod(lambda user_id: user_id == 1))
+
+        denied = FakeMessage(2, ['stopall'])
+        await admin_ops.stop_all_clones_command(None, denied)
+        assert denied.replies == ["❌ Only Mother Bot admins can stop clones."]
+
+        message = FakeMessage(1, ['stopall'])
+        await admin_ops.stop_all_clones_command(None, message)
+        assert message.status.edits[-1].startswith("⚠️ **Bulk stop completed**")
+        assert "`2`: timeout" in message.status.edits[-1]
+
+    @pytest.mark.asyncio
+    async def test_clone_listing_pages_forward(self, monkeypatch):
+        mongomock_motor = pytest.importorskip('mongomock_motor')
+        from bot.database import clone_db
+        from bot.plugins import admin_ops
+        from bot.utils.stats_service import stats_service
+        from bot.utils.ui_builders import page_cursor
+
+        clones = mongomock_motor.AsyncMongoMockClient()['admin_ops_test']['clones']
+        await clones.insert_many([{'_id': f"{i:02d}", 'bot_id': f"{i:02d}", 'username': f"clone{i}_bot",
+                                   'status': 'active'} for i in range(12)])
+        monkeypatch.setattr(clone_db, 'clones_collection', clones)
+
+        async def stats():
+            return {'total_clones': 12}
+
+        monkeypatch.setattr(stats_service, 'get', stats)
+
+        text, markup = await admin_ops.build_clones_status_page()
+        assert "(12 total)" in text and "@clone9_bot" in text and "@clone10_bot" not in text
+        next_data = markup.inline_keyboard[0][-1].callback_data
+        text, markup = await admin_ops.build_clones_status_page(page_cursor(next_data))
+        assert "@clone10_bot" in text and "@clone11_bot" in text and "@clone0_bot" not in text
+        assert [button.text for button in markup.inline_keyboard[0]] == ["⏮ First"]
+
+    @pytest.mark.asyncio
+    async def test_broadcast_copies_through_the_send_scheduler(self, monkeypatch):
+        import bot.database
+        from info import Config
+        from bot.plugins import admin_ops
+        from bot.utils import send_scheduler
+
+        copied = []
+
+        async def copy(user_id):
+            copied.append(user_id)
+
+        async def userbase():
+            return [11, 12, 13]
+
+        scheduled = []
+        real_send = send_scheduler.send
+
+        async def send(client, call, **kwargs):
+            scheduled.append(kwargs)
+            return await real_send(client, call, **kwargs)
+
+        monkeypatch.setattr(bot.database, 'full_userbase', userbase)
+        monkeypatch.setattr(send_scheduler, 'send', send)
+        monkeypatch.setattr('bot.utils.messages.send', send)
+        monkeypatch.setattr(Config, 'is_admin', staticmethod(lambda user_id: user_id == 1))
+
+        client = SimpleNamespace(name='broadcast_test')
+        message = FakeMessage(1, ['broadcast'], reply_to_message=SimpleNamespace(copy=copy))
+        try:
+            await admin_ops.broadcast_command(client, message)
+        finally:
+            await send_scheduler.close_scheduler(client)
+
+        assert sorted(copied) == [11, 12, 13]
+        assert [kwargs['priority'] for kwargs in scheduled] == [send_scheduler.BULK] * 3
+        assert "✅ Sent: 3" in message.status.edits[-1]
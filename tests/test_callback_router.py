@@ -0,0 +1,145 @@
+import pytest
+import sys
+import os
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bot.utils import callback_router
+from bot.utils.callback_router import CallbackRouter, PrefixTrie, RouteRegistry
+from bot.utils.handler_table import _module_handlers
+from bot.utils.metrics import handler_requests
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = RouteRegistry()
+    monkeypatch.setattr(callback_router, 'registry', registry)
+    return registry
+
+
+def make_router(name='plugins.test'):
+    router = CallbackRouter(name)
+    calls = []
+
+    async def record(client, query):
+        calls.append((record.__name__, query.data, query.route_args))
+
+    return router, calls, record
+
+
+async def dispatch(router, data, group=0):
+    """Run ``data`` through the router's handler for ``group`` like pyrogram would"""
+    handler = dict((g, h) for h, g in router.handlers)[group]
+    query = SimpleNamespace(data=data)
+    if not await handler.filters(None, query):
+        return None
+    # pyrofork's handler callback resolves conversation listeners first
+    await getattr(handler, 'original_callback', handler.callback)(None, query)
+    return query
+
+
+class TestPrefixTrie:
+    """Test longest-prefix lookup"""
+
+    def test_longest_prefix_wins(self):
+        trie = PrefixTrie()
+        trie.add('get_', 'short')
+        trie.add('get_file:', 'long')
+        assert trie.longest('get_file:42') == 'long'
+        assert trie.longest('get_random') == 'short'
+        assert trie.longest('ge') is None
+
+    def test_first_value_is_kept(self):
+        trie = PrefixTrie()
+        assert trie.add('a:', 1) is None
+        assert trie.add('a:', 2) == 1
+        assert trie.items() == [('a:', 1)]
+
+
+class TestRouting:
+    """Test resolving and dispatching callback data"""
+
+    @pytest.mark.asyncio
+    async def test_exact_and_prefix_routes(self, registry):
+        router, calls, record = make_router()
+        router.route('close', 'settings')(record)
+        router.prefix('buy_premium:')(record)
+
+        assert (await dispatch(router, 'close')).route_args == ()
+        assert (await dispatch(router, 'buy_premium:monthly:2')).route_args == ('monthly', '2')
+        assert await dispatch(router, 'closed') is None
+        assert await dispatch(router, None) is None
+        assert [data for _, data, _ in calls] == ['close', 'buy_premium:monthly:2']
+
+    @pytest.mark.asyncio
+    async def test_exact_name_beats_prefix(self, registry):
+        router = CallbackRouter('plugins.test')
+        seen = []
+
+        @router.prefix('toggle_')
+        async def toggle_any(client, query):
+            seen.append(('prefix', query.route_args))
+
+        @router.route('toggle_random')
+        async def toggle_random(client, query):
+            seen.append(('exact', query.route_args))
+
+        await dispatch(router, 'toggle_random')
+        await dispatch(router, 'toggle_recent')
+        assert seen == [('exact', ()), ('prefix', ('recent',))]
+
+    @pytest.mark.asyncio
+    async def test_one_handler_per_group(self, registry):
+        router, calls, record = make_router()
+        router.route('a', 'b')(record)
+        router.route('c', group=-3)(record)
+        router.prefix('d:', group=-3)(record)
+
+        assert [group for _, group in router.handlers] == [-3, 0]
+        assert await dispatch(router, 'c') is None
+        assert (await dispatch(router, 'c', group=-3)).route.pattern == 'c'
+        # Plugin loading picks the handlers up from the module attribute
+        module = SimpleNamespace(router=router, other=None)
+        assert _module_handlers(module) == router.handlers
+
+    @pytest.mark.asyncio
+    async def test_routes_are_timed_by_name(self, registry):
+        router, calls, record = make_router()
+        router.prefix('like_file:')(record)
+        before = handler_requests.get(handler='callback:like_file:*', status='ok')
+        await dispatch(router, 'like_file:7')
+        assert handler_requests.get(handler='callback:like_file:*', status='ok') == before + 1
+
+
+class TestConflictReport:
+    """Test the startup report of overlapping routes"""
+
+    def test_report(self, registry):
+        first = CallbackRouter('plugins.first')
+        second = CallbackRouter('plugins.second')
+
+        async def a(client, query): pass
+        async def b(client, query): pass
+
+        first.prefix('get_file:')(a)
+        first.prefix('get_file:')(b)
+        first.route('random_files', group=-3)(a)
+        first.prefix('toggle_')(a)
+        first.route('toggle_random')(b)
+        second.route('random_files')(b)
+        second.route('about')(a)
+        first.route('about')(b)
+
+        report = registry.report()
+        assert report['routers'] == 2
+        assert report['routes'] == 7
+        assert report['groups'] == {-3: 1, 0: 6}
+        # Modules in one group: the router loaded first keeps the name
+        assert report['duplicates'] == [
+            'group 0: get_file:* (first.b) repeats get_file:* (first.a)',
+            'group 0: about (second.a) repeats about (first.b)',
+        ]
+        assert report['shadowed'] == ['group 0: toggle_random (first.b) inside toggle_* (first.a)']
+        assert report['cross_group'] == ['random_files (first.a) in group -3 and random_files (second.b) in group 0']
@@ -122,3 +122,104 @@ class TestCloneManager:
                 
                 await self.clone_manager.check_subscriptions()
                 mock_stop.assert_called_with("123456")
+
+
+class FakeLifecycle:
+    """Clone start/stop/health stand-ins recording how many ran at once"""
+
+    def __init__(self, manager, unhealthy=()):
+        self.manager = manager
+        self.unhealthy = set(unhealthy)
+        self.running = 0
+        self.peak = 0
+        self.order = []
+
+    async def _step(self, bot_id):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        self.order.append(bot_id)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+
+    async def start_clone(self, bot_id):
+        await self._step(bot_id)
+        self.manager.active_clones[bot_id] = {'client': None}
+        return True, "started"
+
+    async def stop_clone(self, bot_id, reason="manual"):
+        await self._step(bot_id)
+        self.manager.active_clones.pop(bot_id, None)
+        return True, "stopped"
+
+    async def restart_clone(self, bot_id):
+        return await self.start_clone(bot_id)
+
+    async def verify(self, bot_id):
+        return bot_id not in self.unhealthy
+
+    def install(self):
+        self.manager.start_clone = self.start_clone
+        self.manager.stop_clone = self.stop_clone
+        self.manager.restart_clone = self.restart_clone
+        self.manager._verify_clone_health = self.verify
+        return self
+
+
+class TestBulkLifecycle:
+    """Test concurrency-limited bulk operations and rolling restarts"""
+
+    def setup_method(self):
+        self.clone_manager = CloneManager()
+        self.ids = [str(10000000 + i) for i in range(7)]
+
+    @pytest.mark.asyncio
+    async def test_bulk_stop_limits_concurrency(self):
+        fake = FakeLifecycle(self.clone_manager).install()
+        self.clone_manager.active_clones = {bot_id: {} for bot_id in self.ids}
+        progress = []
+
+        operation = await self.clone_manager.bulk_stop(concurrency=3, on_progress=lambda op: progress.append(len(op.results)))
+
+        assert operation.status == 'completed'
+        assert operation.succeeded == 7
+        assert fake.peak == 3
+        assert progress == list(range(1, 8))
+        assert not self.clone_manager.active_clones
+        assert self.clone_manager.get_operation(operation.id) is operation
+
+    @pytest.mark.asyncio
+    async def test_rolling_restart_in_waves(self):
+        fake = FakeLifecycle(self.clone_manager).install()
+        self.clone_manager.active_clones = {bot_id: {} for bot_id in self.ids}
+
+        operation = await self.clone_manager.rolling_restart(wave_size=3, health_timeout=0)
+
+        assert operation.status == 'completed'
+        assert (operation.wave, operation.waves) == (3, 3)
+        assert operation.succeeded == 7
+        assert fake.peak == 3
+        # Each wave finishes before the next begins
+        assert sorted(fake.order[:3]) == sorted(self.ids[:3])
+        assert sorted(fake.order[3:6]) == sorted(self.ids[3:6])
+
+    @pytest.mark.asyncio
+    async def test_unhealthy_wave_aborts_restart(self):
+        fake = FakeLifecycle(self.clone_manager, unhealthy=self.ids[:2]).install()
+
+        operation = await self.clone_manager.rolling_restart(self.ids, wave_size=3, health_timeout=0)
+
+        assert operation.status == 'aborted'
+        assert operation.wave == 1
+        assert operation.failed == 2
+        assert operation.skipped == 4
+        assert sorted(fake.order) == sorted(self.ids[:3])
+        assert operation.as_dict()['results'][self.ids[0]]['ok'] is False
+
+    @pytest.mark.asyncio
+    async def test_failures_below_limit_continue(self):
+        FakeLifecycle(self.clone_manager, unhealthy=self.ids[:1]).install()
+
+        operation = await self.clone_manager.rolling_restart(self.ids, wave_size=3, health_timeout=0)
+
+        assert operation.status == 'completed'
+        assert (operation.succeeded, operation.failed, operation.skipped) == (6, 1, 0)
@@ -0,0 +1,267 @@
+import pytest
+import pytest_asyncio
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+DEDICATED_URL = 'mongodb://dedicated.example'
+
+
+@pytest_asyncio.fixture
+async def env(monkeypatch):
+    """Shared database, one dedicated database and a fresh router, all in memory"""
+    mongomock_motor = pytest.importorskip('mongomock_motor')
+    from bot.database import clone_db, mongo_db
+    from bot.database.clone_placement import ClonePlacement
+
+    shared = mongomock_motor.AsyncMongoMockClient()['shared_test']
+    router = ClonePlacement(batch_size=10)
+    router._clients[DEDICATED_URL] = mongomock_motor.AsyncMongoMockClient()
+    monkeypatch.setattr(mongo_db, 'collection', shared['files'])
+    monkeypatch.setattr(mongo_db, 'clone_stats_collection', shared['clone_stats'])
+    monkeypatch.setattr(mongo_db, 'placement', router)
+    monkeypatch.setattr(clone_db, 'clones_collection', shared['clones'])
+
+    await shared['clones'].insert_many([
+        {'_id': 'c1', 'mongodb_url': DEDICATED_URL, 'db_name': 'clone_c1', 'files_placement': 'shared'},
+        {'_id': 'c2'},
+    ])
+    await router.load()
+    for i in range(25):
+        await mongo_db.add_file_to_clone_index(_file(i), 'c1')
+    await mongo_db.add_file_to_clone_index(_file(99), 'c2')
+    yield mongo_db, router, shared, router._clients[DEDICATED_URL]['clone_c1']
+
+
+async def _dedicated_clones(shared, router, *clone_ids):
+    """Clones already routed to their own dedicated database"""
+    await shared['clones'].insert_many([
+        {'_id': clone_id, 'mongodb_url': DEDICATED_URL, 'db_name': f"clone_{clone_id}",
+         'files_placement': 'dedicated'} for clone_id in clone_ids
+    ])
+    await router.load()
+    return [router._clients[DEDICATED_URL][f"clone_{clone_id}"]['files'] for clone_id in clone_ids]
+
+
+def _indexed(clone_id, msg, **overrides):
+    """Document as the channel indexers build it, keyed by chat and message"""
+    return {'_id': f"-1001_{msg}", 'clone_id': clone_id, 'file_id': f"file_{msg}", 'file_name': f"Movie {msg}.mkv",
+            'file_type': 'video', 'file_size': 100, 'chat_id': -1001, 'message_id': msg, **overrides}
+
+
+def _file(i, **overrides):
+    return {'file_id': f"file_{i}", 'file_name': f"Movie {i}.mkv", 'file_type': 'video',
+            'file_size': 100, 'chat_id': -1001, **overrides}
+
+
+class TestMigration:
+    """Tests for moving a clone's data between the shared and its dedicated database"""
+
+    @pytest.mark.asyncio
+    async def test_online_move_keeps_writes_made_during_copy(self, env):
+        mongo_db, router, shared, dedicated = env
+        written = []
+
+        async def write_during_copy(migration):
+            if migration.phase == 'copy' and migration.copied == 10 and not written:
+                written.append(migration.phase)
+                await mongo_db.add_file_to_clone_index(_file(50), 'c1')
+                assert await mongo_db.remove_file_from_clone_index('c1', 'file_0') is True
+                await mongo_db.update_clone_file_access('c1', 'file_24')
+
+        migration = await router.migrate('c1', 'dedicated', on_progress=write_during_copy)
+
+        assert migration.status == 'completed', migration.message
+        assert (migration.source, migration.total) == ('shared', 25)
+        # The file added mid-copy sorts after the copied batch, so the copy picks it up too
+        assert migration.copied == 26
+        assert migration.caught_up >= 3
+        assert router.placement_of('c1') == 'dedicated'
+        record = await shared['clones'].find_one({'_id': 'c1'})
+        assert record['files_placement'] == 'dedicated' and 'placement_migration' not in record
+
+        assert await dedicated.files.count_documents({'clone_id': 'c1'}) == 25
+        assert await dedicated.files.find_one({'file_id': 'file_0'}) is None
+        assert (await dedicated.files.find_one({'file_id': 'file_24'}))['access_count'] == 1
+        # Reads and writes now go to the dedicated database
+        assert (await mongo_db.get_clone_index_stats('c1'))['total_files'] == 25
+        assert await mongo_db.add_file_to_clone_index(_file(51), 'c1') is True
+        assert await dedicated.files.count_documents({}) == 26
+        assert (await mongo_db.get_clone_index_stats('c1'))['total_files'] == 26
+        # The old copy is kept without cleanup; other clones are untouched
+        assert await shared['files'].count_documents({'clone_id': 'c1'}) == 25
+        assert router.placement_of('c2') is None
+        assert (await mongo_db.get_clone_index_stats('c2'))['total_files'] == 1
+
+    @pytest.mark.asyncio
+    async def test_cleanup_and_move_back(self, env):
+        mongo_db, router, shared, dedicated = env
+
+        migration = await router.migrate('c1', 'dedicated', cleanup=True)
+        assert migration.status == 'completed', migration.message
+        assert migration.cleaned == 25
+        assert await shared['files'].count_documents({'clone_id': 'c1'}) == 0
+        assert await shared['clone_stats'].find_one({'_id': 'c1'}) is None
+
+        migration = await router.migrate('c1', 'shared', cleanup=True)
+        assert migration.status == 'completed', migration.message
+        assert migration.verified == 25 and migration.repaired == 0
+        assert await shared['files'].count_documents({'clone_id': 'c1'}) == 25
+        assert await dedicated.files.count_documents({}) == 0
+        assert (await mongo_db.get_detailed_clone_stats('c1'))['total_files'] == 25
+
+    @pytest.mark.asyncio
+    async def test_refusals_leave_routing_alone(self, env):
+        from bot.database.clone_placement import Route
+        mongo_db, router, shared, dedicated = env
+
+        migration = await router.migrate('c2', 'dedicated')
+        assert migration.status == 'failed' and 'no database URL' in migration.message
+        assert (await router.migrate('c1', 'shared')).message == 'Clone c1 is already shared'
+
+        await dedicated.files.insert_one({'_id': 'leftover', 'clone_id': 'c1'})
+        migration = await router.migrate('c1', 'dedicated')
+        assert migration.status == 'failed' and 'already holds 1 files' in migration.message
+        await dedicated.files.delete_one({'_id': 'leftover'})
+
+        await shared['clones'].update_one({'_id': 'c1'}, {'$set': {'placement_migration': 'other'}})
+        migration = await router.migrate('c1', 'dedicated')
+        assert migration.status == 'failed' and 'already being migrated' in migration.message
+
+        assert router.routes == {'c1': Route('shared')}
+        assert (await shared['clones'].find_one({'_id': 'c1'}))['files_placement'] == 'shared'
+
+    @pytest.mark.asyncio
+    async def test_load_routes(self, env):
+        mongo_db, router, shared, dedicated = env
+        await shared['clones'].update_one({'_id': 'c1'}, {'$set': {'files_placement': 'dedicated'}})
+        await shared['clones'].update_one({'_id': 'c2'}, {'$set': {'files_placement': 'dedicated'}})
+
+        assert await router.load() == 1
+        assert router.placement_of('c1') == 'dedicated'
+        assert router.collections('c1')[0] is not None
+        assert router.placement_of('c2') is None
+
+    @pytest.mark.asyncio
+    async def test_cutover_waits_for_running_writes(self, env):
+        """A write still running when the copy ends is finished and synced before the switch"""
+        import asyncio
+        mongo_db, router, shared, dedicated = env
+
+        async with router.writing('c1', {'file_id': 'file_3'}) as (files, _):
+            task = asyncio.create_task(router.migrate('c1', 'dedicated'))
+            for _ in range(50):
+                await asyncio.sleep(0.01)
+            assert task.done() is False
+            assert router.placement_of('c1') == 'shared'
+            await files.update_one({'file_id': 'file_3'}, {'$set': {'file_name': 'Renamed.mkv'}})
+
+        migration = await task
+        assert migration.status == 'completed', migration.message
+        assert (await dedicated.files.find_one({'file_id': 'file_3'}))['file_name'] == 'Renamed.mkv'
+
+    @pytest.mark.asyncio
+    async def test_shared_ids_are_namespaced_per_clone(self, env):
+        """Two clones indexing one channel keep their own documents in the shared collection"""
+        mongo_db, router, shared, dedicated = env
+        c3_files, c4_files = await _dedicated_clones(shared, router, 'c3', 'c4')
+        assert len(await router.merge_files('c3', [_indexed('c3', 5), _indexed('c3', 6)], None)) == 2
+        assert len(await router.merge_files('c4', [_indexed('c4', 5, file_name='Other.mkv')], None)) == 1
+        assert await c3_files.find_one({'_id': '-1001_5'}) is not None
+
+        for clone_id in ('c3', 'c4'):
+            migration = await router.migrate(clone_id, 'shared', cleanup=True)
+            assert migration.status == 'completed', migration.message
+
+        assert (await shared['files'].find_one({'_id': 'c3_-1001_5'}))['file_name'] == 'Movie 5.mkv'
+        assert (await shared['files'].find_one({'_id': 'c4_-1001_5'}))['file_name'] == 'Other.mkv'
+        assert await shared['files'].count_documents({'_id': '-1001_5'}) == 0
+        # Indexer writes after the move land on the namespaced ids
+        inserted = await router.merge_files('c4', [_indexed('c4', 5), _indexed('c4', 7)], None)
+        assert [doc['_id'] for doc in inserted] == ['c4_-1001_7']
+        assert await shared['files'].count_documents({'clone_id': 'c4'}) == 2
+        assert (await mongo_db.get_clone_index_stats('c4'))['total_files'] == 2
+        assert (await mongo_db.get_clone_index_stats('c3'))['total_files'] == 2
+
+        # Back to dedicated, the namespaced ids are kept and the round trip is stable
+        migration = await router.migrate('c4', 'dedicated', cleanup=True)
+        assert migration.status == 'completed', migration.message
+        assert migration.repaired == 0 and migration.cleaned == 2
+        assert await c4_files.count_documents({'clone_id': 'c4'}) == 2
+        assert await shared['files'].count_documents({'clone_id': 'c3'}) == 2
+
+    @pytest.mark.asyncio
+    async def test_indexing_a_placed_clone_keeps_its_stats_current(self, env):
+        """Live and manual indexing of a clone with a placement count new files in its rollup"""
+        mongo_db, router, shared, dedicated = env
+        await _dedicated_clones(shared, router, 'c3')
+        await mongo_db.rebuild_clone_stats('c3')
+
+        assert len(await router.merge_files('c3', [_indexed('c3', 1), _indexed('c3', 2, file_size=300)], None)) == 2
+        assert await router.upsert_file('c3', _indexed('c3', 3, file_type='audio'), None) is not None
+        assert await router.upsert_file('c3', _indexed('c3', 3, file_type='audio'), None) is None
+        assert await router.merge_files('c3', [_indexed('c3', 1)], None) == []
+
+        assert (await mongo_db.get_clone_index_stats('c3'))['total_files'] == 3
+        counted = ('total_files', 'total_size', 'file_types', 'channels')
+        rollup = await router.collections('c3')[1].find_one({'_id': 'c3'})
+        rebuilt = await mongo_db.rebuild_clone_stats('c3')
+        assert {key: rollup[key] for key in counted} == {key: rebuilt[key] for key in counted}
+        assert (rollup['total_size'], rollup['file_types']) == (500, {'video': 2, 'audio': 1})
+
+    @pytest.mark.asyncio
+    async def test_move_stops_at_ids_of_other_clones(self, env):
+        mongo_db, router, shared, dedicated = env
+        await _dedicated_clones(shared, router, 'c3')
+        await router.merge_files('c3', [_indexed('c3', 5)], None)
+        await shared['files'].insert_one({'_id': 'c3_-1001_5', 'clone_id': 'c30'})
+
+        migration = await router.migrate('c3', 'shared')
+        assert migration.status == 'failed' and 'c3_-1001_5 (c30)' in migration.message
+        assert router.placement_of('c3') == 'dedicated'
+        record = await shared['clones'].find_one({'_id': 'c3'})
+        assert record['files_placement'] == 'dedicated' and 'placement_migration' not in record
+        assert (await shared['files'].find_one({'_id': 'c3_-1001_5'}))['clone_id'] == 'c30'
+
+    @pytest.mark.asyncio
+    async def test_split_clone_is_merged_into_the_target(self, env):
+        """A clone without a placement reads shared but indexes into its dedicated database"""
+        mongo_db, router, shared, dedicated = env
+        await shared['clones'].insert_one({'_id': 'c5', 'mongodb_url': DEDICATED_URL, 'db_name': 'clone_c5'})
+        split = router._clients[DEDICATED_URL]['clone_c5']['files']
+        await router.merge_files('c5', [_indexed('c5', msg) for msg in (1, 2, 3)], split)
+        await shared['files'].insert_many([
+            {'_id': 'c5_file_1', 'clone_id': 'c5', 'file_id': 'file_1', 'file_name': 'Movie 1.mkv'},
+            {'_id': 'c5_file_9', 'clone_id': 'c5', 'file_id': 'file_9', 'file_name': 'Movie 9.mkv'},
+        ])
+        assert router.placement_of('c5') is None
+
+        migration = await router.migrate('c5', 'dedicated', cleanup=True)
+        assert migration.status == 'completed', migration.message
+        assert (migration.source, migration.copied, migration.repaired, migration.cleaned) == ('shared', 2, 0, 2)
+        assert await split.count_documents({'clone_id': 'c5'}) == 5
+        assert await shared['files'].count_documents({'clone_id': 'c5'}) == 0
+        assert router.placement_of('c5') == 'dedicated'
+        assert (await mongo_db.get_clone_index_stats('c5'))['total_files'] == 5
+
+    @pytest.mark.asyncio
+    async def test_split_clone_moves_to_shared_and_back_to_split_on_failure(self, env):
+        mongo_db, router, shared, dedicated = env
+        await shared['clones'].insert_one({'_id': 'c5', 'mongodb_url': DEDICATED_URL, 'db_name': 'clone_c5'})
+        split = router._clients[DEDICATED_URL]['clone_c5']['files']
+        await router.merge_files('c5', [_indexed('c5', 1), _indexed('c5', 2)], split)
+        await shared['files'].insert_one({'_id': 'c5_-1001_2', 'clone_id': 'c50'})
+
+        migration = await router.migrate('c5', 'shared')
+        assert migration.status == 'failed' and 'c5_-1001_2 (c50)' in migration.message
+        assert router.placement_of('c5') is None
+        assert 'files_placement' not in await shared['clones'].find_one({'_id': 'c5'})
+
+        await shared['files'].delete_one({'_id': 'c5_-1001_2'})
+        migration = await router.migrate('c5', 'shared')
+        assert migration.status == 'completed', migration.message
+        assert migration.source == 'dedicated' and migration.copied == 2
+        assert sorted(await shared['files'].distinct('_id', {'clone_id': 'c5'})) == ['c5_-1001_1', 'c5_-1001_2']
+        assert router.placement_of('c5') == 'shared'
@@ -0,0 +1,107 @@
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+@pytest.fixture
+def stats_db(monkeypatch):
+    """mongo_db rebound to an in-memory database"""
+    mongomock_motor = pytest.importorskip('mongomock_motor')
+    from bot.database import mongo_db
+
+    db = mongomock_motor.AsyncMongoMockClient()['stats_test']
+    monkeypatch.setattr(mongo_db, 'collection', db['files'])
+    monkeypatch.setattr(mongo_db, 'clone_stats_collection', db['clone_stats'])
+    return mongo_db
+
+
+def _file(i, **overrides):
+    data = {
+        'file_id': f"file_{i}",
+        'file_name': f"Movie {i}.mkv",
+        'file_type': 'video' if i % 3 else 'document',
+        'file_size': 100 * (i + 1),
+        'quality': '1080p' if i % 2 else '720p',
+        'chat_id': -1001 if i % 4 else -1002,
+    }
+    data.update(overrides)
+    return data
+
+
+class TestCloneStatsRollup:
+    """Tests for the incrementally maintained per-clone stats rollup"""
+
+    @pytest.mark.asyncio
+    async def test_incremental_matches_rebuild(self, stats_db):
+        """$inc updates on add, re-index and remove agree with a full rebuild"""
+        for i in range(12):
+            assert await stats_db.add_file_to_clone_index(_file(i), 'c1') is True
+        assert await stats_db.add_file_to_clone_index(_file(3, file_type='audio', quality='unknown'), 'c1') is False
+        assert await stats_db.remove_file_from_clone_index('c1', 'file_0') is True
+        assert await stats_db.remove_file_from_clone_index('c1', 'file_0') is False
+        await stats_db.add_file_to_clone_index(_file(99), 'c2')
+
+        incremental = await stats_db.get_detailed_clone_stats('c1')
+        await stats_db.rebuild_clone_stats('c1')
+        rebuilt = await stats_db.get_detailed_clone_stats('c1')
+
+        assert incremental == rebuilt
+        assert rebuilt['total_files'] == 11
+        assert rebuilt['total_size'] == sum(100 * (i + 1) for i in range(1, 12))
+        assert rebuilt['file_types'] == {'video': 8, 'document': 2, 'audio': 1}
+        assert 'unknown' not in rebuilt['quality_breakdown']
+        assert rebuilt['top_channels'][0] == (-1001, 9)
+        assert rebuilt['files_this_week'] == 11
+        assert rebuilt['most_active_day'] == datetime.utcnow().strftime('%Y-%m-%d')
+
+    @pytest.mark.asyncio
+    async def test_missing_rollup_is_rebuilt(self, stats_db):
+        """Files written without the rollup are picked up on first read"""
+        old = datetime.utcnow() - timedelta(days=30)
+        await stats_db.collection.insert_many([
+            dict(_file(i, quality='HD.v2'), clone_id='c3', indexed_at=old) for i in range(5)
+        ])
+
+        stats = await stats_db.get_clone_index_stats('c3')
+        assert stats['total_files'] == 5
+        assert stats['last_indexed'] == old.strftime('%Y-%m-%d %H:%M')
+
+        detailed = await stats_db.get_detailed_clone_stats('c3')
+        assert detailed['files_this_week'] == 0
+        assert detailed['quality_breakdown'] == {'HD.v2': 5}
+
+        assert await stats_db.clear_clone_index('c3') is True
+        assert await stats_db.get_clone_index_stats('c3') == {
+            'total_files': 0, 'total_size': 0, 'file_types': {}, 'last_indexed': 'Never'
+        }
+        assert await stats_db.get_detailed_clone_stats('c3') is None
+        assert await stats_db.rebuild_all_clone_stats() == 0
+
+    @pytest.mark.asyncio
+    async def test_repair_job_rebuilds_periodically(self, stats_db, monkeypatch):
+        import asyncio
+        from info import Config
+
+        runs = []
+
+        async def rebuild_all():
+            runs.append(len(runs))
+            if len(runs) == 2:
+                raise RuntimeError("database unavailable")  # the job keeps going
+            return 0
+
+        monkeypatch.setattr(Config, 'CLONE_STATS_REPAIR_INTERVAL', 0.01)
+        monkeypatch.setattr(stats_db, 'rebuild_all_clone_stats', rebuild_all)
+        task = asyncio.create_task(stats_db.start_clone_stats_repair())
+        for _ in range(100):
+            if len(runs) >= 3:
+                break
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert len(runs) >= 3
@@ -69,3 +69,103 @@ class TestConfigLoader:
         assert "features" in default_config
         assert "token_settings" in default_config
         assert "channels" in default_config
+
+
+class TestConfigCache:
+    """Test the bounded, single-flight clone config cache"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self):
+        calls = []
+
+        def slow(name, result):
+            async def read(*args):
+                calls.append(name)
+                await asyncio.sleep(0.05)
+                return result
+            return read
+
+        loader = CloneConfigLoader()
+        with patch('bot.utils.clone_config_loader.get_clone_config', new=slow('config', {'_id': '123456'})), \
+             patch('bot.utils.clone_config_loader.get_clone', new=slow('clone', {'admin_id': 1})), \
+             patch('bot.utils.clone_config_loader.get_subscription', new=slow('subscription', None)), \
+             patch('bot.utils.clone_config_loader.get_global_force_channels', new=slow('global', [-100])):
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            configs = await asyncio.gather(*[loader.get_bot_config("123456:TOKEN") for _ in range(10)])
+            elapsed = loop.time() - started
+
+        assert sorted(calls) == ['clone', 'config', 'global', 'subscription']
+        assert all(config is configs[0] for config in configs)
+        # The four reads run together rather than one after another
+        assert elapsed < 0.15
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_is_evicted(self):
+        from bot.utils.clone_config_loader import ConfigCache
+
+        cache = ConfigCache(maxsize=2, ttl=60)
+        loads = []
+
+        async def load(key):
+            loads.append(key)
+            return key
+
+        for key in ('a', 'b', 'a', 'c'):
+            await cache.get(key, lambda key=key: load(key))
+
+        assert len(cache) == 2
+        assert 'a' in cache and 'c' in cache and 'b' not in cache
+        assert loads == ['a', 'b', 'c']
+
+    @pytest.mark.asyncio
+    async def test_invalidated_load_is_not_cached(self):
+        from bot.utils.clone_config_loader import ConfigCache
+
+        cache = ConfigCache(maxsize=10, ttl=60)
+        release = asyncio.Event()
+
+        async def load():
+            await release.wait()
+            return 'stale'
+
+        pending = asyncio.create_task(cache.get('k', load))
+        await asyncio.sleep(0)
+        cache.invalidate('k')
+        release.set()
+
+        assert await pending == 'stale'
+        assert 'k' not in cache
+
+    @pytest.mark.asyncio
+    async def test_settings_change_invalidates(self, monkeypatch):
+        mongomock_motor = pytest.importorskip('mongomock_motor')
+        from bot.core.events.base import event_bus
+        from bot.database import clone_db
+
+        db = mongomock_motor.AsyncMongoMockClient()['test_config_loader']
+        monkeypatch.setattr(clone_db, 'clone_configs_collection', db.clone_configs)
+        monkeypatch.setattr(clone_db, 'global_settings_collection', db.global_settings)
+
+        loader = CloneConfigLoader()
+        loads = []
+
+        async def load():
+            loads.append(1)
+            return {'features': {}}
+
+        subscription = event_bus.subscribe_async('clone.config_changed', loader.on_config_changed)
+        try:
+            await loader.cache.get(('config', '123456'), load)
+            await loader.cache.get(('config', '999'), load)
+            await clone_db.update_clone_token_verification('123456', verification_mode='command_limit')
+            await event_bus.join()
+
+            assert ('config', '123456') not in loader.cache
+            assert ('config', '999') in loader.cache
+
+            await clone_db.set_global_force_channels([-100])
+            await event_bus.join()
+            assert len(loader.cache) == 0
+        finally:
+            event_bus.unsubscribe(subscription)
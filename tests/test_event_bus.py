@@ -0,0 +1,105 @@
+import pytest
+import asyncio
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bot.core.events.base import Event, EventBus, EventHandler, event_dropped
+from bot.core.events.clone_events import CloneStartedEvent, CloneStoppedEvent
+
+
+class RecordingHandler(EventHandler):
+    def __init__(self):
+        self.seen = []
+
+    @property
+    def event_types(self):
+        return ["clone.started", "clone.stopped"]
+
+    async def handle(self, event):
+        self.seen.append((event.event_type, event.data["clone_id"]))
+
+
+class TestEventBus:
+    """Tests for the queued event bus"""
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_does_not_delay_others(self):
+        """Publishing returns at once and fast subscribers finish before slow ones"""
+        bus = EventBus()
+        handler = RecordingHandler()
+        release = asyncio.Event()
+        slow_seen = []
+
+        async def slow(event):
+            await release.wait()
+            slow_seen.append(event.data["clone_id"])
+
+        bus.subscribe(handler)
+        bus.subscribe_async("clone.started", slow, name="slow")
+
+        await bus.publish(CloneStartedEvent("1", username="one"))
+        bus.publish_sync(CloneStoppedEvent("1"))
+        await asyncio.sleep(0.01)
+        assert handler.seen == [("clone.started", "1"), ("clone.stopped", "1")]
+        assert slow_seen == [] and bus.stats()["slow"]["depth"] == 0
+
+        release.set()
+        await bus.join()
+        assert slow_seen == ["1"]
+        assert await bus.drain(timeout=1) is True
+        assert bus.stats()["slow"]["workers"] == 0
+
+    @pytest.mark.asyncio
+    async def test_overflow_policies(self):
+        """drop discards, coalesce keeps the newest per clone, block waits for room"""
+        bus = EventBus()
+        gate = asyncio.Event()
+        handled = {"drop": [], "coalesce": [], "block": []}
+
+        def make(policy):
+            async def handler(event):
+                await gate.wait()
+                handled[policy].append((event.data["clone_id"], event.data.get("username")))
+            return handler
+
+        for policy in handled:
+            bus.subscribe_async("clone.started", make(policy), maxsize=2, overflow=policy, name=policy)
+
+        dropped_before = event_dropped.get(event_type="clone.started", subscriber="drop")
+        # Each worker takes the first event and waits on the gate, two more fill the queues
+        for i, clone_id in enumerate(["a", "b", "c"]):
+            await bus.publish(CloneStartedEvent(clone_id, username=f"v{i}"))
+            await asyncio.sleep(0)
+        # publish_sync never waits; full "block" queues get a tracked put instead
+        bus.publish_sync(CloneStartedEvent("b", username="newer"))
+        bus.publish_sync(CloneStartedEvent("d"))
+
+        blocked = asyncio.create_task(bus.publish(CloneStartedEvent("e")))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+
+        gate.set()
+        await blocked
+        await bus.join()
+
+        assert [clone for clone, _ in handled["drop"]] == ["a", "b", "c"]
+        assert event_dropped.get(event_type="clone.started", subscriber="drop") - dropped_before == 3
+        assert handled["coalesce"] == [("a", "v0"), ("b", "newer"), ("c", "v2")]
+        assert [clone for clone, _ in handled["block"]] == ["a", "b", "c", "b", "d", "e"]
+        await bus.drain(timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_drain_stops_accepting_and_times_out(self):
+        """After drain the bus ignores new events; a stuck handler hits the timeout"""
+        bus = EventBus()
+        bus.subscribe_async("x", lambda event: asyncio.sleep(10), name="stuck")
+        await bus.publish(Event("x"))
+        assert await bus.drain(timeout=0.05) is False
+        await bus.publish(Event("x"))
+        assert bus.stats()["stuck"]["depth"] == 0
+
+        with pytest.raises(ValueError):
+            bus.subscribe_async("x", lambda event: None, overflow="spill")
@@ -0,0 +1,144 @@
+import pytest
+import pytest_asyncio
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyrogram.file_id import FileId, FileType
+from bot.database import file_dedup
+
+
+def telegram_file_id(media_id, copy=0):
+    """A file_id for one copy of a file; copies share media_id, so their file_unique_id"""
+    return FileId(file_type=FileType.DOCUMENT, dc_id=4, media_id=media_id,
+                  access_hash=1000 + copy, file_reference=bytes([copy])).encode()
+
+
+def clone_file(media_id, chat_id, message_id, copy=0, **extra):
+    return {
+        '_id': f"{chat_id}_{message_id}",
+        'file_id': telegram_file_id(media_id, copy),
+        'message_id': message_id,
+        'chat_id': chat_id,
+        'file_name': f"file_{media_id}.mkv",
+        'clone_id': 'c1',
+        'indexed_at': datetime(2024, 1, 1) + timedelta(minutes=message_id),
+        **extra
+    }
+
+
+@pytest_asyncio.fixture
+async def files():
+    mongomock_motor = pytest.importorskip('mongomock_motor')
+    yield mongomock_motor.AsyncMongoMockClient()['test_file_dedup'].files
+
+
+class TestUniqueId:
+    """Test deriving file_unique_id from file_id"""
+
+    def test_copies_share_unique_id(self):
+        first, second = telegram_file_id(7, 0), telegram_file_id(7, 1)
+        assert first != second
+        assert file_dedup.file_unique_id_from(first) == file_dedup.file_unique_id_from(second)
+        assert file_dedup.file_unique_id_from(first) != file_dedup.file_unique_id_from(telegram_file_id(8))
+
+    def test_undecodable_file_id(self):
+        assert file_dedup.file_unique_id_from('file_3') is None
+        assert file_dedup.file_unique_id_from(None) is None
+        assert file_dedup.dedup_filter({'file_id': 'file_3', 'clone_id': 'c1'}) is None
+
+
+class TestMerge:
+    """Test storing clone files once per file_unique_id"""
+
+    @pytest.mark.asyncio
+    async def test_repost_adds_source(self, files):
+        await file_dedup.ensure_dedup_index(files)
+        assert await file_dedup.upsert_file(clone_file(7, -100, 1), files) == clone_file(7, -100, 1)
+        assert await file_dedup.upsert_file(clone_file(7, -200, 5, copy=1), files) is None
+        assert await file_dedup.upsert_file(clone_file(7, -100, 1), files) is None
+
+        stored = await files.find({}).to_list(None)
+        assert len(stored) == 1
+        assert stored[0]['_id'] == '-100_1'
+        assert stored[0]['file_id'] == telegram_file_id(7, 0)
+        assert stored[0]['sources'] == [{'chat_id': -100, 'message_id': 1}, {'chat_id': -200, 'message_id': 5}]
+
+    @pytest.mark.asyncio
+    async def test_bulk_merge(self, files):
+        await file_dedup.ensure_dedup_index(files)
+        batch = [clone_file(1, -100, 1), clone_file(1, -100, 2, copy=1), clone_file(2, -100, 3)]
+        assert await file_dedup.merge_many(batch, files) == [batch[0], batch[2]]
+        assert await file_dedup.merge_many([clone_file(2, -200, 9, copy=1)], files) == []
+
+        assert await files.count_documents({}) == 2
+        merged = await files.find_one({'file_unique_id': file_dedup.file_unique_id_from(telegram_file_id(2))})
+        assert len(merged['sources']) == 2
+
+    @pytest.mark.asyncio
+    async def test_files_without_unique_id_keyed_by_id(self, files):
+        document = dict(clone_file(1, -100, 1), file_id='legacy')
+        assert await file_dedup.upsert_file(document, files) is not None
+        assert await file_dedup.upsert_file(dict(document, _id='-100_2', message_id=2), files) is not None
+        assert await files.count_documents({}) == 2
+
+
+class TestCompaction:
+    """Test the one-off job merging stored duplicates"""
+
+    @pytest.mark.asyncio
+    async def test_compacts_existing_duplicates(self, files):
+        await files.insert_many([
+            clone_file(7, -100, 3, copy=0, access_count=2),
+            clone_file(7, -200, 1, copy=1, access_count=5),
+            clone_file(7, -300, 2, copy=2),
+            clone_file(8, -100, 4),
+            dict(clone_file(9, -100, 5), file_id='legacy'),
+            # Owner-indexed records share the collection but are not clone files
+            {'_id': 'owner_1', 'file_id': telegram_file_id(7), 'owner_id': 1},
+            {'_id': 'owner_2', 'file_id': telegram_file_id(7, 1), 'owner_id': 1},
+        ])
+
+        result = await file_dedup.compact_duplicates(files, batch_size=1)
+
+        assert result['backfilled'] == 4
+        assert result['groups'] == 1
+        assert result['removed'] == 2
+        assert result['clones'] == ['c1']
+        assert await files.count_documents({}) == 5
+        owned = await files.find({'owner_id': 1}).to_list(None)
+        assert len(owned) == 2 and all('file_unique_id' not in doc for doc in owned)
+
+        kept = await files.find_one({'file_unique_id': file_dedup.file_unique_id_from(telegram_file_id(7))})
+        assert kept['_id'] == '-200_1'  # indexed first
+        assert kept['access_count'] == 7
+        assert {source['chat_id'] for source in kept['sources']} == {-100, -200, -300}
+
+        # Nothing left to do on a second run
+        again = await file_dedup.compact_duplicates(files)
+        assert (again['backfilled'], again['removed']) == (0, 0)
+
+    @pytest.mark.asyncio
+    async def test_shared_index_merges_reposts(self, monkeypatch):
+        mongomock_motor = pytest.importorskip('mongomock_motor')
+        from bot.database import mongo_db
+
+        db = mongomock_motor.AsyncMongoMockClient()['test_file_dedup_shared']
+        monkeypatch.setattr(mongo_db, 'collection', db['files'])
+        monkeypatch.setattr(mongo_db, 'clone_stats_collection', db['clone_stats'])
+
+        first, repost = clone_file(7, -100, 1), clone_file(7, -200, 2, copy=1)
+        for document in (first, repost):
+            document.pop('_id')
+        assert await mongo_db.add_file_to_clone_index(first, 'c1') is True
+        assert await mongo_db.add_file_to_clone_index(repost, 'c1') is False
+
+        assert await db['files'].count_documents({}) == 1
+        assert (await mongo_db.get_clone_index_stats('c1'))['total_files'] == 1
+        # The repost's file_id still finds the stored copy
+        found = await mongo_db.get_clone_file_by_id('c1', telegram_file_id(7, 1))
+        assert found['file_id'] == telegram_file_id(7, 0)
+        assert found['chat_id'] == -100
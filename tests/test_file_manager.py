@@ -0,0 +1,132 @@
+import pytest
+import hashlib
+import sys
+import os
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from info import Config
+from bot.utils.file_manager import FileManager, USAGE_COUNTERS
+
+
+class StreamingClient:
+    """Stands in for pyrogram's Client.stream_media"""
+
+    def __init__(self, content: bytes, chunk_size: int = 4):
+        self.content = content
+        self.chunk_size = chunk_size
+
+    async def stream_media(self, message):
+        for start in range(0, len(self.content), self.chunk_size):
+            yield self.content[start:start + self.chunk_size]
+
+
+def _message(content: bytes, message_id: int, name: str):
+    document = SimpleNamespace(file_name=name, file_size=len(content), mime_type='text/plain')
+    return SimpleNamespace(
+        id=message_id, document=document, photo=None, video=None, audio=None,
+        caption=None, _client=StreamingClient(content)
+    )
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'STORAGE_PATH', str(tmp_path / 'storage'))
+    monkeypatch.setattr(Config, 'TEMP_PATH', str(tmp_path / 'temp'))
+    return tmp_path
+
+
+class TestContentAddressedStorage:
+    """Tests for the content-addressed FileManager store"""
+
+    @pytest.mark.asyncio
+    async def test_identical_content_is_stored_once(self, storage):
+        """Same bytes under two names share one blob until both are deleted"""
+        content = b"the same bytes in two uploads"
+        manager = FileManager()
+
+        first = await manager.store_file(_message(content, 1, 'a.txt'), 10)
+        second = await manager.store_file(_message(content, 2, 'b.txt'), 11)
+        other = await manager.store_file(_message(b"different", 3, 'c.txt'), 10)
+
+        digest = hashlib.sha256(content).hexdigest()
+        assert first['file_id'] == second['file_id'] == digest[:16]
+        assert first['stored_path'].endswith(f"objects/{digest[:2]}/{digest[2:4]}/{digest}")
+        assert open(first['stored_path'], 'rb').read() == content
+        assert other['file_id'] != first['file_id']
+        assert not list((storage / 'storage' / 'objects' / 'incoming').iterdir())
+
+        # The index survives a restart
+        manager.index.close()
+        manager = FileManager()
+        assert await manager.get_file_path(first['file_id']) == manager.object_path(digest)
+        assert await manager.get_file_path('0' * 16) is None
+
+        assert await manager.delete_file(first['file_id']) is True
+        assert os.path.exists(first['stored_path'])
+        assert await manager.delete_file(first['file_id']) is True
+        assert not os.path.exists(first['stored_path'])
+        assert await manager.get_file_path(first['file_id']) is None
+        assert await manager.delete_file(first['file_id']) is False
+        manager.index.close()
+
+    @pytest.mark.asyncio
+    async def test_legacy_files_are_indexed(self, storage):
+        """Files from the old ``{file_id}_{name}`` layout are still found"""
+        legacy_dir = storage / 'storage'
+        legacy_dir.mkdir()
+        legacy = legacy_dir / '0123456789abcdef_old.txt'
+        legacy.write_bytes(b'old')
+        (legacy_dir / 'notes_unrelated.txt').write_bytes(b'x')
+
+        manager = FileManager()
+        assert await manager.get_file_path('0123456789abcdef') == legacy
+        assert await manager.get_file_path('notes') is None
+        manager.index.close()
+
+    @pytest.mark.asyncio
+    async def test_storage_accounting(self, storage):
+        """Usage counters follow store/delete/cleanup and the reconciler fixes drift"""
+        manager = FileManager()
+        stats = await manager.get_storage_stats()
+        assert stats['total_files'] == 0 and stats['last_reconciled'] is None
+
+        first = await manager.store_file(_message(b"12345678", 1, 'a.txt'), 10)
+        await manager.store_file(_message(b"12345678", 2, 'b.txt'), 10)
+        await manager.store_file(_message(b"abc", 3, 'c.txt'), 10)
+        stats = await manager.get_storage_stats()
+        assert (stats['stored_files'], stats['stored_size_bytes']) == (2, 11)
+        assert (stats['temp_files'], stats['temp_size_bytes']) == (0, 0)
+        # Downloads are counted as temp files until they move into the store
+        temp_path, _ = await manager.download_and_hash(_message(b"pending", 4, 'd.txt'))
+        stats = await manager.get_storage_stats()
+        assert (stats['temp_files'], stats['temp_size_bytes']) == (1, 7)
+        os.utime(temp_path, (0, 0))
+        await manager.cleanup_temp_files()
+        assert not temp_path.exists()
+        assert await manager.reconcile_storage() == dict.fromkeys(USAGE_COUNTERS, 0)
+
+        await manager.delete_file(first['file_id'])
+        assert (await manager.get_storage_stats())['stored_files'] == 2
+        await manager.delete_file(first['file_id'])
+        assert (await manager.get_storage_stats())['stored_size_bytes'] == 3
+
+        # Files the counters don't know about are picked up by a rescan
+        (storage / 'temp').mkdir()
+        (storage / 'temp' / 'temp_1_2').write_bytes(b'x' * 5)
+        (storage / 'storage' / 'notes.txt').write_bytes(b'y' * 7)
+        drift = await manager.reconcile_storage()
+        assert drift['temp_files'] == 1 and drift['temp_bytes'] == 5
+        stats = await manager.get_storage_stats()
+        assert stats['temp_files'] == 1
+        assert (stats['stored_files'], stats['stored_size_bytes']) == (2, 3 + 7)
+        assert stats['last_reconciled'] is not None
+        assert await manager.reconcile_storage() == dict.fromkeys(drift, 0)
+
+        os.utime(storage / 'temp' / 'temp_1_2', (0, 0))
+        await manager.cleanup_temp_files()
+        stats = await manager.get_storage_stats()
+        assert (stats['temp_files'], stats['temp_size_bytes']) == (0, 0)
+        manager.index.close()
@@ -0,0 +1,148 @@
+import pytest
+import sys
+import os
+from collections import OrderedDict
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bot.utils.handler_table import HandlerTable
+
+PLUGIN_A = '''
+from pyrogram import Client, filters
+
+@Client.on_message(filters.command("a"))
+async def cmd_a(client, message):
+    pass
+
+@Client.on_callback_query(filters.regex("^a_"), group=2)
+async def cb_a(client, query):
+    pass
+
+
+class Registry:
+    @property
+    def handlers(self):
+        return {}
+
+
+class LazyHandle:
+    """Stands in for a lazy database handle: any attribute access would connect"""
+    def __getattr__(self, name):
+        raise RuntimeError("connected while collecting handlers")
+
+
+files = LazyHandle()
+'''
+
+PLUGIN_B = '''
+from pyrogram import Client, filters
+from table_plugins.plugin_a import cmd_a
+
+@Client.on_message(filters.command("b"), group=-1)
+async def cmd_b(client, message):
+    pass
+'''
+
+PLUGIN_SKIP = '''
+from pyrogram import Client, filters
+
+@Client.on_message(filters.command("skip"))
+async def cmd_skip(client, message):
+    pass
+'''
+
+PLUGIN_BROKEN = '''
+from pyrogram import Client, filters
+import table_plugins_dependency_that_is_not_installed
+'''
+
+
+@pytest.fixture
+def plugin_root(tmp_path, monkeypatch):
+    package = tmp_path / 'table_plugins'
+    package.mkdir()
+    (package / '__init__.py').write_text('')
+    (package / 'plugin_a.py').write_text(PLUGIN_A)
+    (package / 'plugin_b.py').write_text(PLUGIN_B)
+    (package / 'plugin_skip.py').write_text(PLUGIN_SKIP)
+    (package / 'plugin_broken.py').write_text(PLUGIN_BROKEN)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield 'table_plugins'
+    for name in list(sys.modules):
+        if name.startswith('table_plugins'):
+            del sys.modules[name]
+
+
+def fake_client():
+    return SimpleNamespace(dispatcher=SimpleNamespace(groups=OrderedDict({0: ['builtin']})))
+
+
+class TestHandlerTable:
+    """Tests for the shared clone handler table"""
+
+    def test_build_collects_handlers_once(self, plugin_root):
+        """Handlers are grouped and ordered, duplicates and exclusions dropped, misses reported"""
+        table = HandlerTable({
+            'root': plugin_root,
+            'include': ['plugin_a', 'plugin_b', 'does_not_exist', 'plugin_broken'],
+            'exclude': ['plugin_skip', 'also_missing'],
+        }).build()
+
+        report = table.report()
+        assert report['modules'] == ['plugin_a', 'plugin_b']
+        assert report['missing'] == ['does_not_exist']
+        # A plugin that exists but whose own imports fail is reported as broken, not missing
+        assert report['failed'] == ['plugin_broken']
+        # cmd_a is re-exported by plugin_b but registered only once
+        assert report['groups'] == {-1: 1, 0: 1, 2: 1}
+        assert 'table_plugins.plugin_skip' not in sys.modules
+
+        groups = table.groups
+        table.build()
+        assert table.groups is groups
+
+    def test_attach_shares_handlers_across_clients(self, plugin_root):
+        """Every client gets the same handler objects, merged with its own groups"""
+        table = HandlerTable({'root': plugin_root, 'include': ['plugin_a', 'plugin_b cmd_b']})
+        first, second = fake_client(), fake_client()
+
+        assert table.attach(first) == table.attach(second) == 3
+        assert list(first.dispatcher.groups) == [-1, 0, 2]
+        assert first.dispatcher.groups[0][0] == 'builtin'
+        for group in first.dispatcher.groups:
+            assert all(a is b for a, b in zip(first.dispatcher.groups[group], second.dispatcher.groups[group]))
+
+    def test_exclude_removes_imported_handlers(self, plugin_root):
+        """Excluding a module drops handlers an included module pulled in from it"""
+        table = HandlerTable({
+            'root': plugin_root,
+            'include': ['plugin_b'],
+            'exclude': ['plugin_a'],
+        }).build()
+
+        assert table.report()['groups'] == {-1: 1}
+
+    def test_handlers_are_instrumented(self, plugin_root):
+        """Shared handlers still record latency metrics, wrapped only once"""
+        table = HandlerTable({'root': plugin_root, 'include': ['plugin_a']}).build()
+        callbacks = [handler.callback for _, handlers in table.groups for handler in handlers]
+
+        assert callbacks and all(getattr(cb, '__metrics_instrumented__', False) for cb in callbacks)
+
+    def test_table_client_reattaches_after_stop(self, plugin_root):
+        """Stopping clears the dispatcher's groups; the next start's plugin load restores them once"""
+        from bot.utils.handler_table import TableClient
+
+        table = HandlerTable({'root': plugin_root, 'include': ['plugin_a']})
+        client = TableClient('table_client', api_id=1, api_hash='hash', in_memory=True, handler_table=table)
+        attached = lambda: [handler for handlers in client.dispatcher.groups.values() for handler in handlers]
+        client.load_plugins()
+        client.load_plugins()
+        first = attached()
+        assert len(first) == len(set(map(id, first))) and len(table) == 2
+
+        client.dispatcher.groups.clear()  # what Dispatcher.stop() does
+        client.load_plugins()
+        assert set(map(id, attached())) >= {id(handler) for _, handlers in table.groups for handler in handlers}
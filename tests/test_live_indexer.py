@@ -0,0 +1,253 @@
+import asyncio
+import pytest
+import pytest_asyncio
+import sys
+import os
+from datetime import datetime
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bot.database import index_db
+from bot.utils.live_indexer import LiveIndexer, MOTHER, mother_document
+from bot.utils.send_scheduler import close_scheduler
+
+CHAT = -1001234
+
+
+def post(message_id, media='document', chat_id=CHAT):
+    """Fake channel post; media=None for a text post"""
+    file = SimpleNamespace(file_id=f"file_{message_id}", file_name=f"file_{message_id}.mkv", file_size=1024)
+    return SimpleNamespace(
+        id=message_id,
+        empty=False,
+        chat=SimpleNamespace(id=chat_id),
+        media=SimpleNamespace(value=media) if media else None,
+        caption=None,
+        from_user=None,
+        date=datetime(2024, 1, 1),
+        **({media: file} if media else {})
+    )
+
+
+class FakeClient:
+    """Channel history served by get_messages, recording each batch requested"""
+
+    def __init__(self, history):
+        self.name = f"live_index_test_{id(self)}"
+        self.history = {message.id: message for message in history}
+        self.requests = []
+
+    async def get_messages(self, chat_id, ids):
+        self.requests.append(list(ids))
+        return [self.history.get(i) or SimpleNamespace(id=i, empty=True) for i in ids]
+
+
+class CountingCollection:
+    """Collection wrapper counting bulk writes"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.bulk_writes = 0
+
+    async def bulk_write(self, *args, **kwargs):
+        self.bulk_writes += 1
+        return await self.collection.bulk_write(*args, **kwargs)
+
+
+@pytest_asyncio.fixture
+async def mock_db(monkeypatch):
+    mongomock_motor = pytest.importorskip('mongomock_motor')
+    db = mongomock_motor.AsyncMongoMockClient()['test_live_indexer']
+    monkeypatch.setattr(index_db, 'collection', db.index)
+    monkeypatch.setattr(index_db, 'checkpoints_collection', db.index_checkpoints)
+    yield db
+
+
+@pytest_asyncio.fixture
+async def client():
+    client = FakeClient([])
+    yield client
+    await close_scheduler(client)
+
+
+async def checkpoint():
+    return (await index_db.get_index_checkpoints(MOTHER)).get(CHAT, 0)
+
+
+class TestMicroBatching:
+    """Test buffering and flushing of live posts"""
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_one_bulk_write(self, mock_db, client):
+        target = CountingCollection(mock_db.index)
+        indexer = LiveIndexer(batch_size=5, flush_interval=60)
+        await indexer.track(MOTHER, client, CHAT, target, mother_document, checkpoint=0)
+
+        for message_id in range(1, 6):
+            assert await indexer.on_message(MOTHER, post(message_id))
+
+        assert target.bulk_writes == 1
+        assert await mock_db.index.count_documents({}) == 5
+        assert await checkpoint() == 5
+
+    @pytest.mark.asyncio
+    async def test_partial_batch_flushes_after_interval(self, mock_db, client):
+        indexer = LiveIndexer(batch_size=50, flush_interval=0.05)
+        await indexer.track(MOTHER, client, CHAT, mock_db.index, mother_document, checkpoint=0)
+
+        await indexer.on_message(MOTHER, post(1))
+        await indexer.on_message(MOTHER, post(2))
+        assert await mock_db.index.count_documents({}) == 0
+
+        await asyncio.sleep(0.15)
+        assert await mock_db.index.count_documents({}) == 2
+        assert await checkpoint() == 2
+
+    @pytest.mark.asyncio
+    async def test_untracked_channel_is_ignored(self, mock_db, client):
+        indexer = LiveIndexer()
+        assert not await indexer.on_message(MOTHER, post(1))
+
+    @pytest.mark.asyncio
+    async def test_text_posts_advance_checkpoint(self, mock_db, client):
+        indexer = LiveIndexer(batch_size=2, flush_interval=60)
+        await indexer.track(MOTHER, client, CHAT, mock_db.index, mother_document, checkpoint=0)
+
+        await indexer.on_message(MOTHER, post(1, media=None))
+        await indexer.on_message(MOTHER, post(2, media=None))
+
+        assert await mock_db.index.count_documents({}) == 0
+        assert await checkpoint() == 2
+
+    @pytest.mark.asyncio
+    async def test_replayed_posts_are_not_duplicated(self, mock_db, client):
+        indexer = LiveIndexer(batch_size=1, flush_interval=60)
+        await indexer.track(MOTHER, client, CHAT, mock_db.index, mother_document, checkpoint=0)
+
+        await indexer.on_message(MOTHER, post(1))
+        await indexer.on_message(MOTHER, post(1))
+        assert await mock_db.index.count_documents({}) == 1
+
+
+class TestCatchUp:
+    """Test backfilling of posts missed while offline"""
+
+    @pytest.mark.asyncio
+    async def test_startup_reads_forward_from_checkpoint(self, mock_db):
+        await index_db.advance_index_checkpoint(MOTHER, CHAT, 10)
+        client = FakeClient([post(i) for i in range(11, 16)])
+        indexer = LiveIndexer(batch_size=50, flush_interval=60)
+        try:
+            channel = await indexer.track(MOTHER, client, CHAT, mock_db.index, mother_document)
+            await channel.backfill
+
+            assert client.requests[0][0] == 11
+            assert await mock_db.index.count_documents({}) == 5
+            assert await checkpoint() == 15
+        finally:
+            await close_scheduler(client)
+
+    @pytest.mark.asyncio
+    async def test_gap_is_backfilled(self, mock_db):
+        client = FakeClient([post(i) for i in range(2, 6)])
+        indexer = LiveIndexer(batch_size=50, flush_interval=60)
+        try:
+            channel = await indexer.track(MOTHER, client, CHAT, mock_db.index, mother_document, checkpoint=1,
+                                          catch_up=False)
+            await indexer.on_message(MOTHER, post(6))
+            await channel.backfill
+
+            assert client.requests == [[2, 3, 4, 5]]
+            assert await mock_db.index.count_documents({}) == 5
+            assert await checkpoint() == 6
+        finally:
+            await close_scheduler(client)
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_held_below_running_backfill(self, mock_db):
+        release = asyncio.Event()
+
+        class SlowClient(FakeClient):
+            async def get_messages(self, chat_id, ids):
+                await release.wait()
+                return await super().get_messages(chat_id, ids)
+
+        client = SlowClient([post(i) for i in range(2, 5)])
+        indexer = LiveIndexer(batch_size=1, flush_interval=60)
+        try:
+            channel = await indexer.track(MOTHER, client, CHAT, mock_db.index, mother_document, checkpoint=1,
+                                          catch_up=False)
+            await indexer.on_message(MOTHER, post(5))
+            # The live post is written, but ids 2-4 are not yet
+            assert await mock_db.index.count_documents({}) == 1
+            assert channel.checkpoint == 1
+
+            release.set()
+            await channel.backfill
+            assert await checkpoint() == 5
+        finally:
+            await close_scheduler(client)
+
+    @pytest.mark.asyncio
+    async def test_failed_backfill_keeps_checkpoint(self, mock_db):
+        class BrokenClient(FakeClient):
+            async def get_messages(self, chat_id, ids):
+                raise RuntimeError("channel unavailable")
+
+        client = BrokenClient([])
+        indexer = LiveIndexer(batch_size=1, flush_interval=60)
+        try:
+            channel = await indexer.track(MOTHER, client, CHAT, mock_db.index, mother_document, checkpoint=1,
+                                          catch_up=False)
+            await indexer.on_message(MOTHER, post(5))
+            task = channel.backfill
+            if task is not None:
+                await task
+
+            assert await mock_db.index.count_documents({}) == 1
+            assert channel.checkpoint == 1
+        finally:
+            await close_scheduler(client)
+
+
+class TestMotherStartup:
+    """Test that main's mother bot startup turns on live indexing"""
+
+    @pytest.mark.asyncio
+    async def test_start_mother_bot_tracks_the_index_channel(self, mock_db, monkeypatch):
+        policy = asyncio.get_event_loop_policy()
+        import main  # switches the loop policy to uvloop when installed
+        asyncio.set_event_loop_policy(policy)
+        from info import Config
+        from bot.utils import live_indexer as live_indexer_module
+        from bot.utils.session_cleanup import session_cleanup
+
+        class MotherClient(FakeClient):
+            def __init__(self, name, **kwargs):
+                super().__init__([])
+                self.plugins = kwargs.get('plugins')
+                self.is_connected = False
+
+            async def start(self):
+                self.is_connected = True
+
+        async def no_cleanup():
+            pass
+
+        indexer = LiveIndexer(batch_size=50, flush_interval=60)
+        monkeypatch.setattr(live_indexer_module, 'live_indexer', indexer)
+        monkeypatch.setattr(session_cleanup, 'cleanup_on_start', no_cleanup)
+        monkeypatch.setattr(main, 'Client', MotherClient)
+        monkeypatch.setattr(Config, 'INDEX_CHANNEL_ID', CHAT)
+
+        app = await main.start_mother_bot()
+        try:
+            assert app.is_connected and app.plugins is main.MOTHER_BOT_PLUGINS
+            assert indexer.channels(MOTHER) == [CHAT]
+            assert await indexer.on_message(MOTHER, post(1))
+            await indexer.stop_owner(MOTHER)
+            assert await mock_db.index.count_documents({}) == 1
+        finally:
+            await close_scheduler(app)
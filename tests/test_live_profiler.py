@@ -0,0 +1,86 @@
+import pytest
+import asyncio
+import time
+import sys
+import os
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bot.utils.live_profiler import LiveProfiler
+from bot.utils.metrics import instrument_handler
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+async def index_files(client, message):
+    busy(0.3)
+
+
+class TestCpuProfile:
+    """Tests for the sampling CPU profile"""
+
+    @pytest.mark.asyncio
+    async def test_stacks_are_rooted_at_the_clone(self):
+        """Samples inside an instrumented handler are rooted at its client and handler"""
+        profiler = LiveProfiler(interval=0.005)
+        profile = profiler.start('cpu', 1)
+        handler = instrument_handler(index_files, name='index:files')
+        await handler(SimpleNamespace(name='clone_42'), None)
+        profile.stop()
+        await profile.wait(poll=0.05)
+
+        assert profile.status == 'completed'
+        assert profile.samples > 10
+        lines = profile.output.splitlines()
+        hot = [line for line in lines if line.startswith('clone_42;handler:index:files;')]
+        assert hot and 'busy (tests/test_live_profiler.py)' in hot[0]
+        assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+        assert profile.summary['by_clone']['clone_42'] > 0.5
+        assert profile.summary['hottest'][0] == 'busy (tests/test_live_profiler.py)'
+        assert profile.document().name.endswith('.folded')
+
+    @pytest.mark.asyncio
+    async def test_clone_filter_and_one_at_a_time(self):
+        """A bot id keeps only that clone's samples; a second cpu profile is refused"""
+        profiler = LiveProfiler(interval=0.005)
+        profile = profiler.start('cpu', 1, clone='7')
+        assert profile.clone == 'clone_7'
+        with pytest.raises(RuntimeError):
+            profiler.start('cpu', 1)
+        with pytest.raises(ValueError):
+            profiler.start('disk', 1)
+
+        await instrument_handler(index_files)(SimpleNamespace(name='clone_8'), None)
+        await instrument_handler(index_files)(SimpleNamespace(name='clone_7'), None)
+        profile.stop()
+        await profile.wait(poll=0.05)
+
+        assert profile.output
+        assert all(line.startswith('clone_7;') for line in profile.output.splitlines())
+        assert profiler.running() == []
+
+
+class TestMemoryProfile:
+    """Tests for the tracemalloc snapshot diff"""
+
+    @pytest.mark.asyncio
+    async def test_top_allocators(self):
+        profiler = LiveProfiler()
+        profile = profiler.start('memory', 5)
+        await asyncio.sleep(0.1)
+        retained = [bytearray(1024) for _ in range(2000)]
+        profile.stop()
+        await profile.wait(poll=0.05)
+
+        assert profile.status == 'completed'
+        assert profile.summary['growth_kib'] > 1500
+        assert 'tests/test_live_profiler.py' in profile.summary['top_sites'][0]
+        assert 'bytearray(1024)' in profile.output
+        assert profile.caption().startswith('📊 **MEMORY profile**')
+        del retained
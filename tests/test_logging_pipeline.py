@@ -0,0 +1,93 @@
+import pytest
+import logging
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bot.logging import (
+    DebugRateLimitFilter, StructuredFormatter, NonBlockingQueueHandler,
+    LOGGER, apply_module_levels
+)
+
+
+def _record(level=logging.DEBUG, lineno=10, **extra):
+    record = logging.LogRecord("bot.test", level, __file__, lineno, "message %s", ("arg",), None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestLoggingPipeline:
+    """Tests for the queue-based logging pipeline"""
+
+    def test_debug_rate_limit_per_call_site(self):
+        """Only the burst plus sampled debug records pass per call site"""
+        log_filter = DebugRateLimitFilter(burst=5, window=60, sample_every=10)
+
+        passed = sum(log_filter.filter(_record()) for _ in range(50))
+
+        # 5 burst records + samples at 10, 20, 30, 40, 50
+        assert passed == 10
+        assert log_filter.suppressed == 40
+
+    def test_rate_limit_ignores_higher_levels_and_other_sites(self):
+        """Warnings are never limited and call sites are tracked separately"""
+        log_filter = DebugRateLimitFilter(burst=1, window=60, sample_every=1000)
+
+        assert all(log_filter.filter(_record(level=logging.WARNING)) for _ in range(20))
+        assert log_filter.filter(_record(lineno=1))
+        assert log_filter.filter(_record(lineno=2))
+        assert not log_filter.filter(_record(lineno=1))
+
+    def test_structured_formatter_renders_fields(self):
+        """Extra fields are appended as key=value pairs"""
+        line = StructuredFormatter().format(_record(level=logging.INFO, clone_id="123"))
+
+        assert "message arg" in line
+        assert line.endswith("| clone_id=123")
+
+    def test_structured_formatter_json_mode(self):
+        """JSON mode emits one object per record"""
+        import json
+        payload = json.loads(StructuredFormatter(json_mode=True).format(_record(level=logging.INFO, op="find")))
+
+        assert payload["msg"] == "message arg"
+        assert payload["op"] == "find"
+        assert payload["level"] == "INFO"
+
+    def test_queue_handler_drops_when_full(self):
+        """A full queue never blocks the caller"""
+        import queue
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+
+        handler.emit(_record(level=logging.INFO))
+        handler.emit(_record(level=logging.INFO))
+
+        assert handler.dropped == 1
+
+    def test_wrapper_kwargs_become_fields(self):
+        """Unknown keyword arguments on LOGGER are kept as structured fields"""
+        captured = []
+
+        class Capture(logging.Handler):
+            def emit(self, record):
+                captured.append(record)
+
+        handler = Capture()
+        logger = logging.getLogger("bot.test.wrapper")
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        try:
+            LOGGER("bot.test.wrapper").info("hello", clone_id="42")
+        finally:
+            logger.removeHandler(handler)
+
+        assert captured and captured[0].clone_id == "42"
+
+    def test_module_levels_spec(self):
+        """Per-module level overrides are applied"""
+        apply_module_levels("bot.test.levels=ERROR, malformed ,bot.test.other=debug")
+
+        assert logging.getLogger("bot.test.levels").level == logging.ERROR
+        assert logging.getLogger("bot.test.other").level == logging.DEBUG
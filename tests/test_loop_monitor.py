@@ -0,0 +1,106 @@
+import pytest
+import asyncio
+import time
+import sys
+import os
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bot.utils import loop_monitor as loop_monitor_module
+from bot.utils.loop_monitor import LoopMonitor
+from bot.utils.metrics import instrument_handler
+from bot.utils.health_check import HealthChecker
+
+
+async def run_monitor(monitor, blocker=None, settle=0.3):
+    """Probe for ``settle`` seconds around an optional blocking call"""
+    monitor.start()
+    try:
+        await asyncio.sleep(settle)
+        if blocker is not None:
+            await blocker()
+            await asyncio.sleep(settle)
+        return monitor.snapshot()
+    finally:
+        monitor.stop()
+
+
+class TestLoopMonitor:
+    """Tests for the lag probe and the blocked-loop watchdog"""
+
+    @pytest.mark.asyncio
+    async def test_idle_loop_has_low_lag(self):
+        """An idle loop records probes and no stalls"""
+        monitor = LoopMonitor(interval=0.01, slow_threshold=0.2)
+        snapshot = await run_monitor(monitor)
+
+        assert snapshot['probes'] > 5
+        assert snapshot['stalls'] == 0
+        assert snapshot['lag_p50'] < 0.1
+        assert not monitor.running
+
+    @pytest.mark.asyncio
+    async def test_stall_is_attributed_to_handler_and_client(self):
+        """Blocking inside an instrumented handler names the handler and its client"""
+        monitor = LoopMonitor(interval=0.01, slow_threshold=0.1)
+
+        async def search_files(client, message):
+            time.sleep(0.4)
+
+        handler = instrument_handler(search_files, name='search:files')
+        client = SimpleNamespace(name='clone_42')
+        snapshot = await run_monitor(monitor, lambda: handler(client, None))
+
+        assert snapshot['stalls'] == 1
+        stall = snapshot['recent_stalls'][0]
+        assert stall['handler'] == 'search:files'
+        assert stall['client'] == 'clone_42'
+        assert stall['duration'] >= 0.3
+        assert stall['samples'] >= 1
+        assert 'search_files' in stall['top_frame']
+        assert snapshot['by_handler'] == {'search:files': 1}
+        assert snapshot['lag_max'] >= 0.3
+
+    @pytest.mark.asyncio
+    async def test_uninstrumented_stall_names_the_task(self):
+        """Without a handler on the stack the running task is blamed"""
+        monitor = LoopMonitor(interval=0.01, slow_threshold=0.1)
+
+        async def reindex():
+            time.sleep(0.3)
+
+        snapshot = await run_monitor(monitor, lambda: asyncio.create_task(reindex()))
+
+        assert snapshot['stalls'] == 1
+        stall = snapshot['recent_stalls'][0]
+        assert stall['handler'] is None
+        assert 'reindex' in stall['task']
+
+
+class TestLoopHealthCheck:
+    """Tests for the event_loop health check"""
+
+    @pytest.mark.asyncio
+    async def test_statuses(self, monkeypatch):
+        monitor = LoopMonitor(interval=0.01, slow_threshold=0.1)
+        monkeypatch.setattr(loop_monitor_module, 'loop_monitor', monitor)
+        checker = HealthChecker()
+
+        assert (await checker.check_event_loop()) == {'status': 'healthy', 'monitored': False}
+
+        monitor.start()
+        try:
+            await asyncio.sleep(0.1)
+            result = await checker.check_event_loop()
+            assert result['status'] == 'healthy'
+
+            time.sleep(0.3)
+            await asyncio.sleep(0.2)
+            assert (await checker.check_event_loop())['status'] == 'degraded'
+
+            checker.alert_thresholds['loop_stall'] = 0.1
+            assert (await checker.check_event_loop())['status'] == 'critical'
+        finally:
+            monitor.stop()
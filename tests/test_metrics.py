@@ -0,0 +1,82 @@
+import pytest
+import asyncio
+from types import SimpleNamespace
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bot.utils.metrics import (
+    MetricsRegistry, MongoCommandListener, instrument_handler,
+    handler_requests, handler_latency, mongo_latency, mongo_failures
+)
+
+
+class TestMetrics:
+    """Tests for the request-level metrics subsystem"""
+
+    def test_histogram_render_is_cumulative(self):
+        """Histogram buckets are cumulative with sum and count series"""
+        registry = MetricsRegistry(prefix='test_')
+        histogram = registry.histogram('latency_seconds', 'Latency', ('op',), buckets=(0.1, 1.0))
+
+        histogram.observe(0.05, op='find')
+        histogram.observe(0.5, op='find')
+        histogram.observe(5, op='find')
+
+        text = registry.render()
+        assert 'test_latency_seconds_bucket{op="find",le="0.1"} 1' in text
+        assert 'test_latency_seconds_bucket{op="find",le="1.0"} 2' in text
+        assert 'test_latency_seconds_bucket{op="find",le="+Inf"} 3' in text
+        assert 'test_latency_seconds_count{op="find"} 3' in text
+        assert '# TYPE test_latency_seconds histogram' in text
+
+    def test_counter_labels_escaped(self):
+        """Label values are escaped in the exposition format"""
+        registry = MetricsRegistry(prefix='test_')
+        counter = registry.counter('events_total', 'Events', ('name',))
+
+        counter.inc(name='a"b')
+        counter.inc(2, name='a"b')
+
+        assert 'test_events_total{name="a\\"b"} 3.0' in registry.render()
+
+    @pytest.mark.asyncio
+    async def test_instrument_handler_records_outcome(self):
+        """Instrumented handlers record latency and error status"""
+        async def ok_handler(client, update):
+            return "done"
+
+        async def failing_handler(client, update):
+            raise RuntimeError("boom")
+
+        ok = instrument_handler(ok_handler, name="test.ok")
+        failing = instrument_handler(failing_handler, name="test.failing")
+
+        assert await ok(None, None) == "done"
+        with pytest.raises(RuntimeError):
+            await failing(None, None)
+
+        assert handler_requests.get(handler="test.ok", status="ok") == 1
+        assert handler_requests.get(handler="test.failing", status="error") == 1
+        assert handler_latency.count(handler="test.ok") == 1
+        # Wrapping twice must not double count
+        assert instrument_handler(ok) is ok
+
+    def test_mongo_listener_tracks_collection_and_op(self):
+        """Command events are attributed to their collection"""
+        listener = MongoCommandListener()
+
+        started = SimpleNamespace(command_name='find', command={'find': 'test_files'}, connection_id=('h', 1), request_id=7)
+        succeeded = SimpleNamespace(command_name='find', duration_micros=2500, connection_id=('h', 1), request_id=7)
+        listener.started(started)
+        listener.succeeded(succeeded)
+
+        started.request_id = failed_id = 8
+        listener.started(started)
+        listener.failed(SimpleNamespace(command_name='find', duration_micros=100, connection_id=('h', 1), request_id=failed_id))
+
+        assert mongo_latency.count(collection='test_files', op='find') == 2
+        assert mongo_failures.get(collection='test_files', op='find') == 1
+        assert not listener._pending
@@ -0,0 +1,129 @@
+import pytest
+import pytest_asyncio
+import sys
+import os
+from datetime import datetime, timedelta
+from bson import ObjectId
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bot.database import balance_db, clone_db
+from bot.database.pagination import aggregate_totals, decode_cursor, encode_cursor, fetch_page
+from bot.utils.ui_builders import MAX_CALLBACK_DATA, build_page_nav, page_cursor
+
+
+@pytest_asyncio.fixture
+async def mock_db(monkeypatch):
+    mongomock_motor = pytest.importorskip('mongomock_motor')
+    db = mongomock_motor.AsyncMongoMockClient()['test_pagination']
+    monkeypatch.setattr(balance_db, 'user_balances', db.user_balances)
+    monkeypatch.setattr(balance_db, 'balance_transactions', db.balance_transactions)
+    monkeypatch.setattr(clone_db, 'clones_collection', db.clones)
+    yield db
+
+
+async def walk(fetch):
+    """Follow next cursors to the end, returning every page"""
+    pages, cursor = [], None
+    while True:
+        page = await fetch(cursor)
+        pages.append(page)
+        if not page.has_more:
+            return pages
+        cursor = page.next_cursor
+
+
+class TestCursor:
+    """Test cursor encoding"""
+
+    def test_round_trip(self):
+        values = [12.5, 7, 'a~b%c', datetime(2024, 5, 1, 12, 30, 45, 123456), ObjectId(), None, True]
+        sort = [(str(i), 1) for i in range(len(values))]
+        assert decode_cursor(encode_cursor(values), sort) == values
+
+    def test_mismatched_cursor_is_rejected(self):
+        with pytest.raises(ValueError):
+            decode_cursor('i1~i2', [('balance', -1)])
+        with pytest.raises(ValueError):
+            decode_cursor('x1', [('balance', -1)])
+
+    def test_transaction_cursor_fits_callback_data(self):
+        cursor = encode_cursor([datetime.now(), ObjectId()])
+        assert len(f"full_transaction_history#{cursor}") <= MAX_CALLBACK_DATA
+
+
+class TestKeysetPages:
+    """Test paging through collections"""
+
+    @pytest.mark.asyncio
+    async def test_balances_with_ties_are_paged_without_gaps(self, mock_db):
+        await mock_db.user_balances.insert_many([
+            {'_id': uid, 'balance': float(uid % 7), 'first_name': f"u{uid}", 'bio': 'x' * 100}
+            for uid in range(1, 54)
+        ])
+
+        pages = await walk(lambda cursor: balance_db.get_user_balances_page(cursor, limit=20))
+        assert [len(p.items) for p in pages] == [20, 20, 13]
+
+        rows = [row for page in pages for row in page.items]
+        assert sorted(row['_id'] for row in rows) == list(range(1, 54))
+        keys = [(-row['balance'], row['_id']) for row in rows]
+        assert keys == sorted(keys)
+        # Only the listed fields are read
+        assert all('bio' not in row for row in rows)
+
+    @pytest.mark.asyncio
+    async def test_transactions_newest_first(self, mock_db):
+        start = datetime(2024, 1, 1)
+        await mock_db.balance_transactions.insert_many([
+            {'user_id': 1 if i % 3 else 2, 'amount': 1.0, 'type': 'credit', 'description': str(i),
+             'timestamp': start + timedelta(minutes=i // 2)}
+            for i in range(30)
+        ])
+
+        pages = await walk(lambda cursor: balance_db.get_user_transactions_page(1, cursor, limit=7))
+        rows = [row for page in pages for row in page.items]
+        assert len(rows) == 20
+        assert len({row['_id'] for row in rows}) == 20
+        stamps = [row['timestamp'] for row in rows]
+        assert stamps == sorted(stamps, reverse=True)
+
+    @pytest.mark.asyncio
+    async def test_clones_page(self, mock_db):
+        await mock_db.clones.insert_many([
+            {'_id': str(1000 + i), 'bot_id': 1000 + i, 'username': f"bot{i}", 'status': 'active',
+             'bot_token': 'secret'}
+            for i in range(12)
+        ])
+        first = await clone_db.get_clones_page(limit=10)
+        assert len(first.items) == 10 and first.has_more
+        assert 'bot_token' not in first.items[0]
+        second = await clone_db.get_clones_page(first.next_cursor, limit=10)
+        assert [c['_id'] for c in second.items] == ['1010', '1011']
+        assert not second.has_more
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor_restarts(self, mock_db):
+        await mock_db.clones.insert_many([{'_id': str(i)} for i in range(3)])
+        page = await fetch_page(mock_db.clones, cursor='garbage~~', limit=10)
+        assert len(page.items) == 3
+
+    @pytest.mark.asyncio
+    async def test_totals_are_aggregated(self, mock_db):
+        await mock_db.user_balances.insert_many([{'_id': i, 'balance': 2.5} for i in range(4)])
+        assert await balance_db.get_balance_totals() == {'count': 4, 'balance': 10.0}
+        assert await aggregate_totals(mock_db.empty, sums={'balance': 'balance'}) == {'count': 0, 'balance': 0}
+
+
+class TestPageNav:
+    """Test navigation buttons"""
+
+    def test_nav_buttons(self):
+        from bot.database.pagination import Page
+        rows = build_page_nav('userbalances', Page([{}], 'i5~i9'), is_first_page=False)
+        data = [button.callback_data for button in rows[0]]
+        assert data == ['userbalances', 'userbalances#i5~i9']
+        assert page_cursor(data[1]) == 'i5~i9'
+        assert page_cursor(data[0]) is None
+        assert build_page_nav('userbalances', Page([{}]), is_first_page=True) == []
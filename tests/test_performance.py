@@ -1,140 +1,194 @@
-
 import pytest
+import pytest_asyncio
 import asyncio
-import time
-from unittest.mock import AsyncMock, MagicMock, patch
+import secrets
 import sys
 import os
+from types import SimpleNamespace
 
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+from info import Config
+from tests.benchmark_harness import (
+    BENCH_ENABLED, BENCH_ITERATIONS, BENCH_SIZES, WORDS,
+    BenchResult, FakeClient, FakeMessage, bench_db_name, create_bench_client,
+    find_regressions, measure, percentile, rebind_motor_handles, record, seed_dataset
+)
+
+BENCH_CLONE_ID = '7000000001'
+BENCH_CLONE_TOKEN = f"{BENCH_CLONE_ID}:BENCHTOKEN"
+
+_mock_client = None
+
+
+class TestBenchmarkHarness:
+    """Checks for the benchmark harness itself (always run)"""
+
+    def test_percentile_nearest_rank(self):
+        """Percentiles use the nearest-rank definition"""
+        values = [float(i) for i in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 95) == 95.0
+        assert percentile(values, 99) == 99.0
+        assert percentile([], 95) == 0.0
+
+    def test_regression_detection(self):
+        """Results worse than the baseline by more than the threshold are reported"""
+        baseline = BenchResult('search', 10000, 'mongomock', 50, 1000.0, 1.0, 2.0, 3.0)
+        stored = {baseline.key: baseline.__dict__}
+
+        within = BenchResult('search', 10000, 'mongomock', 50, 900.0, 1.0, 2.2, 3.3)
+        slower = BenchResult('search', 10000, 'mongomock', 50, 500.0, 2.0, 4.0, 6.0)
+        unknown = BenchResult('search', 100000, 'mongomock', 50, 1.0, 1.0, 99.0, 99.0)
+
+        assert find_regressions(within, stored, threshold=0.25) == []
+        assert len(find_regressions(slower, stored, threshold=0.25)) == 2
+        assert find_regressions(unknown, stored, threshold=0.25) == []
+
+    @pytest.mark.asyncio
+    async def test_fake_client_records_calls(self):
+        """The fake client answers any API method and counts calls"""
+        client = FakeClient(BENCH_CLONE_TOKEN)
+        message = FakeMessage(client, text='/start')
+        await message.reply_text('hello')
+        await client.copy_message(1, 2, 3)
+        assert client.calls == {'send_message': 1, 'copy_message': 1}
+        assert message.command == ['start']
+        assert [m.id async for m in client.iter_messages(1, 3)] == [3, 2, 1]
+
+
+@pytest_asyncio.fixture(params=BENCH_SIZES, ids=lambda size: f"{size}docs")
+async def bench_env(request, monkeypatch):
+    """Project code rebound to a seeded benchmark database of ``size`` documents"""
+    global _mock_client
+
+    if not os.environ.get('BENCH_MONGO_URL'):
+        pytest.importorskip('mongomock_motor')
+    size = request.param
+
+    if os.environ.get('BENCH_MONGO_URL'):
+        client, backend = create_bench_client()
+    else:
+        if _mock_client is None:
+            _mock_client = create_bench_client()
+        client, backend = _mock_client
+
+    # Import everything under test before rebinding so their handles get swapped
+    import bot.database.mongo_db
+    import bot.database.users
+    import bot.database.verify_db
+    import bot.plugins.start_handler
+    import bot.plugins.indexing_unified
+    import bot.plugins.broadcast
+    rebind_motor_handles(monkeypatch, client)
+    monkeypatch.setattr(bot.plugins.indexing_unified, 'AsyncIOMotorClient', lambda *args, **kwargs: client)
+
+    meta = client[bench_db_name(Config.DATABASE_NAME)].bench_meta
+    marker = await meta.find_one({'_id': 'dataset'})
+    if not marker or marker.get('size') != size:
+        await seed_dataset(client, Config.DATABASE_NAME, size, BENCH_CLONE_ID)
+        await meta.replace_one({'_id': 'dataset'}, {'_id': 'dataset', 'size': size}, upsert=True)
+
+    yield SimpleNamespace(client=client, backend=backend, size=size)
+
+
+def _check(result: BenchResult):
+    regressions = record(result)
+    assert not regressions, "Performance regression:\n" + "\n".join(regressions)
 
+
+@pytest.mark.skipif(not BENCH_ENABLED, reason="set RUN_BENCHMARKS=1 to run benchmarks")
 class TestPerformance:
-    """Performance tests for system components"""
-    
+    """Benchmarks of real code paths against a seeded local database"""
+
+    @pytest.mark.asyncio
+    async def test_start_command(self, bench_env):
+        """/start for a new user on the mother bot"""
+        from bot.plugins.start_handler import start_command
+        client = FakeClient(Config.BOT_TOKEN)
+
+        async def operation(i):
+            await start_command(client, FakeMessage(client, user_id=20_000_000 + i + 10, text='/start'))
+
+        _check(await measure('start_command', bench_env.size, operation, backend=bench_env.backend))
+        assert client.calls.get('send_message', 0) + client.calls.get('send_photo', 0) > 0
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('mode', ['random', 'recent', 'popular'])
+    async def test_browse_files(self, bench_env, mode):
+        """Random/recent/popular browsing for the mother bot and a clone"""
+        from bot.database import mongo_db
+        browse = getattr(mongo_db, f"get_{mode}_files")
+
+        files = await browse(limit=10)
+        # mongomock lacks some projection operators the real queries use
+        assert files or bench_env.backend == 'mongomock', f"{mode} browsing returned no files"
+
+        async def operation(i):
+            await browse(limit=10, clone_id=BENCH_CLONE_ID if i % 2 else None)
+
+        _check(await measure(f"browse_{mode}", bench_env.size, operation, backend=bench_env.backend))
+
     @pytest.mark.asyncio
-    async def test_database_query_performance(self):
-        """Test database query performance"""
-        start_time = time.time()
-        
-        with patch('bot.database.clone_db.clones_collection') as mock_collection:
-            mock_collection.find.return_value.to_list.return_value = [
-                {"bot_id": f"bot_{i}", "status": "active"} for i in range(100)
-            ]
-            
-            from bot.database.clone_db import get_all_clones
-            clones = await get_all_clones()
-            
-            end_time = time.time()
-            query_time = end_time - start_time
-            
-            assert len(clones) == 100
-            assert query_time < 1.0  # Should complete within 1 second
+    async def test_search_files(self, bench_env):
+        """Keyword search over file names and captions"""
+        from bot.database.mongo_db import search_files
+
+        assert await search_files(WORDS[0])
+
+        async def operation(i):
+            await search_files(f"{WORDS[i % len(WORDS)]} {WORDS[(i * 7) % len(WORDS)]}")
+
+        _check(await measure('search_files', bench_env.size, operation, backend=bench_env.backend))
 
     @pytest.mark.asyncio
-    async def test_clone_manager_bulk_operations(self):
-        """Test clone manager handling multiple operations"""
-        from clone_manager import CloneManager
-        manager = CloneManager()
-        
-        start_time = time.time()
-        
-        # Mock multiple clone configs
-        with patch('clone_manager.get_clone_config') as mock_config:
-            mock_config.return_value = {
-                "bot_id": "123456",
-                "bot_token": "123456:ABC",
-                "admin_id": 789
-            }
-            
-            with patch('pyrogram.Client') as mock_client:
-                mock_client.return_value = AsyncMock()
-                
-                # Start multiple clones
-                tasks = []
-                for i in range(10):
-                    tasks.append(manager.start_clone(f"bot_{i}"))
-                
-                await asyncio.gather(*tasks, return_exceptions=True)
-                
-                end_time = time.time()
-                operation_time = end_time - start_time
-                
-                assert operation_time < 5.0  # Should complete within 5 seconds
+    async def test_index_files_to_db(self, bench_env):
+        """Indexing a channel backlog into a clone database"""
+        from bot.plugins.indexing_unified import index_files_to_db, index_config
+        batch = 200
+        client = FakeClient(BENCH_CLONE_TOKEN)
+        status = FakeMessage(client)
+        clone_data = {'mongodb_url': 'mongodb://bench', 'db_name': bench_db_name(f"clone_{BENCH_CLONE_ID}")}
+        index_config.CURRENT_SKIP = 0
+
+        async def operation(i):
+            # A fresh chat id per call so every message is new rather than a duplicate
+            chat = -1_000_000_000 - (i + 10) - bench_env.size
+            await index_files_to_db(batch, chat, status, client, clone_id=BENCH_CLONE_ID, clone_data=clone_data)
+
+        iterations = max(5, BENCH_ITERATIONS // 10)
+        _check(await measure('index_files_to_db', bench_env.size, operation, iterations=iterations,
+                             warmup=1, units_per_call=batch, backend=bench_env.backend))
+        indexed = await bench_env.client[clone_data['db_name']].files.count_documents({})
+        assert indexed >= batch * iterations
 
     @pytest.mark.asyncio
-    async def test_subscription_checker_performance(self):
-        """Test subscription checker performance with many subscriptions"""
-        from bot.utils.subscription_checker import SubscriptionChecker
-        checker = SubscriptionChecker()
-        
-        start_time = time.time()
-        
-        # Mock many expired subscriptions
-        with patch('bot.utils.subscription_checker.check_expired_subscriptions') as mock_check:
-            mock_check.return_value = [f"bot_{i}" for i in range(50)]
-            
-            with patch('bot.utils.subscription_checker.deactivate_clone') as mock_deactivate:
-                mock_deactivate.return_value = True
-                
-                with patch('bot.utils.subscription_checker.clone_manager') as mock_manager:
-                    mock_manager.stop_clone.return_value = True
-                    
-                    await checker.check_subscriptions()
-                    
-                    end_time = time.time()
-                    check_time = end_time - start_time
-                    
-                    assert check_time < 10.0  # Should complete within 10 seconds
+    async def test_token_verification(self, bench_env):
+        """Issue a verification token and redeem it"""
+        from bot.database.verify_db import create_verification_token, validate_token_and_verify, is_verified
+
+        async def operation(i):
+            user_id = 30_000_000 + i + 10
+            token = await create_verification_token(user_id)
+            await validate_token_and_verify(user_id, token)
+
+        _check(await measure('token_verification', bench_env.size, operation, backend=bench_env.backend))
+        assert await is_verified(30_000_010)
 
     @pytest.mark.asyncio
-    async def test_memory_usage_monitoring(self):
-        """Test memory usage doesn't grow excessively"""
-        from bot.utils.system_monitor import SystemMonitor
-        monitor = SystemMonitor()
-        
-        with patch('psutil.virtual_memory') as mock_memory:
-            initial_memory = 500000000  # 500MB
-            mock_memory.return_value = MagicMock(
-                total=1000000000,
-                used=initial_memory,
-                percent=50.0
-            )
-            
-            with patch('psutil.cpu_percent') as mock_cpu:
-                mock_cpu.return_value = 25.0
-                
-                with patch('clone_manager.clone_manager') as mock_manager:
-                    mock_manager.get_running_clones.return_value = []
-                    
-                    # Collect stats multiple times
-                    for _ in range(10):
-                        await monitor.collect_stats()
-                        await asyncio.sleep(0.1)
-                    
-                    # Memory usage should remain stable
-                    assert monitor.stats['memory_percent'] <= 60.0
-
-    def test_concurrent_requests_handling(self):
-        """Test handling multiple concurrent requests"""
-        async def mock_request():
-            await asyncio.sleep(0.1)
-            return True
-        
-        async def test_concurrent():
-            start_time = time.time()
-            
-            # Simulate 20 concurrent requests
-            tasks = [mock_request() for _ in range(20)]
-            results = await asyncio.gather(*tasks)
-            
-            end_time = time.time()
-            total_time = end_time - start_time
-            
-            assert len(results) == 20
-            assert all(results)
-            assert total_time < 2.0  # Should handle concurrency efficiently
-        
-        asyncio.run(test_concurrent())
+    async def test_broadcast_message(self, bench_env):
+        """Broadcast to the whole userbase through the fake client"""
+        from bot.plugins.admin_ops import broadcast_command
+        client = FakeClient(Config.BOT_TOKEN)
+        original = FakeMessage(client, message_id=secrets.randbelow(1000) + 1)
+        users = await bench_env.client[bench_db_name(Config.DATABASE_NAME)].users.count_documents({})
+
+        async def operation(i):
+            await broadcast_command(client, FakeMessage(client, user_id=Config.OWNER_ID, text='/broadcast',
+                                                        reply_to_message=original))
+
+        _check(await measure('broadcast_message', bench_env.size, operation, iterations=3,
+                             warmup=0, units_per_call=users, backend=bench_env.backend))
+        assert client.calls['copy_message'] >= users * 3
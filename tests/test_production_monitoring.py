@@ -1,6 +1,7 @@
 
 import pytest
 import asyncio
+import threading
 import time
 from unittest.mock import patch, MagicMock, AsyncMock
 import sys
@@ -67,37 +68,6 @@ class TestProductionMonitoring:
         assert 'percent' in cpu_metric
         assert 'count' in cpu_metric
 
-    @pytest.mark.asyncio
-    async def test_storage_stats_error_handling(self, monitor_instance):
-        """Test storage stats error handling"""
-        with patch('os.path.exists', return_value=False):
-            stats = monitor_instance.get_storage_stats_safe()
-            
-            assert stats['total'] == 0
-            assert stats['used'] == 0
-            assert stats['free'] == 0
-            assert 'error' in stats
-
-    @pytest.mark.asyncio
-    async def test_storage_stats_success(self, monitor_instance):
-        """Test successful storage stats collection"""
-        with patch('os.path.exists', return_value=True), \
-             patch('psutil.disk_usage') as mock_disk_usage:
-            
-            mock_disk_usage.return_value = MagicMock(
-                total=1000000000,  # 1GB
-                used=500000000,    # 500MB
-                free=500000000     # 500MB
-            )
-            
-            stats = monitor_instance.get_storage_stats_safe()
-            
-            assert stats['total'] == 1000000000
-            assert stats['used'] == 500000000
-            assert stats['free'] == 500000000
-            assert stats['percent'] == 50.0
-            assert 'error' not in stats
-
     @pytest.mark.asyncio
     async def test_get_stats_with_history(self, monitor_instance):
         """Test getting stats when history exists"""
@@ -116,19 +86,29 @@ class TestProductionMonitoring:
 
     @pytest.mark.asyncio
     async def test_get_stats_empty_history(self, monitor_instance):
-        """Test getting stats when no history exists"""
-        with patch('psutil.cpu_percent', return_value=25.0), \
-             patch('psutil.virtual_memory') as mock_memory, \
-             patch('psutil.disk_usage') as mock_disk:
-            
-            mock_memory.return_value = MagicMock(percent=60.0)
-            mock_disk.return_value = MagicMock(total=1000, used=300)
-            
+        """Test getting stats when no history exists samples off the caller's thread"""
+        callers = []
+        sampled = monitor_instance.sampler.sample_once
+
+        def sample_once():
+            callers.append(threading.get_ident())
+            sampled()
+
+        with patch.object(monitor_instance.sampler, 'sample_once', side_effect=sample_once):
             stats = monitor_instance.get_stats()
-            
-            assert stats['cpu_percent'] == 25.0
-            assert stats['memory_percent'] == 60.0
-            assert stats['disk_percent'] == 30.0
+
+            assert stats['sampling'] is True
+            assert stats['cpu_percent'] == 0
+            assert stats['memory_percent'] == 0
+            for _ in range(100):
+                if monitor_instance.metrics_history['cpu']:
+                    break
+                await asyncio.sleep(0.02)
+
+        assert callers and threading.get_ident() not in callers
+        stats = monitor_instance.get_stats()
+        assert 'sampling' not in stats
+        assert stats['memory_percent'] > 0
 
     @pytest.mark.asyncio
     async def test_resource_alerts(self, monitor_instance):
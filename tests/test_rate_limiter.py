@@ -0,0 +1,142 @@
+import asyncio
+import pytest
+import sys
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bot.utils import rate_limiter as rl
+from bot.utils.keyed_locks import KeyedLocks
+from bot.utils.rate_limiter import RateLimiter, TokenBuckets
+
+
+def make_limiter(**overrides):
+    options = dict(user_rate=1.0, user_burst=3, clone_rate=100, clone_burst=100,
+                   global_rate=1000, global_burst=1000)
+    options.update(overrides)
+    return RateLimiter(**options)
+
+
+def _named_client(name):
+    client = MagicMock(is_clone=True)
+    client.name = name
+    return client
+
+
+class TestTokenBuckets:
+    """Test token bucket refill and eviction"""
+
+    def test_burst_then_refill(self):
+        buckets = TokenBuckets(rate=2.0, capacity=2)
+        assert buckets.try_acquire('u', now=0.0)
+        assert buckets.try_acquire('u', now=0.0)
+        assert not buckets.try_acquire('u', now=0.0)
+        assert buckets.wait_time('u', now=0.0) == pytest.approx(0.5)
+        assert buckets.try_acquire('u', now=0.5)
+
+    def test_idle_buckets_are_evicted(self):
+        buckets = TokenBuckets(rate=1.0, capacity=2)
+        for key in range(100):
+            buckets.try_acquire(key, now=0.0)
+        assert len(buckets) == 100
+        assert buckets.evict_idle(now=0.5) == 0
+        assert buckets.evict_idle(now=1.0) == 100
+        assert len(buckets) == 0
+
+    def test_growth_triggers_sweep(self):
+        buckets = TokenBuckets(rate=1.0, capacity=1)
+        for key in range(5000):
+            # Each sender is idle long enough to refill before the next sweep
+            buckets.try_acquire(key, now=float(key))
+        assert len(buckets) <= 2048
+
+
+class TestRateLimiter:
+    """Test the combined user, clone and global scopes"""
+
+    def test_user_burst_is_refused(self):
+        limiter = make_limiter()
+        assert all(limiter.check(1, 'c1', now=0.0).allowed for _ in range(3))
+        decision = limiter.check(1, 'c1', now=0.0)
+        assert not decision.allowed
+        assert decision.scope == rl.USER
+        assert decision.retry_after == pytest.approx(1.0)
+        # Other users are unaffected
+        assert limiter.check(2, 'c1', now=0.0).allowed
+
+    def test_refusal_spends_no_tokens_in_other_scopes(self):
+        limiter = make_limiter(user_burst=100, clone_rate=1, clone_burst=2)
+        assert limiter.check(1, 'c1', now=0.0).allowed
+        assert limiter.check(1, 'c1', now=0.0).allowed
+        for _ in range(10):
+            assert limiter.check(1, 'c1', now=0.0).scope == rl.CLONE
+        # 2 admitted updates out of 100, refused ones took nothing from the user
+        assert limiter.users.wait_time(1, 98, now=0.0) == 0
+        assert limiter.check(1, 'c2', now=0.0).allowed
+
+    def test_notices_are_throttled(self):
+        limiter = make_limiter()
+        assert limiter.should_notify(1, now=0.0)
+        assert not limiter.should_notify(1, now=10.0)
+        assert limiter.should_notify(1, now=31.0)
+
+    def test_disabled_admits_everything(self):
+        limiter = make_limiter(enabled=False)
+        assert all(limiter.check(1, now=0.0).allowed for _ in range(50))
+
+
+class TestUpdateHelpers:
+    """Test clone detection, admin exemption and the handler decorator"""
+
+    def test_clone_id_from_client_name(self):
+        assert rl._clone_id(_named_client('clone_123')) == '123'
+        assert rl._clone_id(MagicMock(is_clone=False)) is None
+
+    def test_admins_are_exempt(self, monkeypatch):
+        monkeypatch.setattr(rl, 'rate_limiter', make_limiter(user_burst=1))
+        monkeypatch.setattr(rl.Config, 'is_admin', classmethod(lambda cls, user_id: user_id == 42))
+        client = MagicMock(is_clone=False)
+        assert all(rl.check_update(client, 42).allowed for _ in range(10))
+        assert rl.check_update(client, 7).allowed
+        assert not rl.check_update(client, 7).allowed
+
+    @pytest.mark.asyncio
+    async def test_decorator_skips_handler_and_notifies_once(self, monkeypatch):
+        monkeypatch.setattr(rl, 'rate_limiter', make_limiter(user_burst=1, user_rate=0.001))
+        monkeypatch.setattr(rl.Config, 'is_admin', classmethod(lambda cls, user_id: False))
+        handler = AsyncMock(return_value='handled')
+        guarded = rl.rate_limited()(handler)
+
+        message = MagicMock(spec=['from_user', 'reply'])
+        message.from_user = MagicMock(id=5)
+        message.reply = AsyncMock()
+        client = MagicMock(is_clone=False)
+
+        results = [await guarded(client, message) for _ in range(4)]
+        assert results == ['handled', None, None, None]
+        assert handler.await_count == 1
+        assert message.reply.await_count == 1
+
+
+class TestKeyedLocks:
+    """Test that per-user locks do not outlive their holders"""
+
+    @pytest.mark.asyncio
+    async def test_locks_are_released(self):
+        locks = KeyedLocks()
+        order = []
+
+        async def worker(key, tag):
+            async with locks.hold(key):
+                order.append(('in', tag))
+                await asyncio.sleep(0.01)
+                order.append(('out', tag))
+
+        await asyncio.gather(worker(1, 'a'), worker(1, 'b'), worker(2, 'c'))
+        # Holders of the same key never overlap
+        a_in, a_out = order.index(('in', 'a')), order.index(('out', 'a'))
+        b_in = order.index(('in', 'b'))
+        assert b_in > a_out or order.index(('out', 'b')) < a_in
+        assert len(locks) == 0
@@ -0,0 +1,75 @@
+import pytest
+import asyncio
+import time
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bot.utils.resource_sampler import RingBuffer, ResourceSampler
+from bot.utils.health_check import HealthChecker
+
+
+class TestResourceSampler:
+    """Tests for the background resource sampler and its ring buffers"""
+
+    def test_ring_buffer_wraps_and_orders(self):
+        """Oldest rows are overwritten and reads stay in insertion order"""
+        buffer = RingBuffer(('timestamp', 'percent'), capacity=3)
+        for i in range(5):
+            buffer.append({'timestamp': i, 'percent': i * 10, 'ignored': 1})
+
+        assert len(buffer) == 3
+        assert [row['percent'] for row in buffer] == [20.0, 30.0, 40.0]
+        assert buffer[0]['timestamp'] == 2.0
+        assert buffer[-1]['percent'] == 40.0
+        with pytest.raises(IndexError):
+            buffer[3]
+
+    def test_percentile_and_rate(self):
+        """Percentiles use nearest rank and rates are per second"""
+        buffer = RingBuffer(('timestamp', 'percent', 'bytes'), capacity=100)
+        now = time.time()
+        for i in range(1, 101):
+            buffer.append_values((now - 100 + i, i, i * 1000))
+
+        assert buffer.percentile('percent', 50) == 50.0
+        assert buffer.percentile('percent', 95) == 95.0
+        assert buffer.rate('bytes') == pytest.approx(1000.0)
+        assert buffer.percentile('percent', 95, window=10) == 100.0
+
+    def test_sampler_thread_fills_buffers(self):
+        """The background thread samples without any event loop"""
+        sampler = ResourceSampler(interval=0.01, capacity=10)
+        sampler.start()
+        try:
+            deadline = time.time() + 5
+            while len(sampler.cpu) < 2 and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            sampler.stop()
+
+        assert not sampler.running
+        assert len(sampler.cpu) >= 2
+        snapshot = sampler.snapshot()
+        assert snapshot['samples'] == len(sampler.cpu)
+        assert snapshot['memory_percent'] > 0
+
+    @pytest.mark.asyncio
+    async def test_health_checker_reads_shared_sampler(self):
+        """Resource checks read the shared buffers instead of calling psutil"""
+        sampler = ResourceSampler(capacity=10)
+        now = time.time()
+        sampler.cpu.append({'timestamp': now, 'percent': 95.0, 'count': 4})
+        sampler.memory.append({'timestamp': now, 'percent': 40.0, 'available': 2 * 1024**3, 'total': 8 * 1024**3})
+        checker = HealthChecker(sampler=sampler)
+
+        cpu = await checker.check_cpu()
+        memory = await checker.check_memory()
+
+        assert cpu['status'] == 'critical'
+        assert cpu['cores'] == 4
+        assert memory['status'] == 'healthy'
+        assert memory['available_gb'] == 2.0
+        assert len(sampler.cpu) == 1
@@ -0,0 +1,148 @@
+import asyncio
+import pytest
+import sys
+import os
+from pyrogram.errors import FloodWait
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bot.utils.send_scheduler import BULK, INTERACTIVE, NORMAL, SendScheduler
+
+
+def recorder(log, tag, result=None):
+    async def call():
+        log.append(tag)
+        return result if result is not None else tag
+    return call
+
+
+class TestSendScheduler:
+    """Test ordering, pacing and FloodWait handling of outbound calls"""
+
+    @pytest.mark.asyncio
+    async def test_interactive_calls_overtake_bulk(self):
+        scheduler = SendScheduler('test', rate=1000, chat_rate=1000, chat_burst=1000)
+        log = []
+        futures = [scheduler.submit(recorder(log, f"bulk{i}"), chat_id=i, priority=BULK) for i in range(5)]
+        futures.append(scheduler.submit(recorder(log, 'reply'), chat_id=99, priority=INTERACTIVE))
+        await asyncio.gather(*futures)
+        assert log[0] == 'reply'
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_calls_to_one_chat_are_serialized_and_paced(self):
+        scheduler = SendScheduler('test', rate=1000, chat_rate=20, chat_burst=1)
+        running, overlap = set(), []
+
+        def make(i):
+            async def call():
+                overlap.append(len(running))
+                running.add(i)
+                await asyncio.sleep(0.01)
+                running.discard(i)
+                return i
+            return call
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        results = await asyncio.gather(*(scheduler.call(make(i), chat_id=1) for i in range(4)))
+        assert results == [0, 1, 2, 3]
+        assert max(overlap) == 0
+        # Burst of one, then a token every 50ms
+        assert loop.time() - started >= 0.14
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_bulk_share_leaves_headroom(self):
+        scheduler = SendScheduler('test', rate=10, chat_rate=1000, chat_burst=1000, bulk_share=0.5)
+        log = []
+        bulk = [scheduler.submit(recorder(log, 'bulk'), chat_id=i, priority=BULK) for i in range(20)]
+        await asyncio.sleep(0.3)
+        sent_bulk = log.count('bulk')
+        assert sent_bulk <= 7
+        # Interactive calls still get the rest of the global rate
+        await asyncio.wait_for(scheduler.call(recorder(log, 'reply'), chat_id=500, priority=INTERACTIVE), 0.5)
+        await scheduler.close()
+        assert all(f.cancelled() or f.done() for f in bulk)
+
+    @pytest.mark.asyncio
+    async def test_flood_wait_is_retried_and_slows_the_client(self):
+        scheduler = SendScheduler('test', rate=100, chat_rate=1000, chat_burst=1000, recover_after=2)
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise FloodWait(value=0)
+            return 'ok'
+
+        assert await scheduler.call(flaky, chat_id=1) == 'ok'
+        assert len(attempts) == 3
+        assert scheduler.flood_waits == 2
+        assert scheduler.rate < 100
+
+        # Rate recovers after enough successful calls
+        for i in range(40):
+            await scheduler.call(recorder([], i), chat_id=i)
+        assert scheduler.rate == 100
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_flood_wait_gives_up_after_retries(self):
+        scheduler = SendScheduler('test', rate=1000, chat_rate=1000, chat_burst=1000, max_retries=1)
+
+        async def always_flood():
+            raise FloodWait(value=0)
+
+        with pytest.raises(FloodWait):
+            await scheduler.call(always_flood, chat_id=1)
+        await scheduler.close()
+
+    def test_flood_wait_penalizes_the_chat(self):
+        scheduler = SendScheduler('test', rate=30, chat_rate=1, chat_burst=3)
+        scheduler._on_flood_wait(42, 7)
+        assert scheduler.chats.wait_time(42) == pytest.approx(7, abs=0.1)
+        assert scheduler.chats.wait_time(43) == 0
+        assert scheduler.global_bucket.wait_time('global') == 0
+
+    @pytest.mark.asyncio
+    async def test_keyed_calls_coalesce(self):
+        scheduler = SendScheduler('test', rate=1000, chat_rate=1000, chat_burst=1000)
+        log = []
+        first = scheduler.submit(recorder(log, 'progress 1'), chat_id=1, priority=BULK, key='progress')
+        second = scheduler.submit(recorder(log, 'progress 2'), chat_id=1, priority=BULK, key='progress')
+        assert await first == await second == 'progress 2'
+        assert log == ['progress 2']
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_the_caller_and_close_cancels(self):
+        scheduler = SendScheduler('test', rate=1, chat_rate=1000, chat_burst=1000)
+
+        async def broken():
+            raise ValueError('nope')
+
+        with pytest.raises(ValueError):
+            await scheduler.call(broken, priority=NORMAL)
+        pending = scheduler.submit(recorder([], 'late'), priority=NORMAL)
+        await scheduler.close()
+        assert pending.cancelled()
+        assert len(scheduler) == 0
+
+    @pytest.mark.asyncio
+    async def test_close_cancels_callers_of_running_calls(self):
+        """A caller awaiting a call that is mid-flight when the client stops is released"""
+        scheduler = SendScheduler('test', rate=1000, chat_rate=1000, chat_burst=1000)
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(60)
+
+        caller = asyncio.create_task(scheduler.call(slow, chat_id=1, priority=NORMAL))
+        await asyncio.wait_for(started.wait(), 1)
+        await scheduler.close()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(caller, 1)
+        assert scheduler.stats()['in_flight'] == 0
@@ -0,0 +1,108 @@
+import pytest
+import pytest_asyncio
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bot.database import session_db
+from bot.utils.session_storage import CloneSessionStorage
+
+PEER_A = (111, 9001, 'user', 'alice', None)
+PEER_B = (222, 9002, 'bot', 'bob_bot', None)
+
+
+@pytest_asyncio.fixture
+async def mock_sessions(monkeypatch):
+    mongomock_motor = pytest.importorskip('mongomock_motor')
+    db = mongomock_motor.AsyncMongoMockClient()['test_sessions']
+    monkeypatch.setattr(session_db, 'sessions_collection', db.clone_sessions)
+    monkeypatch.setattr(session_db, 'session_peers_collection', db.clone_session_peers)
+
+    writes = []
+    original = session_db.write_peers
+
+    async def counting_write_peers(name, peers, seen_at):
+        peers = list(peers)
+        writes.append(peers)
+        return await original(name, peers, seen_at)
+
+    monkeypatch.setattr(session_db, 'write_peers', counting_write_peers)
+    yield db, writes
+
+
+async def sign_in(storage):
+    # What pyrogram's load_session and sign_in_bot write for a new bot session
+    await storage.api_id(12345)
+    await storage.dc_id(4)
+    await storage.test_mode(False)
+    await storage.auth_key(b'\x01' * 256)
+    await storage.user_id(777)
+    await storage.is_bot(True)
+
+
+class TestCloneSessionStorage:
+    """Tests for the MongoDB-backed clone session storage"""
+
+    @pytest.mark.asyncio
+    async def test_session_survives_restart(self, mock_sessions):
+        """A second storage with the same name resumes the signed-in session"""
+        storage = CloneSessionStorage('clone_777', flush_interval=60)
+        await storage.open()
+        assert storage.restored is False
+        assert await storage.auth_key() is None
+        await sign_in(storage)
+        await storage.update_peers([PEER_A])
+        await storage.save()
+        await storage.close()
+
+        resumed = CloneSessionStorage('clone_777', flush_interval=60)
+        await resumed.open()
+        try:
+            assert resumed.restored is True
+            assert await resumed.auth_key() == b'\x01' * 256
+            assert await resumed.dc_id() == 4
+            assert await resumed.user_id() == 777
+            assert await resumed.is_bot()
+            peer = await resumed.get_peer_by_id(111)
+            assert peer.access_hash == 9001
+        finally:
+            await resumed.close()
+
+    @pytest.mark.asyncio
+    async def test_peer_updates_are_batched(self, mock_sessions):
+        """Repeated peer updates coalesce into one bulk write; unchanged peers are skipped"""
+        _, writes = mock_sessions
+        storage = CloneSessionStorage('clone_888', flush_interval=60)
+        await storage.open()
+        try:
+            await storage.update_peers([PEER_A, PEER_B])
+            await storage.update_peers([PEER_A, (222, 9003, 'bot', 'bob_bot', None)])
+            assert writes == []
+
+            await storage.flush()
+            assert len(writes) == 1
+            assert sorted(writes[0]) == [PEER_A, (222, 9003, 'bot', 'bob_bot', None)]
+
+            await storage.update_peers([PEER_A])
+            await storage.flush()
+            assert len(writes) == 1
+        finally:
+            await storage.close()
+
+    @pytest.mark.asyncio
+    async def test_delete_removes_stored_session(self, mock_sessions):
+        """Logging out drops the session document and its peers"""
+        db, _ = mock_sessions
+        storage = CloneSessionStorage('clone_999', flush_interval=60)
+        await storage.open()
+        await sign_in(storage)
+        await storage.update_peers([PEER_A])
+        await storage.flush()
+        assert await db.clone_sessions.count_documents({}) == 1
+
+        await storage.delete()
+        await storage.close()
+        assert await db.clone_sessions.count_documents({}) == 0
+        assert await db.clone_session_peers.count_documents({}) == 0
@@ -0,0 +1,96 @@
+import pytest
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shared.utils.startup_profiler import StartupProfiler
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Seconds allowed for importing each entry point, on top of interpreter start-up
+CLI_IMPORT_BUDGET = float(os.environ.get('STARTUP_BUDGET_CLI', '1.5'))
+MAIN_IMPORT_BUDGET = float(os.environ.get('STARTUP_BUDGET_MAIN', '4.0'))
+
+# The result goes to a file named on the command line: the logging writer thread
+# shares stdout and can interleave its records with anything printed there
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+from bot.database.connection import client
+with open(sys.argv[1], 'w') as result:
+    json.dump({{
+        'seconds': elapsed,
+        'pyrogram': 'pyrogram' in sys.modules,
+        'motor_client_created': client.created,
+    }}, result)
+'''
+
+
+def probe_import(module: str) -> dict:
+    env = dict(os.environ, DATABASE_URL=os.environ.get('DATABASE_URL', 'mongodb://localhost:27017'))
+    env.pop('PROFILE_STARTUP', None)
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, 'probe.json')
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE.format(module=module), output],
+            cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, timeout=120
+        )
+        assert result.returncode == 0, result.stderr
+        with open(output) as probe:
+            return json.load(probe)
+
+
+class TestStartup:
+    """Import-time budget for the entry points and the startup profiler"""
+
+    def test_clone_manager_cli_import_budget(self):
+        """The clone CLI imports without pyrogram or a database connection"""
+        probe = probe_import('clone_manager')
+
+        assert probe['pyrogram'] is False
+        assert probe['motor_client_created'] is False
+        assert probe['seconds'] < CLI_IMPORT_BUDGET, f"clone_manager imported in {probe['seconds']:.2f}s"
+
+    def test_main_import_budget(self):
+        """Importing main stays within budget and does not touch the database"""
+        probe = probe_import('main')
+
+        assert probe['motor_client_created'] is False
+        assert probe['seconds'] < MAIN_IMPORT_BUDGET, f"main imported in {probe['seconds']:.2f}s"
+
+    def test_profiler_records_nested_imports(self, tmp_path, monkeypatch):
+        """Per-module self/cumulative times, parents, phases and the JSON report"""
+        package = tmp_path / 'profiled_pkg'
+        package.mkdir()
+        (package / '__init__.py').write_text('from . import child\n')
+        (package / 'child.py').write_text('import time\ntime.sleep(0.02)\n')
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        profiler = StartupProfiler()
+        profiler.start()
+        try:
+            import profiled_pkg  # noqa: F401
+            profiler.mark('imported')
+        finally:
+            profiler.stop()
+            for name in ('profiled_pkg', 'profiled_pkg.child'):
+                sys.modules.pop(name, None)
+
+        modules = {m['module']: m for m in profiler.report()['modules']}
+        parent, child = modules['profiled_pkg'], modules['profiled_pkg.child']
+        assert child['parent'] == 'profiled_pkg'
+        assert child['self_ms'] >= 15
+        assert parent['total_ms'] >= child['total_ms']
+        assert parent['self_ms'] < child['self_ms']
+
+        path = profiler.write_report(str(tmp_path / 'profile.json'))
+        report = json.loads(path.read_text())
+        assert report['phases'][0]['phase'] == 'imported'
+        assert 'profiled_pkg' in report['packages']
@@ -0,0 +1,122 @@
+import pytest
+import asyncio
+import sys
+import os
+import threading
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bot.utils.stats_service import StatsService
+
+
+@pytest.fixture
+def stats_db(monkeypatch):
+    """Database modules read by the stats service, rebound to an in-memory database"""
+    mongomock_motor = pytest.importorskip('mongomock_motor')
+    from bot.database import clone_db, subscription_db, users, mongo_db
+
+    db = mongomock_motor.AsyncMongoMockClient()['stats_service_test']
+    monkeypatch.setattr(clone_db, 'clones_collection', db['clones'])
+    monkeypatch.setattr(subscription_db, 'subscriptions_collection', db['subscriptions'])
+    monkeypatch.setattr(users, 'user_data', db['users'])
+    monkeypatch.setattr(mongo_db, 'collection', db['files'])
+    return db
+
+
+async def _seed(db):
+    await db.clones.insert_many([
+        {'_id': '1', 'status': 'active'}, {'_id': '2', 'status': 'active'},
+        {'_id': '3', 'status': 'pending_payment'}, {'_id': '4', 'status': 'deactivated'},
+    ])
+    await db.subscriptions.insert_many([
+        {'_id': '1', 'status': 'active', 'payment_verified': True, 'total_paid': 3.0},
+        {'_id': '2', 'status': 'expired', 'payment_verified': True, 'total_paid': 8.0},
+        {'_id': '3', 'status': 'pending_payment', 'payment_verified': False, 'total_paid': 0},
+    ])
+    await db.users.insert_many([{'_id': i} for i in range(7)])
+    await db.files.insert_many([{'_id': i} for i in range(5)])
+
+
+class TestStatsService:
+    """Tests for the cached global statistics service"""
+
+    @pytest.mark.asyncio
+    async def test_counts_and_caching(self, stats_db):
+        """All counters come from one pass and are cached until the TTL"""
+        from bot.database.clone_db import get_clone_statistics
+        from bot.database.subscription_db import get_subscription_stats
+        await _seed(stats_db)
+
+        service = StatsService(ttl=60, max_stale=600)
+        stats = await service.get()
+        assert stats['stale'] is False
+        assert (stats['total_clones'], stats['active_clones'], stats['inactive_clones']) == (4, 2, 2)
+        assert (stats['total_subscriptions'], stats['expired_subscriptions']) == (3, 1)
+        assert stats['total_revenue'] == 11.0
+        assert (stats['total_users'], stats['total_files']) == (7, 5)
+
+        assert await get_clone_statistics() == {'total': 4, 'active': 2, 'pending': 1, 'deactivated': 1}
+        assert (await get_subscription_stats())['total_revenue'] == 11.0
+
+        await stats_db.clones.insert_one({'_id': '5', 'status': 'active'})
+        assert (await service.get())['total_clones'] == 4
+        service.invalidate()
+        assert (await service.get())['total_clones'] == 5
+
+    @pytest.mark.asyncio
+    async def test_stale_while_revalidate(self, stats_db):
+        """Expired values are served at once while a single refresh runs"""
+        await _seed(stats_db)
+        service = StatsService(ttl=0, max_stale=600)
+        calls = 0
+        compute = service._compute
+
+        async def counting_compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return await compute()
+
+        service._compute = counting_compute
+        await service.get()
+        await stats_db.users.insert_one({'_id': 'new'})
+
+        results = await asyncio.gather(*(service.get() for _ in range(10)))
+        assert all(result['stale'] and result['total_users'] == 7 for result in results)
+        await asyncio.sleep(0.05)
+        assert calls == 2
+        assert (await service.get(allow_stale=False))['total_users'] == 8
+
+    @pytest.mark.asyncio
+    async def test_other_loops_use_the_home_loop(self, stats_db):
+        """A call from another thread's loop is answered by the home loop's refresh"""
+        await _seed(stats_db)
+        service = StatsService(ttl=60)
+        await service.get()
+        home_task = service._task
+        service.invalidate()
+
+        result = {}
+        thread = threading.Thread(target=lambda: result.update(asyncio.run(service.get())))
+        thread.start()
+        while thread.is_alive():
+            await asyncio.sleep(0.01)
+        assert result['total_clones'] == 4
+        assert service._task is not home_task
+
+    @pytest.mark.asyncio
+    async def test_stale_value_without_home_loop_is_refreshed_inline(self, stats_db):
+        """Once the home loop is gone an expired value is recomputed, not left to a dying task"""
+        await _seed(stats_db)
+        service = StatsService(ttl=0, max_stale=600)
+        thread = threading.Thread(target=lambda: asyncio.run(service.get()))
+        thread.start()
+        while thread.is_alive():
+            await asyncio.sleep(0.01)
+        assert service._home_loop.is_closed()
+
+        await stats_db.users.insert_one({'_id': 'new'})
+        result = await service.get()
+        assert result['stale'] is False and result['total_users'] == 8
+        assert service._task.done()
@@ -0,0 +1,130 @@
+import pytest
+import asyncio
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bot.utils import subscription_scheduler
+from bot.utils.subscription_scheduler import ACTIVATE, EXPIRE, LifecycleScheduler
+
+
+@pytest.fixture
+def lifecycle_db(monkeypatch):
+    """Scheduler and subscription_db rebound to an in-memory database"""
+    mongomock_motor = pytest.importorskip('mongomock_motor')
+    from bot.database import subscription_db
+
+    db = mongomock_motor.AsyncMongoMockClient()['lifecycle_test']
+    monkeypatch.setattr(subscription_scheduler, 'clones_collection', db['clones'])
+    monkeypatch.setattr(subscription_scheduler, 'subscriptions_collection', db['subscriptions'])
+    monkeypatch.setattr(subscription_db, 'subscriptions_collection', db['subscriptions'])
+    return db
+
+
+class Recorder:
+    def __init__(self):
+        self.started, self.stopped = [], []
+        self.fail = set()
+
+    async def start_clone(self, bot_id):
+        self.started.append(bot_id)
+        return (bot_id not in self.fail, 'ok')
+
+    async def stop_clone(self, bot_id):
+        self.stopped.append(bot_id)
+
+
+class TestLifecycleScheduler:
+    """Tests for the subscription lifecycle scheduler"""
+
+    def test_heap_orders_and_reschedules(self):
+        """Moving a deadline supersedes the old heap entry"""
+        scheduler = LifecycleScheduler()
+        now = datetime.now()
+        scheduler.schedule_expiry('a', now + timedelta(hours=1))
+        scheduler.schedule_expiry('b', now + timedelta(minutes=5))
+        scheduler.schedule_expiry('a', now - timedelta(seconds=1))
+        scheduler.schedule_expiry('c', now + timedelta(days=1))
+        scheduler.cancel('c')
+
+        assert scheduler.next_deadline() == now - timedelta(seconds=1)
+        assert scheduler.pop_due(now) == {EXPIRE: ['a'], ACTIVATE: []}
+        assert scheduler.pop_due(now + timedelta(minutes=10)) == {EXPIRE: ['b'], ACTIVATE: []}
+        assert scheduler.pop_due(now + timedelta(days=2)) == {EXPIRE: [], ACTIVATE: []}
+        assert len(scheduler) == 0
+
+    @pytest.mark.asyncio
+    async def test_load_and_fire_in_bulk(self, lifecycle_db):
+        """Due expiries and activations are applied together; extensions are honoured"""
+        now = datetime.now()
+        await lifecycle_db.subscriptions.insert_many([
+            {'_id': 'old', 'status': 'active', 'expires_at': now - timedelta(minutes=1)},
+            {'_id': 'legacy', 'status': 'active', 'expiry_date': now - timedelta(minutes=2)},
+            {'_id': 'later', 'status': 'active', 'expires_at': now + timedelta(days=3)},
+            {'_id': 'waiting', 'status': 'active', 'expires_at': now + timedelta(days=30)},
+            {'_id': 'gone', 'status': 'cancelled'},
+        ])
+        await lifecycle_db.clones.insert_many([
+            {'_id': 'old', 'status': 'active'},
+            {'_id': 'legacy', 'status': 'active'},
+            {'_id': 'later', 'status': 'active'},
+            {'_id': 'waiting', 'status': 'pending_subscription'},
+            {'_id': 'gone', 'status': 'pending_subscription'},
+        ])
+
+        recorder = Recorder()
+        scheduler = LifecycleScheduler(start_clone=recorder.start_clone, stop_clone=recorder.stop_clone)
+        await scheduler.load()
+        assert (await lifecycle_db.clones.find_one({'_id': 'gone'}))['status'] == 'subscription_inactive'
+
+        await scheduler.fire_due()
+        assert sorted(recorder.stopped) == ['legacy', 'old']
+        assert recorder.started == ['waiting']
+        for bot_id in ('old', 'legacy'):
+            assert (await lifecycle_db.subscriptions.find_one({'_id': bot_id}))['status'] == 'expired'
+            assert (await lifecycle_db.clones.find_one({'_id': bot_id}))['status'] == 'deactivated'
+
+        # An extension written behind the scheduler's back wins over the queued deadline
+        scheduler.schedule_expiry('later', now - timedelta(seconds=1))
+        await scheduler.fire_due()
+        assert (await lifecycle_db.subscriptions.find_one({'_id': 'later'}))['status'] == 'active'
+        assert abs(scheduler.next_deadline() - (now + timedelta(days=3))) < timedelta(milliseconds=1)
+
+    @pytest.mark.asyncio
+    async def test_subscription_writes_wake_the_scheduler(self, lifecycle_db, monkeypatch):
+        """subscription_db notifies the scheduler, which fires without polling"""
+        from bot.database import subscription_db
+
+        recorder = Recorder()
+        scheduler = LifecycleScheduler(start_clone=recorder.start_clone, stop_clone=recorder.stop_clone)
+        monkeypatch.setattr(subscription_scheduler, 'lifecycle_scheduler', scheduler)
+        await lifecycle_db.clones.insert_one({'_id': '42', 'status': 'pending_subscription'})
+
+        runner = asyncio.create_task(scheduler.run())
+        try:
+            await subscription_db.create_subscription('42', 1, 'monthly', payment_verified=False)
+            assert len(scheduler) == 0
+
+            await subscription_db.activate_subscription('42')
+            for _ in range(50):
+                if recorder.started:
+                    break
+                await asyncio.sleep(0.01)
+            assert recorder.started == ['42']
+            assert scheduler.next_deadline() > datetime.now() + timedelta(days=29)
+
+            await subscription_db.subscriptions_collection.update_one(
+                {'_id': '42'}, {'$set': {'expires_at': datetime.now()}})
+            scheduler.schedule_expiry('42', datetime.now() + timedelta(milliseconds=50))
+            for _ in range(50):
+                if recorder.stopped:
+                    break
+                await asyncio.sleep(0.01)
+            assert recorder.stopped == ['42']
+        finally:
+            runner.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await runner
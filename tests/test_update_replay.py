@@ -0,0 +1,48 @@
+import pytest
+import asyncio
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tests.update_replay import ReplayHarness, generate_events, parse_mix, use_mongomock
+
+
+class TestUpdateReplay:
+    """Tests for the synthetic update replay harness"""
+
+    def test_generate_events_follows_mix(self):
+        """Generated events respect the rate, duration and user mix"""
+        mix = parse_mix("msg:/start=1,cb:random_files=1")
+        events = generate_events(rate=200, duration=2, users=10, mix=mix, seed=1)
+
+        assert 300 < len(events) < 500
+        assert all(0 <= event['at'] < 2 for event in events)
+        assert len({event['user_id'] for event in events}) <= 10
+        assert {'text', 'callback'} <= {key for event in events for key in event}
+        with pytest.raises(ValueError):
+            parse_mix("sticker:x=1")
+
+    @pytest.mark.asyncio
+    async def test_replay_through_dispatcher(self, monkeypatch):
+        """Updates go through the real dispatcher and plugin handlers"""
+        pytest.importorskip('mongomock_motor')
+        await use_mongomock(monkeypatch, seed_size=50)
+
+        harness = await ReplayHarness(workers=4).start()
+        try:
+            events = [
+                {'at': 0, 'user_id': 5_000_000_001, 'text': '/start'},
+                {'at': 0, 'user_id': 5_000_000_002, 'callback': 'random_files'},
+                {'at': 0, 'user_id': 5_000_000_003, 'text': 'hello there'},
+            ]
+            stats = await harness.replay(events, drain_timeout=30)
+        finally:
+            await harness.stop()
+
+        report = stats.report()
+        assert report['injected'] == report['completed'] == 3
+        assert report['dispatch_errors'] == 0
+        assert report['handlers']['start_handler.start_command']['count'] == 1
+        assert report['api_calls'].get('SendMessage', 0) >= 1
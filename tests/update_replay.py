@@ -0,0 +1,427 @@
+"""
+Synthetic Telegram update replay for end-to-end load testing.
+
+Builds the real ``Bot`` client with all ``bot.plugins`` handlers, stubs the
+network layer (``invoke``) and feeds raw ``UpdateNewMessage`` /
+``UpdateBotCallbackQuery`` updates straight into the Pyrogram dispatcher
+queue, so filters, handler groups and ``catch_all_handler`` all run exactly
+as in production.
+
+Usage (from the repository root):
+    python -m tests.update_replay --rate 200 --duration 20 --users 2000
+    python -m tests.update_replay --ramp 50,100,200,400,800 --duration 10
+    python -m tests.update_replay --replay recorded.jsonl
+    python -m tests.update_replay --mix "msg:/start=5,cb:random_files=3" --record run.jsonl
+
+Events (generated or replayed) are JSON objects, one per line:
+    {"at": 0.12, "user_id": 1001, "text": "/start"}
+    {"at": 0.50, "user_id": 1002, "callback": "random_files"}
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from types import MethodType
+from typing import Dict, Iterable, List, Optional
+
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from pyrogram import raw, types
+from pyrogram.storage import MemoryStorage
+
+from tests.benchmark_harness import percentile
+
+DEFAULT_MIX = (
+    "msg:/start=30,cb:random_files=15,cb:recent_files=10,cb:popular_files=10,"
+    "msg:/help=5,cb:help_menu=5,cb:about_bot=5,msg:avengers 1080p=15,msg:hello=5"
+)
+USER_ID_BASE = 5_000_000_000
+
+
+class InstrumentedQueue(asyncio.Queue):
+    """Dispatcher queue that timestamps packets
+
+    Queueing delay is measured when a worker takes a packet; a packet counts
+    as finished (end-to-end latency) when the same worker comes back for the
+    next one, i.e. after every matching handler has run.
+    """
+
+    def __init__(self, stats: "ReplayStats"):
+        super().__init__()
+        self.stats = stats
+        self._in_flight: Dict[asyncio.Task, float] = {}
+
+    def _put(self, item):
+        super()._put((time.perf_counter(), item))
+
+    def _get(self):
+        enqueued_at, item = super()._get()
+        if item is not None:
+            self.stats.queue_delay.append(time.perf_counter() - enqueued_at)
+            self._in_flight[asyncio.current_task()] = enqueued_at
+        return item
+
+    async def get(self):
+        self.finish_current()
+        return await super().get()
+
+    def finish_current(self):
+        enqueued_at = self._in_flight.pop(asyncio.current_task(), None)
+        if enqueued_at is not None:
+            self.stats.end_to_end.append(time.perf_counter() - enqueued_at)
+            self.stats.completed += 1
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+
+class ReplayStats:
+    """Counters and latency samples for one replay run"""
+
+    def __init__(self):
+        self.injected = 0
+        self.completed = 0
+        self.dispatch_errors = 0
+        self.queue_delay: List[float] = []
+        self.end_to_end: List[float] = []
+        self.handler_latency: Dict[str, List[float]] = defaultdict(list)
+        self.handler_errors: Dict[str, int] = defaultdict(int)
+        self.api_calls: Dict[str, int] = defaultdict(int)
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def report(self, target_rate: float = 0.0) -> Dict:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+
+        def summary(samples: List[float]) -> Dict:
+            return {
+                'p50_ms': round(percentile(samples, 50) * 1000, 2),
+                'p95_ms': round(percentile(samples, 95) * 1000, 2),
+                'p99_ms': round(percentile(samples, 99) * 1000, 2),
+            }
+
+        return {
+            'target_rate': target_rate,
+            'injected': self.injected,
+            'completed': self.completed,
+            'dispatch_errors': self.dispatch_errors,
+            'elapsed_s': round(elapsed, 2),
+            'throughput': round(self.completed / elapsed, 2) if elapsed else 0.0,
+            'queue_delay': summary(self.queue_delay),
+            'end_to_end': summary(self.end_to_end),
+            'handlers': {
+                name: {'count': len(samples), 'errors': self.handler_errors.get(name, 0), **summary(samples)}
+                for name, samples in sorted(self.handler_latency.items(), key=lambda item: -len(item[1]))
+            },
+            'api_calls': dict(self.api_calls),
+        }
+
+
+class DispatchErrorCounter(logging.Handler):
+    """Counts exceptions the dispatcher swallowed (parse failures, handler crashes)"""
+
+    def __init__(self, harness: "ReplayHarness"):
+        super().__init__(level=logging.ERROR)
+        self.harness = harness
+
+    def emit(self, record):
+        self.harness.stats.dispatch_errors += 1
+
+
+# ==================== EVENTS ====================
+
+def parse_mix(spec: str) -> List[tuple]:
+    """``kind:value=weight,...`` -> [(kind, value, weight)]"""
+    mix = []
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        action, _, weight = item.rpartition('=')
+        kind, _, value = action.partition(':')
+        if kind not in ('msg', 'cb'):
+            raise ValueError(f"Unknown event kind in mix: {item!r}")
+        mix.append((kind, value, float(weight)))
+    return mix
+
+
+def generate_events(rate: float, duration: float, users: int, mix: List[tuple],
+                    seed: int = 0) -> List[Dict]:
+    """Open-loop Poisson arrivals from ``users`` distinct users"""
+    rng = random.Random(seed)
+    weights = [weight for _, _, weight in mix]
+    events, at = [], 0.0
+    while True:
+        at += rng.expovariate(rate)
+        if at >= duration:
+            return events
+        kind, value, _ = rng.choices(mix, weights)[0]
+        event = {'at': round(at, 6), 'user_id': USER_ID_BASE + rng.randrange(users)}
+        event['text' if kind == 'msg' else 'callback'] = value
+        events.append(event)
+
+
+def load_events(path: str) -> List[Dict]:
+    with open(path) as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def save_events(path: str, events: Iterable[Dict]) -> None:
+    with open(path, 'w') as handle:
+        for event in events:
+            handle.write(json.dumps(event) + '\n')
+
+
+# ==================== HARNESS ====================
+
+class ReplayHarness:
+    """The production ``Bot`` client with a stubbed network layer"""
+
+    def __init__(self, workers: int = 100, api_latency: float = 0.0, bot_token: Optional[str] = None):
+        self.workers = workers
+        self.api_latency = api_latency
+        self.bot_token = bot_token
+        self.client = None
+        self.stats = ReplayStats()
+        self._message_ids = itertools.count(1)
+        self._known_users = set()
+        self._menu_messages: Dict[int, int] = {}
+
+    async def start(self):
+        from bot import Bot
+        from bot.plugins import MOTHER_BOT_PLUGINS
+
+        client = Bot(bot_token=self.bot_token)
+        # Same plugin set and handler groups as the production mother bot
+        client.plugins = MOTHER_BOT_PLUGINS
+        client.workers = self.workers
+        client.storage = MemoryStorage(client.name)
+        await client.storage.open()
+        bot_id = int(client.bot_token.split(':', 1)[0]) if ':' in client.bot_token else 1
+        client.me = types.User(id=bot_id, is_bot=True, first_name='Replay Bot', username='replay_bot', client=client)
+        client.username = client.me.username
+        client.invoke = MethodType(self._invoke, client)
+        # resolve_peer refuses to run on a client that never connected
+        client.is_connected = True
+        client.dispatcher.updates_queue = InstrumentedQueue(self.stats)
+
+        client.load_plugins()
+        # add_handler schedules registration as tasks; let them run
+        await asyncio.sleep(0.1)
+        self._wrap_handlers(client)
+
+        self._error_counter = DispatchErrorCounter(self)
+        logging.getLogger('pyrogram.dispatcher').addHandler(self._error_counter)
+
+        self.client = client
+        await client.dispatcher.start()
+        return self
+
+    async def stop(self):
+        if self.client is not None:
+            await self.client.dispatcher.stop()
+            self.client.is_connected = False
+            logging.getLogger('pyrogram.dispatcher').removeHandler(self._error_counter)
+            await self.client.storage.close()
+
+    def _wrap_handlers(self, client):
+        harness = self
+        for group, handlers in client.dispatcher.groups.items():
+            for handler in handlers:
+                # Message/callback handlers keep the plugin function in original_callback
+                attr = 'original_callback' if hasattr(handler, 'original_callback') else 'callback'
+                callback = getattr(handler, attr, None)
+                if callback is None or not asyncio.iscoroutinefunction(callback):
+                    continue
+                name = f"{getattr(callback, '__module__', '').rsplit('.', 1)[-1]}.{callback.__name__}"
+
+                async def timed(*args, _callback=callback, _name=name):
+                    start = time.perf_counter()
+                    try:
+                        return await _callback(*args)
+                    except Exception as e:
+                        if type(e).__name__ not in ('StopPropagation', 'ContinuePropagation'):
+                            harness.stats.handler_errors[_name] += 1
+                        raise
+                    finally:
+                        harness.stats.handler_latency[_name].append(time.perf_counter() - start)
+
+                setattr(handler, attr, timed)
+
+    # ---------- network stub ----------
+
+    def _user(self, user_id: int) -> raw.types.User:
+        is_bot = self.client is not None and user_id == self.client.me.id
+        return raw.types.User(id=user_id, access_hash=user_id, first_name=f"User{user_id}",
+                              username=f"user{user_id}", usernames=[], restriction_reason=[], bot=is_bot)
+
+    def _bot_message(self, message_id: int, user_id: int) -> raw.types.Message:
+        return raw.types.Message(
+            id=message_id, peer_id=raw.types.PeerUser(user_id=user_id), date=int(time.time()),
+            message='menu', out=True, from_id=raw.types.PeerUser(user_id=self.client.me.id), entities=[]
+        )
+
+    async def _invoke(self, client, query, *args, **kwargs):
+        name = type(query).__name__
+        self.stats.api_calls[name] += 1
+        if self.api_latency:
+            await asyncio.sleep(self.api_latency)
+
+        now = int(time.time())
+        if isinstance(query, raw.functions.messages.SendMessage):
+            return raw.types.UpdateShortSentMessage(id=next(self._message_ids), pts=0, pts_count=0, date=now)
+        if isinstance(query, raw.functions.messages.GetMessages):
+            ids = [getattr(message_id, 'id', 0) for message_id in query.id]
+            messages = [self._bot_message(i, self._menu_messages.get(i, USER_ID_BASE)) for i in ids]
+            users = [self._user(self._menu_messages.get(i, USER_ID_BASE)) for i in ids] + [self._user(client.me.id)]
+            return raw.types.messages.Messages(messages=messages, chats=[], users=users)
+        if isinstance(query, raw.functions.messages.SetBotCallbackAnswer):
+            return True
+        if isinstance(query, raw.functions.users.GetUsers):
+            return [self._user(getattr(user, 'user_id', USER_ID_BASE)) for user in query.id]
+        return raw.types.Updates(updates=[], users=[], chats=[], date=now, seq=0)
+
+    # ---------- injection ----------
+
+    async def _ensure_peer(self, user_id: int):
+        if user_id not in self._known_users:
+            await self.client.storage.update_peers([(user_id, user_id, 'user', f"user{user_id}", None)])
+            self._known_users.add(user_id)
+
+    async def inject(self, event: Dict):
+        """Put one event on the dispatcher queue as a raw update"""
+        user_id = int(event['user_id'])
+        await self._ensure_peer(user_id)
+        users = {user_id: self._user(user_id)}
+        peer = raw.types.PeerUser(user_id=user_id)
+
+        if 'callback' in event:
+            message_id = next(self._message_ids)
+            self._menu_messages[message_id] = user_id
+            update = raw.types.UpdateBotCallbackQuery(
+                query_id=random.getrandbits(62), user_id=user_id, peer=peer, msg_id=message_id,
+                chat_instance=user_id, data=str(event['callback']).encode()
+            )
+        else:
+            message = raw.types.Message(
+                id=next(self._message_ids), peer_id=peer, date=int(time.time()),
+                message=str(event.get('text', '')), from_id=peer, entities=[]
+            )
+            update = raw.types.UpdateNewMessage(message=message, pts=0, pts_count=0)
+
+        self.client.dispatcher.updates_queue.put_nowait((update, users, {}))
+        self.stats.injected += 1
+
+    async def replay(self, events: List[Dict], drain_timeout: float = 60.0) -> ReplayStats:
+        """Inject events at their ``at`` offsets, then wait for the queue to drain"""
+        self.stats = self.client.dispatcher.updates_queue.stats = ReplayStats()
+        start = time.perf_counter()
+        for event in events:
+            delay = float(event.get('at', 0)) - (time.perf_counter() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self.inject(event)
+
+        queue = self.client.dispatcher.updates_queue
+        deadline = time.perf_counter() + drain_timeout
+        while (queue.qsize() or queue.in_flight) and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+        self.stats.finished = time.perf_counter()
+        return self.stats
+
+
+# ==================== CLI ====================
+
+async def use_mongomock(monkeypatch, seed_size: int = 0):
+    """Rebind project Mongo handles to an in-process mongomock database"""
+    from tests.benchmark_harness import create_bench_client, rebind_motor_handles, seed_dataset
+    from info import Config
+    import bot.database  # noqa: F401  (load the modules whose handles get rebound)
+
+    client, _ = create_bench_client()
+    rebind_motor_handles(monkeypatch, client)
+    if seed_size:
+        await seed_dataset(client, Config.DATABASE_NAME, seed_size, clone_id=None)
+    return client
+
+
+def _print_report(report: Dict, top: int = 10):
+    print(f"\nrate {report['target_rate']}/s: injected {report['injected']}, completed {report['completed']} "
+          f"in {report['elapsed_s']}s -> {report['throughput']} updates/s "
+          f"({report['dispatch_errors']} dispatcher errors)")
+    for label in ('queue_delay', 'end_to_end'):
+        values = report[label]
+        print(f"  {label:<12} p50 {values['p50_ms']}ms  p95 {values['p95_ms']}ms  p99 {values['p99_ms']}ms")
+    for name, values in list(report['handlers'].items())[:top]:
+        print(f"  {name:<45} n={values['count']:<6} err={values['errors']:<4} "
+              f"p50 {values['p50_ms']}ms p95 {values['p95_ms']}ms")
+
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rate', type=float, default=100, help='updates per second')
+    parser.add_argument('--ramp', help='comma-separated rates to step through (capacity search)')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per run/step')
+    parser.add_argument('--users', type=int, default=1000, help='distinct synthetic users')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='kind:value=weight list (kind is msg or cb)')
+    parser.add_argument('--workers', type=int, default=100, help='dispatcher handler workers')
+    parser.add_argument('--api-latency', type=float, default=0.05, help='simulated Telegram API latency (s)')
+    parser.add_argument('--user-rate', type=float, default=0.2,
+                        help='updates/s one active user sends, for the concurrent-user estimate')
+    parser.add_argument('--slo', type=float, default=0.5, help='p95 queueing delay (s) a step must stay under')
+    parser.add_argument('--replay', help='JSONL file of recorded events to replay instead of generating')
+    parser.add_argument('--record', help='write the generated events to this JSONL file')
+    parser.add_argument('--mongomock', action='store_true', help='use an in-process mongomock database')
+    parser.add_argument('--seed-files', type=int, default=1000, help='files to seed into mongomock')
+    parser.add_argument('--json', help='write the report(s) to this file')
+    args = parser.parse_args(argv)
+
+    if args.mongomock:
+        import pytest
+        await use_mongomock(pytest.MonkeyPatch(), args.seed_files)
+
+    harness = await ReplayHarness(workers=args.workers, api_latency=args.api_latency).start()
+    reports = []
+    try:
+        if args.replay:
+            stats = await harness.replay(load_events(args.replay))
+            reports.append(stats.report())
+        else:
+            mix = parse_mix(args.mix)
+            rates = [float(rate) for rate in args.ramp.split(',')] if args.ramp else [args.rate]
+            for step, rate in enumerate(rates):
+                events = generate_events(rate, args.duration, args.users, mix, seed=step)
+                if args.record:
+                    save_events(args.record if len(rates) == 1 else f"{args.record}.{int(rate)}", events)
+                stats = await harness.replay(events)
+                reports.append(stats.report(target_rate=rate))
+                _print_report(reports[-1])
+                if stats.completed < stats.injected or reports[-1]['queue_delay']['p95_ms'] > args.slo * 1000:
+                    print(f"  saturated at {rate}/s")
+                    break
+    finally:
+        await harness.stop()
+
+    if args.replay:
+        _print_report(reports[-1])
+
+    sustainable = [r for r in reports if r['completed'] == r['injected']
+                   and r['queue_delay']['p95_ms'] <= args.slo * 1000]
+    if sustainable:
+        best = max(r['throughput'] for r in sustainable)
+        print(f"\nSustained {best} updates/s within the {args.slo}s p95 queueing SLO "
+              f"≈ {int(best / args.user_rate)} concurrent users at {args.user_rate} updates/s each")
+    if args.json:
+        Path(args.json).write_text(json.dumps(reports, indent=2))
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -3,7 +3,7 @@ import asyncio
 import json
 from datetime import datetime, timedelta
 from threading import Thread
-from flask import Flask, render_template_string, jsonify, request, session, redirect, url_for
+from flask import Flask, Response, render_template_string, jsonify, request, session, redirect, url_for
 from info import Config
 from bot.database.connection_manager import get_database
 from clone_manager import clone_manager
@@ -61,6 +61,84 @@ DASHBOARD_TEMPLATE = """
                 .catch(error => alert('Error: ' + error));
         }
         
+        function bulkClones(action) {
+            if (!confirm(`Run ${action} on all clones?`)) return;
+            fetch(`/api/clones/${action}`, { method: 'POST' })
+                .then(response => response.json())
+                .then(data => {
+                    if (!data.success) return alert(data.message);
+                    pollOperation(data.operation.id);
+                })
+                .catch(error => alert('Error: ' + error));
+        }
+
+        function pollOperation(operationId) {
+            fetch(`/api/operations/${operationId}`)
+                .then(response => response.json())
+                .then(op => {
+                    const wave = op.waves ? ` | wave ${op.wave}/${op.waves}` : '';
+                    document.getElementById('bulk-progress').textContent =
+                        `${op.action} ${op.status}: ${op.done}/${op.total} done, ${op.failed} failed${wave} ${op.message || ''}`;
+                    if (!op.finished_at) setTimeout(() => pollOperation(operationId), 2000);
+                });
+        }
+
+        function moveClone(botId, target) {
+            if (!confirm(`Move clone ${botId} data to the ${target} database?`)) return;
+            fetch(`/api/clone/${botId}/placement`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ target: target })
+            })
+                .then(response => response.json())
+                .then(data => {
+                    if (!data.success) return alert(data.message);
+                    pollMigration(botId, data.migration.id);
+                })
+                .catch(error => alert('Error: ' + error));
+        }
+
+        function pollMigration(botId, migrationId) {
+            fetch(`/api/migrations/${migrationId}`)
+                .then(response => response.json())
+                .then(m => {
+                    document.getElementById(`placement-${botId}`).textContent =
+                        `${m.phase}: ${m.copied}/${m.total} copied, ${m.verified} verified ${m.message || ''}`;
+                    if (!m.finished_at) setTimeout(() => pollMigration(botId, migrationId), 2000);
+                });
+        }
+
+        function startProfile(kind) {
+            const seconds = prompt(`Profile ${kind} for how many seconds?`, kind === 'cpu' ? '30' : '60');
+            if (!seconds) return;
+            fetch(`/api/profile/${kind}`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ seconds: Number(seconds) })
+            })
+                .then(response => response.json())
+                .then(data => {
+                    if (!data.success) return alert(data.message);
+                    pollProfile(data.profile.id);
+                })
+                .catch(error => alert('Error: ' + error));
+        }
+
+        function pollProfile(profileId) {
+            fetch(`/api/profile/${profileId}`)
+                .then(response => response.json())
+                .then(profile => {
+                    const status = document.getElementById('profile-status');
+                    if (profile.status === 'running') {
+                        status.textContent = `${profile.kind} profile ${profile.id} running...`;
+                        return setTimeout(() => pollProfile(profileId), 2000);
+                    }
+                    status.innerHTML = profile.status === 'completed'
+                        ? `<a href="/api/profile/${profile.id}/download">⬇️ ${profile.filename}</a>`
+                        : `${profile.kind} profile ${profile.status}: ${profile.error || ''}`;
+                });
+        }
+
         // Auto-refresh every 30 seconds
         setInterval(refreshDashboard, 30000);
     </script>
@@ -94,6 +172,12 @@ DASHBOARD_TEMPLATE = """
         
         <div class="clones-section">
             <h2>🤖 Clone Management</h2>
+            <div>
+                <button class="btn btn-warning" onclick="bulkClones('restart')">🔄 Rolling Restart All</button>
+                <button class="btn btn-primary" onclick="bulkClones('start')">▶️ Start All</button>
+                <button class="btn btn-danger" onclick="bulkClones('stop')">⏹️ Stop All</button>
+                <small id="bulk-progress"></small>
+            </div>
             {% for clone in clones %}
             <div class="clone-item">
                 <div>
@@ -109,6 +193,8 @@ DASHBOARD_TEMPLATE = """
                     {% else %}
                         <button class="btn btn-primary" onclick="manageClone('{{ clone.id }}', 'start')">▶️ Start</button>
                     {% endif %}
+                    <button class="btn btn-primary" onclick="moveClone('{{ clone.id }}', '{{ 'shared' if clone.files_placement == 'dedicated' else 'dedicated' }}')">🚚 Move to {{ 'shared' if clone.files_placement == 'dedicated' else 'dedicated' }} DB</button>
+                    <small id="placement-{{ clone.id }}">{{ clone.files_placement or '' }}</small>
                 </div>
             </div>
             {% endfor %}
@@ -128,6 +214,31 @@ DASHBOARD_TEMPLATE = """
                 <p><strong>Uptime:</strong> {{ system_health.uptime }}</p>
                 <p><strong>Last Updated:</strong> {{ datetime.now().strftime('%Y-%m-%d %H:%M:%S') }}</p>
             </div>
+
+            <div class="info-card">
+                <h3>⏱️ Event Loop</h3>
+                <p><strong>Lag p50 / p99 / max:</strong> {{ '%.1f' % (loop_health.lag_p50 * 1000) }} / {{ '%.1f' % (loop_health.lag_p99 * 1000) }} / {{ '%.1f' % (loop_health.lag_max * 1000) }} ms</p>
+                <p><strong>Stalls (5 min):</strong> {{ loop_health.stalls }}{% if loop_health.stalls %}, longest {{ '%.0f' % (loop_health.longest_stall * 1000) }} ms{% endif %}</p>
+                {% if loop_health.blocked_for %}
+                <p style="color: red;"><strong>Blocked now:</strong> {{ '%.0f' % (loop_health.blocked_for * 1000) }} ms</p>
+                {% endif %}
+                {% for culprit, count in loop_health.by_handler.items() %}
+                <p>🐢 {{ culprit }} &times; {{ count }}</p>
+                {% endfor %}
+                {% for stall in loop_health.recent_stalls[-3:]|reverse %}
+                <p style="font-size: 12px; color: #666;">{{ '%.0f' % (stall.duration * 1000) }} ms {{ stall.client or '' }} at {{ stall.top_frame or 'unknown frame' }}</p>
+                {% endfor %}
+            </div>
+
+            <div class="info-card">
+                <h3>🔬 Profiling</h3>
+                <button class="btn btn-primary" onclick="startProfile('cpu')">CPU Profile</button>
+                <button class="btn btn-primary" onclick="startProfile('memory')">Memory Diff</button>
+                <p><small id="profile-status"></small></p>
+                {% for profile in profiles %}
+                <p style="font-size: 12px;">{{ profile.kind }} {{ profile.status }}{% if profile.status == 'completed' %}: <a href="/api/profile/{{ profile.id }}/download">{{ profile.filename }}</a>{% endif %}</p>
+                {% endfor %}
+            </div>
         </div>
         
         <div class="log-section" style="margin-top: 20px;">
@@ -176,25 +287,14 @@ LOGIN_TEMPLATE = """
 async def get_dashboard_stats():
     """Collect dashboard statistics"""
     try:
-        db = get_database()
-        if not db:
-            return {}
-        
-        # Get clone statistics
-        total_clones = await db.clones.count_documents({})
-        running_clones = len(clone_manager.get_running_clones())
-        
-        # Get user statistics
-        total_users = await db.users.count_documents({})
-        
-        # Get file statistics
-        total_files = await db.files.count_documents({}) if 'files' in await db.list_collection_names() else 0
+        from bot.utils.stats_service import stats_service
+        stats = await stats_service.get()
         
         return {
-            'total_clones': total_clones,
-            'running_clones': running_clones,
-            'total_users': total_users,
-            'total_files': total_files
+            'total_clones': stats['total_clones'],
+            'running_clones': len(clone_manager.get_running_clones()),
+            'total_users': stats['total_users'],
+            'total_files': stats['total_files']
         }
     except Exception as e:
         print(f"Error getting dashboard stats: {e}")
@@ -286,6 +386,9 @@ def dashboard():
         storage_stats = loop.run_until_complete(get_storage_stats())
         system_health = loop.run_until_complete(get_system_health())
         recent_logs = loop.run_until_complete(get_recent_logs())
+
+        from bot.utils.loop_monitor import loop_monitor
+        from bot.utils.live_profiler import live_profiler
         
         return render_template_string(
             DASHBOARD_TEMPLATE,
@@ -294,6 +397,8 @@ def dashboard():
             storage_stats=storage_stats,
             system_health=system_health,
             recent_logs=recent_logs,
+            loop_health=loop_monitor.snapshot(),
+            profiles=list(reversed(live_profiler.profiles.values()))[:5],
             datetime=datetime
         )
     finally:
@@ -338,6 +443,66 @@ def manage_clone(bot_id, action):
     finally:
         loop.close()
 
+@app.route('/api/clones/<action>', methods=['POST'])
+def manage_all_clones(action):
+    """Start a bulk clone operation (start, stop or rolling restart); returns its id at once"""
+    if not session.get('authenticated'):
+        return jsonify({'success': False, 'message': 'Authentication required'})
+
+    body = request.get_json(silent=True) or {}
+    options = {}
+    if body.get('bot_ids'):
+        options['bot_ids'] = [str(bot_id) for bot_id in body['bot_ids']]
+    if action == 'restart' and body.get('wave_size'):
+        options['wave_size'] = int(body['wave_size'])
+    elif action in ('start', 'stop') and body.get('concurrency'):
+        options['concurrency'] = int(body['concurrency'])
+
+    try:
+        operation = clone_manager.submit(action, **options)
+        return jsonify({'success': True, 'operation': operation.as_dict()})
+    except (ValueError, RuntimeError) as e:
+        return jsonify({'success': False, 'message': str(e)})
+
+@app.route('/api/clone/<bot_id>/placement', methods=['POST'])
+def move_clone_data(bot_id):
+    """Move a clone's files and stats to the shared or its dedicated database; returns the migration at once"""
+    if not session.get('authenticated'):
+        return jsonify({'success': False, 'message': 'Authentication required'})
+
+    from bot.database.clone_placement import placement
+
+    body = request.get_json(silent=True) or {}
+    try:
+        migration = placement.submit(bot_id, body.get('target', ''), cleanup=bool(body.get('cleanup')))
+        return jsonify({'success': True, 'migration': migration.as_dict()})
+    except (ValueError, RuntimeError) as e:
+        return jsonify({'success': False, 'message': str(e)})
+
+@app.route('/api/migrations/<migration_id>')
+def clone_migration(migration_id):
+    """Phase and progress of a clone data migration"""
+    if not session.get('authenticated'):
+        return jsonify({'error': 'Authentication required'})
+
+    from bot.database.clone_placement import placement
+
+    migration = placement.get_migration(migration_id)
+    if migration is None:
+        return jsonify({'error': 'Unknown migration'}), 404
+    return jsonify(migration.as_dict())
+
+@app.route('/api/operations/<operation_id>')
+def clone_operation(operation_id):
+    """Progress and per-clone results of a bulk clone operation"""
+    if not session.get('authenticated'):
+        return jsonify({'error': 'Authentication required'})
+
+    operation = clone_manager.get_operation(operation_id)
+    if operation is None:
+        return jsonify({'error': 'Unknown operation'}), 404
+    return jsonify(operation.as_dict())
+
 @app.route('/api/stats')
 def api_stats():
     """API endpoint for statistics"""
@@ -353,6 +518,82 @@ def api_stats():
     finally:
         loop.close()
 
+@app.route('/api/system')
+def api_system():
+    """Resource usage from the background sampler (no sampling on request)"""
+    if not session.get('authenticated'):
+        return jsonify({'error': 'Authentication required'})
+
+    from bot.utils.resource_sampler import resource_sampler
+    return jsonify(resource_sampler.snapshot())
+
+@app.route('/api/loop')
+def api_loop():
+    """Event loop lag percentiles and recent stalls from the loop monitor"""
+    if not session.get('authenticated'):
+        return jsonify({'error': 'Authentication required'})
+
+    from bot.utils.loop_monitor import loop_monitor
+    return jsonify(loop_monitor.snapshot())
+
+@app.route('/api/profile/<kind>', methods=['POST'])
+def start_profile(kind):
+    """Start a time-boxed cpu or memory profile; returns its id at once"""
+    if not session.get('authenticated'):
+        return jsonify({'success': False, 'message': 'Authentication required'})
+
+    from bot.utils.live_profiler import live_profiler
+
+    body = request.get_json(silent=True) or {}
+    try:
+        profile = live_profiler.start(
+            kind,
+            float(body.get('seconds') or 30),
+            clone=str(body['clone']) if body.get('clone') else None,
+            all_threads=bool(body.get('all_threads'))
+        )
+        return jsonify({'success': True, 'profile': profile.as_dict()})
+    except (ValueError, RuntimeError) as e:
+        return jsonify({'success': False, 'message': str(e)})
+
+@app.route('/api/profile/<profile_id>')
+def profile_status(profile_id):
+    """Status and summary of a profile"""
+    if not session.get('authenticated'):
+        return jsonify({'error': 'Authentication required'})
+
+    from bot.utils.live_profiler import live_profiler
+
+    profile = live_profiler.get(profile_id)
+    if profile is None:
+        return jsonify({'error': 'Unknown profile'}), 404
+    return jsonify(profile.as_dict())
+
+@app.route('/api/profile/<profile_id>/download')
+def download_profile(profile_id):
+    """The profile file: collapsed stacks (cpu) or top allocators (memory)"""
+    if not session.get('authenticated'):
+        return redirect(url_for('login'))
+
+    from bot.utils.live_profiler import live_profiler
+
+    profile = live_profiler.get(profile_id)
+    if profile is None or not profile.finished:
+        return jsonify({'error': 'Profile not ready'}), 404
+    return Response(profile.output, mimetype='text/plain',
+                    headers={'Content-Disposition': f'attachment; filename={profile.filename}'})
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus text exposition of request-level metrics"""
+    if Config.METRICS_TOKEN:
+        token = request.headers.get('Authorization', '').replace('Bearer ', '', 1) or request.args.get('token', '')
+        if token != Config.METRICS_TOKEN:
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+
+    from bot.utils.metrics import render_metrics
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
 def start_webserver():
     """Start the web server in a separate thread"""
     def run_server():